@@ -7,5 +7,6 @@
 # pyre-strict
 
 from .pearl_agent import PearlAgent
+from .vector_pearl_agent import VectorPearlAgent
 
-__all__ = ["PearlAgent"]
+__all__ = ["PearlAgent", "VectorPearlAgent"]
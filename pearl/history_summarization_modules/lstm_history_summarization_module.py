@@ -24,6 +24,22 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
     A history summarization module that uses a recurrent neural network
     to summarize past history observations into a hidden representation
     and incrementally generate a new subjective state.
+
+    By default, each call of `summarize_history` re-runs the LSTM over the last
+    `history_length` observation-action pairs. With `incremental=True`, the hidden and
+    cell states of the LSTM are instead carried across steps (and reset with the
+    module), so that each call performs a single LSTM step whatever `history_length` is.
+    Subjective states then summarize the whole episode, while learning (through
+    `forward`) still runs the LSTM from zero states over windows of `history_length`
+    steps. Once an episode is longer than `history_length`, the subjective states used
+    for acting are therefore not the ones the policy is trained on, so incremental mode
+    changes the behavior of the agent and is not a drop-in speedup: it relies on the
+    policy generalizing from zero-state windows to carried states (as in R2D2 without
+    stored recurrent states), which should be checked on the task at hand.
+
+    In both modes, `get_history` returns the window of the last `history_length` pairs,
+    which is what replay buffers store. `HistoryReplayBuffer` stores each pair only
+    once instead of storing full windows.
     """
 
     def __init__(
@@ -33,6 +49,7 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
         history_length: int = 8,
         hidden_dim: int = 128,
         num_layers: int = 2,
+        incremental: bool = False,
     ) -> None:
         super().__init__()
         self.num_layers = num_layers
@@ -40,6 +57,7 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
         self.history_length = history_length
         self.observation_dim = observation_dim
         self.action_dim = action_dim
+        self.incremental = incremental
         self.register_buffer("default_action", torch.zeros((1, action_dim)))
         self.register_buffer(
             "history",
@@ -51,6 +69,13 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
             hidden_size=self.hidden_dim,
             batch_first=True,
         )
+        # recurrent states carried across steps in incremental mode
+        self.register_buffer(
+            "hidden_state", torch.zeros((num_layers, hidden_dim)), persistent=False
+        )
+        self.register_buffer(
+            "cell_state", torch.zeros((num_layers, hidden_dim)), persistent=False
+        )
 
     def summarize_history(
         self, observation: Observation, action: Action | None
@@ -75,7 +100,13 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
             ],
             dim=0,
         )
-        out, (_, _) = self.lstm(self.history)
+        if not self.incremental:
+            out, (_, _) = self.lstm(self.history)
+            return out[-1]
+        with torch.no_grad():
+            out, (self.hidden_state, self.cell_state) = self.lstm(
+                observation_action_pair, (self.hidden_state, self.cell_state)
+            )
         return out[-1]
 
     def get_history(self) -> torch.Tensor:
@@ -90,6 +121,8 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
             "history",
             torch.zeros((self.history_length, self.action_dim + self.observation_dim)),
         )
+        self.hidden_state = torch.zeros_like(self.hidden_state)
+        self.cell_state = torch.zeros_like(self.cell_state)
 
     def compare(self, other: HistorySummarizationModule) -> str:
         """
@@ -130,6 +163,10 @@ class LSTMHistorySummarizationModule(HistorySummarizationModule):
             differences.append(
                 f"action_dim is different: {self.action_dim} vs {other.action_dim}"
             )
+        if self.incremental != other.incremental:
+            differences.append(
+                f"incremental is different: {self.incremental} vs {other.incremental}"
+            )
         if not torch.allclose(self.default_action, other.default_action):
             differences.append(
                 f"default_action is different: {self.default_action} vs {other.default_action}"
@@ -7,7 +7,7 @@
 
 # pyre-strict
 
-from typing import List
+from typing import Any, List
 
 import torch
 from pearl.api.action import Action
@@ -22,6 +22,18 @@ from pearl.utils.tensor_like import assert_is_tensor_like
 class StackingHistorySummarizationModule(HistorySummarizationModule):
     """
     A history summarization module that simply stacks observations into a history.
+
+    Observation-action pairs are written one after the other in a preallocated buffer
+    of `3 * history_length - 1` pairs, so that the last `history_length` pairs are
+    always a contiguous slice of it. When the buffer is full, the last pairs are moved
+    to its front. Stacked histories are returned from the oldest to the most recent
+    pair, flattened. `summarize_history` returns a view of the buffer, without copying
+    it, which is not modified by the next `history_length` steps (moving pairs to the
+    front of the buffer only overwrites older slices), while `get_history` returns a
+    copy. Since consecutive histories overlap, `HistoryReplayBuffer` can store them
+    with each pair stored once. The history is saved in `state_dict` in order, from
+    the oldest to the most recent pair, so that the position of the slice does not
+    need to be saved.
     """
 
     def __init__(
@@ -32,9 +44,13 @@ class StackingHistorySummarizationModule(HistorySummarizationModule):
         self.observation_dim = observation_dim
         self.action_dim = action_dim
         self.register_buffer("default_action", torch.zeros((1, action_dim)))
+        # the history is the slice of `history_length` pairs starting at index `_start`
         self.register_buffer(
-            "history", torch.zeros((history_length, action_dim + observation_dim))
+            "history",
+            torch.zeros((3 * history_length - 1, action_dim + observation_dim)),
+            persistent=False,
         )
+        self._start = 0
 
     def summarize_history(
         self, observation: Observation, action: Action | None
@@ -45,32 +61,81 @@ class StackingHistorySummarizationModule(HistorySummarizationModule):
         observation = assert_is_tensor_like(observation)
         action = assert_is_tensor_like(action)
         assert observation.shape[-1] + action.shape[-1] == self.history.shape[-1]
-        observation_action_pair = torch.cat(
-            (action, observation.view(1, -1)), dim=-1
-        ).detach()
-        self.history = torch.cat(
-            [
-                self.history[1:, :],
-                observation_action_pair.view(
-                    (1, self.action_dim + self.observation_dim)
-                ),
-            ],
-            dim=0,
-        )
-        return self.history.view(-1)
+        if self._start + self.history_length == len(self.history):
+            # the pairs kept in the next history are moved to the front of the buffer
+            self.history[: self.history_length - 1] = self.history[self._start + 1 :]
+            self._start = -1
+        self._start += 1
+        row = self._start + self.history_length - 1
+        self.history[row, : self.action_dim] = action.detach().view(-1)
+        self.history[row, self.action_dim :] = observation.detach().view(-1)
+        return self._window().view(-1)
+
+    def _window(self) -> torch.Tensor:
+        """The last `history_length` pairs, as a view of the buffer."""
+        return self.history[self._start : self._start + self.history_length]
 
     def get_history(self) -> torch.Tensor:
-        return self.history.view(-1)
+        """
+        Returns the stacked history, which is a new tensor (and not a view of the
+        buffer, which is modified by later steps).
+        """
+        return self._window().clone().view(-1)
+
+    def _save_to_state_dict(
+        self, destination: dict[str, Any], prefix: str, keep_vars: bool
+    ) -> None:
+        super()._save_to_state_dict(destination, prefix, keep_vars)
+        # only the pairs of the history are saved, in order
+        destination[prefix + "history"] = self._window().clone()
+
+    def _load_from_state_dict(
+        self,
+        state_dict: dict[str, Any],
+        prefix: str,
+        local_metadata: dict[str, Any],
+        strict: bool,
+        missing_keys: list[str],
+        unexpected_keys: list[str],
+        error_msgs: list[str],
+    ) -> None:
+        super()._load_from_state_dict(
+            state_dict,
+            prefix,
+            local_metadata,
+            strict,
+            missing_keys,
+            unexpected_keys,
+            error_msgs,
+        )
+        # the buffer is not persistent, so the saved history is loaded here, with its
+        # oldest pair at index 0
+        key = prefix + "history"
+        if key in unexpected_keys:
+            unexpected_keys.remove(key)
+        if key not in state_dict:
+            if strict:
+                missing_keys.append(key)
+            return
+        history = state_dict[key]
+        if history.shape != self._window().shape:
+            error_msgs.append(
+                f"size mismatch for {key}: copying a param with shape "
+                f"{tuple(history.shape)}, the shape in current model is "
+                f"{tuple(self._window().shape)}."
+            )
+            return
+        with torch.no_grad():
+            self.history[: self.history_length] = history
+        self._start = 0
 
     def forward(self, x: History) -> torch.Tensor:
         x = assert_is_tensor_like(x)
         return x
 
     def reset(self) -> None:
-        self.register_buffer(
-            "history",
-            torch.zeros((self.history_length, self.action_dim + self.observation_dim)),
-        )
+        self.history.zero_()
+        self._start = 0
 
     def compare(self, other: HistorySummarizationModule) -> str:
         """
@@ -107,9 +172,9 @@ class StackingHistorySummarizationModule(HistorySummarizationModule):
             differences.append(
                 f"default_action is different: {self.default_action} vs {other.default_action}"
             )
-        if not torch.allclose(self.history, other.history):
+        if not torch.allclose(self.get_history(), other.get_history()):
             differences.append(
-                f"history is different: {self.history} vs {other.history}"
+                f"history is different: {self.get_history()} vs {other.get_history()}"
             )
 
         return "\n".join(differences)  # Join the differences with newlines
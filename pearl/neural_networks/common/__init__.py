@@ -6,7 +6,12 @@
 
 # pyre-strict
 
-from .epistemic_neural_networks import Ensemble, EpistemicNeuralNetwork, MLPWithPrior
+from .epistemic_neural_networks import (
+    Ensemble,
+    EpistemicNeuralNetwork,
+    MLPWithPrior,
+    StackedEnsemble,
+)
 from .residual_wrapper import ResidualWrapper
 from .value_networks import CNNValueNetwork, ValueNetwork, VanillaValueNetwork
 
@@ -15,6 +20,7 @@ __all__ = [
     "EpistemicNeuralNetwork",
     "MLPWithPrior",
     "ResidualWrapper",
+    "StackedEnsemble",
     "ValueNetwork",
     "CNNValueNetwork",
     "VanillaValueNetwork",
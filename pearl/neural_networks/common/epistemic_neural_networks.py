@@ -133,14 +133,178 @@ class Ensemble(EpistemicNeuralNetwork):
         if not persistent:
             self._resample_epistemic_index()
 
+    def forward_all(self, x: Tensor) -> Tensor:
+        """
+        Input:
+            x: Feature vector of state action pairs, of shape (..., input_dim)
+        Output:
+            posterior samples of all ensemble members, of shape
+            (ensemble_size, ..., output_dim)
+        """
+        return torch.stack([model(x) for model in self.models])
+
     def _resample_epistemic_index(self) -> None:
         self.z = torch.randint(0, self.ensemble_size, (1,))
 
 
+class StackedEnsemble(EpistemicNeuralNetwork):
+    """
+    An ensemble of MLPs with prior regularization (see `MLPWithPrior`), equivalent to
+    `Ensemble`, whose weights are stacked across ensemble members in tensors of shape
+    (ensemble_size, in_features, out_features). All members are evaluated at once with
+    batched matrix multiplications, so the cost of evaluating and training the whole
+    ensemble does not grow with the number of Python calls per member.
+    Args:
+        input_dim: int. Input feature dimension.
+        hidden_dims: List[int]. Hidden layer dimensions.
+        output_dim: int. Output dimension.
+        ensemble_size: int. Number of particles in the ensemble
+                            to construct posterior.
+        prior_scale: float. prior regularization scale.
+    """
+
+    def __init__(
+        self,
+        input_dim: int,
+        hidden_dims: list[int] | None,
+        output_dim: int = 1,
+        ensemble_size: int = 10,
+        prior_scale: float = 1.0,
+    ) -> None:
+        super().__init__(input_dim, hidden_dims, output_dim)
+        self.ensemble_size = ensemble_size
+        self.prior_scale = prior_scale
+        dims = [input_dim] + (hidden_dims or []) + [output_dim]
+        self.weights = nn.ParameterList()
+        self.biases = nn.ParameterList()
+        # fixed prior networks, which are not trained
+        self.prior_weights = nn.ParameterList()
+        self.prior_biases = nn.ParameterList()
+        for in_features, out_features in zip(dims[:-1], dims[1:]):
+            # same distribution as the default initialization of `nn.Linear`
+            bound = in_features**-0.5
+            for weights, biases, requires_grad in (
+                (self.weights, self.biases, True),
+                (self.prior_weights, self.prior_biases, False),
+            ):
+                weights.append(
+                    nn.Parameter(
+                        torch.empty(ensemble_size, in_features, out_features).uniform_(
+                            -bound, bound
+                        ),
+                        requires_grad=requires_grad,
+                    )
+                )
+                biases.append(
+                    nn.Parameter(
+                        torch.empty(ensemble_size, 1, out_features).uniform_(
+                            -bound, bound
+                        ),
+                        requires_grad=requires_grad,
+                    )
+                )
+        self._resample_epistemic_index()
+
+    def _mlp(
+        self,
+        x: Tensor,
+        weights: nn.ParameterList,
+        biases: nn.ParameterList,
+        ensemble_index: int | None = None,
+    ) -> Tensor:
+        """
+        Evaluates the MLP of the member `ensemble_index` on x of shape (N, input_dim),
+        returning a tensor of shape (N, output_dim), or the MLPs of all members if it
+        is None, returning a tensor of shape (ensemble_size, N, output_dim).
+        """
+        for i, (weight, bias) in enumerate(zip(weights, biases)):
+            if ensemble_index is not None:
+                x = torch.addmm(bias[ensemble_index], x, weight[ensemble_index])
+            elif x.ndim == 3:
+                x = torch.baddbmm(bias, x, weight)
+            else:
+                # the input is shared by all members
+                x = bias + x @ weight
+            if i < len(weights) - 1:
+                x = torch.relu(x)
+        return x
+
+    def forward_all(self, x: Tensor) -> Tensor:
+        """
+        Input:
+            x: Feature vector of state action pairs, of shape (..., input_dim)
+        Output:
+            posterior samples of all ensemble members, of shape
+            (ensemble_size, ..., output_dim)
+        """
+        batch_shape = x.shape[:-1]
+        x = x.reshape(-1, x.shape[-1])
+        with torch.no_grad():
+            prior = self.prior_scale * self._mlp(
+                x, self.prior_weights, self.prior_biases
+            )
+        outputs = self._mlp(x, self.weights, self.biases) + prior
+        return outputs.view(self.ensemble_size, *batch_shape, -1)
+
+    def forward(self, x: Tensor, z: Tensor, persistent: bool = False) -> Tensor:
+        """
+        Input:
+            x: Feature vector of state action pairs
+            z: Single integer tensor. Ensemble epistemic index
+        Output:
+            posterior samples corresponding to z
+        """
+        assert z.flatten().shape[0] == 1
+        ensemble_index = int(z.item())
+        assert ensemble_index >= 0 and ensemble_index < self.ensemble_size
+        batch_shape = x.shape[:-1]
+        x = x.reshape(-1, x.shape[-1])
+        with torch.no_grad():
+            prior = self.prior_scale * self._mlp(
+                x, self.prior_weights, self.prior_biases, ensemble_index
+            )
+        outputs = self._mlp(x, self.weights, self.biases, ensemble_index) + prior
+        return outputs.view(*batch_shape, -1)
+
+    def _resample_epistemic_index(self) -> None:
+        self.z = torch.randint(0, self.ensemble_size, (1,))
+
+
+class StackedLinear(nn.Module):
+    """
+    Fixed linear layers of several models, whose weights are stacked in a tensor of
+    shape (number_of_models, in_features, out_features), evaluated with a single batched
+    matrix multiplication.
+    """
+
+    def __init__(self, weight: Tensor, bias: Tensor) -> None:
+        super().__init__()
+        self.register_buffer("weight", weight, persistent=False)
+        self.register_buffer("bias", bias.unsqueeze(1), persistent=False)
+
+    def forward(self, x: Tensor) -> Tensor:
+        """
+        Input:
+            x: tensor of shape (N, in_features), shared by all models, or of shape
+                (number_of_models, N, in_features)
+        Output:
+            tensor of shape (number_of_models, N, out_features)
+        """
+        if x.dim() == 2:
+            return self.bias + torch.matmul(x, self.weight)
+        return torch.baddbmm(self.bias, x, self.weight)
+
+
 class Priornet(nn.Module):
     """
     Prior network for epinet.  This network contains an ensemble of
     randomly initialized models which are held fixed during training.
+
+    The weights of the models are also stacked across models (see `StackedLinear`),
+    so that all models are evaluated with one batched matrix multiplication per layer
+    instead of one forward pass per model. Stacked weights are rebuilt when a state
+    dict is loaded, and `generate_params_buffers` must be called after modifying the
+    weights of `models` in any other way.
     """
 
     def __init__(
@@ -166,13 +330,26 @@ class Priornet(nn.Module):
 
         self.params: dict[str, Any]
         self.buffers: dict[str, Any]
+        self.stacked_layers: nn.ModuleList = nn.ModuleList()
         self.generate_params_buffers()
+        self.register_load_state_dict_post_hook(_generate_priornet_params_buffers)
 
     def generate_params_buffers(self) -> None:
         """
         Generate parameters and buffers for the priornet.
         """
         self.params, self.buffers = torch.func.stack_module_state(self.models)
+        number_of_layers = len(self.hidden_dims) + 1
+        self.stacked_layers = nn.ModuleList(
+            [
+                StackedLinear(
+                    # weights of `nn.Linear` are of shape (out_features, in_features)
+                    self.params[f"{i}.0.weight"].detach().transpose(1, 2).contiguous(),
+                    self.params[f"{i}.0.bias"].detach(),
+                )
+                for i in range(number_of_layers)
+            ]
+        )
 
     def call_single_model(
         self, params: dict[str, Any], buffers: dict[str, Any], data: Tensor
@@ -182,6 +359,20 @@ class Priornet(nn.Module):
         """
         return torch.func.functional_call(self.base_model, (params, buffers), (data,))
 
+    def forward_all(self, x: Tensor) -> Tensor:
+        """
+        Input:
+            x: tensor of shape (N, input_dim)
+        Output:
+            outputs of all models, of shape (index_dim, N, output_dim)
+        """
+        outputs = x
+        for i, layer in enumerate(self.stacked_layers):
+            outputs = layer(outputs)
+            if i < len(self.stacked_layers) - 1:
+                outputs = torch.relu(outputs)
+        return outputs
+
     def forward(self, x: Tensor, z: Tensor) -> Tensor:
         """
         Perform forward pass on the priornet ensemble and weight by epistemic index
@@ -192,17 +383,18 @@ class Priornet(nn.Module):
         Output:
             ensemble output of x weighted by epistemic index vector z.
         """
-        # vmap is not compatible with torchscript
-        # outputs = torch.vmap(self.call_single_model, (0, 0, None))(
-        #     self.params, self.buffers, x
-        # )
-        outputs = []
-        for model in self.models:
-            outputs.append(model(x))
-        outputs = torch.stack(outputs, dim=0)
+        outputs = self.forward_all(x)
         return torch.einsum("ijk,ji->jk", outputs, z)
 
 
+def _generate_priornet_params_buffers(
+    module: nn.Module, incompatible_keys: Any
+) -> None:
+    """Rebuilds the stacked weights of a priornet after loading a state dict."""
+    assert isinstance(module, Priornet)
+    module.generate_params_buffers()
+
+
 class Epinet(EpistemicNeuralNetwork):
     def __init__(
         self,
@@ -256,15 +448,37 @@ class Epinet(EpistemicNeuralNetwork):
             x: Feature vector containing item and user embeddings and interactions
             z: Matrix containing . Epinet epistemic indices
         Output:
-            posterior samples corresponding to z
+            posterior samples corresponding to z, for each pair of rows of x and z
+            (as returned by `format_xz`)
+
+        The cartesian product of x and z is not materialized: the first layer of the
+        epinet is split into its x and z parts, which are computed once for each row of
+        x and of z and broadcast over the other, and the priornet is evaluated once for
+        each row of x.
         """
-        xz = self.format_xz(x, z)
-        x_cartesian, z_cartesian = xz[:, : -self.index_dim], xz[:, -self.index_dim :]
-        batch_size, _ = xz.shape
-        epinet_out = self.epinet(xz.detach()).view(
-            batch_size, self.output_dim, self.index_dim
+        batch_size = x.shape[0]
+        num_indices = z.shape[0]
+        # pyre-fixme[29]: `Union[Tensor, Module]` is not a function.
+        first_layer = self.epinet[0][0]
+        hidden = torch.nn.functional.linear(
+            x.detach(), first_layer.weight[:, : self.input_dim], first_layer.bias
+        ).unsqueeze(1) + torch.nn.functional.linear(
+            z.detach(), first_layer.weight[:, self.input_dim :]
+        ).unsqueeze(0)  # (batch_size, num_indices, first layer output dim)
+        if len(self.epi_hiddens) > 0:
+            hidden = torch.relu(hidden)
+        # pyre-fixme[6]: `Union[Tensor, Module]` is not iterable.
+        for i, block in enumerate(self.epinet):
+            if i > 0:
+                hidden = block(hidden)
+        epinet_out = hidden.view(
+            batch_size, num_indices, self.output_dim, self.index_dim
         )
-        epinet_out = torch.einsum("ijk,ik->ij", epinet_out, z_cartesian)
+        epinet_out = torch.einsum("ijkl,jl->ijk", epinet_out, z)
         with torch.no_grad():
-            priornet_out = self.prior_scale * self.priornet(x_cartesian, z_cartesian)
-        return epinet_out + priornet_out
+            priornet_out = self.prior_scale * torch.einsum(
+                "lik,jl->ijk", self.priornet.forward_all(x), z
+            )
+        return (epinet_out + priornet_out).view(
+            batch_size * num_indices, self.output_dim
+        )
@@ -8,6 +8,7 @@
 # pyre-strict
 
 import logging
+import weakref
 from typing import Any
 
 import torch
@@ -169,19 +170,66 @@ def uniform_init_weights(m: nn.Module) -> None:
         nn.init.uniform_(m.bias, -0.001, 0.001)
 
 
+# parameters soft-updated by `update_target_network` for each pair of target and source
+# networks, as lists of target and source parameters of the same device and dtype
+_SOFT_UPDATE_GROUPS: weakref.WeakKeyDictionary[
+    nn.Module,
+    weakref.WeakKeyDictionary[
+        nn.Module, list[tuple[list[torch.Tensor], list[torch.Tensor]]]
+    ],
+] = weakref.WeakKeyDictionary()
+
+
+def _soft_update_groups(
+    target_network: nn.Module, source_network: nn.Module
+) -> list[tuple[list[torch.Tensor], list[torch.Tensor]]]:
+    """
+    Returns the parameters of the target network and the ones of the source network
+    they are soft-updated from, grouped by device and dtype so that each group can be
+    updated with a single multi-tensor operation. Groups are computed once for each
+    pair of networks, assuming that their parameters are not reassigned afterwards.
+    """
+    groups_by_source = _SOFT_UPDATE_GROUPS.setdefault(
+        target_network, weakref.WeakKeyDictionary()
+    )
+    groups = groups_by_source.get(source_network)
+    if groups is None:
+        groups_by_key: dict[
+            tuple[torch.device, torch.dtype],
+            tuple[list[torch.Tensor], list[torch.Tensor]],
+        ] = {}
+        for target_param, source_param in zip(
+            target_network.parameters(), source_network.parameters()
+        ):
+            if target_param is source_param:
+                # skip soft-updating when the target network shares the parameter with
+                # the network being train.
+                continue
+            target_params, source_params = groups_by_key.setdefault(
+                (target_param.device, target_param.dtype), ([], [])
+            )
+            target_params.append(target_param)
+            source_params.append(source_param)
+        groups = list(groups_by_key.values())
+        groups_by_source[source_network] = groups
+    return groups
+
+
 def update_target_network(
     target_network: nn.Module, source_network: nn.Module, tau: float
 ) -> None:
     # Q_target = (1 - tao) * Q_target + tao*Q
-    for target_param, source_param in zip(
-        target_network.parameters(), source_network.parameters()
-    ):
-        if target_param is source_param:
-            # skip soft-updating when the target network shares the parameter with
-            # the network being train.
-            continue
-        new_param = tau * source_param.data + (1.0 - tau) * target_param.data
-        target_param.data.copy_(new_param)
+    # which is computed in place with one fused lerp per device and dtype of parameters
+    with torch.no_grad():
+        for target_params, source_params in _soft_update_groups(
+            target_network, source_network
+        ):
+            if target_params[0].is_floating_point():
+                torch._foreach_lerp_(target_params, source_params, tau)
+                continue
+            for target_param, source_param in zip(target_params, source_params):
+                new_param = tau * source_param + (1.0 - tau) * target_param
+                target_param.copy_(new_param)
 
 
 def ensemble_forward(
@@ -7,12 +7,14 @@
 # pyre-strict
 
 from .base_cb_model import MuSigmaCBModel
+from .batched_linear_regression import BatchedLinearRegression
 from .linear_regression import LinearRegression
 from .neural_linear_regression import NeuralLinearRegression
 
 
 __all__ = [
     "MuSigmaCBModel",
+    "BatchedLinearRegression",
     "LinearRegression",
     "NeuralLinearRegression",
 ]
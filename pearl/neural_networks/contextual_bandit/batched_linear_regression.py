@@ -0,0 +1,350 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import logging
+from typing import Any, List
+
+import torch
+from pearl.neural_networks.contextual_bandit.base_cb_model import MuSigmaCBModel
+from pearl.neural_networks.contextual_bandit.linear_regression import (
+    LinearRegression,
+    precision_to_scale,
+    sample_from_precision_scale,
+)
+from pearl.utils.device import is_distribution_enabled
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# buffers of `LinearRegression`, stacked along a leading arm dimension
+_BUFFER_NAMES = ("_A", "_b", "_sum_weight", "_inv_A", "_coefs")
+
+
+class BatchedLinearRegression(MuSigmaCBModel):
+    def __init__(
+        self,
+        n_arms: int,
+        feature_dim: int,
+        l2_reg_lambda: float = 1.0,
+        gamma: float = 1.0,
+        force_pinv: bool = False,
+    ) -> None:
+        """
+        `n_arms` independent `LinearRegression` models (one per arm of a disjoint bandit)
+        stored as stacked tensors, so that all arms are updated and evaluated with a few
+        batched operations instead of a Python loop over arms:
+        - A has shape (n_arms, feature_dim + 1, feature_dim + 1) and b has shape
+          (n_arms, feature_dim + 1). Observations are added to the A and b of their arm
+          with scatter-adds, and only the arms present in a batch are inverted again.
+        - Point predictions and uncertainties of all arms are computed with one `einsum`.
+
+        The state dict has the same layout as a `ModuleList` of `LinearRegression`
+        models (keys `{i}._A`, `{i}._b`, ...), so that states can be loaded in either.
+
+        n_arms: number of arms
+        feature_dim: number of features
+        l2_reg_lambda: L2 regularization parameter
+        gamma: discounting multiplier (see `LinearRegression`)
+        force_pinv: If True, we will always use pseudo inverse to invert the `A` matrices.
+            If False, we will first try to use regular matrix inversion. If it fails, we will
+            fallback to pseudo inverse.
+        """
+        super().__init__(feature_dim=feature_dim)
+        assert (
+            gamma > 0 and gamma <= 1
+        ), f"gamma should be in (0, 1]. Got gamma={gamma} instead"
+        self.n_arms = n_arms
+        self.gamma = gamma
+        self.l2_reg_lambda = l2_reg_lambda
+        self.force_pinv = force_pinv
+        self.register_buffer(
+            "_A", torch.zeros(n_arms, feature_dim + 1, feature_dim + 1)
+        )
+        self.register_buffer("_b", torch.zeros(n_arms, feature_dim + 1))
+        self.register_buffer("_sum_weight", torch.zeros(n_arms, 1))
+        self.register_buffer(
+            "_inv_A", torch.zeros(n_arms, feature_dim + 1, feature_dim + 1)
+        )
+        self.register_buffer("_coefs", torch.zeros(n_arms, feature_dim + 1))
+        self.distribution_enabled: bool = is_distribution_enabled()
+        # posterior scales are computed lazily, and only for the arms updated since the
+        # last computation (`_stale_arms`); None means all arms need to be computed
+        self._posterior_scale: torch.Tensor | None = None
+        self._stale_arms: torch.Tensor = torch.zeros(n_arms, dtype=torch.bool)
+        self._register_state_dict_hook(self._per_arm_state_dict_hook)
+
+    @classmethod
+    def from_linear_regressions(
+        cls, linear_regressions: list[LinearRegression]
+    ) -> "BatchedLinearRegression":
+        """Stacks the states of `LinearRegression` models with the same parameters."""
+        first = linear_regressions[0]
+        model = cls(
+            n_arms=len(linear_regressions),
+            feature_dim=first._feature_dim,
+            l2_reg_lambda=first.l2_reg_lambda,
+            gamma=first.gamma,
+            force_pinv=first.force_pinv,
+        ).to(first._A.device)
+        model.load_state_dict(
+            torch.nn.ModuleList(linear_regressions).state_dict()  # pyre-ignore[6]
+        )
+        return model
+
+    def arm_model(self, arm: int) -> LinearRegression:
+        """Returns a `LinearRegression` model with a copy of the state of `arm`."""
+        model = LinearRegression(
+            feature_dim=self._feature_dim,
+            l2_reg_lambda=self.l2_reg_lambda,
+            gamma=self.gamma,
+            force_pinv=self.force_pinv,
+        ).to(self._A.device)
+        model.load_state_dict(
+            {name: getattr(self, name)[arm] for name in _BUFFER_NAMES}
+        )
+        return model
+
+    def __getitem__(self, arm: int) -> LinearRegression:
+        if not 0 <= arm < self.n_arms:
+            raise IndexError(f"arm {arm} out of range for {self.n_arms} arms")
+        return self.arm_model(arm)
+
+    def __len__(self) -> int:
+        return self.n_arms
+
+    @staticmethod
+    def _per_arm_state_dict_hook(
+        module: torch.nn.Module,
+        state_dict: dict[str, torch.Tensor],
+        prefix: str,
+        local_metadata: dict[str, Any],
+    ) -> None:
+        for name in _BUFFER_NAMES:
+            stacked = state_dict.pop(prefix + name)
+            for arm, value in enumerate(stacked.unbind(0)):
+                state_dict[f"{prefix}{arm}.{name}"] = value
+
+    def _load_from_state_dict(
+        self,
+        state_dict: dict[str, Any],
+        prefix: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        # stack the per-arm layout produced by `state_dict`
+        for name in _BUFFER_NAMES:
+            keys = [f"{prefix}{arm}.{name}" for arm in range(self.n_arms)]
+            if all(key in state_dict for key in keys):
+                state_dict[prefix + name] = torch.stack(
+                    [state_dict.pop(key) for key in keys]
+                )
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+        self._posterior_scale = None
+
+    @property
+    def A(self) -> torch.Tensor:
+        # return A with L2 regularization applied
+        return self._regularized_A()
+
+    def _regularized_A(self, arms: torch.Tensor | None = None) -> torch.Tensor:
+        """Returns the A matrices of the given arms (default: all) with L2 regularization."""
+        A = self._A if arms is None else self._A[arms]
+        return A + self.l2_reg_lambda * torch.eye(
+            self._feature_dim + 1, device=self._A.device
+        )
+
+    @property
+    def coefs(self) -> torch.Tensor:
+        return self._coefs
+
+    @property
+    def posterior_scale(self) -> torch.Tensor:
+        """
+        Matrices S with S * S^T = A^-1 for each arm, of shape
+        (n_arms, feature_dim + 1, feature_dim + 1).
+        See `LinearRegression.posterior_scale`.
+        """
+        scale = self._posterior_scale
+        if scale is None or scale.device != self._A.device:
+            scale = precision_to_scale(self.A)
+        elif bool(self._stale_arms.any()):
+            arms = self._stale_arms.nonzero().squeeze(-1).to(self._A.device)
+            scale[arms] = precision_to_scale(self._regularized_A(arms))
+        self._posterior_scale = scale
+        self._stale_arms.zero_()
+        return scale
+
+    def sample_coefs(self, number_of_samples: int | None = None) -> torch.Tensor:
+        """
+        Samples the coefficients of all arms from their posterior distributions.
+        Returns a tensor of shape (n_arms, feature_dim + 1), or
+        (number_of_samples, n_arms, feature_dim + 1) if `number_of_samples` is given.
+        """
+        return sample_from_precision_scale(
+            self._coefs, self.posterior_scale, number_of_samples
+        )
+
+    def matrix_inv_fallback_pinv(self, A: torch.Tensor) -> torch.Tensor:
+        """
+        Try to apply regular (batched) matrix inv. If it fails, fallback to pseudo inverse
+        """
+        if not self.force_pinv:
+            try:
+                return torch.linalg.inv(A).contiguous()
+            # pyre-ignore[16]: Module `_C` has no attribute `_LinAlgError`.
+            # pyre-fixme[66]: Exception handler type annotation `unknown` must extend
+            #  BaseException.
+            except torch._C._LinAlgError as e:
+                logger.warning(
+                    "Exception raised during A inversion, falling back to pseudo-inverse",
+                    e,
+                )
+        # A is symmetric by construction
+        return torch.linalg.pinv(A, hermitian=True).contiguous()
+
+    def learn_batch(
+        self,
+        x: torch.Tensor,
+        y: torch.Tensor,
+        arm: torch.Tensor,
+        weight: torch.Tensor | None = None,
+    ) -> None:
+        """
+        A[arm] <- A[arm] + x*x.t
+        b[arm] <- b[arm] + r*x
+        for each row of x, with `arm` the index of the arm of each row.
+        """
+        batch_size = x.shape[0]
+        assert x.shape == (
+            batch_size,
+            self._feature_dim,
+        ), f"x has shape {x.shape} != {(batch_size, self._feature_dim)}"
+        y = y.reshape(batch_size, 1)
+        arm = arm.reshape(batch_size).to(self._A.device)
+        if weight is None:
+            weight = torch.ones_like(y)
+        weight = weight.reshape(batch_size, 1)
+        x = LinearRegression.append_ones(x)
+
+        weighted_x = x * weight
+        # dim: [batch_size, feature_dim + 1, feature_dim + 1]
+        delta_A = weighted_x.unsqueeze(-1) * x.unsqueeze(-2)
+        delta_b = weighted_x * y
+        if self.distribution_enabled:
+            # other workers may have updated any arm
+            dense_delta_A = torch.zeros_like(self._A).index_add_(
+                0, arm, delta_A.to(self._A.device)
+            )
+            dense_delta_b = torch.zeros_like(self._b).index_add_(
+                0, arm, delta_b.to(self._b.device)
+            )
+            dense_delta_sum_weight = torch.zeros_like(self._sum_weight).index_add_(
+                0, arm, weight.to(self._sum_weight.device)
+            )
+            torch.distributed.all_reduce(dense_delta_A)
+            torch.distributed.all_reduce(dense_delta_b)
+            torch.distributed.all_reduce(dense_delta_sum_weight)
+            self._A += dense_delta_A
+            self._b += dense_delta_b
+            self._sum_weight += dense_delta_sum_weight
+            self.calculate_coefs()
+            return
+
+        self._A.index_add_(0, arm, delta_A.to(self._A.device))
+        self._b.index_add_(0, arm, delta_b.to(self._b.device))
+        self._sum_weight.index_add_(0, arm, weight.to(self._sum_weight.device))
+        # update coefs of the arms whose A and b changed
+        self.calculate_coefs(torch.unique(arm))
+
+    def apply_discounting(self) -> None:
+        """
+        Apply gamma (discounting multiplier) to A and b of all arms.
+
+        A <- A * gamma
+        b <- b * gamma
+        """
+        if self.gamma < 1:
+            self._A *= self.gamma
+            self._b *= self.gamma
+        self.calculate_coefs()
+
+    def calculate_coefs(self, arms: torch.Tensor | None = None) -> None:
+        """
+        Calculate coefficients of the given arms (all arms by default) based on their
+        current A and b. Save inverted A and coefficients in buffers.
+        """
+        if arms is None:
+            self._posterior_scale = None
+            self._inv_A = self.matrix_inv_fallback_pinv(self.A)
+            self._coefs = torch.matmul(self._inv_A, self._b.unsqueeze(-1)).squeeze(-1)
+            return
+        inv_A = self.matrix_inv_fallback_pinv(self._regularized_A(arms))
+        self._stale_arms[arms.cpu()] = True
+        self._inv_A[arms] = inv_A
+        self._coefs[arms] = torch.matmul(inv_A, self._b[arms].unsqueeze(-1)).squeeze(
+            -1
+        )
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        x: features of each arm, of shape [batch_size, n_arms, feature_dim]
+        Returns the point predictions of each arm, of shape [batch_size, n_arms]
+        """
+        x = LinearRegression.append_ones(x)
+        return torch.einsum("bni,ni->bn", x, self._coefs)
+
+    def calculate_sigma(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        x: features of each arm, of shape [batch_size, n_arms, feature_dim]
+        Returns the uncertainties of each arm, of shape [batch_size, n_arms]
+        """
+        x = LinearRegression.append_ones(x)
+        return torch.einsum("bni,nij,bnj->bn", x, self._inv_A, x).sqrt()
+
+    def __str__(self) -> str:
+        return f"BatchedLinearRegression(A:\n{self.A}\nb:\n{self._b})"
+
+    def compare(self, other: MuSigmaCBModel) -> str:
+        """
+        Compares two BatchedLinearRegression instances for equality,
+        checking attributes and buffers.
+
+        Args:
+        other: The other BatchedLinearRegression instance to compare with.
+
+        Returns:
+        str: A string describing the differences, or an empty string if they are identical.
+        """
+
+        differences: List[str] = []
+
+        if not isinstance(other, BatchedLinearRegression):
+            differences.append("other is not an instance of BatchedLinearRegression")
+            return "\n".join(differences)
+        if self.n_arms != other.n_arms:
+            differences.append(
+                f"n_arms is different: {self.n_arms} vs {other.n_arms}"
+            )
+            return "\n".join(differences)
+        if self.gamma != other.gamma:
+            differences.append(f"gamma is different: {self.gamma} vs {other.gamma}")
+        if self.l2_reg_lambda != other.l2_reg_lambda:
+            differences.append(
+                f"l2_reg_lambda is different: {self.l2_reg_lambda} vs {other.l2_reg_lambda}"
+            )
+        if self.force_pinv != other.force_pinv:
+            differences.append(
+                f"force_pinv is different: {self.force_pinv} vs {other.force_pinv}"
+            )
+        for name in _BUFFER_NAMES:
+            value, other_value = getattr(self, name), getattr(other, name)
+            if not torch.allclose(value, other_value):
+                differences.append(f"{name} is different: {value} vs {other_value}")
+
+        return "\n".join(differences)  # Join the differences with newlines
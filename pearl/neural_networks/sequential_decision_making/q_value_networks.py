@@ -18,7 +18,10 @@ import abc
 from typing import List, Optional
 
 import torch
-from pearl.neural_networks.common.epistemic_neural_networks import Ensemble
+from pearl.neural_networks.common.epistemic_neural_networks import (
+    Ensemble,
+    StackedEnsemble,
+)
 from pearl.neural_networks.common.utils import (
     compute_output_dim_model_cnn,
     conv_block,
@@ -637,7 +640,10 @@ class TwoTowerQValueNetwork(TwoTowerNetwork):
 
 
 class EnsembleQValueNetwork(QValueNetwork):
-    r"""A Q-value network that uses the `Ensemble` model."""
+    r"""
+    A Q-value network that uses the `Ensemble` model, or the `StackedEnsemble` model
+    if `stacked` is True, which evaluates all ensemble members at once.
+    """
 
     def __init__(
         self,
@@ -647,11 +653,13 @@ class EnsembleQValueNetwork(QValueNetwork):
         output_dim: int,
         ensemble_size: int,
         prior_scale: float = 1.0,
+        stacked: bool = False,
     ) -> None:
         super().__init__()
         self._state_dim = state_dim
         self._action_dim = action_dim
-        self._model = Ensemble(
+        ensemble_type = StackedEnsemble if stacked else Ensemble
+        self._model: Ensemble | StackedEnsemble = ensemble_type(
             input_dim=state_dim + action_dim,
             hidden_dims=hidden_dims,
             output_dim=output_dim,
@@ -678,6 +686,31 @@ class EnsembleQValueNetwork(QValueNetwork):
         z: Tensor,
         curr_available_actions_batch: Tensor | None = None,
         persistent: bool = False,
+    ) -> Tensor:
+        x = self._state_action_features(state_batch, action_batch)
+        q_values = self.forward(x, z=z, persistent=persistent).squeeze(
+            -1
+        )  # (batch_size, number_of_actions_to_query)
+        return q_values if len(action_batch.shape) == 3 else q_values.squeeze(-1)
+
+    def get_ensemble_q_values(
+        self,
+        state_batch: Tensor,  # (batch_size, state_dim)
+        # (batch_size, number of query actions, action_dim) or (batch_size, action_dim)
+        action_batch: Tensor,
+    ) -> Tensor:
+        """
+        Returns the Q-values of all ensemble members, of shape (ensemble_size,
+        batch_size, number of query actions), or (ensemble_size, batch_size) if
+        `action_batch` has a single action per state.
+        """
+        x = self._state_action_features(state_batch, action_batch)
+        # (ensemble_size, batch_size, number_of_actions_to_query)
+        q_values = self._model.forward_all(x).squeeze(-1)
+        return q_values if len(action_batch.shape) == 3 else q_values.squeeze(-1)
+
+    def _state_action_features(
+        self, state_batch: Tensor, action_batch: Tensor
     ) -> Tensor:
         assert len(state_batch.shape) == 2
         assert len(action_batch.shape) == 3 or len(action_batch.shape) == 2
@@ -689,13 +722,9 @@ class EnsembleQValueNetwork(QValueNetwork):
         state_batch = extend_state_feature_by_available_action_space(
             state_batch, extended_action_batch
         )  # (batch_size, number_of_actions_to_query, state_dim)
-        x = torch.cat(
+        return torch.cat(
             [state_batch, extended_action_batch], dim=-1
         )  # (batch_size, number_of_actions_to_query, (state_dim + action_dim))
-        q_values = self.forward(x, z=z, persistent=persistent).squeeze(
-            -1
-        )  # (batch_size, number_of_actions_to_query)
-        return q_values if len(action_batch.shape) == 3 else q_values.squeeze(-1)
 
     @property
     def state_dim(self) -> int:
@@ -73,56 +73,65 @@ class DisjointBanditContainer(ContextualBanditBase):
         assert (
             batch.action.dtype == torch.long
         ), "action must be torch.long type (index of arm)"
-        assert batch.action.min().item() >= 0, "action must be >= 0"
-        assert (
-            batch.action.max().item() < self._n_arms
-        ), "action must be < number of arms"
+        # the range of actions is checked with the number of observations of each arm
+        # in `_partition_batch_by_arm`, which avoids synchronizing the device with the
+        # host for the minimum and maximum actions
 
     def _partition_batch_by_arm(self, batch: TransitionBatch) -> list[TransitionBatch]:
         """
         Break input batch down into per-arm batches based on action
         """
+        # assume action indices
+        action = batch.action[:, 0]
+        # observations are sorted by arm, and split with the number of observations
+        # of each arm (a single device synchronization for all arms)
+        order = torch.argsort(action, stable=True)
+        # bincount fails on negative actions, and counts actions >= number of arms
+        # in additional bins
+        counts = torch.bincount(action, minlength=self.n_arms).tolist()
+        assert len(counts) == self.n_arms, "action must be < number of arms"
+        if batch.state.ndim == 2:
+            # shape: (batch_size, feature_size)
+            # same features for all arms
+            state = batch.state[order]
+        else:
+            # shape: (batch_size, num_arms, feature_size)
+            # different features for each arm
+            assert (
+                batch.state.ndim == 3 and batch.state.shape[1] == self.n_arms
+            ), "For 3D state, 2nd dimension must be equal to number of arms"
+            state = batch.state[order, action[order]]
+        weight = (
+            batch.weight[order]
+            if batch.weight is not None
+            else torch.ones(order.shape[0], dtype=torch.float, device=batch.device)
+        )
         batches = []
-        for arm in range(self.n_arms):
-            # mask of observations for this arm
-            # assume action indices
-            mask = batch.action[:, 0] == arm
-            if mask.sum().item() == 0:
+        for arm_state, arm_reward, arm_weight in zip(
+            torch.split(state, counts),
+            torch.split(batch.reward[order], counts),
+            torch.split(weight, counts),
+        ):
+            if arm_state.shape[0] == 0:
                 # no observations for this arm, use null batch
                 batches.append(self._get_null_batch(batch))
-            else:
-                if batch.state.ndim == 2:
-                    # shape: (batch_size, feature_size)
-                    # same features for all arms
-                    state = batch.state
-                elif batch.state.ndim == 3:
-                    # shape: (batch_size, num_arms, feature_size)
-                    # different features for each arm
-                    assert (
-                        batch.state.shape[1] == self.n_arms
-                    ), "For 3D state, 2nd dimension must be equal to number of arms"
-                    state = batch.state[:, arm, :]
-                batches.append(
-                    TransitionBatch(
-                        # pyre-fixme[61]: `state` is undefined, or not always defined.
-                        state=state[mask],
-                        reward=batch.reward[mask],
-                        weight=(
-                            batch.weight[mask]
-                            if batch.weight is not None
-                            else torch.ones_like(mask, dtype=torch.float)
-                        ),
-                        # empty action features since disjoint model used
-                        # action as index of per-arm model
-                        # if arms need different features, use 3D `state` instead
-                        action=torch.empty(
-                            int(mask.sum().item()),
-                            0,
-                            dtype=torch.float,
-                            device=batch.device,
-                        ),
-                    ).to(batch.device)
-                )
+                continue
+            batches.append(
+                TransitionBatch(
+                    state=arm_state,
+                    reward=arm_reward,
+                    weight=arm_weight,
+                    # empty action features since disjoint model used
+                    # action as index of per-arm model
+                    # if arms need different features, use 3D `state` instead
+                    action=torch.empty(
+                        arm_state.shape[0],
+                        0,
+                        dtype=torch.float,
+                        device=batch.device,
+                    ),
+                ).to(batch.device)
+            )
         return batches
 
     def _get_null_batch(self, batch: TransitionBatch) -> TransitionBatch:
@@ -16,8 +16,9 @@ from pearl.history_summarization_modules.history_summarization_module import (
     HistorySummarizationModule,
     SubjectiveState,
 )
-from pearl.neural_networks.common.utils import ensemble_forward
-from pearl.neural_networks.contextual_bandit.linear_regression import LinearRegression
+from pearl.neural_networks.contextual_bandit.batched_linear_regression import (
+    BatchedLinearRegression,
+)
 from pearl.policy_learners.contextual_bandits.contextual_bandit_base import (
     ContextualBanditBase,
 )
@@ -30,13 +31,14 @@ from pearl.utils.functional_utils.learning.action_utils import (
     concatenate_actions_to_state,
 )
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
-from torch import nn
 
 
 class DisjointLinearBandit(ContextualBanditBase):
     """
     LinearBandit for discrete action space with each action has its own linear
     regression.
+    The linear regressions of all actions are stored in a single
+    `BatchedLinearRegression`, so that learning and acting do not loop over actions.
     DisjointLinearBandit will be deprecated. Use DisjointBanditContainer instead.
     """
 
@@ -57,14 +59,12 @@ class DisjointLinearBandit(ContextualBanditBase):
             exploration_module=exploration_module,
         )
         # Currently our disjoint LinUCB usecase only use LinearRegression
-
-        # Keep list attribute since ensemble_forward requires List[nn.Module]
-        self._linear_regressions_list: list[nn.Module] = [
-            LinearRegression(feature_dim=feature_dim, l2_reg_lambda=l2_reg_lambda)
-            for _ in range(action_space.n)
-        ]
-        # create nn.ModuleList so self.to(device) will move modules along
-        self._linear_regressions = nn.ModuleList(self._linear_regressions_list)
+        # (its state dict has the layout of a ModuleList of LinearRegression models)
+        self._linear_regressions = BatchedLinearRegression(
+            n_arms=action_space.n,
+            feature_dim=feature_dim,
+            l2_reg_lambda=l2_reg_lambda,
+        )
         self._discrete_action_space = action_space
         self._state_features_only = state_features_only
 
@@ -74,44 +74,19 @@ class DisjointLinearBandit(ContextualBanditBase):
         batch is action idx instead of action value
         Only discrete action problem will use DisjointLinearBandit
         """
-        for action_idx, linear_regression in enumerate(self._linear_regressions):
-            index = torch.nonzero(batch.action == action_idx, as_tuple=True)[0]
-            if index.numel() == 0:
-                continue
-            state = torch.index_select(
-                batch.state,
-                dim=0,
-                index=index,
-            )
-            if self._state_features_only:
-                context = state
-            else:
-                # cat state with corresponding action tensor
-                expanded_action = (
-                    torch.Tensor(self._discrete_action_space[action_idx])
-                    .unsqueeze(0)
-                    .expand(state.shape[0], -1)
-                    .to(batch.device)
-                )
-                context = torch.cat([state, expanded_action], dim=1)
-            reward = torch.index_select(
-                batch.reward,
-                dim=0,
-                index=index,
-            )
-            if batch.weight is not None:
-                weight = torch.index_select(
-                    batch.weight,
-                    dim=0,
-                    index=index,
-                )
-            else:
-                weight = torch.ones(reward.shape, device=batch.device)
-            linear_regression.learn_batch(
-                x=context,
-                y=reward,
-                weight=weight,
-            )
+        action = batch.action.reshape(-1).long()
+        if self._state_features_only:
+            context = batch.state
+        else:
+            # cat state with corresponding action tensor
+            actions = self._discrete_action_space.actions_batch.to(batch.device)
+            context = torch.cat([batch.state, actions[action].float()], dim=1)
+        self._linear_regressions.learn_batch(
+            x=context,
+            y=batch.reward,
+            arm=action,
+            weight=batch.weight,
+        )
 
         return {}
 
@@ -132,14 +107,12 @@ class DisjointLinearBandit(ContextualBanditBase):
         )
         # (batch_size, action_count, feature_size)
 
-        values = ensemble_forward(
-            self._linear_regressions_list, feature, use_for_loop=True
-        )
+        values = self._linear_regressions(feature)
         return self.exploration_module.act(
             subjective_state=feature,
             action_space=action_space,
             values=values,
-            representation=self._linear_regressions_list,  # pyre-fixme[6]: unexpected type
+            representation=self._linear_regressions,
         )
 
     def get_scores(
@@ -182,12 +155,9 @@ class DisjointLinearBandit(ContextualBanditBase):
                 )
 
             # Compare linear regressions
-            for i, (lr1, lr2) in enumerate(
-                zip(self._linear_regressions_list, other._linear_regressions_list)
-            ):
-                assert isinstance(lr1, LinearRegression)
-                assert isinstance(lr2, LinearRegression)
-                if (reason := lr1.compare(lr2)) != "":
-                    differences.append(f"Linear regression {i} is different: {reason}")
+            if (
+                reason := self._linear_regressions.compare(other._linear_regressions)
+            ) != "":
+                differences.append(f"Linear regressions are different: {reason}")
 
         return "\n".join(differences)
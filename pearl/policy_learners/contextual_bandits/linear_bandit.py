@@ -14,6 +14,7 @@ from pearl.action_representation_modules.action_representation_module import (
     ActionRepresentationModule,
 )
 from pearl.api.action import Action
+from pearl.api.action_space import ActionSpace
 from pearl.history_summarization_modules.history_summarization_module import (
     HistorySummarizationModule,
     SubjectiveState,
@@ -29,6 +30,10 @@ from pearl.policy_learners.exploration_modules.common.score_exploration_base imp
 from pearl.policy_learners.exploration_modules.exploration_module import (
     ExplorationModule,
 )
+from pearl.policy_learners.inference_policy import (
+    ContextualBanditInferencePolicy,
+    export_discrete_inference_policy,
+)
 from pearl.policy_learners.policy_learner import PolicyLearner
 from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.functional_utils.learning.action_utils import (
@@ -87,6 +92,9 @@ class LinearBandit(ContextualBanditBase):
         batch_size (int, default 128): size of the batches used during training.
         action_representation_module (Optional[ActionRepresentationModule], default identity):
                                      module for representing actions.
+        incremental_updates (bool, default False): if True, small batches update the inverse
+                                   of the A matrix incrementally instead of inverting it again
+                                   (see `LinearRegression`).
     """
 
     def __init__(
@@ -100,6 +108,7 @@ class LinearBandit(ContextualBanditBase):
         training_rounds: int = 100,
         batch_size: int = 128,
         action_representation_module: ActionRepresentationModule | None = None,
+        incremental_updates: bool = False,
     ) -> None:
         super().__init__(
             feature_dim=feature_dim,
@@ -113,6 +122,7 @@ class LinearBandit(ContextualBanditBase):
             l2_reg_lambda=l2_reg_lambda,
             gamma=gamma,
             force_pinv=force_pinv,
+            incremental_updates=incremental_updates,
         )
         self.apply_discounting_interval = apply_discounting_interval
         self.last_sum_weight_when_discounted = 0.0
@@ -195,6 +205,35 @@ class LinearBandit(ContextualBanditBase):
             representation=self.model,
         )
 
+    def export_inference_policy(
+        self,
+        example_subjective_states: torch.Tensor,
+        action_space: ActionSpace | None = None,
+        return_scores: bool = False,
+    ) -> torch.jit.ScriptModule:
+        """
+        Exports the policy selecting the actions with the highest predicted reward
+        (without exploration), whose scores are the predicted rewards.
+        See `PolicyLearner.export_inference_policy`.
+        """
+        if not isinstance(action_space, DiscreteActionSpace):
+            raise ValueError(
+                "A discrete action space is required to export an inference policy"
+            )
+        with torch.no_grad():
+            action_representations = self.action_representation_module(
+                action_space.actions_batch.to(example_subjective_states.device)
+            )
+        return export_discrete_inference_policy(
+            ContextualBanditInferencePolicy(
+                model=self.model,
+                action_representations=action_representations,
+                state_features_only=False,
+                return_scores=return_scores,
+            ),
+            example_subjective_states,
+        )
+
     def get_scores(
         self,
         subjective_state: SubjectiveState,
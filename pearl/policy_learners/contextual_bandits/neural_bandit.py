@@ -30,6 +30,10 @@ from pearl.policy_learners.contextual_bandits.contextual_bandit_base import (
 from pearl.policy_learners.exploration_modules.exploration_module import (
     ExplorationModule,
 )
+from pearl.policy_learners.inference_policy import (
+    ContextualBanditInferencePolicy,
+    export_discrete_inference_policy,
+)
 from pearl.policy_learners.policy_learner import PolicyLearner
 from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.functional_utils.learning.action_utils import (
@@ -157,6 +161,35 @@ class NeuralBandit(ContextualBanditBase):
             representation=None,  # fill in as needed in the future
         )
 
+    def export_inference_policy(
+        self,
+        example_subjective_states: torch.Tensor,
+        action_space: ActionSpace | None = None,
+        return_scores: bool = False,
+    ) -> torch.jit.ScriptModule:
+        """
+        Exports the policy selecting the actions with the highest predicted reward
+        (without exploration), whose scores are the predicted rewards.
+        See `PolicyLearner.export_inference_policy`.
+        """
+        if not isinstance(action_space, DiscreteActionSpace):
+            raise ValueError(
+                "A discrete action space is required to export an inference policy"
+            )
+        with torch.no_grad():
+            action_representations = self.action_representation_module(
+                action_space.actions_batch.to(example_subjective_states.device)
+            )
+        return export_discrete_inference_policy(
+            ContextualBanditInferencePolicy(
+                model=self.model,
+                action_representations=action_representations,
+                state_features_only=self._state_features_only,
+                return_scores=return_scores,
+            ),
+            example_subjective_states,
+        )
+
     def get_scores(
         self,
         subjective_state: SubjectiveState,
@@ -59,16 +59,7 @@ class EGreedyExploration(UniformExplorationBase):
         action_availability_mask: torch.Tensor | None = None,
         representation: torch.nn.Module | None = None,
     ) -> Action:
-        if self._epsilon_scheduling:
-            assert self.warmup_steps is not None
-            if self.time_step < self.warmup_steps:
-                assert self.warmup_steps is not None
-                frac = self.time_step / self.warmup_steps
-                assert self.start_epsilon is not None
-                assert self.end_epsilon is not None
-                self.curr_epsilon = (
-                    self.start_epsilon + (self.end_epsilon - self.start_epsilon) * frac
-                )
+        self._update_epsilon()
         self.time_step += 1
         if exploit_action is None:
             raise ValueError(
@@ -83,6 +74,49 @@ class EGreedyExploration(UniformExplorationBase):
         else:
             return exploit_action
 
+    def act_batch(
+        self,
+        subjective_states: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_actions: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        """
+        Replaces each exploit action by a uniformly random action with probability epsilon.
+        Each state of the batch counts as one time step for the epsilon schedule.
+        """
+        self._update_epsilon()
+        if exploit_actions is None:
+            raise ValueError(
+                "exploit_actions cannot be None for epsilon-greedy exploration"
+            )
+        if not isinstance(action_space, DiscreteActionSpace):
+            raise TypeError("action space must be discrete")
+        batch_size = exploit_actions.shape[0]
+        self.time_step += batch_size
+        device = exploit_actions.device
+        explore = torch.rand(batch_size, device=device) < self.curr_epsilon
+        random_actions = action_space.actions_batch.to(device)[
+            torch.randint(action_space.n, (batch_size,), device=device)
+        ]
+        return torch.where(
+            explore.view(-1, *([1] * (exploit_actions.ndim - 1))),
+            random_actions.to(exploit_actions.dtype),
+            exploit_actions,
+        )
+
+    def _update_epsilon(self) -> None:
+        if self._epsilon_scheduling:
+            assert self.warmup_steps is not None
+            if self.time_step < self.warmup_steps:
+                assert self.warmup_steps is not None
+                frac = self.time_step / self.warmup_steps
+                assert self.start_epsilon is not None
+                assert self.end_epsilon is not None
+                self.curr_epsilon = (
+                    self.start_epsilon + (self.end_epsilon - self.start_epsilon) * frac
+                )
+
     def get_extra_state(self) -> dict[str, Any]:
         return {
             "start_epsilon": self.start_epsilon,
@@ -75,6 +75,21 @@ class NormalDistributionExploration(ExplorationModule):
         # clip final action value to be within bounds of the action space
         return torch.clamp(action, low, high)
 
+    def act_batch(
+        self,
+        subjective_states: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_actions: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        # noise is drawn independently for each entry, so a batch of exploit actions
+        # can be perturbed in a single call
+        return self.act(
+            action_space=action_space,
+            subjective_state=subjective_states,
+            exploit_action=exploit_actions,
+        )
+
     def compare(self, other: ExplorationModule) -> str:
         """
         Compares two NormalDistributionExploration instances for equality,
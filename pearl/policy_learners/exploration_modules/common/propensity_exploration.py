@@ -42,6 +42,20 @@ class PropensityExploration(ExplorationModule):
         action_index = torch.distributions.Categorical(values).sample()
         return action_space.actions[action_index]
 
+    def act_batch(
+        self,
+        subjective_states: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_actions: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        """Samples one action per row of `values` (the action probabilities)."""
+        if not isinstance(action_space, DiscreteActionSpace):
+            raise TypeError("action space must be discrete")
+        assert values is not None
+        action_indices = torch.distributions.Categorical(values).sample()
+        return action_space.actions_batch.to(action_indices.device)[action_indices]
+
     def compare(self, other: ExplorationModule) -> str:
         """
         Compares two PropensityExploration instances for equality.
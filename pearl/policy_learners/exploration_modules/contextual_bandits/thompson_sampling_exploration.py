@@ -14,6 +14,9 @@ import torch
 from pearl.api.action import Action
 from pearl.api.action_space import ActionSpace
 from pearl.api.state import SubjectiveState
+from pearl.neural_networks.contextual_bandit.batched_linear_regression import (
+    BatchedLinearRegression,
+)
 from pearl.neural_networks.contextual_bandit.linear_regression import LinearRegression
 from pearl.policy_learners.exploration_modules import ExplorationModule
 from pearl.policy_learners.exploration_modules.common.score_exploration_base import (
@@ -26,14 +29,24 @@ from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpac
 class ThompsonSamplingExplorationLinear(ScoreExplorationBase):
     """
     Thompson Sampling exploration module for the joint linear bandits.
+
+    Args:
+        enable_efficient_sampling: if True, scores are sampled independently for each
+            action from the normal distribution of the predicted reward, instead of
+            sampling the model coefficients.
+        sample_per_state: if True, coefficients are sampled independently for each state
+            of a batch (e.g. for batches of independent requests), instead of sampling
+            them once for the whole batch.
     """
 
     def __init__(
         self,
         enable_efficient_sampling: bool = False,
+        sample_per_state: bool = False,
     ) -> None:
         super().__init__()
         self._enable_efficient_sampling = enable_efficient_sampling
+        self._sample_per_state = sample_per_state
 
     def get_scores(
         self,
@@ -58,6 +71,17 @@ class ThompsonSamplingExplorationLinear(ScoreExplorationBase):
             # batch_size, action_count, 1
             assert sigma.shape == subjective_state.shape[:-1]
             scores = torch.normal(mean=expected_reward, std=sigma)
+        elif isinstance(representation, LinearRegression):
+            # samples use the Cholesky factor of A cached by the model
+            features = LinearRegression.append_ones(subjective_state)
+            if self._sample_per_state:
+                # batch_size, action_count, feature_dim + 1
+                features = features.view(-1, action_space.n, features.shape[-1])
+                # batch_size, feature_dim + 1
+                thompson_sampling_coefs = representation.sample_coefs(features.shape[0])
+                scores = torch.einsum("bni,bi->bn", features, thompson_sampling_coefs)
+            else:
+                scores = torch.matmul(features, representation.sample_coefs())
         else:
             thompson_sampling_coefs = (
                 torch.distributions.multivariate_normal.MultivariateNormal(
@@ -98,6 +122,11 @@ class ThompsonSamplingExplorationLinear(ScoreExplorationBase):
                     f"_enable_efficient_sampling is different: {self._enable_efficient_sampling} "
                     + "vs {other._enable_efficient_sampling}"
                 )
+            if self._sample_per_state != other._sample_per_state:
+                differences.append(
+                    f"_sample_per_state is different: {self._sample_per_state} "
+                    + f"vs {other._sample_per_state}"
+                )
 
         return "\n".join(differences)
 
@@ -110,8 +139,12 @@ class ThompsonSamplingExplorationLinearDisjoint(ThompsonSamplingExplorationLinea
     def __init__(
         self,
         enable_efficient_sampling: bool = False,
+        sample_per_state: bool = False,
     ) -> None:
-        super().__init__(enable_efficient_sampling=enable_efficient_sampling)
+        super().__init__(
+            enable_efficient_sampling=enable_efficient_sampling,
+            sample_per_state=sample_per_state,
+        )
 
     def get_scores(
         self,
@@ -124,6 +157,11 @@ class ThompsonSamplingExplorationLinearDisjoint(ThompsonSamplingExplorationLinea
     ) -> torch.Tensor:
         assert isinstance(action_space, DiscreteActionSpace)
         # DisJoint Linear Bandits
+        if isinstance(representation, BatchedLinearRegression):
+            # sample the coefficients of all arms at once
+            return self._get_batched_scores(subjective_state, representation).view(
+                -1, action_space.n
+            )
         # The representation is a list for different actions.
         scores = []
         for i, model in enumerate(representation):
@@ -140,6 +178,29 @@ class ThompsonSamplingExplorationLinearDisjoint(ThompsonSamplingExplorationLinea
         scores = torch.stack(scores)
         return scores.view(-1, action_space.n)
 
+    def _get_batched_scores(
+        self,
+        subjective_state: SubjectiveState,
+        representation: BatchedLinearRegression,
+    ) -> torch.Tensor:
+        """
+        subjective_state is in shape of batch_size, action_count, feature_dim
+        Returns scores in shape of batch_size, action_count
+        """
+        if self._enable_efficient_sampling:
+            expected_reward = representation(subjective_state)
+            sigma = representation.calculate_sigma(subjective_state)
+            return torch.normal(mean=expected_reward, std=sigma)
+        features = LinearRegression.append_ones(subjective_state)
+        if self._sample_per_state:
+            # shape: batch_size, action_count, feature_dim + 1
+            thompson_sampling_coefs = representation.sample_coefs(features.shape[0])
+            return torch.einsum("bni,bni->bn", features, thompson_sampling_coefs)
+        # one sample of the coefficients of each arm
+        # shape: action_count, feature_dim + 1
+        thompson_sampling_coefs = representation.sample_coefs()
+        return torch.einsum("bni,ni->bn", features, thompson_sampling_coefs)
+
     def compare(self, other: ExplorationModule) -> str:
         """
         Compares two ThompsonSamplingExplorationLinearDisjoint instances for equality.
@@ -14,6 +14,9 @@ import torch
 from pearl.api.action import Action
 from pearl.api.action_space import ActionSpace
 from pearl.api.state import SubjectiveState
+from pearl.neural_networks.contextual_bandit.batched_linear_regression import (
+    BatchedLinearRegression,
+)
 from pearl.policy_learners.exploration_modules import ExplorationModule
 from pearl.policy_learners.exploration_modules.common.score_exploration_base import (
     ScoreExplorationBase,
@@ -128,8 +131,14 @@ class DisjointUCBExploration(UCBExploration):
         """
         Args:
             subjective_state: this is feature vector in shape, batch_size, action_count, feature
-            representation: a list of bandit models, one per action (arm)
+            representation: a list of bandit models, one per action (arm), or a
+                `BatchedLinearRegression` model of all arms
         """
+        if isinstance(representation, BatchedLinearRegression):
+            # computes the sigmas of all arms at once
+            return super().sigma(
+                subjective_state=subjective_state, representation=representation
+            )
         sigmas = []
         for i, arm_model in enumerate(representation):
             sigmas.append(
@@ -52,6 +52,35 @@ class ExplorationModule(ABC, nn.Module):
     ) -> Action:
         pass
 
+    def act_batch(
+        self,
+        subjective_states: SubjectiveState,
+        action_space: ActionSpace,
+        values: torch.Tensor | None = None,
+        exploit_actions: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        """
+        Selects actions for a batch of independent subjective states (e.g. one per
+        environment of a `VectorPearlAgent`). `values` and `exploit_actions` have one row
+        per state. Returns the selected actions stacked along the first dimension.
+        The default implementation calls `act` for each state.
+        """
+        return torch.stack(
+            [
+                torch.as_tensor(
+                    self.act(
+                        subjective_state=subjective_states[i],
+                        action_space=action_space,
+                        values=None if values is None else values[i],
+                        exploit_action=(
+                            None if exploit_actions is None else exploit_actions[i]
+                        ),
+                    )
+                )
+                for i in range(len(subjective_states))
+            ]
+        )
+
     def learn(self, replay_buffer: ReplayBuffer) -> None:  # noqa: B027
         """Learns from the replay buffer. Default implementation does nothing."""
         pass
@@ -0,0 +1,177 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+"""
+Self-contained modules computing the greedy actions of trained policy learners, meant
+for low-latency serving. They are produced by `PolicyLearner.export_inference_policy`,
+which traces them with `torch.jit.trace`, so they can be saved with `torch.jit.save` and
+served without Pearl.
+
+Inference policies take batches of subjective states (i.e. the output of the history
+summarization module used during training) and only use precomputed action
+representations, bypassing the safety, action representation and exploration modules
+used by `PearlAgent.act`.
+"""
+
+import copy
+from abc import ABC, abstractmethod
+
+import torch
+from torch import nn, Tensor
+
+
+class InferencePolicy(ABC, nn.Module):
+    """
+    Base class of inference policies for discrete action spaces.
+    `forward(state_batch, action_mask)` returns the index of the greedy action of each
+    state, i.e. the action with the highest score among the available ones.
+    `action_mask` has shape (batch_size, number_of_actions) and is True for unavailable
+    actions. If `return_scores` is True, the scores of all actions are returned as well.
+
+    Args:
+        action_representations: the representations of the actions of the action space,
+            with shape (number_of_actions, action_representation_dim).
+        return_scores: whether to also return the scores of all actions.
+    """
+
+    def __init__(self, action_representations: Tensor, return_scores: bool) -> None:
+        super().__init__()
+        self.register_buffer("action_representations", action_representations)
+        self.return_scores = return_scores
+
+    @abstractmethod
+    def scores(self, state_batch: Tensor) -> Tensor:
+        """Returns the scores of the actions, of shape (batch_size, number_of_actions)."""
+        pass
+
+    def forward(
+        self, state_batch: Tensor, action_mask: Tensor
+    ) -> Tensor | tuple[Tensor, Tensor]:
+        scores = self.scores(state_batch)
+        action_index = torch.argmax(
+            scores.masked_fill(action_mask, float("-inf")), dim=-1
+        )
+        if self.return_scores:
+            return action_index, scores
+        return action_index
+
+    def _expanded_action_representations(self, batch_size: int) -> Tensor:
+        # (batch_size, number_of_actions, action_representation_dim)
+        return self.action_representations.unsqueeze(0).expand(batch_size, -1, -1)
+
+
+class QValueInferencePolicy(InferencePolicy):
+    """Selects the actions with the highest Q-values."""
+
+    def __init__(
+        self,
+        q_value_network: nn.Module,
+        action_representations: Tensor,
+        return_scores: bool = False,
+    ) -> None:
+        super().__init__(action_representations, return_scores)
+        self.q_value_network = q_value_network
+
+    def scores(self, state_batch: Tensor) -> Tensor:
+        return self.q_value_network.get_q_values(
+            state_batch, self._expanded_action_representations(state_batch.shape[0])
+        )
+
+
+class ActorInferencePolicy(InferencePolicy):
+    """Selects the actions with the highest probability under a discrete actor."""
+
+    def __init__(
+        self,
+        actor: nn.Module,
+        action_representations: Tensor,
+        return_scores: bool = False,
+    ) -> None:
+        super().__init__(action_representations, return_scores)
+        self.actor = actor
+
+    def scores(self, state_batch: Tensor) -> Tensor:
+        return self.actor.get_policy_distribution(
+            state_batch=state_batch,
+            available_actions=self._expanded_action_representations(
+                state_batch.shape[0]
+            ),
+        )
+
+
+class ContextualBanditInferencePolicy(InferencePolicy):
+    """
+    Selects the actions with the highest predicted reward, where rewards are predicted
+    by `model` from the concatenation of the state and action representation (or from
+    the state only if `state_features_only` is True).
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        action_representations: Tensor,
+        state_features_only: bool = False,
+        return_scores: bool = False,
+    ) -> None:
+        super().__init__(action_representations, return_scores)
+        self.model = model
+        self.state_features_only = state_features_only
+
+    def scores(self, state_batch: Tensor) -> Tensor:
+        batch_size = state_batch.shape[0]
+        number_of_actions = self.action_representations.shape[0]
+        features = state_batch.unsqueeze(1).expand(batch_size, number_of_actions, -1)
+        if not self.state_features_only:
+            features = torch.cat(
+                [features, self._expanded_action_representations(batch_size)], dim=2
+            )
+        return self.model(features).reshape(batch_size, number_of_actions)
+
+
+class ContinuousActorInferencePolicy(nn.Module):
+    """
+    Inference policy for continuous action spaces: `forward(state_batch)` returns the
+    actions sampled by the actor network (which are deterministic for deterministic
+    actors, such as the ones of DDPG and TD3).
+    """
+
+    def __init__(self, actor: nn.Module) -> None:
+        super().__init__()
+        self.actor = actor
+
+    def forward(self, state_batch: Tensor) -> Tensor:
+        return self.actor.sample_action(state_batch)
+
+
+def export_discrete_inference_policy(
+    inference_policy: InferencePolicy, example_state_batch: Tensor
+) -> torch.jit.ScriptModule:
+    """Traces `inference_policy` with `example_state_batch` and a mask of no actions."""
+    number_of_actions = inference_policy.action_representations.shape[0]
+    action_mask = torch.zeros(
+        (example_state_batch.shape[0], number_of_actions),
+        dtype=torch.bool,
+        device=example_state_batch.device,
+    )
+    return trace_inference_policy(inference_policy, (example_state_batch, action_mask))
+
+
+def trace_inference_policy(
+    inference_policy: nn.Module, example_inputs: tuple[Tensor, ...]
+) -> torch.jit.ScriptModule:
+    """
+    Traces `inference_policy` with `torch.jit.trace`. The traced module owns a frozen
+    copy of the networks of the policy learner, so later training does not affect it.
+    """
+    inference_policy = copy.deepcopy(inference_policy).eval()
+    for parameter in inference_policy.parameters():
+        parameter.requires_grad_(False)
+    with torch.no_grad():
+        # check_trace is disabled since stochastic actors give different outputs
+        return torch.jit.trace(inference_policy, example_inputs, check_trace=False)
@@ -8,6 +8,7 @@
 # pyre-strict
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from typing import Any, List, TypeVar
 
 import torch
@@ -35,6 +36,11 @@ from pearl.policy_learners.exploration_modules.exploration_module import (
 from pearl.replay_buffers.replay_buffer import ReplayBuffer
 from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.device import is_distribution_enabled
+from pearl.utils.functional_utils.learning.compile_utils import compiled_method
+from pearl.utils.functional_utils.learning.metrics_accumulator import (
+    is_scalar_metric,
+    MetricsAccumulator,
+)
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 
 
@@ -65,6 +71,7 @@ class PolicyLearner(torch.nn.Module, ABC):
         batch_size: int = 1,
         requires_tensors: bool = True,
         action_representation_module: ActionRepresentationModule | None = None,
+        compile: bool = False,
         **options: Any,
     ) -> None:
         super().__init__()
@@ -108,11 +115,27 @@ class PolicyLearner(torch.nn.Module, ABC):
         self._is_action_continuous = is_action_continuous
         self.distribution_enabled: bool = is_distribution_enabled()
         self.requires_tensors = requires_tensors
+        # whether the loss computations of `learn_batch` are compiled with torch.compile
+        self._compile = compile
+        # metrics of the training rounds of `learn`, accumulated on device
+        self._metrics = MetricsAccumulator()
+        # TD errors of the transitions of the last batch of `learn_batch`, set by
+        # policy learners which compute them
+        self._td_error: torch.Tensor | None = None
 
     @property
     def batch_size(self) -> int:
         return self._batch_size
 
+    @property
+    def td_error(self) -> torch.Tensor | None:
+        """
+        The (detached) TD error of each transition of the last batch learned from by
+        `learn_batch`, used to update the priorities of prioritized replay buffers, or
+        None if the policy learner does not compute TD errors.
+        """
+        return self._td_error
+
     @property
     def exploration_module(self) -> ExplorationModule:
         exploration_module = self._modules["exploration_module"]
@@ -161,6 +184,55 @@ class PolicyLearner(torch.nn.Module, ABC):
     ) -> Action:
         pass
 
+    def act_batch(
+        self,
+        subjective_states: SubjectiveState,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> torch.Tensor:
+        """
+        Selects an action for each row of `subjective_states`, a batch of subjective
+        states of independent environments sharing `available_action_space`.
+        The default implementation calls `act` for each state; policy learners which can
+        select the actions of the whole batch at once override it.
+
+        Returns:
+            The selected actions stacked along the first dimension.
+        """
+        return torch.stack(
+            [
+                torch.as_tensor(
+                    self.act(subjective_state, available_action_space, exploit)
+                )
+                for subjective_state in subjective_states
+            ]
+        )
+
+    def export_inference_policy(
+        self,
+        example_subjective_states: torch.Tensor,
+        action_space: ActionSpace | None = None,
+        return_scores: bool = False,
+    ) -> torch.jit.ScriptModule:
+        """
+        Exports a self-contained TorchScript module selecting the greedy actions of this
+        policy learner, for low-latency serving (see
+        `pearl.policy_learners.inference_policy`). For discrete action spaces, its
+        `forward(state_batch, action_mask)` returns the indices of the greedy actions in
+        `action_space`, where `action_mask` is True for unavailable actions.
+        The representations of the actions are computed once, at export time.
+
+        Args:
+            example_subjective_states: a batch of subjective states used to trace the
+                module.
+            action_space: the action space of the exported policy. Defaults to the
+                action space of the policy learner, for policy learners which have one.
+            return_scores: whether the module also returns the scores of all actions.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support exporting an inference policy"
+        )
+
     def learn(
         self,
         replay_buffer: ReplayBuffer,
@@ -170,7 +242,12 @@ class PolicyLearner(torch.nn.Module, ABC):
             replay_buffer: buffer instance which learn is reading from
 
         Returns:
-            A dictionary which includes useful metrics
+            A dictionary with the mean of each scalar metric reported by `learn_batch`
+            over the training rounds, as a tensor on the device of the policy learner.
+            Metrics are accumulated on device, so that training does not synchronize
+            the device with the host (see `MetricsAccumulator`). Other values reported
+            by `learn_batch` (e.g. the per-transition labels and predictions of
+            contextual bandits) are returned as reported in the last training round.
         """
         if len(replay_buffer) == 0:
             return {}
@@ -180,21 +257,41 @@ class PolicyLearner(torch.nn.Module, ABC):
         else:
             batch_size = self._batch_size
 
-        report = {}
+        self._metrics.reset()
+        # non-scalar values of the last training round which reported them
+        last_values: dict[str, Any] = {}
         for _ in range(self._training_rounds):
             self._training_steps += 1
             batch = replay_buffer.sample(batch_size)
             single_report = {}
             if isinstance(batch, TransitionBatch):
+                buffer_index = batch.buffer_index
                 batch = self.preprocess_batch(batch)
+                self._td_error = None
                 single_report = self.learn_batch(batch)
+                # per-transition TD errors are fed back to the replay buffer
+                td_error = self._td_error
+                if td_error is not None and buffer_index is not None:
+                    replay_buffer.update_priorities(buffer_index, td_error)
+            self._metrics.record(single_report)
+            last_values.update(
+                (name, value)
+                for name, value in single_report.items()
+                if not is_scalar_metric(value)
+            )
+        return {**last_values, **self._metrics.means()}
 
-            for k, v in single_report.items():
-                if k in report:
-                    report[k].append(v)
-                else:
-                    report[k] = [v]
-        return report
+    def _compiled(self, name: str) -> Callable[..., Any]:
+        """
+        Returns method `name` of this policy learner, compiled with `torch.compile` if
+        the policy learner was constructed with `compile=True` (see `compiled_method`).
+        Policy learners call the methods computing their losses through this method in
+        `learn_batch`, while backward passes, optimizer steps and target network updates
+        are run eagerly.
+        """
+        if not self._compile:
+            return getattr(self, name)
+        return compiled_method(self, name)
 
     def preprocess_batch(self, batch: TransitionBatch) -> TransitionBatch:
         """
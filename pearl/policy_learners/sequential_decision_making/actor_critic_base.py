@@ -39,6 +39,12 @@ from pearl.neural_networks.sequential_decision_making.q_value_networks import (
 from pearl.policy_learners.exploration_modules.exploration_module import (
     ExplorationModule,
 )
+from pearl.policy_learners.inference_policy import (
+    ActorInferencePolicy,
+    ContinuousActorInferencePolicy,
+    export_discrete_inference_policy,
+    trace_inference_policy,
+)
 from pearl.policy_learners.policy_learner import PolicyLearner
 from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.functional_utils.learning.critic_utils import (
@@ -99,6 +105,7 @@ class ActorCriticBase(PolicyLearner):
         actor_optimizer: Optional[optim.Optimizer] = None,
         critic_optimizer: Optional[optim.Optimizer] = None,
         history_summarization_optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         super().__init__(
             on_policy=on_policy,
@@ -108,9 +115,11 @@ class ActorCriticBase(PolicyLearner):
             exploration_module=exploration_module,
             action_representation_module=action_representation_module,
             action_space=action_space,
+            compile=compile,
         )
         """
-        Constructs a base actor-critic policy learner.
+        Constructs a base actor-critic policy learner. With `compile=True`, the actor
+        and critic losses computed by `learn_batch` are compiled with `torch.compile`.
         """
 
         self._state_dim = state_dim
@@ -306,6 +315,88 @@ class ActorCriticBase(PolicyLearner):
             values=action_probabilities,
         )
 
+    def act_batch(
+        self,
+        subjective_states: SubjectiveState,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> torch.Tensor:
+        """
+        Selects actions for a batch of subjective states with a single forward pass of
+        the actor network. See `act`.
+        """
+        with torch.no_grad():
+            if self._is_action_continuous:
+                # pyre-fixme[29]: `Union[Module, Tensor]` is not a function.
+                exploit_actions = self._actor.sample_action(subjective_states)
+                action_probabilities = None
+            else:
+                assert isinstance(available_action_space, DiscreteActionSpace)
+                actions_batch = available_action_space.actions_batch.to(
+                    subjective_states.device
+                )
+                actions = self.action_representation_module(actions_batch)
+                # pyre-fixme[29]: `Union[Module, Tensor]` is not a function.
+                action_probabilities = self._actor.get_policy_distribution(
+                    state_batch=subjective_states,
+                    available_actions=actions.unsqueeze(0).expand(
+                        subjective_states.shape[0], -1, -1
+                    ),
+                )
+                # (batch_size, action_space_size)
+                exploit_actions = actions_batch[
+                    torch.argmax(action_probabilities, dim=1)
+                ]
+
+        if exploit:
+            return exploit_actions
+
+        return self.exploration_module.act_batch(
+            subjective_states=subjective_states,
+            action_space=available_action_space,
+            values=action_probabilities,
+            exploit_actions=exploit_actions,
+        )
+
+    def export_inference_policy(
+        self,
+        example_subjective_states: torch.Tensor,
+        action_space: ActionSpace | None = None,
+        return_scores: bool = False,
+    ) -> torch.jit.ScriptModule:
+        """
+        For discrete action spaces, exports the policy selecting the most likely action
+        under the actor, whose scores are the action probabilities.
+        For continuous action spaces, the exported module maps a batch of states to the
+        actions sampled by the actor. See `PolicyLearner.export_inference_policy`.
+        """
+        if self._is_action_continuous:
+            if return_scores:
+                raise ValueError("Scores are only defined for discrete action spaces")
+            return trace_inference_policy(
+                ContinuousActorInferencePolicy(self._actor),
+                (example_subjective_states,),
+            )
+        if action_space is None:
+            # set when the policy learner is reset
+            action_space = getattr(self, "_action_space", None)
+        if not isinstance(action_space, DiscreteActionSpace):
+            raise ValueError(
+                "A discrete action space is required to export an inference policy"
+            )
+        with torch.no_grad():
+            action_representations = self.action_representation_module(
+                action_space.actions_batch.to(example_subjective_states.device)
+            )
+        return export_discrete_inference_policy(
+            ActorInferencePolicy(
+                actor=self._actor,
+                action_representations=action_representations,
+                return_scores=return_scores,
+            ),
+            example_subjective_states,
+        )
+
     def reset(self, action_space: ActionSpace) -> None:
         # pyre-fixme[16]: `ActorCriticBase` has no attribute `_action_space`.
         self._action_space = action_space
@@ -334,7 +425,7 @@ class ActorCriticBase(PolicyLearner):
         """
         assert self._history_summarization_optimizer is not None
         self._history_summarization_optimizer.zero_grad()
-        actor_loss = self._actor_loss(batch)
+        actor_loss = self._compiled("_actor_loss")(batch)
         self._actor_optimizer.zero_grad()
         """
         If the history summarization module is a neural network,
@@ -345,13 +436,13 @@ class ActorCriticBase(PolicyLearner):
         """
         actor_loss.backward(retain_graph=True)
         self._actor_optimizer.step()
-        report = {"actor_loss": actor_loss.item()}
+        report = {"actor_loss": actor_loss.detach()}
         if self._use_critic:
             self._critic_optimizer.zero_grad()
-            critic_loss = self._critic_loss(batch)
+            critic_loss = self._compiled("_critic_loss")(batch)
             critic_loss.backward()
             self._critic_optimizer.step()
-            report["critic_loss"] = critic_loss.item()
+            report["critic_loss"] = critic_loss.detach()
         assert self._history_summarization_optimizer is not None
         self._history_summarization_optimizer.step()
 
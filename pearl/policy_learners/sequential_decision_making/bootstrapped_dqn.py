@@ -33,7 +33,6 @@ from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
     DeepQLearning,
 )
 from pearl.replay_buffers.transition import (
-    filter_batch_by_bootstrap_mask,
     TransitionBatch,
     TransitionWithBootstrapMaskBatch,
 )
@@ -108,35 +107,39 @@ class BootstrappedDQN(DeepQLearning):
                 f"{type(self).__name__} requires a batch of type "
                 f"`TransitionWithBootstrapMaskBatch`, but got {type(batch)}."
             )
-        loss_ensemble = torch.tensor(0.0).to(batch.device)
         mask = batch.bootstrap_mask
-        for z in range(self.ensemble_size):
-            z = torch.tensor(z).to(batch.device)
-            # if this batch doesn't have any items for the z-th ensemble, move on
-            if mask is None or mask[:, z].sum() == 0:
-                continue
-
-            # filter the batch to only the transitions belonging to ensemble `z`
-            batch_filtered = filter_batch_by_bootstrap_mask(batch=batch, z=z)
-            state_action_values = self._Q.get_q_values(
-                state_batch=batch_filtered.state,
-                action_batch=batch_filtered.action,
-                curr_available_actions_batch=batch_filtered.curr_available_actions,
-                z=z,
-            )
-
-            # compute the Bellman target
-            expected_state_action_values = (
-                self._get_next_state_values(
-                    batch=batch_filtered, batch_size=batch_filtered.state.shape[0], z=z
-                )
-                * self._discount_factor
-                * (1 - batch_filtered.terminated.float())
-            ) + batch_filtered.reward  # (batch_size), r + gamma * V(s)
-
-            criterion = torch.nn.MSELoss()
-            loss = criterion(state_action_values, expected_state_action_values)
-            loss_ensemble += loss
+        assert mask is not None
+        # whether each transition belongs to each ensemble member,
+        # (ensemble_size, batch_size)
+        mask = mask.t().float()
+
+        # all ensemble members are evaluated on the whole batch, and transitions not
+        # belonging to a member are weighted out of its loss
+        state_action_values = self._Q.get_ensemble_q_values(
+            state_batch=batch.state, action_batch=batch.action
+        )  # (ensemble_size, batch_size)
+
+        # compute the Bellman target
+        expected_state_action_values = (
+            self._get_next_state_values(batch=batch, batch_size=len(batch))
+            * self._discount_factor
+            * (1 - batch.terminated.float())
+        ) + batch.reward  # (ensemble_size, batch_size), r + gamma * V(s)
+
+        td_error = state_action_values - expected_state_action_values
+        squared_td_error = td_error.pow(2)
+        if batch.weight is not None:
+            squared_td_error = batch.weight * squared_td_error
+        # the loss of each member is the mean over its transitions, and members without
+        # transitions in this batch do not contribute
+        member_losses = (mask * squared_td_error).sum(dim=1) / mask.sum(dim=1).clamp(
+            min=1
+        )
+        loss_ensemble = member_losses.sum()
+        # mean absolute TD error of each transition across the ensemble members it
+        # belongs to
+        td_error_sum = (mask * td_error.detach().abs()).sum(dim=0)
+        td_error_count = mask.sum(dim=0)
 
         # Optimize the model
         self._optimizer.zero_grad()
@@ -147,7 +150,9 @@ class BootstrappedDQN(DeepQLearning):
         if (self._training_steps + 1) % self._target_update_freq == 0:
             update_target_network(self._Q_target, self._Q, self._soft_update_tau)
 
-        return {"loss": loss_ensemble.mean().item()}
+        # transitions not used by any ensemble member get a NaN TD error
+        self._td_error = td_error_sum / td_error_count
+        return {"loss": loss_ensemble.detach()}
 
     def reset(self, action_space: ActionSpace) -> None:
         # Reset the `DeepExploration` module, which will resample the epistemic index.
@@ -188,42 +193,64 @@ class BootstrappedDQN(DeepQLearning):
             values=q_values,
         )
 
+    def act_batch(
+        self,
+        subjective_states: SubjectiveState,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> Tensor:
+        # actions are selected with the ensemble member sampled by the exploration
+        # module, so the batched Q-value computation of `DeepTDLearning` does not apply
+        return PolicyLearner.act_batch(
+            self, subjective_states, available_action_space, exploit
+        )
+
+    def export_inference_policy(
+        self,
+        example_subjective_states: Tensor,
+        action_space: ActionSpace | None = None,
+        return_scores: bool = False,
+    ) -> torch.jit.ScriptModule:
+        # the greedy actions depend on the ensemble member sampled for each episode
+        raise NotImplementedError(
+            "BootstrappedDQN does not support exporting an inference policy"
+        )
+
     @torch.no_grad()
     def _get_next_state_values(
-        self, batch: TransitionBatch, batch_size: int, z: Tensor
+        self, batch: TransitionBatch, batch_size: int
     ) -> torch.Tensor:
+        """
+        Returns the double DQN values of next states for each ensemble member, of shape
+        (ensemble_size, batch_size): the target network of each member evaluates the
+        greedy action of its online network.
+        """
         assert batch.next_state is not None
         assert isinstance(self._action_space, DiscreteActionSpace)
         assert batch.next_available_actions is not None
         assert batch.next_unavailable_actions_mask is not None
 
-        # for dueling, this does a forward pass; since the batch of next available
-        # actions is already input
-        next_state_action_values = self._Q.get_q_values(
-            state_batch=batch.next_state,  # (batch_size x state_dim)
+        # (ensemble_size x batch_size x action_space_size)
+        next_state_action_values = self._Q.get_ensemble_q_values(
+            state_batch=batch.next_state,
             # (batch_size x action_space_size x action_dim)
             action_batch=batch.next_available_actions,
-            z=z,
-        )  # (batch_size x action_space_size)
-
-        target_next_state_action_values = self._Q_target.get_q_values(
-            # pyre-fixme6]: In call `EnsembleQValueNetwork.get_q_values`,
-            # for argument `state_batch`, expected `Tensor` but got `Optional[Tensor]`
+        )
+        target_next_state_action_values = self._Q_target.get_ensemble_q_values(
             state_batch=batch.next_state,
-            # pyre-fixme6]: In call `EnsembleQValueNetwork.get_q_values`,
-            # for argument `action_batch`, expected `Tensor` but got `Optional[Tensor]`
             action_batch=batch.next_available_actions,
-            z=z,
         )
 
         # Make sure that unavailable actions' Q values are assigned to -inf
-        next_state_action_values[batch.next_unavailable_actions_mask] = -float("inf")
+        next_state_action_values = next_state_action_values.masked_fill(
+            batch.next_unavailable_actions_mask.unsqueeze(0), -float("inf")
+        )
 
         # Get argmax actions indices
-        argmax_actions = next_state_action_values.max(1)[1]  # (batch_size)
-        return target_next_state_action_values[
-            torch.arange(batch_size), argmax_actions
-        ]  # (batch_size)
+        argmax_actions = next_state_action_values.argmax(dim=-1, keepdim=True)
+        return target_next_state_action_values.gather(-1, argmax_actions).squeeze(
+            -1
+        )  # (ensemble_size x batch_size)
 
     def compare(self, other: PolicyLearner) -> str:
         """
@@ -70,6 +70,7 @@ class DeepDeterministicPolicyGradient(ActorCriticBase):
         actor_optimizer: Optional[optim.Optimizer] = None,
         critic_optimizer: Optional[optim.Optimizer] = None,
         history_summarization_optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         super().__init__(
             state_dim=state_dim,
@@ -102,6 +103,7 @@ class DeepDeterministicPolicyGradient(ActorCriticBase):
             actor_optimizer=actor_optimizer,
             critic_optimizer=critic_optimizer,
             history_summarization_optimizer=history_summarization_optimizer,
+            compile=compile,
         )
 
     def _actor_loss(self, batch: TransitionBatch) -> torch.Tensor:
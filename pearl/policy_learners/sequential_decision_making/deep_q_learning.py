@@ -57,6 +57,7 @@ class DeepQLearning(DeepTDLearning):
         action_representation_module: ActionRepresentationModule | None = None,
         network_instance: QValueNetwork | None = None,
         optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
         **kwargs: Any,
     ) -> None:
         """Constructs a DeepQLearning policy learner. DeepQLearning is based on DeepTDLearning
@@ -97,6 +98,8 @@ class DeepQLearning(DeepTDLearning):
                 Note: This is an alternative to specifying a `network_type`. If provided, the
                 specified `network_type` is ignored and the input `network_instance` is used for
                 learning. Allows for custom implementations of Q-value networks.
+            compile (bool): Whether to compile the loss computation of `learn_batch` with
+                `torch.compile`. Defaults to False.
             **kwargs: Additional arguments to be passed when using `TwoTowerNetwork`
                 class as the QValueNetwork. This includes {state_output_dim (int),
                 action_output_dim (int), state_hidden_dims (List[int]),
@@ -126,6 +129,7 @@ class DeepQLearning(DeepTDLearning):
             target_update_freq=target_update_freq,
             network_instance=network_instance,
             optimizer=optimizer,
+            compile=compile,
             **kwargs,
         )
 
@@ -160,7 +164,9 @@ class DeepQLearning(DeepTDLearning):
         )  # (batch_size x action_space_size)
 
         # Make sure that unavailable actions' Q values are assigned to -inf
-        next_state_action_values[batch.next_unavailable_actions_mask] = -float("inf")
+        next_state_action_values = next_state_action_values.masked_fill(
+            batch.next_unavailable_actions_mask, -float("inf")
+        )
 
         # Torch.max(1) returns value, indices
         return next_state_action_values.max(1)[0]  # (batch_size)
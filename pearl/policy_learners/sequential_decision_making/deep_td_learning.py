@@ -34,6 +34,10 @@ from pearl.neural_networks.sequential_decision_making.q_value_networks import (
 from pearl.policy_learners.exploration_modules.exploration_module import (
     ExplorationModule,
 )
+from pearl.policy_learners.inference_policy import (
+    export_discrete_inference_policy,
+    QValueInferencePolicy,
+)
 from pearl.policy_learners.policy_learner import PolicyLearner
 from pearl.replay_buffers.transition import TransitionBatch
 
@@ -74,6 +78,7 @@ class DeepTDLearning(PolicyLearner):
         network_instance: QValueNetwork | None = None,
         action_representation_module: ActionRepresentationModule | None = None,
         optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
         **kwargs: Any,
     ) -> None:
         """Constructs a DeepTDLearning based policy learner. DeepTDLearning is the base class
@@ -115,6 +120,8 @@ class DeepTDLearning(PolicyLearner):
             action_representation_module (ActionRepresentationModule, optional): Optional module to
                 represent actions as a feature vector. Typically specified at the agent level.
                 Defaults to None.
+            compile (bool): Whether to compile the loss computation of `learn_batch` (including
+                the Bellman targets) with `torch.compile`. Defaults to False.
         """
         super().__init__(
             training_rounds=training_rounds,
@@ -124,6 +131,7 @@ class DeepTDLearning(PolicyLearner):
             is_action_continuous=False,
             action_representation_module=action_representation_module,
             action_space=action_space,
+            compile=compile,
         )
         self._action_space = action_space
         self._learning_rate = learning_rate
@@ -252,6 +260,67 @@ class DeepTDLearning(PolicyLearner):
             values=q_values,
         )
 
+    def act_batch(
+        self,
+        subjective_states: SubjectiveState,
+        available_action_space: ActionSpace,
+        exploit: bool = False,
+    ) -> torch.Tensor:
+        """
+        Selects actions for a batch of subjective states with a single forward pass of
+        the Q-value network. See `act`.
+        """
+        assert isinstance(available_action_space, DiscreteActionSpace)
+        # actions keep their dtype, and are only cast for the action representation
+        actions = available_action_space.actions_batch.to(subjective_states.device)
+        with torch.no_grad():
+            batched_actions_representation = self.action_representation_module(
+                actions.to(subjective_states)
+            ).unsqueeze(0)  # (1 x number of actions x action_dim)
+            q_values = self._Q.get_q_values(
+                subjective_states,  # (batch_size x state_dim)
+                batched_actions_representation.expand(
+                    subjective_states.shape[0], -1, -1
+                ),
+            )  # (batch_size x number of actions)
+            exploit_actions = actions[torch.argmax(q_values, dim=1)]
+
+        if exploit:
+            return exploit_actions
+
+        assert self.exploration_module is not None
+        return self.exploration_module.act_batch(
+            subjective_states=subjective_states,
+            action_space=available_action_space,
+            values=q_values,
+            exploit_actions=exploit_actions,
+        )
+
+    def export_inference_policy(
+        self,
+        example_subjective_states: torch.Tensor,
+        action_space: ActionSpace | None = None,
+        return_scores: bool = False,
+    ) -> torch.jit.ScriptModule:
+        """
+        Exports the greedy policy with respect to the Q-value network, whose scores are
+        the Q-values of the actions. See `PolicyLearner.export_inference_policy`.
+        """
+        action_space = self._action_space if action_space is None else action_space
+        assert isinstance(action_space, DiscreteActionSpace)
+        with torch.no_grad():
+            action_representations = self.action_representation_module(
+                action_space.actions_batch.to(example_subjective_states)
+            )
+        return export_discrete_inference_policy(
+            QValueInferencePolicy(
+                q_value_network=self._Q,
+                action_representations=action_representations,
+                return_scores=return_scores,
+            ),
+            example_subjective_states,
+        )
+
     @abstractmethod
     def get_next_state_values(
         self, batch: TransitionBatch, batch_size: int
@@ -275,6 +344,27 @@ class DeepTDLearning(PolicyLearner):
             batch (TransitionBatch): batch of transitions
         Returns:
             Dict[str, Any]: dictionary with loss as the mean bellman error (across the batch).
+                The TD error of each transition, used to update replay priorities, is
+                stored in `td_error`.
+        """
+        loss, td_error = self._compiled("_td_loss")(batch)
+
+        # Optimize the model
+        self._optimizer.zero_grad()
+        loss.backward()
+        self._optimizer.step()
+
+        # Target network update
+        if (self._training_steps + 1) % self._target_update_freq == 0:
+            update_target_network(self._Q_target, self._Q, self._soft_update_tau)
+
+        self._td_error = td_error
+        return {"loss": torch.abs(td_error).mean()}
+
+    def _td_loss(self, batch: TransitionBatch) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Computes the loss of a batch of transitions (the Bellman error, plus the CQL
+        loss for conservative updates) and the (detached) TD error of each transition.
         """
         state_batch = batch.state  # (batch_size x state_dim)
         action_batch = batch.action  # (batch_size x action_dim)
@@ -301,8 +391,14 @@ class DeepTDLearning(PolicyLearner):
             * (1 - terminated_batch.float())
         ) + reward_batch  # (batch_size), r + gamma * V(s)
 
-        criterion = torch.nn.MSELoss()
-        bellman_loss = criterion(state_action_values, expected_state_action_values)
+        td_error = state_action_values - expected_state_action_values  # (batch_size)
+        if batch.weight is not None:
+            # importance-sampling weights, e.g. from a prioritized replay buffer
+            bellman_loss = (batch.weight * td_error.pow(2)).mean()
+        else:
+            bellman_loss = torch.nn.functional.mse_loss(
+                state_action_values, expected_state_action_values
+            )
 
         # Conservative TD updates for offline learning.
         if self._is_conservative:
@@ -312,21 +408,7 @@ class DeepTDLearning(PolicyLearner):
             loss = self._conservative_alpha * cql_loss + bellman_loss
         else:
             loss = bellman_loss
-
-        # Optimize the model
-        self._optimizer.zero_grad()
-        loss.backward()
-        self._optimizer.step()
-
-        # Target network update
-        if (self._training_steps + 1) % self._target_update_freq == 0:
-            update_target_network(self._Q_target, self._Q, self._soft_update_tau)
-
-        return {
-            "loss": torch.abs(state_action_values - expected_state_action_values)
-            .mean()
-            .item()
-        }
+        return loss, td_error.detach()
 
     def compare(self, other: PolicyLearner) -> str:
         """
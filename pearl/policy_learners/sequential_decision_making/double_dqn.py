@@ -43,15 +43,20 @@ class DoubleDQN(DeepQLearning):
             batch.next_available_actions,  # (batch_size x action_space_size x action_dim)
         )  # (batch_size x action_space_size)
         # Make sure that unavailable actions' Q values are assigned to -inf
-        next_state_action_values[batch.next_unavailable_actions_mask] = -float("inf")
+        next_state_action_values = next_state_action_values.masked_fill(
+            batch.next_unavailable_actions_mask, -float("inf")
+        )
 
         # Torch.max(1) returns value, indices
         next_action_indices = next_state_action_values.max(1)[1]  # (batch_size)
         # pyre-fixme[16]: Optional type has no attribute `__getitem__`.
         next_action_batch = batch.next_available_actions[
             # pyre-fixme[16]: Optional type has no attribute `size`.
-            torch.arange(batch.next_available_actions.size(0)),
-            next_action_indices.squeeze(),
+            torch.arange(
+                batch.next_available_actions.size(0),
+                device=next_action_indices.device,
+            ),
+            next_action_indices,
         ]  # (batch_size x action_dim)
         return self._Q_target.get_q_values(
             # pyre-fixme[6]: expected `Tensor` but got `Optional[Tensor]`
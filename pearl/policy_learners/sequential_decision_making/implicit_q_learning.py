@@ -101,6 +101,7 @@ class ImplicitQLearning(ActorCriticBase):
         critic_optimizer: Optional[optim.Optimizer] = None,
         history_summarization_optimizer: Optional[optim.Optimizer] = None,
         value_optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         super().__init__(
             state_dim=state_dim,
@@ -132,6 +133,7 @@ class ImplicitQLearning(ActorCriticBase):
             actor_optimizer=actor_optimizer,
             critic_optimizer=critic_optimizer,
             history_summarization_optimizer=history_summarization_optimizer,
+            compile=compile,
         )
 
         self._expectile = expectile
@@ -162,9 +164,9 @@ class ImplicitQLearning(ActorCriticBase):
             )
 
     def learn_batch(self, batch: TransitionBatch) -> dict[str, Any]:
-        value_loss = self._value_loss(batch)
-        critic_loss = self._critic_loss(batch)
-        actor_loss = self._actor_loss(batch)
+        value_loss = self._compiled("_value_loss")(batch)
+        critic_loss = self._compiled("_critic_loss")(batch)
+        actor_loss = self._compiled("_actor_loss")(batch)
         # pyre-fixme[16]: Item `Tensor` of `Tensor | Module` has no attribute
         #  `zero_grad`.
         self._history_summarization_optimizer.zero_grad()
@@ -190,18 +192,19 @@ class ImplicitQLearning(ActorCriticBase):
         )
 
         return {
-            "value_loss": value_loss.item(),
-            "actor_loss": actor_loss.item(),
-            "critic_loss": critic_loss.item(),
+            "value_loss": value_loss.detach(),
+            "actor_loss": actor_loss.detach(),
+            "critic_loss": critic_loss.detach(),
         }
 
     def _value_loss(self, batch: TransitionBatch) -> torch.Tensor:
         with torch.no_grad():
             # pyre-fixme[29]: `Union[Tensor, Module]` is not a function.
             q1, q2 = self._critic_target.get_q_values(batch.state, batch.action)
-            # random ensemble distillation.
-            random_index = torch.randint(0, 2, (1,)).item()
-            target_q = q1 if random_index == 0 else q2  # shape: (batch_size)
+            # random ensemble distillation, choosing a critic without synchronizing
+            # the device with the host
+            random_index = torch.randint(0, 2, ())
+            target_q = torch.where(random_index == 0, q1, q2)  # shape: (batch_size)
 
         value_batch = self._value_network(batch.state).view(-1)  # shape: (batch_size)
 
@@ -216,9 +219,10 @@ class ImplicitQLearning(ActorCriticBase):
         with torch.no_grad():
             # pyre-fixme[29]: `Union[Tensor, Module]` is not a function.
             q1, q2 = self._critic_target.get_q_values(batch.state, batch.action)
-            # random ensemble distillation.
-            random_index = torch.randint(0, 2, (1,)).item()
-            target_q = q1 if random_index == 0 else q2  # shape: (batch_size)
+            # random ensemble distillation, choosing a critic without synchronizing
+            # the device with the host
+            random_index = torch.randint(0, 2, ())
+            target_q = torch.where(random_index == 0, q1, q2)  # shape: (batch_size)
 
             value_batch = self._value_network(batch.state).view(-1)
             # shape: (batch_size)
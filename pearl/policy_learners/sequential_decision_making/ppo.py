@@ -41,8 +41,12 @@ from pearl.replay_buffers.transition import Transition, TransitionBatch
 from pearl.utils.functional_utils.learning.critic_utils import (
     single_critic_state_value_loss,
 )
+from pearl.utils.functional_utils.learning.return_utils import (
+    generalized_advantage_estimates,
+)
 from pearl.utils.replay_buffer_utils import (
     make_replay_buffer_class_for_specific_transition_types,
+    ReplayBufferWithColumns,
 )
 from torch import nn, optim
 
@@ -78,7 +82,7 @@ class PPOTransitionBatch(TransitionBatch):
         return child_obj
 
 
-PPOReplayBuffer: type[TensorBasedReplayBuffer] = (
+PPOReplayBuffer: type[ReplayBufferWithColumns] = (
     make_replay_buffer_class_for_specific_transition_types(
         PPOTransition, PPOTransitionBatch
     )
@@ -114,6 +118,7 @@ class ProximalPolicyOptimization(ActorCriticBase):
         actor_optimizer: Optional[optim.Optimizer] = None,
         critic_optimizer: Optional[optim.Optimizer] = None,
         history_summarization_optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         super().__init__(
             state_dim=state_dim,
@@ -147,6 +152,7 @@ class ProximalPolicyOptimization(ActorCriticBase):
             actor_optimizer=actor_optimizer,
             critic_optimizer=critic_optimizer,
             history_summarization_optimizer=history_summarization_optimizer,
+            compile=compile,
         )
         self._epsilon = epsilon
         self._trace_decay_param = trace_decay_param
@@ -210,41 +216,37 @@ class ProximalPolicyOptimization(ActorCriticBase):
         See https://arxiv.org/abs/1707.06347 equation (11) for the definition of gae.
         See "Reinforcement Learning: An Introduction" by Sutton and Barto (2018) equation (12.10)
         for the definition of truncated lambda return.
+
+        Transitions in memory are treated as consecutive steps, which can span several
+        episodes. All quantities are computed with batched tensor operations, and are
+        stored as columns of `PPOReplayBuffer` (see `ReplayBufferWithColumns`), or in
+        each transition for other replay buffers.
         """
         assert isinstance(replay_buffer, TensorBasedReplayBuffer)
         assert len(replay_buffer.memory) > 0
-        (
-            state_list,
-            action_list,
-            available_actions_list,
-            unavailable_actions_mask_list,
-        ) = ([], [], [], [])
-        for transition in reversed(replay_buffer.memory):
-            state_list.append(transition.state)
-            action_list.append(transition.action)
-            available_actions_list.append(transition.curr_available_actions)
-            unavailable_actions_mask_list.append(
-                transition.curr_unavailable_actions_mask
-            )
-        history_summary_batch = self._history_summarization_module(
-            torch.cat(state_list)
-        ).detach()
-        action_representation_batch = self.action_representation_module(
-            torch.cat(action_list)
-        )
+        memory = list(replay_buffer.memory)
+        device = replay_buffer.device_for_batches
 
         # Transitions in the reply buffer memory are in the CPU
         # (only sampled batches are moved to the used device, kept in replay_buffer.device)
         # To use it in expressions involving the models,
         # we must move them to the device being used first.
-        history_summary_batch = history_summary_batch.to(
-            replay_buffer.device_for_batches
-        )
-        action_representation_batch = action_representation_batch.to(
-            replay_buffer.device_for_batches
+        def column(name: str) -> torch.Tensor:
+            return torch.cat([getattr(transition, name) for transition in memory]).to(
+                device
+            )
+
+        history_summary_batch = self._history_summarization_module(
+            column("state")
+        ).detach()
+        action_representation_batch = self.action_representation_module(
+            column("action")
         )
+        rewards = column("reward")
+        terminated = column("terminated")
+        truncated = column("truncated")
 
-        state_values = self._critic(history_summary_batch).detach()
+        state_values = self._critic(history_summary_batch).detach().reshape(-1)
         action_probs = (
             # pyre-fixme[29]: `Union[Module, Tensor]` is not a function.
             self._actor.get_action_prob(
@@ -252,48 +254,50 @@ class ProximalPolicyOptimization(ActorCriticBase):
                 action_batch=action_representation_batch,
             )
             .detach()
-            .unsqueeze(-1)
+            .reshape(-1)
         )
 
-        # Transitions in the reply buffer memory are in the CPU
-        # (only sampled batches are moved to the used device,
-        # kept in replay_buffer.device_for_batches)
-        # To use it in expressions involving the critic,
-        # we must move them to the device being used first.
-        next_state = replay_buffer.memory[-1].next_state
-        assert next_state is not None
-        next_state_in_device = next_state.to(replay_buffer.device_for_batches)
-
-        # Obtain the value of the most recent state stored in the replay buffer.
-        # This value is used to compute the generalized advantage estimation (gae)
-        # and the truncated lambda return for all states in the replay buffer.
-        next_value = self._critic(
-            self._history_summarization_module(next_state_in_device)
-        ).detach()[0]  # shape (1,)
-        gae = torch.tensor([0.0]).to(state_values.device)
-        for i, transition in enumerate(reversed(replay_buffer.memory)):
-            original_transition_device = transition.device
-            transition.to(state_values.device)
-            td_error = (
-                transition.reward
-                + self._discount_factor * next_value * (~transition.terminated)
-                - state_values[i]
+        # The next state of a transition is the state of the following one, except for
+        # the last transition and at truncations, whose next state values are computed.
+        next_state_values = torch.roll(state_values, shifts=-1)
+        bootstrapped = truncated.clone()
+        bootstrapped[-1] = True
+        bootstrapped_indices = torch.nonzero(bootstrapped).flatten().tolist()
+        next_states = []
+        for i in bootstrapped_indices:
+            next_state = memory[i].next_state
+            assert next_state is not None
+            next_states.append(next_state)
+        next_state_values[bootstrapped_indices] = (
+            self._critic(
+                self._history_summarization_module(torch.cat(next_states).to(device))
             )
-            gae = (
-                td_error
-                + self._discount_factor
-                * self._trace_decay_param
-                * (not (transition.terminated or transition.truncated))
-                * gae
+            .detach()
+            .reshape(-1)
+        )
+
+        gae = generalized_advantage_estimates(
+            rewards=rewards,
+            state_values=state_values,
+            next_state_values=next_state_values,
+            terminated=terminated,
+            truncated=truncated,
+            discount_factor=self._discount_factor,
+            trace_decay_param=self._trace_decay_param,
+        )
+        # truncated lambda return of the states
+        lam_return = gae + state_values
+
+        if isinstance(replay_buffer, ReplayBufferWithColumns):
+            replay_buffer.set_columns(
+                gae=gae, lam_return=lam_return, action_probs=action_probs
             )
+            return
+        for i, transition in enumerate(memory):
             assert isinstance(transition, PPOTransition)
-            transition.gae = gae
-            # truncated lambda return of the state
-            transition.lam_return = gae + state_values[i]
-            # action probabilities from the current policy
-            transition.action_probs = action_probs[i]
-            next_value = state_values[i]
-            transition.to(original_transition_device)
+            transition.gae = gae[i : i + 1].to(transition.device)
+            transition.lam_return = lam_return[i : i + 1].to(transition.device)
+            transition.action_probs = action_probs[i : i + 1].to(transition.device)
 
     def compare(self, other: PolicyLearner) -> str:
         """
@@ -63,6 +63,7 @@ class QuantileRegressionDeepQLearning(QuantileRegressionDeepTDLearning):
         network_type: type[QuantileQValueNetwork] = QuantileQValueNetwork,
         network_instance: QuantileQValueNetwork | None = None,
         optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         assert isinstance(action_space, DiscreteActionSpace)
         super().__init__(
@@ -86,6 +87,7 @@ class QuantileRegressionDeepQLearning(QuantileRegressionDeepTDLearning):
             network_instance=network_instance,
             action_representation_module=action_representation_module,
             optimizer=optimizer,
+            compile=compile,
         )
 
     # QR-DQN is based on QuantileRegressionDeepTDLearning class.
@@ -124,7 +126,9 @@ class QuantileRegressionDeepQLearning(QuantileRegressionDeepTDLearning):
         )  # shape: (batch_size, action_space_size)
 
         # make sure that unavailable actions' Q values are assigned to -inf
-        next_state_action_values[next_unavailable_actions_mask_batch] = -float("inf")
+        next_state_action_values = next_state_action_values.masked_fill(
+            next_unavailable_actions_mask_batch, -float("inf")
+        )
 
         """
         Step 2: choose the greedy action for each state
@@ -38,7 +38,7 @@ from pearl.safety_modules.risk_sensitive_safety_modules import (  # noqa
     RiskNeutralSafetyModule,  # noqa
 )
 from pearl.utils.functional_utils.learning.loss_fn_utils import (
-    compute_elementwise_huber_loss,
+    compute_quantile_huber_loss,
 )
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 from pearl.utils.module_utils import modules_have_similar_state_dict
@@ -71,6 +71,7 @@ class QuantileRegressionDeepTDLearning(DistributionalPolicyLearner):
         network_instance: QuantileQValueNetwork | None = None,
         action_representation_module: ActionRepresentationModule | None = None,
         optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         assert isinstance(action_space, DiscreteActionSpace)
         super().__init__(
@@ -81,6 +82,7 @@ class QuantileRegressionDeepTDLearning(DistributionalPolicyLearner):
             is_action_continuous=False,
             action_representation_module=action_representation_module,
             optimizer=optimizer,
+            compile=compile,
         )
 
         if hidden_dims is None:
@@ -197,7 +199,27 @@ class QuantileRegressionDeepTDLearning(DistributionalPolicyLearner):
 
         See the parameterization in QR DQN paper: https://arxiv.org/pdf/1710.10044.pdf for details.
         """
+        quantile_bellman_loss, loss = self._compiled("_quantile_bellman_loss")(batch)
 
+        # optimize model (parameters of quantile q network)
+        self._optimizer.zero_grad()
+        quantile_bellman_loss.backward()
+        self._optimizer.step()
+
+        # target network update
+        if (self._training_steps + 1) % self._target_update_freq == 0:
+            update_target_network(self._Q_target, self._Q, self._soft_update_tau)
+
+        return {"loss": loss}
+
+    def _quantile_bellman_loss(
+        self, batch: TransitionBatch
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Computes the quantile huber loss of a batch of transitions (see `learn_batch`),
+        along with the (detached) mean absolute difference between the quantiles and
+        their Bellman targets, which is reported as the loss.
+        """
         batch_size = batch.state.shape[0]
 
         """
@@ -226,49 +248,28 @@ class QuantileRegressionDeepTDLearning(DistributionalPolicyLearner):
         """
         Step 3: pairwise distributional quantile loss:
         T theta_j(s',a*) - theta_i(s,a) for i,j in (1, .. , N)
-            - output shape: (batch_size, N, N)
-        """
-        pairwise_quantile_loss = quantile_next_state_greedy_action_values.unsqueeze(
-            2
-        ) - quantile_state_action_values.unsqueeze(1)
+            - smoothed by the elementwise huber loss, since it is non-smooth at 0
 
-        # elementwise huber loss smoothes the quantile loss, since it is non-smooth at 0
-        huber_loss = compute_elementwise_huber_loss(pairwise_quantile_loss)
+        Step 4: compute asymmetric huber loss (also known as the quantile huber loss),
+        weighting the pairwise huber loss by |tau_i - 1{T theta_j - theta_i < 0}|
 
-        with torch.no_grad():
-            asymmetric_weight = torch.abs(
-                self._Q.quantile_midpoints - (pairwise_quantile_loss < 0).float()
-            )
-
-        """
-        # Step 4: compute asymmetric huber loss (also known as the quantile huber loss)
-            - output shape: (batch_size, N, N)
-        """
-        quantile_huber_loss = asymmetric_weight * huber_loss
-
-        """
         Step 5: compute loss to optimize: given pairwise quantile huber loss,
-            - sum(dim=1) approximates the (sum_{i=1}^N [ .. ]) term in Equation (1),
-            - mean() takes average over the other quantile dimension (E_j [ .. ]) and over batch
-        """
-        quantile_bellman_loss = quantile_huber_loss.sum(dim=1).mean()
-
-        # optimize model (parameters of quantile q network)
-        self._optimizer.zero_grad()
-        quantile_bellman_loss.backward()
-        self._optimizer.step()
-
-        # target network update
-        if (self._training_steps + 1) % self._target_update_freq == 0:
-            update_target_network(self._Q_target, self._Q, self._soft_update_tau)
+            - the sum over j approximates the (sum_{i=1}^N [ .. ]) term in Equation (1),
+            - the mean takes average over the other quantile dimension (E_j [ .. ]) and
+              over batch
 
-        return {
-            "loss": torch.abs(
-                quantile_state_action_values - quantile_next_state_greedy_action_values
-            )
-            .mean()
-            .item()
-        }
+        The pairwise terms are computed in chunks of the batch, in both the forward and
+        the backward pass, rather than as (batch_size, N, N) tensors.
+        """
+        quantile_bellman_loss = compute_quantile_huber_loss(
+            quantiles=quantile_state_action_values,
+            target_quantiles=quantile_next_state_greedy_action_values,
+            quantile_midpoints=self._Q.quantile_midpoints,
+        )
+        loss = torch.abs(
+            quantile_state_action_values - quantile_next_state_greedy_action_values
+        ).mean()
+        return quantile_bellman_loss, loss.detach()
 
     def compare(self, other: PolicyLearner) -> str:
         """
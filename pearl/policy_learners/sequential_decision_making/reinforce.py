@@ -18,10 +18,10 @@ from pearl.neural_networks.common.value_networks import ValueNetwork
 
 from pearl.neural_networks.sequential_decision_making.actor_networks import ActorNetwork
 from pearl.policy_learners.policy_learner import PolicyLearner
-from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
 from pearl.replay_buffers.transition import Transition
 from pearl.utils.replay_buffer_utils import (
     make_replay_buffer_class_for_specific_transition_types,
+    ReplayBufferWithColumns,
 )
 from torch import nn
 
@@ -50,6 +50,7 @@ from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.functional_utils.learning.critic_utils import (
     single_critic_state_value_loss,
 )
+from pearl.utils.functional_utils.learning.return_utils import discounted_returns
 from torch import optim
 
 
@@ -76,7 +77,7 @@ class REINFORCETransitionBatch(TransitionBatch):
         return child_obj
 
 
-REINFORCEReplayBuffer: type[TensorBasedReplayBuffer] = (
+REINFORCEReplayBuffer: type[ReplayBufferWithColumns] = (
     make_replay_buffer_class_for_specific_transition_types(
         REINFORCETransition, REINFORCETransitionBatch
     )
@@ -112,6 +113,7 @@ class REINFORCE(ActorCriticBase):
         actor_optimizer: Optional[optim.Optimizer] = None,
         critic_optimizer: Optional[optim.Optimizer] = None,
         history_summarization_optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         super().__init__(
             state_dim=state_dim,
@@ -145,6 +147,7 @@ class REINFORCE(ActorCriticBase):
             actor_optimizer=actor_optimizer,
             critic_optimizer=critic_optimizer,
             history_summarization_optimizer=history_summarization_optimizer,
+            compile=compile,
         )
 
     def _actor_loss(self, batch: TransitionBatch) -> torch.Tensor:
@@ -180,32 +183,60 @@ class REINFORCE(ActorCriticBase):
         )
 
     def learn(self, replay_buffer: ReplayBuffer) -> dict[str, Any]:
-        assert type(replay_buffer) is REINFORCEReplayBuffer
+        """
+        Computes the discounted returns of all transitions in the replay buffer, which
+        are treated as consecutive steps of one or more episodes, and learns from them.
+        With a critic, returns are bootstrapped with the values of the next states of
+        the last transition (unless it is terminated) and of truncated transitions.
+        """
+        assert isinstance(replay_buffer, REINFORCEReplayBuffer)
         assert len(replay_buffer.memory) > 0
-        # compute return for all states in the buffer
+        memory = list(replay_buffer.memory)
 
         # Transitions in the reply buffer memory are in the CPU
         # (only sampled batches are moved to the used device,
         # kept in replay_buffer.device_for_batches)
         # To use it in expressions involving the critic,
         # we must move them to the device being used first.
-        next_state = replay_buffer.memory[-1].next_state
-        terminated = replay_buffer.memory[-1].terminated
-        assert next_state is not None
-        assert terminated is not None
-        next_state_in_device = next_state.to(replay_buffer.device_for_batches)
-        terminated_in_device = terminated.to(replay_buffer.device_for_batches)
-
-        cum_reward = self._critic(
-            self._history_summarization_module(next_state_in_device)
-        ).detach() * (~terminated_in_device)
-
-        # move cum_reward to CPU to process CPU-stored transitions
-        cum_reward = cum_reward.cpu()
-        for transition in reversed(replay_buffer.memory):
-            cum_reward += transition.reward
-            assert isinstance(transition, REINFORCETransition)
-            transition.cum_reward = cum_reward
+        device = replay_buffer.device_for_batches
+        rewards = torch.cat([transition.reward for transition in memory]).to(device)
+        terminated = torch.cat([transition.terminated for transition in memory]).to(
+            device
+        )
+        truncated = torch.cat([transition.truncated for transition in memory]).to(
+            device
+        )
+
+        bootstrap_values = torch.zeros_like(rewards, dtype=torch.float)
+        if self._use_critic:
+            bootstrapped = truncated.clone()
+            bootstrapped[-1] = True
+            bootstrapped &= ~terminated
+            bootstrapped_indices = torch.nonzero(bootstrapped).flatten().tolist()
+            if len(bootstrapped_indices) > 0:
+                next_states = []
+                for i in bootstrapped_indices:
+                    next_state = memory[i].next_state
+                    assert next_state is not None
+                    next_states.append(next_state)
+                bootstrap_values[bootstrapped_indices] = (
+                    self._critic(
+                        self._history_summarization_module(
+                            torch.cat(next_states).to(device)
+                        )
+                    )
+                    .detach()
+                    .reshape(-1)
+                )
+
+        replay_buffer.set_columns(
+            cum_reward=discounted_returns(
+                rewards=rewards,
+                dones=terminated | truncated,
+                gamma=self._discount_factor,
+                bootstrap_value=bootstrap_values,
+            )
+        )
         # sample from replay buffer and learn
         result = super().learn(replay_buffer)
         return result
@@ -79,6 +79,7 @@ class SoftActorCritic(ActorCriticBase):
         critic_optimizer: Optional[optim.Optimizer] = None,
         history_summarization_optimizer: Optional[optim.Optimizer] = None,
         target_entropy_scale: float = 0.89,
+        compile: bool = False,
     ) -> None:
         super().__init__(
             state_dim=state_dim,
@@ -111,6 +112,7 @@ class SoftActorCritic(ActorCriticBase):
             actor_optimizer=actor_optimizer,
             critic_optimizer=critic_optimizer,
             history_summarization_optimizer=history_summarization_optimizer,
+            compile=compile,
         )
 
         # This is needed to avoid actor softmax overflow issue.
@@ -178,7 +180,7 @@ class SoftActorCritic(ActorCriticBase):
             self._entropy_coef = torch.exp(self._log_entropy).detach()
             actor_critic_loss = {
                 **actor_critic_loss,
-                **{"entropy_coef": entropy_optimizer_loss},
+                **{"entropy_coef": entropy_optimizer_loss.detach()},
             }
 
         return actor_critic_loss
@@ -234,7 +236,7 @@ class SoftActorCritic(ActorCriticBase):
         # since we are calculating expectation
 
         if next_unavailable_actions_mask_batch is not None:
-            next_q[next_unavailable_actions_mask_batch] = 0.0
+            next_q = next_q.masked_fill(next_unavailable_actions_mask_batch, 0.0)
 
         # pyre-fixme[29]: `Union[Module, Tensor]` is not a function.
         next_state_policy_dist = self._actor.get_policy_distribution(
@@ -281,7 +283,7 @@ class SoftActorCritic(ActorCriticBase):
         # pyre-fixme[16]: `SoftActorCritic` has no attribute `_action_log_probs_cache`.
         self._action_log_probs_cache = torch.log(new_policy_dist + 1e-8)
         if unavailable_actions_mask is not None:
-            q[unavailable_actions_mask] = 0.0
+            q = q.masked_fill(unavailable_actions_mask, 0.0)
 
         loss = (
             # pyre-fixmeUnsupported operand [58]: `*` is not supported for operand types
@@ -69,6 +69,7 @@ class ContinuousSoftActorCritic(ActorCriticBase):
         actor_optimizer: Optional[optim.Optimizer] = None,
         critic_optimizer: Optional[optim.Optimizer] = None,
         history_summarization_optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         super().__init__(
             state_dim=state_dim,
@@ -101,6 +102,7 @@ class ContinuousSoftActorCritic(ActorCriticBase):
             actor_optimizer=actor_optimizer,
             critic_optimizer=critic_optimizer,
             history_summarization_optimizer=history_summarization_optimizer,
+            compile=compile,
         )
 
         self._entropy_autotune = entropy_autotune
@@ -149,7 +151,7 @@ class ContinuousSoftActorCritic(ActorCriticBase):
             self._entropy_coef = torch.exp(self._log_entropy).detach()
             actor_critic_loss = {
                 **actor_critic_loss,
-                **{"entropy_coef": entropy_optimizer_loss},
+                **{"entropy_coef": entropy_optimizer_loss.detach()},
             }
 
         return actor_critic_loss
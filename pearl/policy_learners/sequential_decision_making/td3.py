@@ -73,6 +73,7 @@ class TD3(DeepDeterministicPolicyGradient):
         actor_optimizer: Optional[optim.Optimizer] = None,
         critic_optimizer: Optional[optim.Optimizer] = None,
         history_summarization_optimizer: Optional[optim.Optimizer] = None,
+        compile: bool = False,
     ) -> None:
         assert isinstance(action_space, BoxActionSpace)
         super().__init__(
@@ -96,12 +97,13 @@ class TD3(DeepDeterministicPolicyGradient):
             actor_optimizer=actor_optimizer,
             critic_optimizer=critic_optimizer,
             history_summarization_optimizer=history_summarization_optimizer,
+            compile=compile,
         )
         self._action_space: BoxActionSpace = action_space
         self._actor_update_freq = actor_update_freq
         self._actor_update_noise = actor_update_noise
         self._actor_update_noise_clip = actor_update_noise_clip
-        self._last_actor_loss: float = 0.0
+        self._last_actor_loss: torch.Tensor = torch.tensor(0.0)
 
     def learn_batch(self, batch: TransitionBatch) -> dict[str, Any]:
         # The actor and the critic updates are arranged in the following way
@@ -115,17 +117,17 @@ class TD3(DeepDeterministicPolicyGradient):
         self._history_summarization_optimizer.zero_grad()
         if self._training_steps % self._actor_update_freq == 0:
             self._actor_optimizer.zero_grad()
-            actor_loss = self._actor_loss(batch)
+            actor_loss = self._compiled("_actor_loss")(batch)
             actor_loss.backward(retain_graph=True)
             self._actor_optimizer.step()
-            self._last_actor_loss = actor_loss.item()
+            self._last_actor_loss = actor_loss.detach()
         report["actor_loss"] = self._last_actor_loss
 
         self._critic_optimizer.zero_grad()
-        critic_loss = self._critic_loss(batch)  # critic update
+        critic_loss = self._compiled("_critic_loss")(batch)  # critic update
         critic_loss.backward()
         self._critic_optimizer.step()
-        report["critic_loss"] = critic_loss.item()
+        report["critic_loss"] = critic_loss.detach()
         # pyre-fixme[16]: Item `Tensor` of `Tensor | Module` has no attribute `step`.
         self._history_summarization_optimizer.step()
 
@@ -269,6 +271,7 @@ class TD3BC(TD3):
         actor_network_instance: ActorNetwork | None = None,
         critic_network_instance: QValueNetwork | nn.Module | None = None,
         alpha_bc: float = 2.5,
+        compile: bool = False,
     ) -> None:
         super().__init__(
             state_dim=state_dim,
@@ -291,6 +294,7 @@ class TD3BC(TD3):
             action_representation_module=action_representation_module,
             actor_network_instance=actor_network_instance,
             critic_network_instance=critic_network_instance,
+            compile=compile,
         )
         self.alpha_bc: float = alpha_bc
         self._behavior_policy: torch.nn.Module = behavior_policy
@@ -7,7 +7,14 @@
 # pyre-strict
 
 from .basic_replay_buffer import BasicReplayBuffer
+from .columnar_replay_buffer import ColumnarReplayBuffer
+from .columnar_storage import ColumnarStorage, InternedTensorTable
+from .history_replay_buffer import HistoryReplayBuffer
+from .memmap_replay_buffer import MemmapColumnarStorage, MemmapReplayBuffer
+from .prefetching_replay_buffer import PrefetchingReplayBuffer
+from .prioritized_replay_buffer import PrioritizedReplayBuffer
 from .replay_buffer import ReplayBuffer
+from .sum_tree import SumTree
 from .tensor_based_replay_buffer import TensorBasedReplayBuffer
 from .transition import (
     Transition,
@@ -24,4 +31,13 @@ __all__ = [
     "TransitionWithBootstrapMask",
     "TransitionWithBootstrapMaskBatch",
     "BasicReplayBuffer",
+    "ColumnarReplayBuffer",
+    "ColumnarStorage",
+    "HistoryReplayBuffer",
+    "InternedTensorTable",
+    "MemmapColumnarStorage",
+    "MemmapReplayBuffer",
+    "PrefetchingReplayBuffer",
+    "PrioritizedReplayBuffer",
+    "SumTree",
 ]
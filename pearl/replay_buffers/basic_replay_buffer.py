@@ -11,7 +11,7 @@ from pearl.api.action import Action
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
 from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
-from pearl.replay_buffers.transition import Transition
+from pearl.replay_buffers.transition import Transition, TransitionBatch
 from torch import Tensor
 
 
@@ -47,3 +47,6 @@ class BasicReplayBuffer(TensorBasedReplayBuffer):
             cost=self._process_single_cost(cost),
         )
         self.memory.append(transition)
+
+    def _store_batch(self, batch: TransitionBatch) -> None:
+        self.memory.extend(self._split_batch_into_transitions(batch))
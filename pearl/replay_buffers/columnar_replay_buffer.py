@@ -0,0 +1,241 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import torch
+from pearl.api.action import Action
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.columnar_storage import (
+    ColumnarStorage,
+    InternedTensorTable,
+)
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from torch import Tensor
+
+# (available actions field, unavailable actions mask field, stored id column)
+_AVAILABLE_ACTIONS_FIELDS: tuple[tuple[str, str, str], ...] = (
+    ("curr_available_actions", "curr_unavailable_actions_mask", "curr_action_space_id"),
+    ("next_available_actions", "next_unavailable_actions_mask", "next_action_space_id"),
+)
+# batch fields which are not stored
+_UNSTORED_FIELDS: tuple[str, ...] = (
+    "next_action",
+    "weight",
+    "time_diff",
+    "buffer_index",
+)
+
+
+class ColumnarReplayBuffer(TensorBasedReplayBuffer):
+    """
+    A drop-in replacement for `BasicReplayBuffer` which keeps transitions in a
+    `ColumnarStorage` (one preallocated tensor per field, written as a ring buffer)
+    instead of a deque of `Transition` objects.
+
+    Sampling draws indices uniformly at random *with replacement* using a single
+    `torch.randint` and gathers each column with `index_select`, so its cost does
+    not depend on the number of stored transitions.
+
+    Padded available actions and their masks are usually identical across transitions,
+    so instead of storing them in every row, each distinct (available actions, mask)
+    pair is kept once in an `InternedTensorTable` and rows only store its id. Ids are
+    reference-counted by the rows storing them, so that pairs which are no longer used
+    by any row (e.g. with per-step action spaces) are freed when rows are overwritten.
+
+    Since `memory` is not used, learners which iterate over `replay_buffer.memory`
+    (e.g. PPO and REINFORCE) should keep using their own replay buffers.
+
+    Args:
+        capacity: Size of the replay buffer.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity)
+        self.storage: ColumnarStorage = ColumnarStorage(capacity)
+        self._available_actions_table = InternedTensorTable()
+
+    def _store_transition(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions_tensor_with_padding: Tensor | None,
+        curr_unavailable_actions_mask: Tensor | None,
+        next_state: SubjectiveState | None,
+        next_available_actions_tensor_with_padding: Tensor | None,
+        next_unavailable_actions_mask: Tensor | None,
+        cost: float | None = None,
+    ) -> None:
+        columns = self._transition_columns(
+            state,
+            action,
+            reward,
+            terminated,
+            truncated,
+            curr_available_actions_tensor_with_padding,
+            curr_unavailable_actions_mask,
+            next_state,
+            next_available_actions_tensor_with_padding,
+            next_unavailable_actions_mask,
+            cost,
+        )
+        self._update_action_space_references(columns)
+        self.storage.append(columns)
+
+    def _transition_columns(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions_tensor_with_padding: Tensor | None,
+        curr_unavailable_actions_mask: Tensor | None,
+        next_state: SubjectiveState | None,
+        next_available_actions_tensor_with_padding: Tensor | None,
+        next_unavailable_actions_mask: Tensor | None,
+        cost: float | None = None,
+    ) -> dict[str, Tensor]:
+        """Returns the row of each stored column for a single transition."""
+        columns = {
+            "state": self._process_non_optional_single_state(state),
+            "action": self._process_single_action(action),
+            "reward": self._process_single_reward(reward),
+            "terminated": self._process_single_terminated(terminated),
+            "truncated": self._process_single_truncated(truncated),
+            "next_state": self._process_single_state(next_state),
+            "curr_available_actions": curr_available_actions_tensor_with_padding,
+            "curr_unavailable_actions_mask": curr_unavailable_actions_mask,
+            "next_available_actions": next_available_actions_tensor_with_padding,
+            "next_unavailable_actions_mask": next_unavailable_actions_mask,
+            "cost": self._process_single_cost(cost),
+        }
+        for actions_field, mask_field, id_field in _AVAILABLE_ACTIONS_FIELDS:
+            actions = columns.pop(actions_field)
+            mask = columns.pop(mask_field)
+            if actions is not None and mask is not None:
+                action_space_id = self._available_actions_table.intern(actions, mask)
+                columns[id_field] = torch.tensor([action_space_id])
+        return {name: value for name, value in columns.items() if value is not None}
+
+    def _store_batch(self, batch: TransitionBatch) -> None:
+        columns = self._batch_columns(batch)
+        self._update_action_space_references(columns)
+        self.storage.extend(columns)
+
+    def _update_action_space_references(self, columns: dict[str, Tensor]) -> None:
+        """
+        Acquires the action space ids of rows about to be written to the storage, and
+        releases the ids of the rows they overwrite (and of the written rows which do
+        not fit in the storage), so that unused action spaces are freed.
+        """
+        number_of_rows = len(next(iter(columns.values())))
+        number_of_overwritten_rows = max(
+            len(self.storage) + min(number_of_rows, self.storage.capacity)
+            - self.storage.capacity,
+            0,
+        )
+        number_of_dropped_rows = max(number_of_rows - self.storage.capacity, 0)
+        overwritten_indices = self.storage.ordered_indices()[
+            :number_of_overwritten_rows
+        ]
+        # new ids are acquired first, since they can be the ones being released
+        for _, _, id_field in _AVAILABLE_ACTIONS_FIELDS:
+            if id_field in columns:
+                self._available_actions_table.acquire(columns[id_field])
+        for _, _, id_field in _AVAILABLE_ACTIONS_FIELDS:
+            if id_field in self.storage.column_names:
+                self._available_actions_table.release(
+                    self.storage.column(id_field).index_select(0, overwritten_indices)
+                )
+            if id_field in columns:
+                self._available_actions_table.release(
+                    columns[id_field][:number_of_dropped_rows]
+                )
+
+    def _batch_columns(self, batch: TransitionBatch) -> dict[str, Tensor]:
+        """Returns the rows of each stored column for a batch of transitions."""
+        columns = {
+            name: value
+            for name, value in batch.__dict__.items()
+            if value is not None and name not in _UNSTORED_FIELDS
+        }
+        for actions_field, mask_field, id_field in _AVAILABLE_ACTIONS_FIELDS:
+            actions = columns.pop(actions_field, None)
+            mask = columns.pop(mask_field, None)
+            if actions is not None and mask is not None:
+                columns[id_field] = self._available_actions_table.intern_batch(
+                    actions, mask
+                )
+        return columns
+
+    def _acquire_stored_action_spaces(self) -> None:
+        """Acquires the action space ids of all stored rows (e.g. after loading)."""
+        stored_indices = self.storage.ordered_indices()
+        for _, _, id_field in _AVAILABLE_ACTIONS_FIELDS:
+            if id_field in self.storage.column_names:
+                self._available_actions_table.acquire(
+                    self.storage.column(id_field).index_select(0, stored_indices)
+                )
+
+    def _sample_indices(self, batch_size: int) -> Tensor:
+        """Returns the storage indices of the transitions to be sampled."""
+        return torch.randint(
+            len(self), (batch_size,), generator=self._sampling_generator
+        ).to(self.storage.device)
+
+    def _gather(self, indices: Tensor) -> dict[str, Tensor]:
+        """Returns the stored columns of the sampled transitions."""
+        return self.storage.gather(indices)
+
+    def _create_transition_batch_from_columns(
+        self, columns: dict[str, Tensor]
+    ) -> TransitionBatch:
+        for actions_field, mask_field, id_field in _AVAILABLE_ACTIONS_FIELDS:
+            action_space_ids = columns.pop(id_field, None)
+            if action_space_ids is not None and not self._is_action_continuous:
+                (
+                    columns[actions_field],
+                    columns[mask_field],
+                ) = self._available_actions_table.gather(action_space_ids)
+        columns["state"] = columns["state"].type(torch.float32)
+        if "next_state" in columns:
+            columns["next_state"] = columns["next_state"].type(torch.float32)
+        return TransitionBatch(**columns).to(self.device_for_batches)
+
+    def sample(self, batch_size: int) -> TransitionBatch:
+        """
+        Samples `batch_size` transitions uniformly at random with replacement.
+        See `TensorBasedReplayBuffer.sample` for the shapes of the returned batch.
+        The `buffer_index` field of the batch holds the storage index of each transition.
+        """
+        if batch_size > len(self):
+            raise ValueError(
+                f"Can't get a batch of size {batch_size} from a replay buffer with "
+                f"only {len(self)} elements"
+            )
+        if batch_size == 0:
+            return self._create_transition_batch(
+                transitions=[], is_action_continuous=self._is_action_continuous
+            )
+        indices = self._sample_indices(batch_size)
+        batch = self._create_transition_batch_from_columns(self._gather(indices))
+        batch.buffer_index = indices.to(batch.device)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.storage)
+
+    def clear(self) -> None:
+        super().clear()
+        self.storage.clear()
+        self._available_actions_table = InternedTensorTable()
@@ -0,0 +1,397 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import torch
+from pearl.utils.device import get_default_device
+from torch import Tensor
+
+
+class ColumnarStorage:
+    """
+    A fixed-capacity ring buffer storing transitions column by column.
+
+    Each field of a transition (state, action, reward, ...) is kept in its own
+    preallocated contiguous tensor of shape (capacity, *field_shape). Columns are
+    allocated lazily on the first write, using the shape and dtype of the data written,
+    so the storage does not need to know the transition layout in advance.
+    Writes advance a cursor which wraps around once the storage is full,
+    overwriting the oldest rows first.
+
+    Reading a set of rows costs one `index_select` per column, independently of
+    the capacity of the storage.
+
+    Args:
+        capacity: maximum number of rows kept in the storage.
+        device: device on which columns are allocated. Defaults to the torch default device.
+    """
+
+    def __init__(self, capacity: int, device: torch.device | None = None) -> None:
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.device: torch.device = (
+            device if device is not None else get_default_device()
+        )
+        self._columns: dict[str, Tensor] = {}
+        self._cursor = 0
+        self._size = 0
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self._columns.keys())
+
+    @property
+    def cursor(self) -> int:
+        """Index of the row that the next write will go to."""
+        return self._cursor
+
+    def column(self, name: str) -> Tensor:
+        """
+        Returns the full preallocated column (including rows not written yet).
+        Only the first `len(self)` rows (in ring order) hold valid data.
+        """
+        return self._columns[name]
+
+    def _allocate_column(
+        self, name: str, row_shape: torch.Size, dtype: torch.dtype
+    ) -> Tensor:
+        """
+        Allocates the tensor backing column `name`.
+        Subclasses can override this to change where columns live.
+        """
+        return torch.zeros((self.capacity, *row_shape), dtype=dtype, device=self.device)
+
+    def _promote_column(self, name: str, dtype: torch.dtype) -> Tensor:
+        """
+        Returns column `name` converted to `dtype`, which can represent both the stored
+        rows and the rows being written.
+        """
+        return self._columns[name].to(dtype)
+
+    def _prepare_columns(self, columns: dict[str, Tensor]) -> int:
+        """
+        Validates a set of columns to be written, allocating new columns and promoting
+        dtypes of existing ones as needed. Returns the number of rows being written.
+        """
+        if len(columns) == 0:
+            raise ValueError("Cannot write an empty set of columns")
+        if len(self._columns) > 0 and set(columns.keys()) != set(self._columns.keys()):
+            raise ValueError(
+                f"Columns written {sorted(columns.keys())} do not match "
+                f"stored columns {sorted(self._columns.keys())}"
+            )
+        number_of_rows = None
+        for name, value in columns.items():
+            if number_of_rows is None:
+                number_of_rows = value.shape[0]
+            elif value.shape[0] != number_of_rows:
+                raise ValueError(
+                    f"Column {name} has {value.shape[0]} rows, expected {number_of_rows}"
+                )
+            if name not in self._columns:
+                self._columns[name] = self._allocate_column(
+                    name, value.shape[1:], value.dtype
+                )
+                continue
+            column = self._columns[name]
+            if column.shape[1:] != value.shape[1:]:
+                raise ValueError(
+                    f"Column {name} stores rows of shape {tuple(column.shape[1:])} "
+                    f"but got rows of shape {tuple(value.shape[1:])}"
+                )
+            promoted_dtype = torch.promote_types(column.dtype, value.dtype)
+            if promoted_dtype != column.dtype:
+                # e.g. integer rewards followed by float rewards
+                self._columns[name] = self._promote_column(name, promoted_dtype)
+        assert number_of_rows is not None
+        return number_of_rows
+
+    def append(self, columns: dict[str, Tensor]) -> int:
+        """
+        Writes a single row. Each value must have a leading dimension of size 1.
+        Returns the index of the row written.
+        """
+        number_of_rows = self._prepare_columns(columns)
+        if number_of_rows != 1:
+            raise ValueError(f"append expects a single row but got {number_of_rows}")
+        index = self._cursor
+        for name, value in columns.items():
+            self._columns[name][index] = value[0]
+        self._cursor = (self._cursor + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return index
+
+    def extend(self, columns: dict[str, Tensor]) -> Tensor:
+        """
+        Writes several rows at once. All values must share the same leading dimension.
+        If more rows than the capacity are given, only the most recent ones are kept.
+        Returns the indices of the rows written.
+        """
+        number_of_rows = self._prepare_columns(columns)
+        if number_of_rows > self.capacity:
+            columns = {
+                name: value[number_of_rows - self.capacity :]
+                for name, value in columns.items()
+            }
+            number_of_rows = self.capacity
+        indices = (
+            torch.arange(number_of_rows, device=self.device) + self._cursor
+        ) % self.capacity
+        for name, value in columns.items():
+            column = self._columns[name]
+            column.index_copy_(0, indices, value.to(column.device, column.dtype))
+        self._cursor = (self._cursor + number_of_rows) % self.capacity
+        self._size = min(self._size + number_of_rows, self.capacity)
+        return indices
+
+    def gather(self, indices: Tensor) -> dict[str, Tensor]:
+        """Returns the rows at the given indices, one tensor per column."""
+        indices = indices.to(self.device)
+        return {
+            name: column.index_select(0, indices)
+            for name, column in self._columns.items()
+        }
+
+    def ordered_indices(self) -> Tensor:
+        """Indices of all stored rows, from the oldest to the most recent."""
+        start = self._cursor if self._size == self.capacity else 0
+        return (torch.arange(self._size, device=self.device) + start) % self.capacity
+
+    def clear(self) -> None:
+        """Forgets all rows. Allocated columns are kept and reused."""
+        self._cursor = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class InternedTensorTable:
+    """
+    Assigns a small integer id to each distinct tuple of tensors it is given, keeping a
+    single copy of each. Storing ids instead of the tensors themselves is useful for
+    values that are repeated across many transitions, such as the padded available
+    actions tensor and mask of a discrete action space.
+
+    Like a single transition, each interned tensor has a leading dimension of size 1,
+    and all interned tuples must have tensors of the same shapes and dtypes. Interned
+    tensors are written into preallocated columns (one per tensor of the tuples, indexed
+    by id), whose capacity is doubled when they are full, so that `gather` costs one
+    `index_select` per column.
+
+    Users of the ids keep them alive with `acquire` and give them up with `release`
+    (e.g. when the rows of a ring buffer storing them are overwritten). Ids whose
+    reference count drops to zero are freed, and reused by the next interned tuples, so
+    that the table does not grow beyond the number of distinct tuples in use.
+
+    Args:
+        initial_capacity: the number of ids allocated when the first tuple is interned.
+    """
+
+    def __init__(self, initial_capacity: int = 4) -> None:
+        if initial_capacity < 1:
+            raise ValueError(
+                f"initial_capacity must be positive, got {initial_capacity}"
+            )
+        self._initial_capacity = initial_capacity
+        self._columns: list[Tensor] = []
+        # number of ids allocated so far, including freed ones
+        self._size = 0
+        self._ids_by_content: dict[bytes, int] = {}
+        # content key of each allocated id, or None for freed ids
+        self._keys: list[bytes | None] = []
+        self._free_ids: list[int] = []
+        self._reference_counts: Tensor = torch.zeros(0, dtype=torch.long)
+        # the most recently interned tuple, which is first looked up by identity
+        self._last_interned: tuple[tuple[Tensor, ...], int] | None = None
+
+    def __len__(self) -> int:
+        """The number of interned tuples which have not been freed."""
+        return self._size - len(self._free_ids)
+
+    @property
+    def rows(self) -> list[tuple[Tensor, ...] | None]:
+        """The interned tuples of tensors, indexed by their ids (None for freed ids)."""
+        return [
+            (
+                tuple(column[row_id : row_id + 1].clone() for column in self._columns)
+                if self._keys[row_id] is not None
+                else None
+            )
+            for row_id in range(self._size)
+        ]
+
+    @classmethod
+    def from_rows(
+        cls, rows: list[tuple[Tensor, ...] | None]
+    ) -> "InternedTensorTable":
+        """
+        Creates a table whose tuples have the ids of `rows` (as returned by `rows`).
+        The reference counts of all ids are zero until they are acquired.
+        """
+        table = cls()
+        for values in rows:
+            if values is not None:
+                table._allocate_columns(values)
+                break
+        free_ids = []
+        for row_id, values in enumerate(rows):
+            if values is None:
+                table._allocate_id()
+                table._keys.append(None)
+                free_ids.append(row_id)
+            else:
+                table._add(values, _content_key(values))
+        # freed ids are reused from the end of the list
+        table._free_ids = free_ids[::-1]
+        return table
+
+    def _allocate_columns(self, values: tuple[Tensor, ...]) -> None:
+        """Allocates the columns, with the shapes and dtypes of the given tensors."""
+        capacity = max(len(self._reference_counts), self._initial_capacity)
+        self._columns = [
+            value.detach().new_zeros(capacity, *value.shape[1:]) for value in values
+        ]
+        self._reference_counts = torch.cat(
+            [
+                self._reference_counts,
+                torch.zeros(
+                    capacity - len(self._reference_counts), dtype=torch.long
+                ),
+            ]
+        )
+
+    def _allocate_id(self) -> int:
+        """Allocates a new id at the end of the columns, growing them if needed."""
+        row_id = self._size
+        if row_id == len(self._reference_counts):
+            capacity = max(2 * row_id, self._initial_capacity)
+            self._reference_counts = torch.cat(
+                [
+                    self._reference_counts,
+                    torch.zeros(capacity - row_id, dtype=torch.long),
+                ]
+            )
+            self._columns = [
+                torch.cat(
+                    [column, column.new_zeros(capacity - row_id, *column.shape[1:])]
+                )
+                for column in self._columns
+            ]
+        self._size += 1
+        return row_id
+
+    def _add(self, values: tuple[Tensor, ...], key: bytes) -> int:
+        """Writes a new tuple into the columns, reusing a freed id if possible."""
+        if len(self._columns) == 0:
+            self._allocate_columns(values)
+        if len(self._free_ids) > 0:
+            row_id = self._free_ids.pop()
+            self._keys[row_id] = key
+        else:
+            row_id = self._allocate_id()
+            self._keys.append(key)
+        for column, value in zip(self._columns, values):
+            column[row_id] = value.detach()[0].to(column.device)
+        self._ids_by_content[key] = row_id
+        return row_id
+
+    def intern(self, *values: Tensor) -> int:
+        """
+        Returns the id of the given tuple of tensors, adding it to the table if new.
+        The reference count of the id is not changed (see `acquire`).
+        """
+        last_interned = self._last_interned
+        if last_interned is not None and all(
+            value is last_value for value, last_value in zip(values, last_interned[0])
+        ):
+            return last_interned[1]
+
+        # checked before looking up the content, since tensors of other shapes or
+        # dtypes can have the same bytes as interned ones
+        if len(self._columns) > 0 and (
+            len(values) != len(self._columns)
+            or any(
+                value.shape[1:] != column.shape[1:]
+                or value.shape[0] != 1
+                or value.dtype != column.dtype
+                for value, column in zip(values, self._columns)
+            )
+        ):
+            raise ValueError(
+                "All tensors interned in the same table must have the same "
+                "shapes and dtypes"
+            )
+        key = _content_key(values)
+        row_id = self._ids_by_content.get(key)
+        if row_id is None:
+            row_id = self._add(values, key)
+        self._last_interned = (values, row_id)
+        return row_id
+
+    def intern_batch(self, *values: Tensor) -> Tensor:
+        """
+        Interns each row (along the first dimension) of the given tensors.
+        Returns a tensor with the id of each row.
+        """
+        number_of_rows = values[0].shape[0]
+        flattened_rows = torch.cat(
+            [value.reshape(number_of_rows, -1).double() for value in values], dim=1
+        )
+        unique_rows, inverse = torch.unique(
+            flattened_rows, dim=0, return_inverse=True
+        )
+        # intern the first occurrence of each distinct row
+        first_occurrences = torch.full(
+            (len(unique_rows),), number_of_rows, dtype=torch.long
+        ).scatter_reduce(0, inverse, torch.arange(number_of_rows), reduce="amin")
+        unique_ids = torch.tensor(
+            [
+                self.intern(*(value[i : i + 1] for value in values))
+                for i in first_occurrences.tolist()
+            ]
+        )
+        return unique_ids[inverse]
+
+    def acquire(self, ids: Tensor) -> None:
+        """Increments the reference counts of the given ids (once per occurrence)."""
+        ids = ids.reshape(-1).cpu()
+        self._reference_counts.index_add_(0, ids, torch.ones_like(ids))
+
+    def release(self, ids: Tensor) -> None:
+        """
+        Decrements the reference counts of the given ids (once per occurrence), and
+        frees the ids whose reference count drops to zero.
+        """
+        ids = ids.reshape(-1).cpu()
+        if len(ids) == 0:
+            return
+        self._reference_counts.index_add_(0, ids, -torch.ones_like(ids))
+        released_ids = torch.unique(ids)
+        freed_ids = released_ids[self._reference_counts[released_ids] <= 0]
+        for row_id in freed_ids.tolist():
+            key = self._keys[row_id]
+            if key is None:
+                continue
+            self._reference_counts[row_id] = 0
+            del self._ids_by_content[key]
+            self._keys[row_id] = None
+            self._free_ids.append(row_id)
+            if self._last_interned is not None and self._last_interned[1] == row_id:
+                self._last_interned = None
+
+    def gather(self, ids: Tensor) -> tuple[Tensor, ...]:
+        """Returns the interned tensors with the given ids, concatenated along dim 0."""
+        return tuple(
+            column.index_select(0, ids.to(column.device)) for column in self._columns
+        )
+
+
+def _content_key(values: tuple[Tensor, ...]) -> bytes:
+    return b"".join(value.detach().cpu().numpy().tobytes() for value in values)
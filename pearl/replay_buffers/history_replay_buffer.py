@@ -0,0 +1,269 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import torch
+from pearl.api.action import Action
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from pearl.replay_buffers.columnar_storage import ColumnarStorage
+from pearl.replay_buffers.transition import TransitionBatch
+from torch import Tensor
+
+# maximum number of episodes whose next transition is recognized as a continuation
+_MAX_OPEN_EPISODES = 1024
+
+
+class HistoryReplayBuffer(ColumnarReplayBuffer):
+    """
+    A `ColumnarReplayBuffer` for agents whose states are windows of the last
+    `history_length` steps of their history, such as the ones returned by
+    `get_history` of `LSTMHistorySummarizationModule`, or their flattened versions
+    returned by `StackingHistorySummarizationModule` (as with frame stacking in Atari
+    DQN, which stores each frame once). Consecutive windows of an episode
+    overlap in all but one step, so instead of storing the state and next state windows
+    of every transition (2 * history_length steps), each step is stored once with the
+    id of the previous step of its episode, and windows are rebuilt at sample time by
+    following these ids, with zeros before the first stored step of an episode (as in
+    the windows of history summarization modules after a reset).
+
+    A pushed transition continues an episode if its state is the next state of a
+    previously pushed transition which was neither terminated nor truncated, so that
+    transitions of different episodes (e.g. of vectorized environments) can be
+    interleaved. Otherwise, the transition starts a new episode, whose first stored
+    steps are the rows of its state after leading rows of zeros.
+
+    Steps are kept in a ring buffer of `steps_capacity` rows, which defaults to
+    `capacity + history_length`, the number of rows used by the windows of `capacity`
+    transitions of a single episode. Each new episode uses at least one more row, and
+    the windows of interleaved episodes reach further back in the ring, so transitions
+    whose windows use steps which have been overwritten are evicted: they are no longer
+    counted by `len` nor sampled, until their rows are overwritten. A larger
+    `steps_capacity` keeps more of them, e.g. with many short or interleaved episodes.
+
+    Args:
+        capacity: Size of the replay buffer.
+        history_length: the number of steps of state windows.
+        steps_capacity: the number of stored steps, at least `history_length + 1`.
+    """
+
+    def __init__(
+        self, capacity: int, history_length: int, steps_capacity: int | None = None
+    ) -> None:
+        super().__init__(capacity)
+        if history_length <= 0:
+            raise ValueError(f"history_length must be positive, got {history_length}")
+        if steps_capacity is None:
+            steps_capacity = capacity + history_length
+        if steps_capacity < history_length + 1:
+            raise ValueError(
+                f"steps_capacity must be at least history_length + 1 = "
+                f"{history_length + 1}, got {steps_capacity}"
+            )
+        self.history_length = history_length
+        self.steps: ColumnarStorage = ColumnarStorage(steps_capacity)
+        self._number_of_steps = 0
+        # whether windows are pushed flattened
+        self._flattened_windows: bool = False
+        # ids of the steps of the next state of the last transition of each episode
+        # which can be continued (-1 for rows before the first step of the episode),
+        # indexed by the bytes of that next state
+        self._open_episodes: dict[bytes, list[int]] = {}
+
+    def _transition_columns(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions_tensor_with_padding: Tensor | None,
+        curr_unavailable_actions_mask: Tensor | None,
+        next_state: SubjectiveState | None,
+        next_available_actions_tensor_with_padding: Tensor | None,
+        next_unavailable_actions_mask: Tensor | None,
+        cost: float | None = None,
+    ) -> dict[str, Tensor]:
+        if next_state is None:
+            raise ValueError(f"{type(self).__name__} requires next states")
+        columns = super()._transition_columns(
+            state,
+            action,
+            reward,
+            terminated,
+            truncated,
+            curr_available_actions_tensor_with_padding,
+            curr_unavailable_actions_mask,
+            next_state,
+            next_available_actions_tensor_with_padding,
+            next_unavailable_actions_mask,
+            cost,
+        )
+        first_step_id, step_id = self._store_steps(
+            columns.pop("state")[0],
+            columns.pop("next_state")[0],
+            terminated or truncated,
+        )
+        columns["first_step_id"] = torch.tensor([first_step_id])
+        columns["step_id"] = torch.tensor([step_id])
+        return columns
+
+    def _batch_columns(self, batch: TransitionBatch) -> dict[str, Tensor]:
+        if batch.next_state is None:
+            raise ValueError(f"{type(self).__name__} requires next states")
+        columns = super()._batch_columns(batch)
+        states = columns.pop("state")
+        next_states = columns.pop("next_state")
+        done = (batch.terminated | batch.truncated).tolist()
+        columns["first_step_id"], columns["step_id"] = torch.tensor(
+            [
+                self._store_steps(state, next_state, is_done)
+                for state, next_state, is_done in zip(states, next_states, done)
+            ]
+        ).unbind(dim=1)
+        return columns
+
+    def _store_steps(
+        self, state: Tensor, next_state: Tensor, done: bool
+    ) -> tuple[int, int]:
+        """
+        Stores the steps of a transition which are not stored yet, and returns the ids
+        of the first stored step of its state and of the last step of its next state.
+        """
+        if next_state.shape != state.shape:
+            raise ValueError(
+                f"Next states must have the shape of states {tuple(state.shape)}, got "
+                f"{tuple(next_state.shape)}"
+            )
+        self._flattened_windows = state.ndim == 1
+        if self._flattened_windows and state.shape[0] % self.history_length == 0:
+            state = state.view(self.history_length, -1)
+            next_state = next_state.view(self.history_length, -1)
+        if state.ndim != 2 or state.shape[0] != self.history_length:
+            raise ValueError(
+                f"States must be windows of shape (history_length, step_dim), or their "
+                f"flattened versions, with history_length={self.history_length}, got "
+                f"{tuple(state.shape)}"
+            )
+        state = state.float()
+        next_state = next_state.float()
+        state_key = _window_key(state)
+        state_step_ids = self._open_episodes.pop(state_key, None)
+        # the steps of the state of a continued episode are stored again if one of them
+        # would be overwritten by the step of the next state
+        first_kept_step_id = self._number_of_steps + 1 - self.steps.capacity
+        if state_step_ids is None or any(
+            0 <= step_id < first_kept_step_id for step_id in state_step_ids
+        ):
+            # new episode: its leading rows of zeros are not stored, except the last
+            # row, which is the last step of the state
+            nonzero_rows = torch.nonzero(state.abs().sum(dim=1)).flatten()
+            first_step = (
+                int(nonzero_rows[0]) if len(nonzero_rows) > 0 else len(state) - 1
+            )
+            state_step_ids = [-1] * first_step
+            previous_step_id = -1
+            for step in state[first_step:]:
+                previous_step_id = self._append_step(step, previous_step_id)
+                state_step_ids.append(previous_step_id)
+        step_id = self._append_step(next_state[-1], state_step_ids[-1])
+        next_state_step_ids = state_step_ids[1:] + [step_id]
+        if not done:
+            self._open_episodes[_window_key(next_state)] = next_state_step_ids
+            if len(self._open_episodes) > _MAX_OPEN_EPISODES:
+                # forget the least recently continued episode
+                del self._open_episodes[next(iter(self._open_episodes))]
+        first_step_id = next(
+            window_step_id for window_step_id in state_step_ids if window_step_id >= 0
+        )
+        return first_step_id, step_id
+
+    def _append_step(self, step: Tensor, previous_step_id: int) -> int:
+        step_id = self._number_of_steps
+        self.steps.append(
+            {
+                "step": step.unsqueeze(0),
+                "step_id": torch.tensor([step_id]),
+                "previous_step_id": torch.tensor([previous_step_id]),
+            }
+        )
+        self._number_of_steps += 1
+        return step_id
+
+    def _stored_transitions(self) -> Tensor:
+        """
+        Whether the steps of the windows of each row of `storage` are still stored,
+        for the first `len(storage)` rows.
+        """
+        first_step_ids = self.storage.column("first_step_id")[: len(self.storage)]
+        return first_step_ids >= self._number_of_steps - self.steps.capacity
+
+    def _sample_indices(self, batch_size: int) -> Tensor:
+        stored_transitions = self._stored_transitions()
+        if bool(stored_transitions.all()):
+            return super()._sample_indices(batch_size)
+        indices = torch.nonzero(stored_transitions).flatten()
+        return indices[
+            torch.randint(
+                len(indices), (batch_size,), generator=self._sampling_generator
+            ).to(indices.device)
+        ]
+
+    def _windows(self, step_ids: Tensor) -> tuple[Tensor, Tensor]:
+        """
+        Rebuilds the state and next state windows of the transitions whose next states
+        end with the given steps.
+        """
+        device = self.steps.device
+        step_ids = step_ids.to(device)
+        stored_steps = self.steps.column("step")
+        stored_step_ids = self.steps.column("step_id")
+        previous_step_ids = self.steps.column("previous_step_id")
+        # the last `history_length + 1` steps of each transition, from the most recent
+        steps = []
+        for _ in range(self.history_length + 1):
+            rows = step_ids.clamp(min=0) % self.steps.capacity
+            # invalid ids are the ones before the first step of an episode
+            valid = step_ids >= 0
+            valid &= stored_step_ids.index_select(0, rows) == step_ids
+            steps.append(
+                stored_steps.index_select(0, rows) * valid.unsqueeze(1).float()
+            )
+            step_ids = torch.where(
+                valid,
+                previous_step_ids.index_select(0, rows),
+                torch.full_like(step_ids, -1),
+            )
+        windows = torch.stack(steps[::-1], dim=1)
+        states, next_states = windows[:, :-1], windows[:, 1:]
+        if self._flattened_windows:
+            return states.flatten(start_dim=1), next_states.flatten(start_dim=1)
+        return states, next_states
+
+    def _create_transition_batch_from_columns(
+        self, columns: dict[str, Tensor]
+    ) -> TransitionBatch:
+        del columns["first_step_id"]
+        columns["state"], columns["next_state"] = self._windows(columns.pop("step_id"))
+        return super()._create_transition_batch_from_columns(columns)
+
+    def __len__(self) -> int:
+        if len(self.storage) == 0:
+            return 0
+        return int(self._stored_transitions().sum())
+
+    def clear(self) -> None:
+        super().clear()
+        self.steps.clear()
+        self._number_of_steps = 0
+        self._open_episodes = {}
+
+
+def _window_key(window: Tensor) -> bytes:
+    return window.detach().cpu().numpy().tobytes()
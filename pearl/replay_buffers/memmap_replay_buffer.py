@@ -0,0 +1,176 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import json
+import math
+import os
+
+import torch
+from pearl.replay_buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from pearl.replay_buffers.columnar_storage import ColumnarStorage, InternedTensorTable
+from torch import Tensor
+
+
+def _dtype_from_string(dtype_name: str) -> torch.dtype:
+    """Inverse of `str(dtype)`, e.g. "torch.float32" -> torch.float32."""
+    dtype = getattr(torch, dtype_name.split(".")[-1], None)
+    if not isinstance(dtype, torch.dtype):
+        raise ValueError(f"Unknown dtype {dtype_name}")
+    return dtype
+
+
+class MemmapColumnarStorage(ColumnarStorage):
+    """
+    A `ColumnarStorage` whose columns are memory-mapped files in `directory` (one raw
+    binary file per column, mapped with `torch.from_file`), so that the storage can be
+    much larger than the available RAM. Only the pages touched by reads and writes are
+    loaded in memory, and they are managed by the operating system's page cache.
+
+    Column layouts, the number of rows and the cursor are written to a metadata file by
+    `flush`, after which the storage can be reopened with `MemmapColumnarStorage.load`.
+
+    Args:
+        capacity: maximum number of rows kept in the storage.
+        directory: directory holding the column files. It is created if needed.
+        pin_memory: whether rows read by `gather` are copied into pinned memory, which
+            allows asynchronous copies to a GPU. Ignored if CUDA is not available.
+    """
+
+    METADATA_FILE_NAME = "metadata.json"
+
+    def __init__(
+        self, capacity: int, directory: str, pin_memory: bool = False
+    ) -> None:
+        super().__init__(capacity, device=torch.device("cpu"))
+        self.directory = directory
+        self.pin_memory: bool = pin_memory and torch.cuda.is_available()
+        os.makedirs(directory, exist_ok=True)
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _allocate_column(
+        self, name: str, row_shape: torch.Size, dtype: torch.dtype
+    ) -> Tensor:
+        shape = (self.capacity, *row_shape)
+        # `shared=True` creates the file if needed and writes changes back to it
+        return torch.from_file(
+            self._column_path(name), shared=True, size=math.prod(shape), dtype=dtype
+        ).view(shape)
+
+    def _promote_column(self, name: str, dtype: torch.dtype) -> Tensor:
+        raise ValueError(
+            f"Cannot write rows of dtype {dtype} into on-disk column {name} of dtype "
+            f"{self.column(name).dtype}; convert them before writing"
+        )
+
+    def gather(self, indices: Tensor) -> dict[str, Tensor]:
+        """
+        Returns the rows at the given indices, one tensor per column, read directly
+        from the mapped files (into pinned memory if `pin_memory` is set).
+        """
+        indices = indices.cpu()
+        rows = {}
+        for name, column in self._columns.items():
+            out = torch.empty(
+                (len(indices), *column.shape[1:]),
+                dtype=column.dtype,
+                pin_memory=self.pin_memory,
+            )
+            rows[name] = torch.index_select(column, 0, indices, out=out)
+        return rows
+
+    def flush(self) -> None:
+        """Writes the metadata needed to reopen the storage with `load`."""
+        metadata = {
+            "capacity": self.capacity,
+            "size": len(self),
+            "cursor": self.cursor,
+            "columns": {
+                name: {"dtype": str(column.dtype), "shape": list(column.shape[1:])}
+                for name, column in self._columns.items()
+            },
+        }
+        with open(os.path.join(self.directory, self.METADATA_FILE_NAME), "w") as f:
+            json.dump(metadata, f)
+
+    @classmethod
+    def load(cls, directory: str, pin_memory: bool = False) -> "MemmapColumnarStorage":
+        """Reopens a storage previously written to `directory` and flushed."""
+        with open(os.path.join(directory, cls.METADATA_FILE_NAME)) as f:
+            metadata = json.load(f)
+        storage = cls(metadata["capacity"], directory, pin_memory=pin_memory)
+        for name, layout in metadata["columns"].items():
+            storage._columns[name] = storage._allocate_column(
+                name, torch.Size(layout["shape"]), _dtype_from_string(layout["dtype"])
+            )
+        storage._size = metadata["size"]
+        storage._cursor = metadata["cursor"]
+        return storage
+
+
+class MemmapReplayBuffer(ColumnarReplayBuffer):
+    """
+    A `ColumnarReplayBuffer` backed by a `MemmapColumnarStorage`, for datasets which
+    do not fit in memory (typically offline datasets, see
+    `convert_offline_data_to_memmap_buffer`).
+
+    Sampled indices are sorted before being gathered so that rows are read from disk
+    in increasing offset order.
+
+    Call `flush` once writing is done; the buffer can then be reopened from its directory
+    with `MemmapReplayBuffer.load`.
+
+    Args:
+        capacity: Size of the replay buffer.
+        directory: Directory holding the on-disk columns.
+        pin_memory: Whether sampled batches are gathered into pinned memory.
+    """
+
+    AVAILABLE_ACTIONS_FILE_NAME = "available_actions.pt"
+
+    def __init__(self, capacity: int, directory: str, pin_memory: bool = False) -> None:
+        super().__init__(capacity)
+        self.storage: MemmapColumnarStorage = MemmapColumnarStorage(
+            capacity, directory, pin_memory=pin_memory
+        )
+
+    @property
+    def directory(self) -> str:
+        return self.storage.directory
+
+    def _sample_indices(self, batch_size: int) -> Tensor:
+        return super()._sample_indices(batch_size).sort().values
+
+    def flush(self) -> None:
+        """Writes everything needed to reopen the buffer with `load`."""
+        self.storage.flush()
+        torch.save(
+            {
+                "is_action_continuous": self._is_action_continuous,
+                "available_actions": self._available_actions_table.rows,
+            },
+            os.path.join(self.directory, self.AVAILABLE_ACTIONS_FILE_NAME),
+        )
+
+    @classmethod
+    def load(cls, directory: str, pin_memory: bool = False) -> "MemmapReplayBuffer":
+        """Reopens a replay buffer previously written to `directory` and flushed."""
+        storage = MemmapColumnarStorage.load(directory, pin_memory=pin_memory)
+        replay_buffer = cls(storage.capacity, directory, pin_memory=pin_memory)
+        replay_buffer.storage = storage
+        state = torch.load(
+            os.path.join(directory, cls.AVAILABLE_ACTIONS_FILE_NAME), weights_only=True
+        )
+        replay_buffer._is_action_continuous = state["is_action_continuous"]
+        replay_buffer._available_actions_table = InternedTensorTable.from_rows(
+            state["available_actions"]
+        )
+        replay_buffer._acquire_stored_action_spaces()
+        return replay_buffer
@@ -0,0 +1,313 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import dataclasses
+import threading
+from collections import deque
+from typing import Deque
+
+import torch
+from pearl.api.action import Action
+from pearl.api.action_space import ActionSpace
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.prioritized_replay_buffer import PrioritizedReplayBuffer
+from pearl.replay_buffers.replay_buffer import ReplayBuffer
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.device import get_default_device
+from torch import Tensor
+
+
+class PrefetchingReplayBuffer(ReplayBuffer):
+    """
+    Wraps a replay buffer so that batches are sampled ahead of time by a background
+    thread, overlapping sampling (and, for CUDA devices, the copy of batches to the
+    device) with training on the previous batches. It can wrap any replay buffer
+    supporting `seed_sampling`, and be passed wherever a replay buffer is expected
+    (e.g. to `PearlAgent` or `offline_learning`).
+
+    Up to `number_of_prefetched_batches` batches of the last requested batch size are
+    kept ready. For CUDA devices, batches are copied from pinned memory with
+    non-blocking copies on a separate CUDA stream.
+
+    The wrapped buffer samples from its own random number generators (see
+    `ReplayBuffer.seed_sampling`), seeded from the global random state unless `seed` is
+    given. Operations which modify the wrapped buffer (`push`, `push_batch` and
+    `update_priorities`) only wait for the batch being sampled, if any, while the
+    background thread keeps sampling afterwards. Which transitions a batch is sampled
+    from then depends on thread timing, and batches returned after such an operation
+    may have been sampled before it. With `deterministic=True`, these operations instead
+    first wait for all prefetched batches to be ready, which makes sampling reproducible
+    at the cost of blocking until the background thread is done.
+
+    Args:
+        replay_buffer: the replay buffer to sample batches from.
+        number_of_prefetched_batches: number of batches sampled ahead of time.
+        seed: seed for the sampling random number generators of the wrapped buffer.
+        deterministic: whether sampled batches should not depend on thread timing.
+    """
+
+    def __init__(
+        self,
+        replay_buffer: ReplayBuffer,
+        number_of_prefetched_batches: int = 2,
+        seed: int | None = None,
+        deterministic: bool = False,
+    ) -> None:
+        if number_of_prefetched_batches <= 0:
+            raise ValueError(
+                "number_of_prefetched_batches must be positive, got "
+                f"{number_of_prefetched_batches}"
+            )
+        is_action_continuous = replay_buffer.is_action_continuous
+        # set before calling the base constructor, which sets `_is_action_continuous`
+        self._replay_buffer = replay_buffer
+        super().__init__()
+        self._is_action_continuous = is_action_continuous
+        self.number_of_prefetched_batches = number_of_prefetched_batches
+        self.deterministic = deterministic
+
+        if seed is None:
+            seed = int(torch.randint(2**62, ()).item())
+        replay_buffer.seed_sampling(seed)
+        # batches are moved to the target device by the background thread
+        self._device_for_batches: torch.device = get_default_device()
+        replay_buffer.device_for_batches = torch.device("cpu")
+
+        self._condition = threading.Condition()
+        # held while the wrapped buffer is sampled or modified
+        self._replay_buffer_lock = threading.Lock()
+        self._batches: Deque[tuple[object, torch.cuda.Event | None]] = deque()
+        self._batch_size: int | None = None
+        self._worker: threading.Thread | None = None
+        self._stop = False
+        self._error: BaseException | None = None
+        self._cuda_stream: torch.cuda.Stream | None = None
+
+    @property
+    def replay_buffer(self) -> ReplayBuffer:
+        """The wrapped replay buffer."""
+        return self._replay_buffer
+
+    @property
+    def _is_action_continuous(self) -> bool:
+        return self._replay_buffer._is_action_continuous
+
+    @_is_action_continuous.setter
+    def _is_action_continuous(self, value: bool) -> None:
+        self._replay_buffer._is_action_continuous = value
+
+    @property
+    def device_for_batches(self) -> torch.device:
+        return self._device_for_batches
+
+    @device_for_batches.setter
+    def device_for_batches(self, new_device_for_batches: torch.device) -> None:
+        self._stop_worker()
+        self._device_for_batches = new_device_for_batches
+
+    def _copy_to_device(self, batch: TransitionBatch) -> torch.cuda.Event:
+        """
+        Copies the fields of `batch` to the (CUDA) target device, from pinned memory
+        and on a separate stream. Returns an event marking the completion of the copies.
+        """
+        device = self._device_for_batches
+        if self._cuda_stream is None:
+            self._cuda_stream = torch.cuda.Stream(device)
+        with torch.cuda.stream(self._cuda_stream):
+            for field in dataclasses.fields(batch):
+                value = getattr(batch, field.name)
+                if isinstance(value, Tensor):
+                    value = value.pin_memory().to(device, non_blocking=True)
+                    setattr(batch, field.name, value)
+            event = torch.cuda.Event()
+            event.record(self._cuda_stream)
+        return event
+
+    def _prefetch(self, batch_size: int) -> None:
+        """Body of the background thread."""
+        try:
+            while True:
+                with self._condition:
+                    while (
+                        not self._stop
+                        and len(self._batches) >= self.number_of_prefetched_batches
+                    ):
+                        self._condition.wait()
+                    if self._stop:
+                        return
+                with self._replay_buffer_lock:
+                    batch = self._replay_buffer.sample(batch_size)
+                event = None
+                if isinstance(batch, TransitionBatch):
+                    if self._device_for_batches.type == "cuda":
+                        event = self._copy_to_device(batch)
+                    else:
+                        batch = batch.to(self._device_for_batches)
+                with self._condition:
+                    self._batches.append((batch, event))
+                    self._condition.notify_all()
+        except BaseException as e:
+            with self._condition:
+                self._error = e
+                self._condition.notify_all()
+
+    def _wait_until_prefetched(self) -> None:
+        """
+        Waits until the background thread has sampled all batches it can, after which it
+        does not access the wrapped buffer until a batch is consumed.
+        """
+        with self._condition:
+            while (
+                self._worker is not None
+                and self._error is None
+                and len(self._batches) < self.number_of_prefetched_batches
+            ):
+                self._condition.wait()
+
+    def _before_modifying_replay_buffer(self) -> None:
+        """
+        In deterministic mode, waits until the background thread is done sampling, so
+        that the wrapped buffer is modified at the same point of the sampling sequence
+        whatever the thread timing.
+        """
+        if self.deterministic:
+            self._wait_until_prefetched()
+
+    def _stop_worker(self) -> None:
+        """Stops the background thread and discards prefetched batches."""
+        worker = self._worker
+        if worker is None:
+            return
+        self._before_modifying_replay_buffer()
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+        worker.join()
+        self._worker = None
+        self._stop = False
+        self._error = None
+        self._batch_size = None
+        self._batches.clear()
+
+    def _start_worker(self, batch_size: int) -> None:
+        self._batch_size = batch_size
+        self._worker = threading.Thread(
+            target=self._prefetch, args=(batch_size,), daemon=True
+        )
+        self._worker.start()
+
+    def sample(self, batch_size: int) -> object:
+        """
+        Returns the next prefetched batch of size `batch_size`. If the previous batches
+        had a different size, prefetched batches are discarded and prefetching restarts.
+        Errors raised while sampling in the background are raised here.
+        """
+        if batch_size != self._batch_size:
+            self._stop_worker()
+            self._start_worker(batch_size)
+        with self._condition:
+            while len(self._batches) == 0 and self._error is None:
+                self._condition.wait()
+            if len(self._batches) == 0:
+                error = self._error
+                assert error is not None
+                self._stop_worker()
+                raise error
+            batch, event = self._batches.popleft()
+            self._condition.notify_all()
+
+        if event is not None:
+            assert isinstance(batch, TransitionBatch)
+            stream = torch.cuda.current_stream(self._device_for_batches)
+            stream.wait_event(event)
+            for field in dataclasses.fields(batch):
+                value = getattr(batch, field.name)
+                if isinstance(value, Tensor):
+                    # the memory was allocated on the prefetching stream
+                    value.record_stream(stream)
+        return batch
+
+    def push(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions: ActionSpace | None = None,
+        next_state: SubjectiveState | None = None,
+        next_available_actions: ActionSpace | None = None,
+        max_number_actions: int | None = None,
+        cost: float | None = None,
+    ) -> None:
+        self._before_modifying_replay_buffer()
+        with self._replay_buffer_lock:
+            self._replay_buffer.push(
+                state=state,
+                action=action,
+                reward=reward,
+                terminated=terminated,
+                truncated=truncated,
+                curr_available_actions=curr_available_actions,
+                next_state=next_state,
+                next_available_actions=next_available_actions,
+                max_number_actions=max_number_actions,
+                cost=cost,
+            )
+
+    def push_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions: ActionSpace | None = None,
+        next_available_actions: ActionSpace | None = None,
+        max_number_actions: int | None = None,
+    ) -> None:
+        """See `TensorBasedReplayBuffer.push_batch`."""
+        replay_buffer = self._replay_buffer
+        if not isinstance(replay_buffer, TensorBasedReplayBuffer):
+            raise TypeError(
+                f"{type(replay_buffer).__name__} does not support push_batch"
+            )
+        self._before_modifying_replay_buffer()
+        with self._replay_buffer_lock:
+            replay_buffer.push_batch(
+                batch,
+                curr_available_actions=curr_available_actions,
+                next_available_actions=next_available_actions,
+                max_number_actions=max_number_actions,
+            )
+
+    def update_priorities(self, indices: Tensor, td_errors: Tensor) -> None:
+        """
+        Forwards to the wrapped buffer if it is a `PrioritizedReplayBuffer`, and does
+        nothing otherwise (without waiting for prefetched batches in deterministic mode).
+        """
+        replay_buffer = self._replay_buffer
+        if isinstance(replay_buffer, PrioritizedReplayBuffer):
+            self._before_modifying_replay_buffer()
+            with self._replay_buffer_lock:
+                replay_buffer.update_priorities(indices, td_errors)
+
+    def seed_sampling(self, seed: int) -> None:
+        self._stop_worker()
+        self._replay_buffer.seed_sampling(seed)
+
+    def clear(self) -> None:
+        self._stop_worker()
+        self._replay_buffer.clear()
+
+    def close(self) -> None:
+        """Stops the background thread."""
+        self._stop_worker()
+
+    def __len__(self) -> int:
+        with self._replay_buffer_lock:
+            return len(self._replay_buffer)
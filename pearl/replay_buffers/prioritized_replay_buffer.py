@@ -0,0 +1,177 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import torch
+from pearl.api.action import Action
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from pearl.replay_buffers.sum_tree import SumTree
+from pearl.replay_buffers.transition import TransitionBatch
+from torch import Tensor
+
+
+class PrioritizedReplayBuffer(ColumnarReplayBuffer):
+    r"""
+    Prioritized experience replay, proposed by [1]. Transition `i` is sampled with
+    probability `P(i) = p_i^alpha / sum_k p_k^alpha`, where its priority `p_i` is the
+    absolute value of its last TD error (plus `epsilon`). New transitions get the
+    largest priority seen so far, so that each of them is sampled at least once.
+
+    The bias introduced by non-uniform sampling is corrected with importance-sampling
+    weights `w_i = (N * P(i))^-beta / max_k w_k`, which are returned in the `weight`
+    field of sampled batches. `beta` is linearly annealed from its initial value to 1
+    over `beta_annealing_steps` calls to `sample`.
+
+    Priorities are kept in a `SumTree` over the storage slots, so sampling a batch and
+    updating its priorities both take O(log capacity) vectorized steps. Learners update
+    priorities through `update_priorities`, using the `buffer_index` field of the
+    sampled batch; `PolicyLearner.learn` does this automatically with the TD errors
+    reported by `learn_batch`.
+
+    [1] Tom Schaul, John Quan, Ioannis Antonoglou and David Silver, Prioritized
+        Experience Replay. ICLR 2016. https://arxiv.org/abs/1511.05952.
+
+    Args:
+        capacity: Size of the replay buffer.
+        alpha: How much prioritization is used (0 corresponds to uniform sampling).
+        beta: Initial exponent of the importance-sampling weights (1 fully corrects
+            the sampling bias).
+        beta_annealing_steps: Number of calls to `sample` over which `beta` is
+            annealed to 1. If 0, `beta` stays constant.
+        epsilon: Small constant added to priorities so that no transition has a zero
+            probability of being sampled.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        alpha: float = 0.6,
+        beta: float = 0.4,
+        beta_annealing_steps: int = 0,
+        epsilon: float = 1e-6,
+    ) -> None:
+        super().__init__(capacity)
+        if alpha < 0:
+            raise ValueError(f"alpha must be non-negative, got {alpha}")
+        if not 0 <= beta <= 1:
+            raise ValueError(f"beta must be in [0, 1], got {beta}")
+        self._alpha = alpha
+        self._initial_beta = beta
+        self._beta_annealing_steps = beta_annealing_steps
+        self._epsilon = epsilon
+        self._number_of_samples = 0
+        self._max_priority = 1.0
+        self._sum_tree = SumTree(capacity)
+
+    @property
+    def beta(self) -> float:
+        if self._beta_annealing_steps <= 0:
+            return self._initial_beta
+        progress = min(self._number_of_samples / self._beta_annealing_steps, 1.0)
+        return self._initial_beta + progress * (1.0 - self._initial_beta)
+
+    def _set_priorities_of_last_written(self, number_of_rows: int) -> None:
+        """Gives the maximum priority to the `number_of_rows` most recently written rows."""
+        number_of_rows = min(number_of_rows, self.capacity)
+        indices = (
+            torch.arange(self.storage.cursor - number_of_rows, self.storage.cursor)
+            % self.capacity
+        )
+        self._sum_tree.update(
+            indices, torch.full((number_of_rows,), self._max_priority**self._alpha)
+        )
+
+    def _store_transition(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions_tensor_with_padding: Tensor | None,
+        curr_unavailable_actions_mask: Tensor | None,
+        next_state: SubjectiveState | None,
+        next_available_actions_tensor_with_padding: Tensor | None,
+        next_unavailable_actions_mask: Tensor | None,
+        cost: float | None = None,
+    ) -> None:
+        super()._store_transition(
+            state,
+            action,
+            reward,
+            terminated,
+            truncated,
+            curr_available_actions_tensor_with_padding,
+            curr_unavailable_actions_mask,
+            next_state,
+            next_available_actions_tensor_with_padding,
+            next_unavailable_actions_mask,
+            cost,
+        )
+        self._set_priorities_of_last_written(1)
+
+    def _store_batch(self, batch: TransitionBatch) -> None:
+        super()._store_batch(batch)
+        self._set_priorities_of_last_written(len(batch))
+
+    def _sample_indices(self, batch_size: int) -> Tensor:
+        """
+        Draws indices proportionally to their priorities with stratified sampling:
+        [0, total priority) is split into `batch_size` equal segments and one prefix sum
+        is drawn uniformly from each.
+        """
+        segment = self._sum_tree.total / batch_size
+        prefix_sums = (
+            torch.arange(batch_size, dtype=torch.float64)
+            + torch.rand(
+                batch_size, dtype=torch.float64, generator=self._sampling_generator
+            )
+        ) * segment
+        indices = self._sum_tree.find_prefix_sum_indices(prefix_sums)
+        # rounding errors can lead past the last stored transition into empty slots
+        indices = indices.clamp(max=len(self) - 1)
+        return indices.to(self.storage.device)
+
+    def sample(self, batch_size: int) -> TransitionBatch:
+        """
+        Samples `batch_size` transitions with probabilities given by their priorities.
+        Importance-sampling weights are returned in the `weight` field of the batch.
+        """
+        batch = super().sample(batch_size)
+        if batch_size == 0:
+            return batch
+        indices = batch.buffer_index
+        assert indices is not None
+        priorities = self._sum_tree[indices]
+        # (N * P(i))^-beta / max_k (N * P(k))^-beta = (p_i / min_k p_k)^-beta
+        weights = (priorities / self._sum_tree.min) ** (-self.beta)
+        batch.weight = weights.to(batch.device, torch.float32)
+        self._number_of_samples += 1
+        return batch
+
+    def update_priorities(self, indices: Tensor, td_errors: Tensor) -> None:
+        """
+        Sets the priorities of the transitions at the given storage indices (e.g. the
+        `buffer_index` field of a sampled batch) from their new TD errors.
+        Entries whose TD error is NaN keep their current priority.
+        """
+        td_errors = td_errors.detach().cpu().to(torch.float64).reshape(-1)
+        indices = indices.detach().cpu().reshape(-1)
+        is_valid = ~torch.isnan(td_errors)
+        priorities = td_errors[is_valid].abs() + self._epsilon
+        if priorities.numel() == 0:
+            return
+        self._max_priority = max(self._max_priority, priorities.max().item())
+        self._sum_tree.update(indices[is_valid], priorities**self._alpha)
+
+    def clear(self) -> None:
+        super().clear()
+        self._sum_tree.clear()
+        self._max_priority = 1.0
@@ -69,6 +69,25 @@ class ReplayBuffer(ABC):
     def sample(self, batch_size: int) -> object:
         pass
 
+    def seed_sampling(self, seed: int) -> None:
+        """
+        Makes `sample` draw from dedicated random number generators seeded with `seed`,
+        instead of the global ones. Sampling then neither depends on nor affects other
+        uses of the global random state, which keeps it reproducible when it runs
+        concurrently with them (e.g. in a background thread).
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support dedicated sampling seeds"
+        )
+
+    def update_priorities(self, indices: torch.Tensor, td_errors: torch.Tensor) -> None:
+        """
+        Feeds back the TD errors of sampled transitions, given their storage indices
+        (the `buffer_index` field of a sampled batch). Does nothing by default;
+        prioritized replay buffers override it to update their sampling priorities.
+        """
+        pass
+
     @abstractmethod
     def clear(self) -> None:
         """Empties replay buffer"""
@@ -7,14 +7,13 @@
 
 # pyre-strict
 
-import random
-
 import torch
 from pearl.api.action import Action
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
 from pearl.replay_buffers import BasicReplayBuffer  # noqa E501
 from pearl.replay_buffers.transition import (
+    TransitionBatch,
     TransitionWithBootstrapMask,
     TransitionWithBootstrapMaskBatch,
 )
@@ -84,13 +83,25 @@ class BootstrapReplayBuffer(BasicReplayBuffer):
             )
         )
 
+    def _store_batch(self, batch: TransitionBatch) -> None:
+        # sample the bootstrap masks of all transitions in the batch at once
+        probs = torch.full((len(batch), self.ensemble_size), self.p)
+        bootstrap_mask = torch.bernoulli(probs)
+        self.memory.extend(
+            self._split_batch_into_transitions(
+                batch,
+                transition_type=TransitionWithBootstrapMask,
+                bootstrap_mask=bootstrap_mask,
+            )
+        )
+
     def sample(self, batch_size: int) -> TransitionWithBootstrapMaskBatch:
         if batch_size > len(self):
             raise ValueError(
                 f"Can't get a batch of size {batch_size} from a "
                 f"replay buffer with only {len(self)} elements"
             )
-        samples = random.sample(self.memory, batch_size)
+        samples = self._sample_from_memory(batch_size)
         transition_batch = self._create_transition_batch(
             # pyre-fixme[6]: For 1st argument expected `List[Transition]` but got
             #  `List[Union[Transition, TransitionBatch]]`.
@@ -9,148 +9,241 @@
 
 from collections.abc import Callable
 
+import torch
 from pearl.api.action import Action
-from pearl.api.action_space import ActionSpace
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.columnar_replay_buffer import ColumnarReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from torch import Tensor
 
-from pearl.replay_buffers import BasicReplayBuffer
-from pearl.utils.tensor_like import assert_is_tensor_like
+# strategies choosing the step whose next state is the relabeled goal of a transition:
+# the last step of its episode, a step of its episode from itself onwards, or any step
+# of its episode
+HER_STRATEGIES: tuple[str, ...] = ("final", "future", "episode")
 
 
-class HindsightExperienceReplayBuffer(BasicReplayBuffer):
+class HindsightExperienceReplayBuffer(ColumnarReplayBuffer):
     """
     paper: https://arxiv.org/pdf/1707.01495.pdf
-    final mode for alternative only for now
 
     TLDR:
     HindsightExperienceReplayBuffer is used for sparse reward problems.
-    After an episode ends, apart from pushing original data in,
-    it will replace original goal with final state in the episode,
-    and replay the transitions again for new rewards and push
+    Apart from replaying transitions with their original goals, it replays transitions
+    whose goal is replaced by a state reached later in their episode, with rewards
+    recomputed for that goal.
+
+    Each transition is stored once, along with the ids of the first and last
+    transitions of its episode. Goals are relabeled lazily when sampling: each sampled
+    transition of a finished episode is relabeled with probability k / (k + 1), where k
+    is `relabels_per_transition`, so that k relabeled transitions are replayed for each
+    original one on average, at no storage cost. Goals of transitions whose episode is
+    not finished yet are not relabeled.
 
     capacity: size of the replay buffer
     goal_dim: dimension of goal of the problem.
-              Subjective state input to `push` method will be the final state representation
-              so we could need this info in order to split alternative goal after episode
-              terminates.
+              Subjective states pushed are the concatenation of observations and
+              goals, with goals in their last `goal_dim` dimensions. The goal reached by
+              a transition is its next state without its goal.
     reward_fn: is the F here: F(state+goal, action) = reward
     terminated_fn: This is different from paper. Original paper doesn't have it.
              We need it for games which may end earlier.
              If this is not defined, then use terminated value from original trajectory.
+    batch_reward_fn: batched version of `reward_fn`, taking a batch of states and a
+             batch of actions and returning a tensor of rewards, used instead of
+             calling `reward_fn` on each relabeled transition.
+    batch_terminated_fn: batched version of `terminated_fn`.
+    strategy: one of "final", "future" or "episode" (see `HER_STRATEGIES`).
+    relabels_per_transition: the average number of relabeled transitions sampled for
+             each original transition.
     """
 
-    # TODO: improve unclear docstring
-
     def __init__(
         self,
         capacity: int,
         goal_dim: int,
-        reward_fn: Callable[[SubjectiveState, Action], Reward],
+        reward_fn: Callable[[SubjectiveState, Action], Reward] | None = None,
         terminated_fn: Callable[[SubjectiveState, Action], bool] | None = None,
+        batch_reward_fn: Callable[[Tensor, Tensor], Tensor] | None = None,
+        batch_terminated_fn: Callable[[Tensor, Tensor], Tensor] | None = None,
+        strategy: str = "final",
+        relabels_per_transition: int = 1,
     ) -> None:
         super().__init__(capacity=capacity)
+        if reward_fn is None and batch_reward_fn is None:
+            raise ValueError(
+                f"{type(self).__name__} requires reward_fn or batch_reward_fn"
+            )
+        if strategy not in HER_STRATEGIES:
+            raise ValueError(
+                f"strategy must be one of {HER_STRATEGIES}, got {strategy}"
+            )
+        if relabels_per_transition < 0:
+            raise ValueError(
+                "relabels_per_transition must be non-negative, got "
+                f"{relabels_per_transition}"
+            )
         self._goal_dim = goal_dim
         self._reward_fn = reward_fn
         self._terminated_fn = terminated_fn
-        self._trajectory: list[
-            tuple[
-                SubjectiveState,
-                Action,
-                SubjectiveState,
-                ActionSpace,
-                ActionSpace,
-                bool,
-                bool,
-                int | None,
-                float | None,
-            ]
-        ] = []
-
-    def push(
+        self._batch_reward_fn = batch_reward_fn
+        self._batch_terminated_fn = batch_terminated_fn
+        self._strategy = strategy
+        self._relabel_probability: float = relabels_per_transition / (
+            relabels_per_transition + 1
+        )
+        # number of transitions pushed so far, which is the id of the next transition
+        self._number_of_transitions = 0
+        # id of the first transition of the current episode
+        self._episode_start = 0
+
+    def _transition_columns(
         self,
         state: SubjectiveState,
         action: Action,
         reward: Reward,
         terminated: bool,
         truncated: bool,
-        curr_available_actions: ActionSpace | None = None,
-        next_state: SubjectiveState | None = None,
-        next_available_actions: ActionSpace | None = None,
-        max_number_actions: int | None = None,
+        curr_available_actions_tensor_with_padding: Tensor | None,
+        curr_unavailable_actions_mask: Tensor | None,
+        next_state: SubjectiveState | None,
+        next_available_actions_tensor_with_padding: Tensor | None,
+        next_unavailable_actions_mask: Tensor | None,
         cost: float | None = None,
-    ) -> None:
-        next_state = assert_is_tensor_like(next_state)
-        # assuming state and goal are all list, so we could use + to cat
-        super().push(
-            # input here already have state and goal cat together
+    ) -> dict[str, Tensor]:
+        if next_state is None:
+            raise ValueError(f"{type(self).__name__} requires next states")
+        columns = super()._transition_columns(
             state,
             action,
             reward,
             terminated,
             truncated,
-            curr_available_actions,
+            curr_available_actions_tensor_with_padding,
+            curr_unavailable_actions_mask,
             next_state,
-            next_available_actions,
-            max_number_actions,
+            next_available_actions_tensor_with_padding,
+            next_unavailable_actions_mask,
             cost,
         )
+        columns.update(self._episode_columns(torch.tensor([terminated or truncated])))
+        return columns
 
-        if curr_available_actions is None:
-            raise ValueError(
-                f"{type(self)} requires curr_available_actions not to be None"
-            )
+    def _batch_columns(self, batch: TransitionBatch) -> dict[str, Tensor]:
+        if batch.next_state is None:
+            raise ValueError(f"{type(self).__name__} requires next states")
+        columns = super()._batch_columns(batch)
+        done = (batch.terminated.bool() | batch.truncated.bool()).cpu()
+        if len(done) > self.capacity:
+            # only the most recent transitions would be kept, so the others are not
+            # counted as stored
+            columns = {name: value[-self.capacity :] for name, value in columns.items()}
+            done = done[-self.capacity :]
+        columns.update(self._episode_columns(done))
+        return columns
 
-        if next_available_actions is None:
-            raise ValueError(
-                f"{type(self)} requires next_available_actions not to be None"
-            )
+    def _episode_columns(self, done: Tensor) -> dict[str, Tensor]:
+        """
+        Returns the ids of the first and last transitions of the episodes of transitions
+        about to be stored, given whether each of them ends its episode. Last ids are -1
+        for transitions of an unfinished episode, and are filled in for the stored
+        transitions of the current episode if it ends.
+        """
+        first_id = self._number_of_transitions
+        ids = torch.arange(first_id, first_id + len(done))
+        # each transition starts an episode after a done transition
+        episode_starts = torch.where(
+            done, ids + 1, torch.full_like(ids, self._episode_start)
+        )
+        episode_starts = torch.cat(
+            [torch.tensor([self._episode_start]), episode_starts[:-1]]
+        ).cummax(dim=0)[0]
+        # the first done transition from each transition onwards ends its episode
+        unfinished = torch.full_like(ids, first_id + len(done))
+        episode_ends = (
+            torch.where(done, ids, unfinished).flip(0).cummin(dim=0)[0].flip(0)
+        )
+        episode_ends[episode_ends == unfinished] = -1
+
+        done_ids = ids[done]
+        if len(done_ids) > 0:
+            # the stored transitions of the current episode end with its first done one
+            oldest_id = first_id - len(self)
+            stored_ids = torch.arange(max(self._episode_start, oldest_id), first_id)
+            if len(stored_ids) > 0:
+                positions = (stored_ids % self.capacity).to(self.storage.device)
+                self.storage.column("episode_end")[positions] = done_ids[0].to(
+                    self.storage.device
+                )
+            self._episode_start = int(done_ids[-1]) + 1
+        self._number_of_transitions += len(done)
+        return {"episode_start": episode_starts, "episode_end": episode_ends}
+
+    def _gather(self, indices: Tensor) -> dict[str, Tensor]:
+        columns = super()._gather(indices)
+        episode_starts = columns.pop("episode_start")
+        episode_ends = columns.pop("episode_end")
+        device = self.storage.device
+        # transition ids, from the oldest stored one, which is at position id % capacity
+        oldest_id = self._number_of_transitions - len(self)
+        ids = oldest_id + (indices.to(device) - oldest_id) % self.capacity
 
-        self._trajectory.append(
-            (
-                state,
-                action,
-                next_state,
-                curr_available_actions,
-                next_available_actions,
-                terminated,
-                truncated,
-                max_number_actions,
-                cost,
+        random_numbers = torch.rand(
+            (2, len(indices)), generator=self._sampling_generator
+        ).to(device)
+        relabeled = episode_ends >= 0
+        relabeled &= random_numbers[0] < self._relabel_probability
+        if not bool(relabeled.any()):
+            return columns
+
+        if self._strategy == "final":
+            goal_ids = episode_ends
+        else:
+            first_goal_ids = (
+                ids
+                if self._strategy == "future"
+                else episode_starts.clamp(min=oldest_id)
             )
+            goal_ids = first_goal_ids + (
+                random_numbers[1] * (episode_ends - first_goal_ids + 1)
+            ).long().clamp(min=0)
+        goals = self.storage.column("next_state").index_select(
+            0, goal_ids[relabeled] % self.capacity
+        )[:, : -self._goal_dim]
+        for name in ("state", "next_state"):
+            columns[name][relabeled, -self._goal_dim :] = goals.to(columns[name].dtype)
+
+        states = columns["state"][relabeled]
+        actions = columns["action"][relabeled]
+        columns["reward"][relabeled] = self._relabeled_values(
+            states, actions, self._batch_reward_fn, self._reward_fn
+        ).to(columns["reward"].dtype)
+        if self._batch_terminated_fn is not None or self._terminated_fn is not None:
+            columns["terminated"][relabeled] = self._relabeled_values(
+                states, actions, self._batch_terminated_fn, self._terminated_fn
+            ).to(columns["terminated"].dtype)
+        return columns
+
+    def _relabeled_values(
+        self,
+        states: Tensor,
+        actions: Tensor,
+        batch_fn: Callable[[Tensor, Tensor], Tensor] | None,
+        fn: Callable[[SubjectiveState, Action], Reward | bool] | None,
+    ) -> Tensor:
+        """
+        Computes rewards (or terminated flags) of relabeled transitions with the batched
+        function if given, or else with the per-transition function.
+        """
+        if batch_fn is not None:
+            return batch_fn(states, actions).reshape(len(states)).to(states.device)
+        assert fn is not None
+        return torch.tensor(
+            [float(fn(state, action)) for state, action in zip(states, actions)],
+            device=states.device,
         )
-        if terminated or truncated:
-            additional_goal = next_state[: -self._goal_dim]  # final mode
-            for (
-                state,
-                action,
-                next_state,
-                curr_available_actions,
-                next_available_actions,
-                terminated,
-                truncated,
-                max_number_actions,
-                cost,
-            ) in self._trajectory:
-                # replace current_goal with additional_goal
-                state = assert_is_tensor_like(state)
-                next_state = assert_is_tensor_like(next_state)
-                state[-self._goal_dim :] = additional_goal
-                next_state[-self._goal_dim :] = additional_goal
-                super().push(
-                    state,
-                    action,
-                    self._reward_fn(state, action),
-                    (
-                        terminated
-                        if self._terminated_fn is None
-                        else self._terminated_fn(state, action)
-                    ),
-                    truncated,
-                    curr_available_actions,
-                    next_state,
-                    next_available_actions,
-                    max_number_actions,
-                    cost,
-                )
-            self._trajectory = []
+
+    def clear(self) -> None:
+        super().clear()
+        self._number_of_transitions = 0
+        self._episode_start = 0
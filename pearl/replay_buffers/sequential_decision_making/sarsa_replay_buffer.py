@@ -7,13 +7,15 @@
 
 # pyre-strict
 
+import dataclasses
+
 import torch
 
 from pearl.api.action import Action
 from pearl.api.reward import Reward
 from pearl.api.state import SubjectiveState
 from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
-from pearl.replay_buffers.transition import Transition
+from pearl.replay_buffers.transition import Transition, TransitionBatch
 from torch import Tensor
 
 
@@ -101,3 +103,87 @@ class SARSAReplayBuffer(TensorBasedReplayBuffer):
                     truncated=self._process_single_truncated(truncated),
                 )
             )
+
+    def _store_batch(self, batch: TransitionBatch) -> None:
+        """
+        Stores a batch of consecutive transitions, matching SARSA pairs within the batch
+        (and with the cached transition of a previous push) in the same way as pushing
+        the transitions one at a time would.
+        """
+        next_state = batch.next_state
+        assert next_state is not None
+        done = batch.terminated | batch.truncated
+
+        if self.cache is not None:
+            assert self.cache.next_state is not None
+            if torch.equal(self.cache.next_state, batch.state[:1]):
+                self.memory.append(
+                    dataclasses.replace(self.cache, next_action=batch.action[:1])
+                )
+
+        # A non-terminal transition is complete if the next transition in the batch
+        # starts from its next state; its next action is then the next transition's action.
+        batch_size = len(batch)
+        matches_next_transition = torch.zeros_like(done)
+        if batch_size > 1:
+            matches_next_transition[:-1] = (
+                (next_state[:-1] == batch.state[1:])
+                .reshape(batch_size - 1, -1)
+                .all(dim=1)
+            )
+        is_complete = matches_next_transition & ~done
+        next_action = torch.where(
+            is_complete.view((-1,) + (1,) * (batch.action.dim() - 1)),
+            batch.action.roll(-1, dims=0),
+            batch.action,  # for terminal transitions the value does not matter
+        )
+        keep = is_complete | done
+        kept_batch = TransitionBatch(
+            state=batch.state[keep],
+            action=batch.action[keep],
+            reward=batch.reward[keep],
+            terminated=batch.terminated[keep],
+            truncated=batch.truncated[keep],
+            next_state=next_state[keep],
+            next_action=next_action[keep],
+            curr_available_actions=_filter(batch.curr_available_actions, keep),
+            curr_unavailable_actions_mask=_filter(
+                batch.curr_unavailable_actions_mask, keep
+            ),
+            next_available_actions=_filter(batch.next_available_actions, keep),
+            next_unavailable_actions_mask=_filter(
+                batch.next_unavailable_actions_mask, keep
+            ),
+        )
+        self.memory.extend(self._split_batch_into_transitions(kept_batch))
+
+        # the last non-terminal transition waits for its next action, as in `push`
+        non_terminal_indices = (~done).nonzero()
+        if len(non_terminal_indices) > 0:
+            last = int(non_terminal_indices[-1])
+            self.cache = self._split_batch_into_transitions(
+                TransitionBatch(
+                    state=batch.state[last : last + 1],
+                    action=batch.action[last : last + 1],
+                    reward=batch.reward[last : last + 1],
+                    terminated=batch.terminated[last : last + 1],
+                    truncated=batch.truncated[last : last + 1],
+                    next_state=next_state[last : last + 1],
+                    curr_available_actions=_filter(
+                        batch.curr_available_actions, slice(last, last + 1)
+                    ),
+                    curr_unavailable_actions_mask=_filter(
+                        batch.curr_unavailable_actions_mask, slice(last, last + 1)
+                    ),
+                    next_available_actions=_filter(
+                        batch.next_available_actions, slice(last, last + 1)
+                    ),
+                    next_unavailable_actions_mask=_filter(
+                        batch.next_unavailable_actions_mask, slice(last, last + 1)
+                    ),
+                )
+            )[0]
+
+
+def _filter(x: Tensor | None, index: Tensor | slice) -> Tensor | None:
+    return None if x is None else x[index]
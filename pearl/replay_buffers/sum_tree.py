@@ -0,0 +1,95 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import torch
+from torch import Tensor
+
+
+class SumTree:
+    """
+    A complete binary tree over `capacity` non-negative leaf values (priorities), stored
+    in flat arrays, where each internal node holds the sum (and the minimum) of its two
+    children. The root therefore holds the total (and minimum) of all leaves.
+
+    Updating a set of leaves and finding the leaves at a set of prefix sums both take
+    O(log capacity) vectorized steps, one per level of the tree, regardless of how many
+    leaves are updated or looked up at once.
+
+    Args:
+        capacity: number of leaves.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        # number of leaves, rounded up to a power of two so that the tree is complete
+        self._number_of_leaves: int = 1 << (capacity - 1).bit_length()
+        # node i has children 2i and 2i + 1; leaves are stored from _number_of_leaves on
+        self._sums: Tensor = torch.zeros(
+            2 * self._number_of_leaves, dtype=torch.float64
+        )
+        self._mins: Tensor = torch.full(
+            (2 * self._number_of_leaves,), float("inf"), dtype=torch.float64
+        )
+
+    @property
+    def total(self) -> float:
+        """Sum of all leaf values."""
+        return self._sums[1].item()
+
+    @property
+    def min(self) -> float:
+        """Minimum over the leaves set so far (`inf` if none)."""
+        return self._mins[1].item()
+
+    def __getitem__(self, indices: Tensor) -> Tensor:
+        """Returns the values of the given leaves."""
+        return self._sums[indices.cpu() + self._number_of_leaves]
+
+    def update(self, indices: Tensor, values: Tensor) -> None:
+        """
+        Sets the values of the given leaves and updates their ancestors.
+        If an index appears several times, one of its values is kept.
+        """
+        if indices.numel() == 0:
+            return
+        nodes = indices.cpu().long() + self._number_of_leaves
+        values = values.detach().cpu().to(torch.float64)
+        self._sums[nodes] = values
+        self._mins[nodes] = values
+        # all updated leaves are at the same depth, so their ancestors are updated
+        # level by level until the root (node 1) is reached
+        nodes = torch.unique(nodes // 2)
+        while nodes[0] >= 1:
+            left, right = 2 * nodes, 2 * nodes + 1
+            self._sums[nodes] = self._sums[left] + self._sums[right]
+            self._mins[nodes] = torch.minimum(self._mins[left], self._mins[right])
+            nodes = torch.unique(nodes // 2)
+
+    def find_prefix_sum_indices(self, prefix_sums: Tensor) -> Tensor:
+        """
+        For each value `s` in `prefix_sums` (expected in [0, total)), returns the index of
+        the leaf `i` such that the sum of leaves before `i` is at most `s` and the sum of
+        leaves up to and including `i` is greater than `s`. Sampling `s` uniformly in
+        [0, total) therefore returns leaf `i` with probability proportional to its value.
+        """
+        values = prefix_sums.detach().cpu().to(torch.float64).clone()
+        nodes = torch.ones_like(values, dtype=torch.long)
+        for _ in range(self._number_of_leaves.bit_length() - 1):
+            left_sums = self._sums[2 * nodes]
+            go_right = values >= left_sums
+            values -= left_sums * go_right
+            nodes = 2 * nodes + go_right.long()
+        return nodes - self._number_of_leaves
+
+    def clear(self) -> None:
+        """Sets all leaves back to zero."""
+        self._sums.zero_()
+        self._mins.fill_(float("inf"))
@@ -7,9 +7,10 @@
 
 # pyre-strict
 
+import dataclasses
 import random
 
-from collections import deque
+from collections import deque, OrderedDict
 from typing import Deque
 
 import torch
@@ -24,6 +25,9 @@ from pearl.utils.device import get_default_device
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 from torch import Tensor
 
+# number of action spaces whose padded tensors and masks are cached by replay buffers
+MAX_NUMBER_OF_CACHED_ACTION_SPACES = 16
+
 
 class TensorBasedReplayBuffer(ReplayBuffer):
     def __init__(
@@ -35,6 +39,14 @@ class TensorBasedReplayBuffer(ReplayBuffer):
         # TODO: we want a unifying transition type
         self.memory: Deque[Transition | TransitionBatch] = deque([], maxlen=capacity)
         self._device_for_batches: torch.device = get_default_device()
+        # maps (action space id, max number of actions) to the action space
+        # and its padded actions tensor and mask
+        self._padded_actions_cache: OrderedDict[
+            tuple[int, int], tuple[ActionSpace, Tensor, Tensor]
+        ] = OrderedDict()
+        # dedicated random number generators set by `seed_sampling`
+        self._sampling_random: random.Random | None = None
+        self._sampling_generator: torch.Generator | None = None
 
     def _store_transition(
         self,
@@ -90,37 +102,16 @@ class TensorBasedReplayBuffer(ReplayBuffer):
             (
                 curr_available_actions_tensor_with_padding,
                 curr_unavailable_actions_mask,
-            ) = self.create_action_tensor_and_mask(
+            ) = self._get_padded_action_tensor_and_mask(
                 max_number_actions, curr_available_actions
             )
-
             (
                 next_available_actions_tensor_with_padding,
                 next_unavailable_actions_mask,
-            ) = self.create_action_tensor_and_mask(
+            ) = self._get_padded_action_tensor_and_mask(
                 max_number_actions, next_available_actions
             )
 
-            # Transitions require a "batch" dimension in the tensors,
-            # so we add a dimension of size 1.
-            if curr_available_actions_tensor_with_padding is not None:
-                curr_available_actions_tensor_with_padding = (
-                    curr_available_actions_tensor_with_padding.unsqueeze(0)
-                )
-            if curr_unavailable_actions_mask is not None:
-                curr_unavailable_actions_mask = curr_unavailable_actions_mask.unsqueeze(
-                    0
-                )
-
-            if next_available_actions_tensor_with_padding is not None:
-                next_available_actions_tensor_with_padding = (
-                    next_available_actions_tensor_with_padding.unsqueeze(0)
-                )
-            if next_unavailable_actions_mask is not None:
-                next_unavailable_actions_mask = next_unavailable_actions_mask.unsqueeze(
-                    0
-                )
-
         self._store_transition(
             state,
             action,
@@ -135,6 +126,152 @@ class TensorBasedReplayBuffer(ReplayBuffer):
             cost,
         )
 
+    def _store_batch(self, batch: TransitionBatch) -> None:
+        """
+        Implements the way the replay buffer stores a batch of transitions.
+        The batch has already been processed by `push_batch`: it is in the default device,
+        `terminated` and `truncated` have one entry per transition, and the available
+        actions tensors and masks are filled in for discrete action spaces.
+        """
+        raise NotImplementedError(f"{type(self)} has not implemented _store_batch")
+
+    def push_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions: ActionSpace | None = None,
+        next_available_actions: ActionSpace | None = None,
+        max_number_actions: int | None = None,
+    ) -> None:
+        """
+        Saves a batch of transitions at once. This is equivalent to calling `push` once per
+        transition in the batch (in order), but processes each field with a handful of tensor
+        operations instead of building tensors one transition at a time.
+
+        For discrete action spaces, the available actions tensors and masks can either be
+        given in the batch itself, or be computed once from `curr_available_actions`
+        and `next_available_actions` when the action space is the same for all transitions
+        in the batch.
+
+        Args:
+            batch: the transitions to be saved, each field having one row per transition.
+            curr_available_actions: the action space shared by all transitions, used when
+                `batch.curr_available_actions` is None.
+            next_available_actions: the next action space shared by all transitions, used
+                when `batch.next_available_actions` is None.
+            max_number_actions: the maximum number of actions, used to pad the available
+                actions tensors. Defaults to the size of `curr_available_actions`.
+        """
+        if len(batch) == 0:
+            return
+        self._store_batch(
+            self._process_batch(
+                batch,
+                curr_available_actions,
+                next_available_actions,
+                max_number_actions,
+            )
+        )
+
+    def _process_batch(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions: ActionSpace | None,
+        next_available_actions: ActionSpace | None,
+        max_number_actions: int | None,
+    ) -> TransitionBatch:
+        """
+        Returns a copy of `batch` in the default device, in the format expected by
+        `_store_batch`.
+        """
+        batch_size = len(batch)
+        device = get_default_device()
+
+        def _process_tensor(x: Tensor | None) -> Tensor | None:
+            return None if x is None else x.detach().to(device).clone()
+
+        def _process_flags(x: Tensor) -> Tensor:
+            x = torch.as_tensor(x, device=device).bool()
+            return x.reshape(-1).expand(batch_size).clone()
+
+        def _padded_actions(
+            batch_tensor: Tensor | None,
+            batch_mask: Tensor | None,
+            action_space: ActionSpace | None,
+        ) -> tuple[Tensor | None, Tensor | None]:
+            if batch_tensor is not None or action_space is None:
+                return _process_tensor(batch_tensor), _process_tensor(batch_mask)
+            number_of_actions = max_number_actions
+            if number_of_actions is None:
+                assert isinstance(action_space, DiscreteActionSpace)
+                number_of_actions = action_space.n
+            actions_tensor, mask = self._get_padded_action_tensor_and_mask(
+                number_of_actions, action_space
+            )
+            assert actions_tensor is not None and mask is not None
+            # the same padded tensor and mask are shared by all transitions in the batch
+            return (
+                actions_tensor.to(device).expand(batch_size, -1, -1),
+                mask.to(device).expand(batch_size, -1),
+            )
+
+        if self._is_action_continuous:
+            curr_actions, curr_mask, next_actions, next_mask = None, None, None, None
+        else:
+            curr_actions, curr_mask = _padded_actions(
+                batch.curr_available_actions,
+                batch.curr_unavailable_actions_mask,
+                curr_available_actions,
+            )
+            next_actions, next_mask = _padded_actions(
+                batch.next_available_actions,
+                batch.next_unavailable_actions_mask,
+                next_available_actions,
+            )
+
+        state = _process_tensor(batch.state)
+        action = _process_tensor(batch.action)
+        reward = _process_tensor(batch.reward)
+        assert state is not None and action is not None and reward is not None
+        return TransitionBatch(
+            state=state,
+            action=action,
+            reward=reward.reshape(batch_size),
+            terminated=_process_flags(batch.terminated),
+            truncated=_process_flags(batch.truncated),
+            next_state=_process_tensor(batch.next_state),
+            next_action=_process_tensor(batch.next_action),
+            curr_available_actions=curr_actions,
+            curr_unavailable_actions_mask=curr_mask,
+            next_available_actions=next_actions,
+            next_unavailable_actions_mask=next_mask,
+            weight=_process_tensor(batch.weight),
+            cost=_process_tensor(batch.cost),
+        )
+
+    @staticmethod
+    def _split_batch_into_transitions(
+        batch: TransitionBatch,
+        transition_type: type[Transition] = Transition,
+        **additional_columns: Tensor,
+    ) -> list[Transition]:
+        """
+        Splits a processed batch into one transition of type `transition_type` per row.
+        Each field of a transition is a view of size 1 (along the first dimension) of the
+        corresponding field of the batch, so no new tensor data is allocated.
+        """
+        batch_fields = {f.name for f in dataclasses.fields(batch)}
+        columns = {
+            f.name: getattr(batch, f.name)
+            for f in dataclasses.fields(transition_type)
+            if f.name in batch_fields and getattr(batch, f.name) is not None
+        }
+        columns.update(additional_columns)
+        split_columns = {name: column.split(1) for name, column in columns.items()}
+        return [
+            transition_type(**{name: rows[i] for name, rows in split_columns.items()})
+            for i in range(len(batch))
+        ]
+
     @property
     def device_for_batches(self) -> torch.device:
         return self._device_for_batches
@@ -179,6 +316,41 @@ class TensorBasedReplayBuffer(ReplayBuffer):
     def _process_single_truncated(self, truncated: bool) -> torch.Tensor:
         return torch.tensor([truncated])  # (1,)
 
+    def _get_padded_action_tensor_and_mask(
+        self,
+        max_number_actions: int | None,
+        available_action_space: ActionSpace | None,
+    ) -> tuple[torch.Tensor | None, torch.Tensor | None]:
+        """
+        Returns the result of `create_action_tensor_and_mask` with an added batch dimension
+        of size 1, as stored in transitions.
+
+        Results are cached for the most recently used action spaces, so that consecutive
+        transitions with the same action space (the common case) share its padded tensor
+        and mask instead of each storing a copy. Action spaces are therefore assumed not to
+        be modified after being pushed, and the returned tensors must not be modified in
+        place.
+        """
+        if max_number_actions is None or available_action_space is None:
+            return (None, None)
+        key = (id(available_action_space), max_number_actions)
+        cached = self._padded_actions_cache.get(key)
+        # the cache keeps a reference to the action space, so its id cannot be reused
+        if cached is not None and cached[0] is available_action_space:
+            self._padded_actions_cache.move_to_end(key)
+            return (cached[1], cached[2])
+
+        actions_tensor, mask = self.create_action_tensor_and_mask(
+            max_number_actions, available_action_space
+        )
+        if actions_tensor is None or mask is None:
+            return (None, None)
+        actions_tensor, mask = actions_tensor.unsqueeze(0), mask.unsqueeze(0)
+        self._padded_actions_cache[key] = (available_action_space, actions_tensor, mask)
+        if len(self._padded_actions_cache) > MAX_NUMBER_OF_CACHED_ACTION_SPACES:
+            self._padded_actions_cache.popitem(last=False)
+        return (actions_tensor, mask)
+
     @staticmethod
     def create_action_tensor_and_mask(
         max_number_actions: int | None,
@@ -276,7 +448,7 @@ class TensorBasedReplayBuffer(ReplayBuffer):
                 f"Can't get a batch of size {batch_size} from a replay buffer with "
                 f"only {len(self)} elements"
             )
-        samples = random.sample(self.memory, batch_size)
+        samples = self._sample_from_memory(batch_size)
         return self._create_transition_batch(
             # pyre-fixme[6]: For 1st argument expected `List[Transition]` but got
             #  `List[Union[Transition, TransitionBatch]]`.
@@ -284,6 +456,18 @@ class TensorBasedReplayBuffer(ReplayBuffer):
             is_action_continuous=self._is_action_continuous,
         )
 
+    def seed_sampling(self, seed: int) -> None:
+        self._sampling_random = random.Random(seed)
+        self._sampling_generator = torch.Generator().manual_seed(seed)
+
+    def _sample_from_memory(
+        self, batch_size: int
+    ) -> list[Transition | TransitionBatch]:
+        """Samples `batch_size` distinct elements of `memory` uniformly at random."""
+        if self._sampling_random is None:
+            return random.sample(self.memory, batch_size)
+        return self._sampling_random.sample(self.memory, batch_size)
+
     def __len__(self) -> int:
         return len(self.memory)
 
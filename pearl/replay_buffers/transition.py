@@ -76,6 +76,9 @@ class TransitionBatch:
     weight: torch.Tensor | None = None
     time_diff: torch.Tensor | None = None
     cost: torch.Tensor | None = None
+    # position of each transition in the replay buffer it was sampled from, set by
+    # buffers which support updating stored transitions (e.g. their priorities)
+    buffer_index: torch.Tensor | None = None
 
     def to(self: TB, device: torch.device) -> TB:
         # iterate over all fields
@@ -207,7 +207,7 @@ class RCSafetyModuleCostCriticContinuousAction(SafetyModule):
         )
 
         return {
-            "cost_critic_loss": loss.item(),
+            "cost_critic_loss": loss.detach(),
         }
 
     def filter_action(
@@ -15,6 +15,8 @@ from pearl.api.environment import Environment
 from pearl.api.reward import Value
 from pearl.pearl_agent import PearlAgent
 from pearl.utils.functional_utils.train_and_eval.online_learning import run_episode
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from pearl.utils.offline_dataset import OfflineDatasetWriter, to_discrete_action_space
 
 
 def create_offline_data(
@@ -28,13 +30,15 @@ def create_offline_data(
     learn_after_episode: bool = True,
     evaluation_episodes: int = 100,
     seed: int | None = None,
+    columnar_format: bool = False,
 ) -> list[Value]:
     """
     This function creates offline data by interacting with a given environment using a specified
     agent. This is mostly for illustration with standard benchmark environments. For most
     practical use cases, offline data collection will use custom pipelines.
 
-    Transition tuples are stored in .pt file in the specified path. Training returns
+    Transition tuples are stored in .pt file in the specified path (or, if `columnar_format` is
+    set, written incrementally to an `OfflineDataset` directory at that path). Training returns
     (episodic returns during training) of the agent are saved in a pickle file. At the end of data
     collection, evaluation returns of the final agent are also saved in a pickle file. This
     approximates the performance of the best learned policy in the offline data.
@@ -59,6 +63,10 @@ def create_offline_data(
         evaluation_episodes (int): The number of episodes to evaluate the trained agent on.
             Defaults to 100.
         seed (int, optional): Environment seed for reproducibility.
+        columnar_format (bool): When set to True, transitions are written during collection to a
+            sharded columnar `OfflineDataset` in directory `save_path + file_name` instead of a
+            .pt file. The last episode is then written in full, so the dataset can hold slightly
+            more than `max_len_offline_data` transitions. Defaults to False.
 
     Returns:
         returns_offline_agent: a list of returns for each evaluation episode.
@@ -69,7 +77,18 @@ def create_offline_data(
     epi_returns = []
     epi = 0
     raw_transitions_buffer = deque([], maxlen=max_len_offline_data)
-    while len(raw_transitions_buffer) < max_len_offline_data:
+    writer = None
+    if columnar_format:
+        action_space = to_discrete_action_space(env.action_space)
+        is_action_continuous = not isinstance(action_space, DiscreteActionSpace)
+        writer = OfflineDatasetWriter(
+            save_path + file_name,
+            is_action_continuous=is_action_continuous,
+            max_number_actions=None if is_action_continuous else action_space.n,
+        )
+    while (
+        len(writer) if writer is not None else len(raw_transitions_buffer)
+    ) < max_len_offline_data:
         g = 0
         observation, action_space = env.reset(seed=seed)
         agent.reset(observation, action_space)
@@ -94,8 +113,20 @@ def create_offline_data(
                 "truncated": action_result.truncated,
             }
 
+            if writer is not None:
+                writer.append(
+                    observation=observation,
+                    action=action,
+                    reward=action_result.reward,
+                    next_observation=action_result.observation,
+                    terminated=action_result.terminated,
+                    truncated=action_result.truncated,
+                    curr_available_actions=env.action_space,
+                    next_available_actions=env.action_space,
+                )
+            else:
+                raw_transitions_buffer.append(transition_tuple)
             observation = action_result.observation
-            raw_transitions_buffer.append(transition_tuple)
             if learn and not learn_after_episode:
                 agent.learn()
             done = action_result.done
@@ -107,8 +138,11 @@ def create_offline_data(
         print(f"\rEpisode {epi}, return={g}", end="")
         epi += 1
 
-    # save offline transition tuples in a .pt file
-    torch.save(raw_transitions_buffer, save_path + file_name)
+    if writer is not None:
+        writer.close()
+    else:
+        # save offline transition tuples in a .pt file
+        torch.save(raw_transitions_buffer, save_path + file_name)
 
     # save training returns of the data collection agent
     with open(
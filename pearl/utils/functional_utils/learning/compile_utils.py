@@ -0,0 +1,60 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import dataclasses
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+import torch
+from pearl.replay_buffers.transition import TransitionBatch
+
+# methods compiled with `torch.compile`, for each object. The functions of the classes
+# of objects are compiled, rather than their bound methods, so that the cache does not
+# keep objects alive.
+_COMPILED_METHODS: weakref.WeakKeyDictionary[
+    object, dict[str, Callable[..., Any]]
+] = weakref.WeakKeyDictionary()
+
+
+def mark_batch_dynamic(batch: TransitionBatch) -> None:
+    """
+    Marks the batch dimension of the tensors of a batch of transitions as dynamic, so
+    that functions compiled with `torch.compile` are compiled for any batch size
+    rather than recompiled whenever the batch size changes (for instance, for the last
+    batch of an epoch, or when a replay buffer has fewer transitions than the batch
+    size).
+    """
+    for field in dataclasses.fields(batch):
+        value = getattr(batch, field.name)
+        if isinstance(value, torch.Tensor) and value.ndim > 0:
+            torch._dynamo.maybe_mark_dynamic(value, 0)
+
+
+def compiled_method(obj: object, name: str) -> Callable[..., Any]:
+    """
+    Returns method `name` of `obj` compiled with `torch.compile`. The method is
+    compiled once per object, and batches of transitions passed to it have their batch
+    dimension marked as dynamic (see `mark_batch_dynamic`).
+
+    Note that methods are compiled lazily, when they are first called, and are
+    recompiled if attributes they use (such as their modules) are replaced.
+    """
+    methods = _COMPILED_METHODS.setdefault(obj, {})
+    if name not in methods:
+        methods[name] = torch.compile(getattr(type(obj), name))
+    compiled = methods[name]
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        for arg in (*args, *kwargs.values()):
+            if isinstance(arg, TransitionBatch):
+                mark_batch_dynamic(arg)
+        return compiled(obj, *args, **kwargs)
+
+    return call
@@ -79,3 +79,138 @@ def compute_elementwise_huber_loss(input_errors: Tensor, kappa: float = 1.0) ->
         kappa * (torch.abs(input_errors) - (0.5 * kappa)),
     )
     return huber_loss
+
+
+# maximum number of pairwise elements (batch rows x target quantiles x quantiles) held
+# at once by `compute_quantile_huber_loss`
+_QUANTILE_HUBER_LOSS_CHUNK_NUMEL: int = 2**20
+
+
+def _batch_chunks(batch_size: int, chunk_size: int) -> list[slice]:
+    """Returns the slices of the chunks of `chunk_size` rows of a batch."""
+    if chunk_size >= batch_size:
+        # a single chunk, without iterating over the (possibly dynamic) batch size
+        return [slice(None)]
+    return [
+        slice(start, start + chunk_size) for start in range(0, batch_size, chunk_size)
+    ]
+
+
+def _pairwise_quantile_errors(
+    quantiles: Tensor, target_quantiles: Tensor, quantile_midpoints: Tensor
+) -> tuple[Tensor, Tensor]:
+    """
+    Returns the pairwise errors T theta_j - theta_i between target quantiles and
+    quantiles, of shape (batch_size, number of target quantiles, number of quantiles),
+    along with their asymmetric weights |tau_i - 1{T theta_j - theta_i < 0}|.
+    """
+    pairwise_errors = target_quantiles.unsqueeze(2) - quantiles.unsqueeze(1)
+    asymmetric_weight = torch.abs(
+        quantile_midpoints - (pairwise_errors < 0).to(pairwise_errors.dtype)
+    )
+    return pairwise_errors, asymmetric_weight
+
+
+class QuantileHuberLoss(torch.autograd.Function):
+    """
+    Quantile huber loss which processes the pairwise errors between quantiles and their
+    targets in chunks of batch rows, in both the forward and the backward pass. Only the
+    inputs are saved for the backward pass, where the pairwise errors of each chunk are
+    recomputed, so that at most `chunk_size` x N x N intermediate elements are held at
+    once rather than the (batch_size, N, N) tensors of the elementwise computation.
+
+    As in `compute_elementwise_huber_loss`, the asymmetric weights are not
+    differentiated, and no gradient is computed for the quantile midpoints.
+    """
+
+    @staticmethod
+    # pyre-ignore[14]: inconsistent override, as for all custom autograd functions
+    def forward(
+        ctx: torch.autograd.function.FunctionCtx,
+        quantiles: Tensor,
+        target_quantiles: Tensor,
+        quantile_midpoints: Tensor,
+        kappa: float,
+        chunk_size: int,
+    ) -> Tensor:
+        ctx.save_for_backward(quantiles, target_quantiles, quantile_midpoints)
+        ctx.kappa = kappa
+        ctx.chunk_size = chunk_size
+        loss = quantiles.new_zeros(())
+        for chunk in _batch_chunks(quantiles.shape[0], chunk_size):
+            pairwise_errors, asymmetric_weight = _pairwise_quantile_errors(
+                quantiles[chunk], target_quantiles[chunk], quantile_midpoints
+            )
+            huber_loss = compute_elementwise_huber_loss(pairwise_errors, kappa)
+            loss = loss + (asymmetric_weight * huber_loss).sum()
+        return loss / quantiles.numel()
+
+    @staticmethod
+    # pyre-ignore[14]: inconsistent override, as for all custom autograd functions
+    def backward(
+        ctx: torch.autograd.function.FunctionCtx, grad_output: Tensor
+    ) -> tuple[Tensor | None, Tensor | None, None, None, None]:
+        quantiles, target_quantiles, quantile_midpoints = ctx.saved_tensors
+        needs_quantiles_grad, needs_target_quantiles_grad = ctx.needs_input_grad[:2]
+        grad_quantiles = torch.empty_like(quantiles) if needs_quantiles_grad else None
+        grad_target_quantiles = (
+            torch.empty_like(target_quantiles) if needs_target_quantiles_grad else None
+        )
+        scale = grad_output / quantiles.numel()
+        for chunk in _batch_chunks(quantiles.shape[0], ctx.chunk_size):
+            pairwise_errors, asymmetric_weight = _pairwise_quantile_errors(
+                quantiles[chunk], target_quantiles[chunk], quantile_midpoints
+            )
+            # the derivative of the huber loss of an error u is clamp(u, -kappa, kappa)
+            grad_pairwise_errors = (
+                asymmetric_weight * pairwise_errors.clamp(-ctx.kappa, ctx.kappa) * scale
+            )
+            if grad_quantiles is not None:
+                grad_quantiles[chunk] = -grad_pairwise_errors.sum(dim=1)
+            if grad_target_quantiles is not None:
+                grad_target_quantiles[chunk] = grad_pairwise_errors.sum(dim=2)
+        return grad_quantiles, grad_target_quantiles, None, None, None
+
+
+def compute_quantile_huber_loss(
+    quantiles: Tensor,
+    target_quantiles: Tensor,
+    quantile_midpoints: Tensor,
+    kappa: float = 1.0,
+    chunk_size: int | None = None,
+) -> Tensor:
+    """
+    Computes the quantile huber loss of quantile regression (see Equation (1) of
+    https://arxiv.org/pdf/1710.10044.pdf), without materializing the (batch_size, N, N)
+    pairwise intermediates of the elementwise computation:
+
+        1/N sum_i E_j [ |tau_i - 1{u_ij < 0}| * huber_kappa(u_ij) ],
+        with u_ij = T theta_j - theta_i,
+
+    averaged over the batch. This is equal to weighting `compute_elementwise_huber_loss`
+    of the pairwise errors, summing over target quantiles and averaging over the rest.
+
+    Args:
+        quantiles: quantile locations theta_i, of shape (batch_size, N).
+        target_quantiles: target quantile locations T theta_j, of shape (batch_size, N').
+        quantile_midpoints: quantile midpoints tau_i, of shape (N,).
+        kappa: the threshold of the huber loss.
+        chunk_size: the number of batch rows processed at once. By default, chunks hold
+            at most about one million pairwise elements. When compiled with
+            `torch.compile`, the batch is processed at once, since the compiled kernels
+            fuse the pairwise computations with their reductions.
+    Returns:
+        The quantile huber loss, as a scalar tensor.
+    """
+    batch_size, number_of_quantiles = quantiles.shape
+    if chunk_size is None:
+        if torch.compiler.is_compiling():
+            chunk_size = batch_size
+        else:
+            chunk_size = _QUANTILE_HUBER_LOSS_CHUNK_NUMEL // (
+                number_of_quantiles * target_quantiles.shape[-1]
+            )
+    # pyre-ignore[7]: `apply` is untyped
+    return QuantileHuberLoss.apply(
+        quantiles, target_quantiles, quantile_midpoints, kappa, max(chunk_size, 1)
+    )
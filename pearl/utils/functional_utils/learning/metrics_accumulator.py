@@ -0,0 +1,166 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+from collections.abc import Mapping
+from typing import Any
+
+import torch
+
+
+def is_scalar_metric(value: Any) -> bool:
+    """Whether `value` is a Python number or a tensor with a single element."""
+    return isinstance(value, (int, float)) or (
+        isinstance(value, torch.Tensor) and value.numel() == 1
+    )
+
+
+class MetricsAccumulator:
+    """
+    Accumulates scalar training metrics (such as the losses reported by `learn_batch`)
+    on the device they are computed on, so that recording them does not synchronize
+    the device with the host.
+
+    The sums of all metrics are kept in a single preallocated tensor with one slot per
+    metric, and each call to `record` adds all recorded values with a single in-place
+    operation. Values are only transferred to the host by `reduce`, which is meant to
+    be called once per reporting interval.
+
+    Only scalar values (Python numbers and tensors with a single element) are recorded;
+    other values, such as per-transition TD errors, are ignored.
+
+    Args:
+        initial_capacity: the number of metric slots allocated when the first metric
+            is recorded. The number of slots is doubled whenever more distinct metrics
+            are recorded.
+    """
+
+    def __init__(self, initial_capacity: int = 8) -> None:
+        if initial_capacity < 1:
+            raise ValueError(
+                f"initial_capacity must be positive, got {initial_capacity}"
+            )
+        self._initial_capacity = initial_capacity
+        # slot of each metric in `_sums`, in order of first appearance
+        self._slots: dict[str, int] = {}
+        # number of values recorded for each metric since the last reset, kept on
+        # the host since it does not depend on the recorded values
+        self._counts: list[int] = []
+        self._sums: torch.Tensor | None = None
+        # slot indices of the last recorded metric names, reused while the names of
+        # recorded metrics do not change
+        self._cached_names: tuple[str, ...] = ()
+        self._cached_indices: torch.Tensor | None = None
+
+    def __len__(self) -> int:
+        """The number of metrics with values recorded since the last reset."""
+        return sum(count > 0 for count in self._counts)
+
+    @property
+    def names(self) -> list[str]:
+        """The names of the metrics with values recorded since the last reset."""
+        return [name for name, slot in self._slots.items() if self._counts[slot] > 0]
+
+    def _allocate(self, number_of_slots: int, device: torch.device) -> torch.Tensor:
+        """
+        Returns the tensor of sums, (re)allocating it if it has fewer than
+        `number_of_slots` slots or is on another device.
+        """
+        sums = self._sums
+        if sums is not None and sums.device == device and len(sums) >= number_of_slots:
+            return sums
+        capacity = self._initial_capacity if sums is None else len(sums)
+        while capacity < number_of_slots:
+            capacity *= 2
+        new_sums = torch.zeros(capacity, dtype=torch.float32, device=device)
+        if sums is not None:
+            new_sums[: len(sums)] = sums.to(device)
+        self._sums = new_sums
+        self._cached_indices = None
+        return new_sums
+
+    def record(self, metrics: Mapping[str, Any]) -> None:
+        """
+        Adds scalar values of `metrics` to the sums of their metrics, without
+        synchronizing the device with the host. Tensors are detached.
+        """
+        values = {
+            name: value for name, value in metrics.items() if is_scalar_metric(value)
+        }
+        if len(values) == 0:
+            return
+        names = tuple(values)
+        for name in names:
+            if name not in self._slots:
+                self._slots[name] = len(self._slots)
+                self._counts.append(0)
+            self._counts[self._slots[name]] += 1
+
+        # sums are kept on the device of the recorded tensors, preferring accelerators
+        # to the CPU when tensors are on several devices
+        devices = {
+            value.device for value in values.values() if isinstance(value, torch.Tensor)
+        }
+        device = self._sums.device if self._sums is not None else torch.device("cpu")
+        if len(devices) > 0 and (device not in devices or device.type == "cpu"):
+            device = max(devices, key=lambda device: device.type != "cpu")
+        sums = self._allocate(len(self._slots), device)
+        if names != self._cached_names or self._cached_indices is None:
+            self._cached_names = names
+            self._cached_indices = torch.tensor(
+                [self._slots[name] for name in names], device=sums.device
+            )
+        stacked_values = torch.stack(
+            [
+                torch.as_tensor(value)
+                .detach()
+                .reshape(())
+                .to(device=sums.device, dtype=sums.dtype)
+                for value in values.values()
+            ]
+        )
+        sums.index_add_(0, self._cached_indices, stacked_values)
+
+    def means(self) -> dict[str, torch.Tensor]:
+        """
+        Returns the means of the values recorded for each metric since the last reset,
+        as scalar tensors on the device of the accumulator, without synchronizing the
+        device with the host.
+        """
+        sums = self._sums
+        if sums is None:
+            return {}
+        return {
+            name: sums[slot] / self._counts[slot]
+            for name, slot in self._slots.items()
+            if self._counts[slot] > 0
+        }
+
+    def reduce(self) -> dict[str, float]:
+        """
+        Returns the means of the values recorded for each metric since the last reset,
+        transferred to the host with a single synchronization, and resets the
+        accumulator.
+        """
+        sums = self._sums
+        if sums is None or len(self) == 0:
+            return {}
+        host_sums = sums[: len(self._slots)].tolist()
+        means = {
+            name: host_sums[slot] / self._counts[slot]
+            for name, slot in self._slots.items()
+            if self._counts[slot] > 0
+        }
+        self.reset()
+        return means
+
+    def reset(self) -> None:
+        """Discards all recorded values, keeping the allocated slots."""
+        if self._sums is not None:
+            self._sums.zero_()
+        self._counts = [0] * len(self._counts)
@@ -0,0 +1,118 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import torch
+from torch import Tensor
+
+
+def reverse_discounted_cumsum(
+    values: Tensor, discounts: Tensor, last_value: Tensor | float = 0.0
+) -> Tensor:
+    """
+    Computes the reverse scan y[t] = values[t] + discounts[t] * y[t + 1] along the first
+    dimension, where y[T] = `last_value` for sequences of length T. Setting
+    `discounts[t]` to 0 at episode boundaries computes discounted sums over each of the
+    concatenated episodes at once.
+
+    The scan is computed in O(log T) tensor operations (Hillis-Steele), by composing the
+    affine maps y -> values[t] + discounts[t] * y over blocks of doubling sizes. Only
+    products and sums of the inputs are computed, so it is stable for discounts in
+    [0, 1].
+
+    Args:
+        values: tensor of shape (T, ...).
+        discounts: tensor broadcastable to the shape of `values`.
+        last_value: the value following the last element of the sequence, broadcastable
+            to the shape of values[0].
+
+    Returns:
+        A tensor of the shape of `values`.
+    """
+    offsets = values.clone()
+    scales = torch.broadcast_to(discounts, values.shape).to(values.dtype).clone()
+    length = values.shape[0]
+    shift = 1
+    while shift < length:
+        # compose the maps of blocks [t, t + shift) with the ones of [t + shift, ...)
+        offsets[:-shift] = offsets[:-shift] + scales[:-shift] * offsets[shift:]
+        scales[:-shift] = scales[:-shift] * scales[shift:]
+        shift *= 2
+    return offsets + scales * last_value
+
+
+def generalized_advantage_estimates(
+    rewards: Tensor,
+    state_values: Tensor,
+    next_state_values: Tensor,
+    terminated: Tensor,
+    truncated: Tensor,
+    discount_factor: float,
+    trace_decay_param: float,
+) -> Tensor:
+    """
+    Computes the generalized advantage estimates (GAE) of a sequence of transitions,
+    which can span several episodes. See https://arxiv.org/abs/1506.02438.
+
+    Estimates are computed backwards from the end of the sequence, and restart after each
+    terminated or truncated transition. The values of the next states of terminated
+    transitions are ignored, while the ones of truncated transitions are bootstrapped.
+
+    Args:
+        rewards: rewards of the transitions, of shape (T,).
+        state_values: values of the states of the transitions, of shape (T,).
+        next_state_values: values of the next states of the transitions, of shape (T,).
+        terminated: whether transitions are terminated, of shape (T,).
+        truncated: whether transitions are truncated, of shape (T,).
+        discount_factor: the discount factor.
+        trace_decay_param: the lambda parameter of GAE.
+
+    Returns:
+        The generalized advantage estimates of the transitions, of shape (T,).
+    """
+    terminated = terminated.bool()
+    done = terminated | truncated.bool()
+    td_errors = (
+        rewards + discount_factor * next_state_values * (~terminated) - state_values
+    )
+    return reverse_discounted_cumsum(
+        td_errors, discount_factor * trace_decay_param * (~done)
+    )
+
+
+def discounted_returns(
+    rewards: Tensor,
+    dones: Tensor,
+    gamma: float,
+    bootstrap_value: Tensor | float = 0.0,
+) -> Tensor:
+    """
+    Computes the discounted returns of a sequence of steps, which can span several
+    concatenated episodes: returns restart after each step for which `dones` is True.
+
+    Args:
+        rewards: rewards of the steps, of shape (T,).
+        dones: whether each step is the last step of its episode, of shape (T,).
+        gamma: the discount factor.
+        bootstrap_value: either the value following the last step (e.g. the value of
+            its next state if its episode is unfinished), ignored if it is done, or a
+            tensor of shape (T,) whose values follow the last step and the done steps
+            (e.g. the values of the next states of truncated steps, and zeros for
+            terminated ones).
+
+    Returns:
+        The discounted returns of the steps, of shape (T,).
+    """
+    dones = dones.bool()
+    if isinstance(bootstrap_value, Tensor) and bootstrap_value.ndim > 0:
+        ends = dones.clone()
+        ends[-1] = True
+        return reverse_discounted_cumsum(
+            rewards + gamma * bootstrap_value * ends, gamma * (~ends)
+        )
+    return reverse_discounted_cumsum(rewards, gamma * (~dones), bootstrap_value)
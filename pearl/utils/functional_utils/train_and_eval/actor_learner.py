@@ -0,0 +1,321 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+"""
+Distributed online learning with an actor-learner architecture (in the style of Ape-X
+and IMPALA) on a single host: actor processes step their own copies of the environment
+with copies of the agent, and stream transitions to a learner (the calling process)
+which owns the replay buffer and trains the policy learner, broadcasting its weights
+back to the actors periodically.
+"""
+
+import queue
+import time
+from typing import Any, Callable
+
+import torch
+import torch.multiprocessing as mp
+from pearl.api.environment import Environment
+from pearl.pearl_agent import PearlAgent
+from pearl.replay_buffers.basic_replay_buffer import BasicReplayBuffer
+from pearl.replay_buffers.prefetching_replay_buffer import PrefetchingReplayBuffer
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from torch import Tensor
+
+# seconds waited for messages before checking that actor processes are still alive
+_QUEUE_TIMEOUT = 1.0
+
+# kinds of messages sent by actors to the learner
+_TRANSITIONS = "transitions"
+_EPISODE_RETURN = "episode_return"
+_STOPPED = "stopped"
+
+
+def distributed_online_learning(
+    agent_factory: Callable[[], PearlAgent],
+    env_factory: Callable[[], Environment],
+    number_of_actors: int,
+    number_of_learner_updates: int,
+    weight_broadcast_period: int = 10,
+    learning_start_step: int = 0,
+    transitions_per_message: int = 32,
+    queue_size: int = 64,
+    seed: int | None = None,
+    start_method: str = "spawn",
+) -> dict[str, Any]:
+    """
+    Performs online learning with `number_of_actors` actor processes and a learner
+    running in the calling process.
+
+    Each actor creates an agent with `agent_factory` and an environment with
+    `env_factory`, and runs episodes with `PearlAgent.act` and `PearlAgent.observe`
+    (without learning). Transitions are sent to the learner in batches of
+    `transitions_per_message`, through a queue whose tensors live in shared memory.
+
+    The learner creates its own agent with `agent_factory`, pushes the received
+    transitions to the agent's replay buffer (which must support `push_batch`) and calls
+    `PearlAgent.learn`, which trains the policy learner with `learn_batch`. Every
+    `weight_broadcast_period` updates (calls of `learn_batch`), the weights of the
+    policy learner are copied to shared memory, from which actors load them before
+    their next step. Actors and learner only run on CPU.
+
+    Since actors keep acting while the learner trains, learning is off-policy: on-policy
+    policy learners are not supported.
+
+    Args:
+        agent_factory: creates the agents of the learner and actors. It must be
+            picklable (e.g. a module-level function) unless `start_method` is "fork".
+        env_factory: creates the environments of the actors, with the same requirement.
+        number_of_actors: the number of actor processes.
+        number_of_learner_updates: the number of updates after which learning stops.
+        weight_broadcast_period: the number of updates between two broadcasts of the
+            weights of the policy learner to the actors.
+        learning_start_step: the number of actor steps (summed over all actors) before
+            the learner starts to learn.
+        transitions_per_message: the number of transitions sent in each message.
+        queue_size: the maximum number of messages waiting for the learner; actors wait
+            when the queue is full.
+        seed: if given, the learner is seeded with `seed` and actor `i` with
+            `seed + i + 1`.
+        start_method: the multiprocessing start method of the actor processes.
+
+    Returns:
+        A dict with the returns of the episodes completed by actors (in the order they
+        were received), the number of actor steps and learner updates, and the actor
+        steps and learner updates per second.
+    """
+    if number_of_actors <= 0:
+        raise ValueError(f"number_of_actors must be positive, got {number_of_actors}")
+    if weight_broadcast_period <= 0:
+        raise ValueError(
+            f"weight_broadcast_period must be positive, got {weight_broadcast_period}"
+        )
+    if seed is not None:
+        set_seed(seed)
+    agent = agent_factory()
+    if agent.policy_learner.on_policy:
+        raise ValueError("Distributed online learning requires an off-policy learner")
+    replay_buffer = agent.replay_buffer
+    if not isinstance(
+        replay_buffer, (TensorBasedReplayBuffer, PrefetchingReplayBuffer)
+    ):
+        raise TypeError(
+            f"{type(replay_buffer).__name__} does not support push_batch, which is "
+            "required to store the transitions of actors"
+        )
+
+    context = mp.get_context(start_method)
+    # weights of the policy learner, shared with the actors
+    shared_state = {
+        key: value.detach().cpu().clone().share_memory_()
+        for key, value in agent.policy_learner.state_dict().items()
+        if isinstance(value, Tensor)
+    }
+    weights_version = context.Value("q", 0)
+    actor_steps = context.Array("q", number_of_actors)
+    message_queue = context.Queue(maxsize=queue_size)
+    stop_event = context.Event()
+    exit_event = context.Event()
+    actors = [
+        context.Process(
+            target=_run_actor,
+            args=(
+                actor_index,
+                agent_factory,
+                env_factory,
+                message_queue,
+                shared_state,
+                weights_version,
+                actor_steps,
+                stop_event,
+                exit_event,
+                transitions_per_message,
+                None if seed is None else seed + actor_index + 1,
+            ),
+            daemon=True,
+        )
+        for actor_index in range(number_of_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    returns = []
+    stopped_actors = set()
+
+    def receive_messages(block: bool) -> None:
+        """Pushes received transitions to the replay buffer and records returns."""
+        while True:
+            try:
+                kind, actor_index, payload = message_queue.get(
+                    block=block, timeout=_QUEUE_TIMEOUT if block else None
+                )
+            except queue.Empty:
+                _check_actors_are_alive(actors, stopped_actors)
+                return
+            block = False
+            if kind == _TRANSITIONS:
+                if not stop_event.is_set():
+                    replay_buffer.push_batch(payload)
+            elif kind == _EPISODE_RETURN:
+                returns.append(payload)
+            else:
+                stopped_actors.add(actor_index)
+
+    initial_training_steps = agent.policy_learner._training_steps
+    learner_updates = 0
+    last_broadcast_update = 0
+    start_time = time.perf_counter()
+    try:
+        while learner_updates < number_of_learner_updates:
+            can_learn = (
+                len(replay_buffer) > 0 and sum(actor_steps) >= learning_start_step
+            )
+            receive_messages(block=not can_learn)
+            if not can_learn:
+                continue
+            agent.learn()
+            learner_updates = (
+                agent.policy_learner._training_steps - initial_training_steps
+            )
+            if learner_updates - last_broadcast_update >= weight_broadcast_period:
+                _broadcast_weights(agent, shared_state, weights_version)
+                last_broadcast_update = learner_updates
+        elapsed_time = time.perf_counter() - start_time
+        total_actor_steps = sum(actor_steps)
+    finally:
+        stop_event.set()
+        # transitions are received until every actor stopped, so that no actor exits
+        # while the learner may still read tensors from its shared memory
+        while len(stopped_actors) < number_of_actors and any(
+            actor.is_alive() for actor in actors
+        ):
+            try:
+                receive_messages(block=True)
+            except RuntimeError:
+                break
+        exit_event.set()
+        for actor in actors:
+            actor.join()
+
+    return {
+        "return": returns,
+        "actor_steps": total_actor_steps,
+        "learner_updates": learner_updates,
+        "actor_steps_per_second": total_actor_steps / elapsed_time,
+        "learner_updates_per_second": learner_updates / elapsed_time,
+    }
+
+
+def _broadcast_weights(
+    agent: PearlAgent,
+    shared_state: dict[str, Tensor],
+    weights_version: Any,
+) -> None:
+    """Copies the weights of the policy learner of `agent` to shared memory."""
+    state = agent.policy_learner.state_dict()
+    with weights_version.get_lock():
+        for key, value in shared_state.items():
+            value.copy_(state[key])
+        weights_version.value += 1
+
+
+def _check_actors_are_alive(
+    actors: list[mp.Process], stopped_actors: set[int]
+) -> None:
+    for actor_index, actor in enumerate(actors):
+        if actor_index not in stopped_actors and actor.exitcode is not None:
+            raise RuntimeError(
+                f"Actor {actor_index} exited unexpectedly with exit code "
+                f"{actor.exitcode}"
+            )
+
+
+def _put_message(
+    message_queue: mp.Queue,
+    message: tuple[str, int, object],
+    stop_event: Any,
+) -> None:
+    """Puts `message` in the queue, unless learning stops while the queue is full."""
+    while True:
+        try:
+            message_queue.put(message, timeout=_QUEUE_TIMEOUT)
+            return
+        except queue.Full:
+            if stop_event.is_set():
+                return
+
+
+def _run_actor(
+    actor_index: int,
+    agent_factory: Callable[[], PearlAgent],
+    env_factory: Callable[[], Environment],
+    message_queue: mp.Queue,
+    shared_state: dict[str, Tensor],
+    weights_version: Any,
+    actor_steps: Any,
+    stop_event: Any,
+    exit_event: Any,
+    transitions_per_message: int,
+    seed: int | None,
+) -> None:
+    """Body of the actor processes."""
+    # actors run in parallel, so each of them uses a single thread
+    torch.set_num_threads(1)
+    if seed is not None:
+        set_seed(seed)
+    agent = agent_factory()
+    # the transitions observed by the agent are collected and sent to the learner
+    transitions = BasicReplayBuffer(transitions_per_message)
+    transitions.device_for_batches = torch.device("cpu")
+    agent.replay_buffer = transitions
+    transitions._is_action_continuous = agent.policy_learner._is_action_continuous
+    env = env_factory()
+    local_weights_version = -1
+
+    while not stop_event.is_set():
+        observation, action_space = env.reset(seed=seed)
+        seed = None  # only the first episode is seeded
+        agent.reset(observation, action_space)
+        episode_return = 0.0
+        done = False
+        while not done and not stop_event.is_set():
+            if weights_version.value != local_weights_version:
+                with weights_version.get_lock():
+                    agent.policy_learner.load_state_dict(shared_state, strict=False)
+                    local_weights_version = weights_version.value
+            action = agent.act(exploit=False)
+            action = action.cpu() if isinstance(action, Tensor) else action
+            action_result = env.step(action)
+            agent.observe(action_result)
+            # pyre-fixme[58]: `+` is not supported for operand types `float` and
+            #  `object`.
+            episode_return += action_result.reward
+            done = action_result.done
+            actor_steps[actor_index] += 1
+            if len(transitions) >= transitions_per_message:
+                _put_message(
+                    message_queue,
+                    (_TRANSITIONS, actor_index, transitions.sample(len(transitions))),
+                    stop_event,
+                )
+                transitions.clear()
+        if done:
+            _put_message(
+                message_queue,
+                (_EPISODE_RETURN, actor_index, float(episode_return)),
+                stop_event,
+            )
+
+    # the learner receives messages until every actor stopped, so this cannot block
+    # forever
+    message_queue.put((_STOPPED, actor_index, None))
+    # the learner may still be reading tensors sent by this process
+    exit_event.wait()
+    env.close()
@@ -12,23 +12,27 @@ import math
 import os
 import time
 
-from typing import Optional
+from typing import Any, Optional
 
 import torch
 
 from pearl.api.environment import Environment
 from pearl.pearl_agent import PearlAgent
-from pearl.replay_buffers import BasicReplayBuffer
+from pearl.replay_buffers import BasicReplayBuffer, MemmapReplayBuffer
 from pearl.replay_buffers.replay_buffer import ReplayBuffer
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
 from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from pearl.utils.functional_utils.learning.metrics_accumulator import (
+    MetricsAccumulator,
+)
 from pearl.utils.functional_utils.requests_get import requests_get
 from pearl.utils.functional_utils.train_and_eval.learning_logger import (
     LearningLogger,
     null_learning_logger,
 )
 from pearl.utils.functional_utils.train_and_eval.online_learning import run_episode
-from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from pearl.utils.offline_dataset import to_discrete_action_space
 
 
 TRAINING_TAG = "training"
@@ -77,6 +81,78 @@ def get_offline_data_in_buffer(
             The transition tuples are in the format as expected by a Pearl agent.
     """
 
+    _check_max_number_actions(is_action_continuous, max_number_actions_if_discrete)
+    raw_transitions_buffer = _load_raw_transitions(url, data_path, device)
+
+    offline_data_replay_buffer = BasicReplayBuffer(size)
+    if is_action_continuous:
+        offline_data_replay_buffer._is_action_continuous = True
+
+    # only the last `size` transitions fit in the replay buffer
+    _push_raw_transitions(
+        offline_data_replay_buffer,
+        list(raw_transitions_buffer)[-size:],
+        is_action_continuous,
+        max_number_actions_if_discrete,
+    )
+    return offline_data_replay_buffer
+
+
+def convert_offline_data_to_memmap_buffer(
+    directory: str,
+    is_action_continuous: bool,
+    url: str | None = None,
+    data_path: str | None = None,
+    max_number_actions_if_discrete: int | None = None,
+    chunk_size: int = 100000,
+    pin_memory: bool = False,
+) -> MemmapReplayBuffer:
+    """
+    One-time conversion of offline data in the `.pt` format read by
+    `get_offline_data_in_buffer` into a `MemmapReplayBuffer` stored in `directory`.
+
+    The `.pt` file still has to be unpickled once, but transitions are then written to
+    disk `chunk_size` at a time. The resulting buffer can later be reopened with
+    `MemmapReplayBuffer.load(directory)` and used by `offline_learning` without loading
+    the dataset in memory.
+
+    Args:
+        directory (str): directory in which the on-disk buffer is created.
+        is_action_continuous (bool): whether the action space is continuous or discrete.
+        url (str, optional): from where offline data needs to be fetched from.
+        data_path (str, optional): local path to the offline data.
+        max_number_actions_if_discrete (int, optional): maximum number of actions, required
+            for discrete action spaces (see `get_offline_data_in_buffer`).
+        chunk_size (int): number of transitions written to disk at a time.
+        pin_memory (bool): whether batches sampled from the buffer use pinned memory.
+
+    Returns:
+        MemmapReplayBuffer: an on-disk replay buffer holding all offline transitions.
+    """
+    _check_max_number_actions(is_action_continuous, max_number_actions_if_discrete)
+    raw_transitions = list(_load_raw_transitions(url, data_path, "cpu"))
+    if len(raw_transitions) == 0:
+        raise ValueError("Cannot convert an empty offline dataset")
+
+    replay_buffer = MemmapReplayBuffer(
+        len(raw_transitions), directory, pin_memory=pin_memory
+    )
+    if is_action_continuous:
+        replay_buffer._is_action_continuous = True
+    for start in range(0, len(raw_transitions), chunk_size):
+        _push_raw_transitions(
+            replay_buffer,
+            raw_transitions[start : start + chunk_size],
+            is_action_continuous,
+            max_number_actions_if_discrete,
+        )
+    replay_buffer.flush()
+    return replay_buffer
+
+
+def _check_max_number_actions(
+    is_action_continuous: bool, max_number_actions_if_discrete: int | None
+) -> None:
     if is_action_continuous:
         if max_number_actions_if_discrete is not None:
             raise ValueError(
@@ -89,54 +165,101 @@ def get_offline_data_in_buffer(
             max_number_actions to be an integer value"
         )
 
+
+def _load_raw_transitions(url: str | None, data_path: str | None, device: str) -> Any:
+    """Loads offline data in the `.pt` format from a url or a local path."""
     if url is not None:
         offline_transitions_data = requests_get(url)
         stream = io.BytesIO(offline_transitions_data.content)  # implements seek()
-        raw_transitions_buffer = torch.load(
-            stream, map_location=torch.device(device), weights_only=False
-        )
-    else:
-        if data_path is None:
-            raise ValueError(
-                "provide either a data_path or a url to fetch offline data"
-            )
+        return torch.load(stream, map_location=torch.device(device), weights_only=False)
 
-        # loads data on the specified device
-        raw_transitions_buffer = torch.load(
-            data_path, map_location=torch.device(device), weights_only=False
-        )
+    if data_path is None:
+        raise ValueError("provide either a data_path or a url to fetch offline data")
 
-    offline_data_replay_buffer = BasicReplayBuffer(size)
-    if is_action_continuous:
-        offline_data_replay_buffer._is_action_continuous = True
+    # loads data on the specified device
+    return torch.load(data_path, map_location=torch.device(device), weights_only=False)
 
-    for transition in raw_transitions_buffer:
-        if transition["curr_available_actions"].__class__.__name__ == "Discrete":
-            transition["curr_available_actions"] = DiscreteActionSpace(
-                actions=list(
-                    torch.arange(transition["curr_available_actions"].n).view(-1, 1)
-                )
-            )
-        if transition["next_available_actions"].__class__.__name__ == "Discrete":
-            transition["next_available_actions"] = DiscreteActionSpace(
-                actions=list(
-                    torch.arange(transition["next_available_actions"].n).view(-1, 1)
-                )
-            )
 
-        offline_data_replay_buffer.push(
-            state=transition["observation"],
-            action=transition["action"],
-            reward=transition["reward"],
-            next_state=transition["next_observation"],
-            curr_available_actions=transition["curr_available_actions"],
-            next_available_actions=transition["next_available_actions"],
-            terminated=transition["done"],
-            truncated=False,
+def _push_raw_transitions(
+    replay_buffer: TensorBasedReplayBuffer,
+    raw_transitions: list[dict[str, Any]],
+    is_action_continuous: bool,
+    max_number_actions_if_discrete: int | None,
+) -> None:
+    """Pushes raw transition dictionaries into a replay buffer as a single batch."""
+    if len(raw_transitions) == 0:
+        return
+
+    batch = TransitionBatch(
+        state=_stack_column(raw_transitions, "observation"),
+        action=_stack_column(raw_transitions, "action"),
+        reward=_stack_column(raw_transitions, "reward").reshape(-1),
+        next_state=_stack_column(raw_transitions, "next_observation"),
+        terminated=_stack_column(raw_transitions, "done").reshape(-1).bool(),
+        truncated=torch.zeros(len(raw_transitions), dtype=torch.bool),
+    )
+    if is_action_continuous:
+        replay_buffer.push_batch(batch)
+        return
+
+    assert max_number_actions_if_discrete is not None
+    curr_action_spaces = _distinct_values(raw_transitions, "curr_available_actions")
+    next_action_spaces = _distinct_values(raw_transitions, "next_available_actions")
+    if len(curr_action_spaces) == 1 and len(next_action_spaces) == 1:
+        # the common case of a fixed action space: pad it only once for all transitions
+        replay_buffer.push_batch(
+            batch,
+            curr_available_actions=to_discrete_action_space(curr_action_spaces[0]),
+            next_available_actions=to_discrete_action_space(next_action_spaces[0]),
             max_number_actions=max_number_actions_if_discrete,
         )
-
-    return offline_data_replay_buffer
+        return
+
+    (
+        batch.curr_available_actions,
+        batch.curr_unavailable_actions_mask,
+    ) = _stack_available_actions(
+        raw_transitions, "curr_available_actions", max_number_actions_if_discrete
+    )
+    (
+        batch.next_available_actions,
+        batch.next_unavailable_actions_mask,
+    ) = _stack_available_actions(
+        raw_transitions, "next_available_actions", max_number_actions_if_discrete
+    )
+    replay_buffer.push_batch(batch)
+
+
+def _stack_column(raw_transitions: list[dict[str, Any]], key: str) -> torch.Tensor:
+    """Stacks the values of `key` in all raw transitions into a single tensor."""
+    return torch.stack(
+        [torch.as_tensor(transition[key]).cpu() for transition in raw_transitions]
+    )
+
+
+def _distinct_values(raw_transitions: list[dict[str, Any]], key: str) -> list[Any]:
+    """Returns the distinct objects (by identity) stored under `key` in raw transitions."""
+    return list({id(t[key]): t[key] for t in raw_transitions}.values())
+
+
+def _stack_available_actions(
+    raw_transitions: list[dict[str, Any]], key: str, max_number_actions: int
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Stacks the padded available actions tensors and masks of the action spaces stored
+    under `key` in all raw transitions, padding each distinct action space only once.
+    """
+    padded_actions: dict[int, tuple[torch.Tensor, torch.Tensor]] = {}
+    for action_space in _distinct_values(raw_transitions, key):
+        actions_tensor, mask = TensorBasedReplayBuffer.create_action_tensor_and_mask(
+            max_number_actions, to_discrete_action_space(action_space)
+        )
+        assert actions_tensor is not None and mask is not None
+        padded_actions[id(action_space)] = (actions_tensor, mask)
+    return (
+        torch.stack([padded_actions[id(t[key])][0] for t in raw_transitions]),
+        torch.stack([padded_actions[id(t[key])][1] for t in raw_transitions]),
+    )
 
 
 def offline_learning(
@@ -146,6 +269,7 @@ def offline_learning(
     number_of_batches: Optional[int] = None,
     learning_logger: LearningLogger = null_learning_logger,
     seed: Optional[int] = None,
+    logging_interval: int = 1000,
 ) -> None:
     """
     Trains the offline agent using transition tuples from offline data (provided in
@@ -164,7 +288,16 @@ def offline_learning(
         logger (LearningLogger, optional): a LearningLogger to log the training loss
                                            (default is no-op logger).
         seed (int, optional): random seed (default is `int(time.time())`).
+        logging_interval (int, default 1000): number of batches between two calls of
+                        the learning logger, which receives the means of the scalar
+                        metrics reported over these batches. Metrics are accumulated on
+                        the device of the agent and only transferred to the host when
+                        logged.
     """
+    if logging_interval < 1:
+        raise ValueError(
+            f"logging_interval must be positive, but got {logging_interval}."
+        )
     if seed is None:
         seed = int(time.time())
     set_seed(seed=seed)
@@ -185,12 +318,13 @@ def offline_learning(
     data_buffer.device_for_batches = offline_agent.device
 
     # training loop
+    metrics = MetricsAccumulator()
     for i in range(number_of_batches):
         batch = data_buffer.sample(offline_agent.policy_learner.batch_size)
         assert isinstance(batch, TransitionBatch)
-        loss = offline_agent.learn_batch(batch=batch)
-        if i % 1000 == 0:
-            learning_logger(loss, i, batch, TRAINING_TAG)
+        metrics.record(offline_agent.learn_batch(batch=batch))
+        if (i + 1) % logging_interval == 0 or i == number_of_batches - 1:
+            learning_logger(metrics.reduce(), i, batch, TRAINING_TAG)
 
 
 def offline_evaluation(
@@ -17,6 +17,10 @@ from pearl.api.environment import Environment
 from pearl.api.reward import Value
 from pearl.pearl_agent import PearlAgent
 from pearl.utils.functional_utils.experimentation.plots import fontsize_for
+from pearl.utils.instantiations.environments.vector_gym_environment import (
+    VectorGymEnvironment,
+)
+from pearl.vector_pearl_agent import VectorPearlAgent
 
 MA_WINDOW_SIZE = 10
 
@@ -163,6 +167,114 @@ def online_learning(
     return info
 
 
+def online_learning_vectorized(
+    agent: VectorPearlAgent,
+    env: VectorGymEnvironment,
+    number_of_episodes: int | None = None,
+    number_of_steps: int | None = None,
+    learn_every_k_steps: int = 1,
+    print_every_x_episodes: int | None = None,
+    seed: int | None = None,
+    record_period: int = 1,
+    learning_start_step: int = 0,
+) -> dict[str, Any]:
+    """
+    Performs online learning with a `VectorPearlAgent` stepping all environments of a
+    `VectorGymEnvironment` at once, for a number of episodes or environment steps
+    (summed over all environments).
+
+    Args:
+        agent (VectorPearlAgent): the agent, with one history per environment of `env`.
+        env (VectorGymEnvironment): the vectorized environment.
+        number_of_episodes (int, optional): the number of episodes to complete.
+        number_of_steps (int, optional): the number of environment steps to run.
+        learn_every_k_steps (int, optional): number of steps of the vectorized
+            environment (each made of one step per environment) between two calls of
+            agent.learn().
+        print_every_x_episodes (int, optional): prints information every x episodes.
+        seed (int, optional): the seed for the environments.
+        record_period (int): number of completed episodes between two records; episodic
+            statistics collected within this period are averaged and then recorded.
+            Defaults to 1.
+        learning_start_step (int, optional): the agent starts to learn at
+            learning_start_step environment steps. Defaults to 0.
+    Returns:
+        A dict whose "return" entry contains the returns of completed episodes
+        (averaged over each record period), in the order in which episodes were
+        completed, and whose "env_index" entry contains the index of the environment
+        of each episode when record_period is 1.
+    """
+    assert (number_of_episodes is None and number_of_steps is not None) or (
+        number_of_episodes is not None and number_of_steps is None
+    )
+    assert learn_every_k_steps > 0, "learn_every_k_steps must be positive"
+    if agent.number_of_envs != env.number_of_envs:
+        raise ValueError(
+            f"The agent has {agent.number_of_envs} environments but the vectorized "
+            f"environment has {env.number_of_envs}"
+        )
+    number_of_envs = env.number_of_envs
+    observations, action_space = env.reset(seed=seed)
+    agent.reset_batch(observations, action_space)
+    cum_rewards = torch.zeros(number_of_envs)
+    total_steps = 0
+    total_vector_steps = 0
+    total_episodes = 0
+    info = {}
+    info_period = {}
+    while True:
+        if number_of_episodes is not None and total_episodes >= number_of_episodes:
+            break
+        if number_of_steps is not None and total_steps >= number_of_steps:
+            break
+        actions = agent.act_batch(exploit=False)
+        action_result = env.step(actions)
+        agent.observe_batch(
+            observations=action_result.observation,
+            rewards=action_result.reward,
+            terminated=action_result.terminated,
+            truncated=action_result.truncated,
+        )
+        cum_rewards += action_result.reward
+        total_steps += number_of_envs
+        total_vector_steps += 1
+        if (
+            total_steps >= learning_start_step
+            and total_vector_steps % learn_every_k_steps == 0
+        ):
+            agent.learn()
+
+        done_env_indices = torch.nonzero(action_result.done).view(-1)
+        if len(done_env_indices) == 0:
+            continue
+        for env_index in done_env_indices.tolist():
+            total_episodes += 1
+            episode_return = cum_rewards[env_index].item()
+            info_period.setdefault("return", []).append(episode_return)
+            if record_period == 1:
+                info.setdefault("env_index", []).append(env_index)
+            if (
+                print_every_x_episodes is not None
+                and total_episodes % print_every_x_episodes == 0
+            ):
+                print(
+                    f"episode {total_episodes}, step {total_steps}, agent={agent}, "
+                    f"env={env}",
+                )
+                print(f"return: {episode_return} (environment {env_index})")
+            if total_episodes % record_period == 0:
+                for key in info_period:
+                    info.setdefault(key, []).append(np.mean(info_period[key]))
+                info_period = {}
+        cum_rewards[done_env_indices] = 0
+        agent.reset_batch(
+            action_result.reset_observation[done_env_indices],
+            action_space,
+            env_indices=done_env_indices,
+        )
+    return info
+
+
 def target_return_is_reached(
     target_return: Value,
     max_episodes: int,
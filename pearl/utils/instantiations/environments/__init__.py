@@ -25,6 +25,7 @@ from .sparse_reward_environment import (
     DiscreteSparseRewardEnvironment,
     SparseRewardEnvironment,
 )
+from .vector_gym_environment import VectorActionResult, VectorGymEnvironment
 
 
 __all__ = [
@@ -39,4 +40,6 @@ __all__ = [
     "RewardIsEqualToTenTimesActionMultiArmBanditEnvironment",
     "SLCBEnvironment",
     "SparseRewardEnvironment",
+    "VectorActionResult",
+    "VectorGymEnvironment",
 ]
@@ -0,0 +1,196 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import functools
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import torch
+from pearl.api.action_space import ActionSpace
+from pearl.api.space import Space
+from pearl.utils.instantiations.environments.gym_environment import (
+    _get_pearl_space,
+    gym,
+    GYM_TO_PEARL_ACTION_SPACE,
+    GYM_TO_PEARL_OBSERVATION_SPACE,
+)
+from torch import Tensor
+
+
+@dataclass
+class VectorActionResult:
+    """
+    The result of a step of a `VectorGymEnvironment`, with one row per environment.
+
+    For environments whose episode ended in this step, `observation` is the last
+    observation of the episode and `reset_observation` is the first observation of the
+    next episode (the environment is reset automatically). For other environments, both
+    are the same.
+    """
+
+    observation: Tensor
+    reward: Tensor
+    terminated: Tensor
+    truncated: Tensor
+    reset_observation: Tensor
+    info: dict[str, Any]
+
+    @property
+    def done(self) -> Tensor:
+        return self.terminated | self.truncated
+
+
+class VectorGymEnvironment:
+    """
+    A wrapper for gym vector environments (`gym.vector.SyncVectorEnv`, or
+    `gym.vector.AsyncVectorEnv` which steps environments in subprocesses) returning
+    batched observations, rewards and termination flags as tensors. It is meant to be
+    used with a `VectorPearlAgent` (see `online_learning_vectorized`).
+
+    Actions, observations and rewards are converted for the whole batch at once.
+    Environments are reset automatically at the end of their episodes, in the same step
+    (see `VectorActionResult`).
+    """
+
+    def __init__(
+        self,
+        env_or_env_name: gym.vector.VectorEnv | str,
+        number_of_envs: int = 1,
+        asynchronous: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Constructs a `VectorGymEnvironment` wrapper.
+
+        Args:
+            env_or_env_name: A gym vector environment or a name of a gym.Env.
+            number_of_envs: The number of copies of the environment, used if the first
+                argument is a string.
+            asynchronous: Whether the copies of the environment are stepped in
+                subprocesses, used if the first argument is a string.
+            kwargs: Keyword arguments passed to `gym.make()` if the first argument is a
+                string.
+        """
+        if isinstance(env_or_env_name, str):
+            env_fns = [
+                functools.partial(gym.make, env_or_env_name, **kwargs)
+            ] * number_of_envs
+            vector_kwargs = {}
+            if hasattr(gym.vector, "AutoresetMode"):
+                vector_kwargs["autoreset_mode"] = gym.vector.AutoresetMode.SAME_STEP
+            vector_env_cls = (
+                gym.vector.AsyncVectorEnv if asynchronous else gym.vector.SyncVectorEnv
+            )
+            env = vector_env_cls(env_fns, **vector_kwargs)
+        else:
+            env = env_or_env_name
+        _check_autoreset_mode(env)
+        self.env: gym.vector.VectorEnv = env
+        self._action_space: ActionSpace = _get_pearl_space(
+            gym_space=env.single_action_space,
+            gym_to_pearl_map=GYM_TO_PEARL_ACTION_SPACE,
+        )
+        self._observation_space: Space = _get_pearl_space(
+            gym_space=env.single_observation_space,
+            gym_to_pearl_map=GYM_TO_PEARL_OBSERVATION_SPACE,
+        )
+        self._is_action_discrete: bool = (
+            env.single_action_space.__class__.__name__ == "Discrete"
+        )
+
+    @property
+    def number_of_envs(self) -> int:
+        return self.env.num_envs
+
+    @property
+    def action_space(self) -> ActionSpace:
+        """Returns the Pearl action space of each environment."""
+        return self._action_space
+
+    @property
+    def observation_space(self) -> Space:
+        """Returns the Pearl observation space of each environment."""
+        return self._observation_space
+
+    def reset(self, seed: int | None = None) -> tuple[Tensor, ActionSpace]:
+        """
+        Resets all environments and returns their initial observations and the initial
+        action space. Environment `i` is seeded with `seed + i`.
+        """
+        # pyre-fixme: ActionSpace does not have _gym_space
+        # FIXME: private attribute _gym_space should not be accessed
+        self._action_space._gym_space.seed(seed)
+        self.env.action_space.seed(seed)
+        observations, _ = self.env.reset(seed=seed)
+        return _observations_to_tensor(observations), self.action_space
+
+    def step(self, actions: Tensor) -> VectorActionResult:
+        """Takes one step in all environments given one action per environment."""
+        if self._is_action_discrete:
+            gym_actions = actions.reshape(-1).numpy(force=True).astype(np.int64)
+        else:
+            gym_actions = actions.numpy(force=True)
+        observations, rewards, terminated, truncated, info = self.env.step(gym_actions)
+        reset_observations = _observations_to_tensor(observations)
+        terminated = torch.as_tensor(terminated, dtype=torch.bool)
+        truncated = torch.as_tensor(truncated, dtype=torch.bool)
+
+        final_observations = reset_observations
+        for key in ("final_obs", "final_observation"):
+            if key in info:
+                final_observations = reset_observations.clone()
+                mask = info[f"_{key}"]
+                for i in np.flatnonzero(mask):
+                    final_observations[i] = _observations_to_tensor(info[key][i])
+                break
+
+        return VectorActionResult(
+            observation=final_observations,
+            reward=torch.as_tensor(rewards, dtype=torch.float32),
+            terminated=terminated,
+            truncated=truncated,
+            reset_observation=reset_observations,
+            info=info,
+        )
+
+    def close(self) -> None:
+        self.env.close()
+
+    def __str__(self) -> str:
+        spec = getattr(self.env, "spec", None)
+        name = spec.id if spec is not None else "CustomGymEnvironment"
+        return f"{name} x {self.number_of_envs}"
+
+
+def _observations_to_tensor(observations: object) -> Tensor:
+    observations = np.asarray(observations)
+    if observations.dtype == np.float64:
+        observations = observations.astype(np.float32)
+    return torch.from_numpy(observations)
+
+
+def _check_autoreset_mode(env: gym.vector.VectorEnv) -> None:
+    """
+    Checks that `env` resets environments in the same step their episode ends, which
+    makes the last observation of the episode available in the step info.
+    """
+    autoreset_mode = env.metadata.get("autoreset_mode")
+    if autoreset_mode is None:
+        # vector environments of gymnasium 1.0 always reset in the next step
+        if gym.__version__.startswith("1.0"):
+            raise ValueError(
+                "VectorGymEnvironment requires gymnasium < 1.0 or >= 1.1, whose vector "
+                "environments can be reset in the same step"
+            )
+        return
+    if getattr(autoreset_mode, "value", autoreset_mode) != "SameStep":
+        raise ValueError(
+            "VectorGymEnvironment requires a vector environment with "
+            f"autoreset_mode=SAME_STEP, got {autoreset_mode}"
+        )
@@ -67,6 +67,7 @@ class DiscreteActionSpace(DiscreteSpace, ActionSpace):
                 )
             validated_actions.append(action)
         self.elements = validated_actions
+        self._actions_batch: Tensor | None = None
 
     @property
     def actions(self) -> list[Action]:
@@ -76,8 +77,16 @@ class DiscreteActionSpace(DiscreteSpace, ActionSpace):
     @property
     def actions_batch(self) -> Tensor:
         """Returns a tensor of shape `(b, d)` with each row corresponding to an
-        `Action` object from this action space."""
-        return torch.stack(self.actions, dim=0)
+        `Action` object from this action space.
+
+        The tensor is computed once and reused by subsequent calls (until the space is
+        moved to another device), so it must not be modified in place."""
+        # `getattr` supports action spaces unpickled from before this attribute existed
+        actions_batch = getattr(self, "_actions_batch", None)
+        if actions_batch is None:
+            actions_batch = torch.stack(self.actions, dim=0)
+            self._actions_batch = actions_batch
+        return actions_batch
 
     @property
     def action_dim(self) -> int:
@@ -108,3 +117,6 @@ class DiscreteActionSpace(DiscreteSpace, ActionSpace):
     def to(self, device: torch.device) -> None:
         for i, action in enumerate(self.actions):
             self.actions[i] = action.to(device)
+        actions_batch = getattr(self, "_actions_batch", None)
+        if actions_batch is not None and actions_batch.device != device:
+            self._actions_batch = actions_batch.to(device)
@@ -0,0 +1,470 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+"""
+A columnar, sharded on-disk format for offline RL datasets.
+
+A dataset is a directory containing:
+    - `header.json`: the format version, whether actions are continuous, the maximum
+      number of actions, the dtype and row shape of each column and the list of shards.
+    - `shard_XXXXXX.pt`: one file per shard, holding a dictionary of column tensors
+      (saved with `torch.save`, so it is loaded with `weights_only=True` and can be
+      memory-mapped).
+    - `action_spaces.pt` (discrete actions only): the distinct available action spaces,
+      as a list of `(number_of_actions, action_dim)` tensors. Transitions store the
+      index of their current and next action spaces in this list.
+
+Datasets are written incrementally (and can be appended to) with `OfflineDatasetWriter`
+and read with `OfflineDataset`, either shard by shard or by random access.
+`OfflineDatasetReplayBuffer` samples from a dataset for `offline_learning`.
+"""
+
+import json
+import os
+from collections.abc import Iterator
+from typing import Any
+
+import torch
+from pearl.api.action import Action
+from pearl.api.action_space import ActionSpace
+from pearl.api.reward import Reward
+from pearl.api.state import SubjectiveState
+from pearl.replay_buffers.memmap_replay_buffer import _dtype_from_string
+from pearl.replay_buffers.replay_buffer import ReplayBuffer
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.device import get_default_device
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from torch import Tensor
+
+FORMAT_VERSION = 1
+HEADER_FILE_NAME = "header.json"
+ACTION_SPACES_FILE_NAME = "action_spaces.pt"
+
+
+def to_discrete_action_space(action_space: Any) -> DiscreteActionSpace:
+    """Converts gym `Discrete` action spaces into Pearl's `DiscreteActionSpace`."""
+    if action_space.__class__.__name__ == "Discrete":
+        return DiscreteActionSpace(
+            actions=list(torch.arange(action_space.n).view(-1, 1))
+        )
+    return action_space
+
+
+def _read_header(directory: str) -> dict[str, Any]:
+    with open(os.path.join(directory, HEADER_FILE_NAME)) as f:
+        header = json.load(f)
+    if header["format_version"] != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported offline dataset format version {header['format_version']}"
+        )
+    return header
+
+
+def _action_space_key(actions: Tensor) -> bytes:
+    """
+    The content of an action space tensor, including its shape and dtype, since
+    tensors of other shapes or dtypes can have the same bytes.
+    """
+    layout = f"{tuple(actions.shape)} {actions.dtype}".encode()
+    return layout + actions.numpy().tobytes()
+
+
+class OfflineDatasetWriter:
+    """
+    Writes transitions to an offline dataset directory, one shard of `shard_size`
+    transitions at a time. If the directory already holds a dataset, new transitions
+    are appended to it.
+
+    Rows are buffered in memory until a shard is full; call `close` (or use the writer
+    as a context manager) to write the last, possibly smaller, shard.
+
+    Args:
+        directory: directory of the dataset. It is created if needed.
+        is_action_continuous: whether the action space is continuous.
+        max_number_actions: maximum number of available actions, required for discrete
+            action spaces (see `TensorBasedReplayBuffer.create_action_tensor_and_mask`).
+        shard_size: number of transitions per shard.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        is_action_continuous: bool = False,
+        max_number_actions: int | None = None,
+        shard_size: int = 10000,
+    ) -> None:
+        if not is_action_continuous and max_number_actions is None:
+            raise ValueError("max_number_actions is required for discrete actions")
+        if shard_size <= 0:
+            raise ValueError(f"shard_size must be positive, got {shard_size}")
+        self.directory = directory
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+
+        self._action_spaces: list[Tensor] = []
+        if os.path.isfile(os.path.join(directory, HEADER_FILE_NAME)):
+            self._header: dict[str, Any] = _read_header(directory)
+            if (
+                self._header["is_action_continuous"] != is_action_continuous
+                or self._header["max_number_actions"] != max_number_actions
+            ):
+                raise ValueError(
+                    f"Cannot append to dataset {directory} which has different "
+                    "action space settings"
+                )
+            if not is_action_continuous:
+                self._action_spaces = torch.load(
+                    os.path.join(directory, ACTION_SPACES_FILE_NAME), weights_only=True
+                )
+        else:
+            self._header = {
+                "format_version": FORMAT_VERSION,
+                "is_action_continuous": is_action_continuous,
+                "max_number_actions": max_number_actions,
+                "columns": {},
+                "shards": [],
+            }
+        # maps the content of each action space to its index
+        self._action_space_ids: dict[bytes, int] = {
+            _action_space_key(actions): i
+            for i, actions in enumerate(self._action_spaces)
+        }
+        # the last action space seen and its index, first looked up by identity
+        self._last_action_space: tuple[Any, int] | None = None
+        self._pending_rows: dict[str, list[Tensor]] = {}
+        self._number_of_pending_rows = 0
+
+    @property
+    def is_action_continuous(self) -> bool:
+        return self._header["is_action_continuous"]
+
+    def __len__(self) -> int:
+        written = sum(shard["number_of_rows"] for shard in self._header["shards"])
+        return written + self._number_of_pending_rows
+
+    def _action_space_id(self, action_space: ActionSpace) -> int:
+        last_action_space = self._last_action_space
+        if last_action_space is not None and last_action_space[0] is action_space:
+            return last_action_space[1]
+        actions = to_discrete_action_space(action_space).actions_batch.cpu()
+        key = _action_space_key(actions)
+        action_space_id = self._action_space_ids.get(key)
+        if action_space_id is None:
+            action_space_id = len(self._action_spaces)
+            self._action_spaces.append(actions.clone())
+            self._action_space_ids[key] = action_space_id
+        self._last_action_space = (action_space, action_space_id)
+        return action_space_id
+
+    def append(
+        self,
+        observation: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        next_observation: SubjectiveState,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions: ActionSpace | None = None,
+        next_available_actions: ActionSpace | None = None,
+    ) -> None:
+        """Adds a transition, writing a shard if `shard_size` transitions are pending."""
+        row = {
+            "state": torch.as_tensor(observation).cpu(),
+            "action": torch.as_tensor(action).cpu(),
+            "reward": torch.as_tensor(reward, dtype=torch.float32).cpu(),
+            "next_state": torch.as_tensor(next_observation).cpu(),
+            "terminated": torch.as_tensor(bool(terminated)),
+            "truncated": torch.as_tensor(bool(truncated)),
+        }
+        if not self.is_action_continuous:
+            if curr_available_actions is None or next_available_actions is None:
+                raise ValueError("Available actions are required for discrete actions")
+            row["curr_action_space_id"] = torch.tensor(
+                self._action_space_id(curr_available_actions)
+            )
+            row["next_action_space_id"] = torch.tensor(
+                self._action_space_id(next_available_actions)
+            )
+        for name, value in row.items():
+            self._pending_rows.setdefault(name, []).append(value)
+        self._number_of_pending_rows += 1
+        if self._number_of_pending_rows >= self.shard_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes pending transitions as a new shard and updates the header."""
+        if self._number_of_pending_rows == 0:
+            return
+        columns = {name: torch.stack(rows) for name, rows in self._pending_rows.items()}
+        layouts = self._header["columns"]
+        for name, column in columns.items():
+            if name not in layouts:
+                layouts[name] = {
+                    "dtype": str(column.dtype),
+                    "shape": list(column.shape[1:]),
+                }
+            elif list(column.shape[1:]) != layouts[name]["shape"]:
+                raise ValueError(
+                    f"Column {name} has rows of shape {list(column.shape[1:])}, "
+                    f"expected {layouts[name]['shape']}"
+                )
+            columns[name] = column.to(_dtype_from_string(layouts[name]["dtype"]))
+
+        shards = self._header["shards"]
+        file_name = f"shard_{len(shards):06d}.pt"
+        torch.save(columns, os.path.join(self.directory, file_name))
+        shards.append(
+            {"file_name": file_name, "number_of_rows": len(columns["reward"])}
+        )
+        if not self.is_action_continuous:
+            torch.save(
+                self._action_spaces,
+                os.path.join(self.directory, ACTION_SPACES_FILE_NAME),
+            )
+        # the header is replaced atomically, so readers never see a partial header
+        header_path = os.path.join(self.directory, HEADER_FILE_NAME)
+        with open(header_path + ".tmp", "w") as f:
+            json.dump(self._header, f)
+        os.replace(header_path + ".tmp", header_path)
+
+        self._pending_rows = {}
+        self._number_of_pending_rows = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "OfflineDatasetWriter":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+class OfflineDataset:
+    """
+    Reads an offline dataset written by `OfflineDatasetWriter`.
+
+    Shards are loaded lazily, memory-mapped by default, so that reading can start
+    before (and without) the whole dataset being loaded. `iter_batches` yields one
+    `TransitionBatch` per shard, and `get_batch` gathers arbitrary transitions by index,
+    e.g. for shuffling.
+
+    Args:
+        directory: directory of the dataset.
+        mmap: whether shards are memory-mapped instead of read in memory.
+        max_cached_shards: number of loaded shards kept for subsequent reads. The least
+            recently read shard is evicted first.
+    """
+
+    def __init__(
+        self, directory: str, mmap: bool = True, max_cached_shards: int = 16
+    ) -> None:
+        self.directory = directory
+        self.mmap = mmap
+        self.max_cached_shards = max_cached_shards
+        self._header: dict[str, Any] = _read_header(directory)
+        number_of_rows = torch.tensor(
+            [shard["number_of_rows"] for shard in self._header["shards"]],
+            dtype=torch.long,
+        )
+        self._shard_ends: Tensor = number_of_rows.cumsum(0)
+        self._shard_starts: Tensor = self._shard_ends - number_of_rows
+        self._shards: dict[int, dict[str, Tensor]] = {}
+
+        self._padded_actions: Tensor | None = None
+        self._unavailable_actions_mask: Tensor | None = None
+        if not self.is_action_continuous:
+            action_spaces = torch.load(
+                os.path.join(directory, ACTION_SPACES_FILE_NAME), weights_only=True
+            )
+            padded_actions_and_masks = [
+                TensorBasedReplayBuffer.create_action_tensor_and_mask(
+                    self._header["max_number_actions"],
+                    DiscreteActionSpace(actions=list(actions)),
+                )
+                for actions in action_spaces
+            ]
+            self._padded_actions = torch.stack([a for a, _ in padded_actions_and_masks])
+            self._unavailable_actions_mask = torch.stack(
+                [mask for _, mask in padded_actions_and_masks]
+            )
+
+    @property
+    def is_action_continuous(self) -> bool:
+        return self._header["is_action_continuous"]
+
+    @property
+    def number_of_shards(self) -> int:
+        return len(self._header["shards"])
+
+    def __len__(self) -> int:
+        return int(self._shard_ends[-1]) if self.number_of_shards > 0 else 0
+
+    def _load_shard(self, shard_id: int) -> dict[str, Tensor]:
+        shard = self._shards.pop(shard_id, None)
+        if shard is None:
+            file_name = self._header["shards"][shard_id]["file_name"]
+            shard = torch.load(
+                os.path.join(self.directory, file_name),
+                mmap=self.mmap,
+                weights_only=True,
+            )
+            if len(self._shards) >= self.max_cached_shards:
+                self._shards.pop(next(iter(self._shards)))
+        # shards are kept from the least to the most recently read
+        self._shards[shard_id] = shard
+        return shard
+
+    @property
+    def shard_sizes(self) -> Tensor:
+        """The number of transitions of each shard."""
+        return self._shard_ends - self._shard_starts
+
+    def shard_range(self, shard_id: int) -> tuple[int, int]:
+        """The global indices of the first and past the last transitions of a shard."""
+        return int(self._shard_starts[shard_id]), int(self._shard_ends[shard_id])
+
+    def _create_transition_batch(self, columns: dict[str, Tensor]) -> TransitionBatch:
+        columns = dict(columns)
+        curr_action_space_id = columns.pop("curr_action_space_id", None)
+        next_action_space_id = columns.pop("next_action_space_id", None)
+        batch = TransitionBatch(
+            state=columns["state"].float(),
+            action=columns["action"],
+            reward=columns["reward"],
+            next_state=columns["next_state"].float(),
+            terminated=columns["terminated"],
+            truncated=columns["truncated"],
+        )
+        if curr_action_space_id is not None and next_action_space_id is not None:
+            padded_actions = self._padded_actions
+            mask = self._unavailable_actions_mask
+            assert padded_actions is not None and mask is not None
+            batch.curr_available_actions = padded_actions[curr_action_space_id]
+            batch.curr_unavailable_actions_mask = mask[curr_action_space_id]
+            batch.next_available_actions = padded_actions[next_action_space_id]
+            batch.next_unavailable_actions_mask = mask[next_action_space_id]
+        return batch
+
+    def iter_batches(self) -> Iterator[TransitionBatch]:
+        """Yields the transitions of each shard, in order, as a `TransitionBatch`."""
+        for shard_id in range(self.number_of_shards):
+            yield self._create_transition_batch(self._load_shard(shard_id))
+
+    def get_batch(self, indices: Tensor) -> TransitionBatch:
+        """Returns the transitions at the given (global) indices as a `TransitionBatch`."""
+        indices = indices.cpu().long()
+        if len(indices) > 0 and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Indices out of range for a dataset of size {len(self)}")
+        columns = {
+            name: torch.empty(
+                (len(indices), *layout["shape"]),
+                dtype=_dtype_from_string(layout["dtype"]),
+            )
+            for name, layout in self._header["columns"].items()
+        }
+        shard_ids = torch.searchsorted(self._shard_ends, indices, right=True)
+        for shard_id in torch.unique(shard_ids).tolist():
+            positions = (shard_ids == shard_id).nonzero().squeeze(1)
+            rows = indices[positions] - self._shard_starts[shard_id]
+            for name, column in self._load_shard(shard_id).items():
+                columns[name][positions] = column[rows]
+        return self._create_transition_batch(columns)
+
+
+class OfflineDatasetReplayBuffer(ReplayBuffer):
+    """
+    A read-only replay buffer view of an `OfflineDataset`, which samples transitions
+    uniformly at random (with replacement) by random access into its shards. It can be
+    passed to `offline_learning` to train on a dataset without loading it in memory.
+
+    Batches sampled from the whole dataset read from up to `batch_size` shards, so when
+    the dataset has many more shards than `max_cached_shards`, most reads load a shard.
+    With `shard_local=True`, each batch is instead sampled from a single shard, chosen
+    with a probability proportional to its number of transitions, so each transition is
+    still sampled with the same probability, but transitions of a batch are correlated.
+
+    Args:
+        dataset: the offline dataset to sample from.
+        shard_local: whether each batch is sampled from a single shard.
+    """
+
+    def __init__(self, dataset: OfflineDataset, shard_local: bool = False) -> None:
+        super().__init__()
+        self.dataset = dataset
+        self.shard_local = shard_local
+        self._is_action_continuous = dataset.is_action_continuous
+        self._device_for_batches: torch.device = get_default_device()
+        self._sampling_generator: torch.Generator | None = None
+
+    @property
+    def device_for_batches(self) -> torch.device:
+        return self._device_for_batches
+
+    @device_for_batches.setter
+    def device_for_batches(self, new_device_for_batches: torch.device) -> None:
+        self._device_for_batches = new_device_for_batches
+
+    def push(
+        self,
+        state: SubjectiveState,
+        action: Action,
+        reward: Reward,
+        terminated: bool,
+        truncated: bool,
+        curr_available_actions: ActionSpace | None = None,
+        next_state: SubjectiveState | None = None,
+        next_available_actions: ActionSpace | None = None,
+        max_number_actions: int | None = None,
+        cost: float | None = None,
+    ) -> None:
+        raise NotImplementedError(
+            f"{type(self).__name__} is read-only; use OfflineDatasetWriter to add data"
+        )
+
+    def sample(self, batch_size: int) -> TransitionBatch:
+        """
+        Samples `batch_size` transitions uniformly at random with replacement.
+        Indices are sorted so that each shard is read in increasing offset order.
+        """
+        if batch_size > len(self):
+            raise ValueError(
+                f"Can't get a batch of size {batch_size} from a replay buffer with "
+                f"only {len(self)} elements"
+            )
+        start, end = 0, len(self)
+        if self.shard_local:
+            shard_id = int(
+                torch.multinomial(
+                    self.dataset.shard_sizes.float(),
+                    1,
+                    generator=self._sampling_generator,
+                )
+            )
+            start, end = self.dataset.shard_range(shard_id)
+        indices = (
+            torch.randint(
+                start, end, (batch_size,), generator=self._sampling_generator
+            )
+            .sort()
+            .values
+        )
+        batch = self.dataset.get_batch(indices)
+        batch.buffer_index = indices
+        return batch.to(self.device_for_batches)
+
+    def seed_sampling(self, seed: int) -> None:
+        self._sampling_generator = torch.Generator().manual_seed(seed)
+
+    def clear(self) -> None:
+        raise NotImplementedError(f"{type(self).__name__} is read-only")
+
+    def __len__(self) -> int:
+        return len(self.dataset)
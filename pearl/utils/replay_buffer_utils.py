@@ -1,6 +1,9 @@
 # (c) Meta Platforms, Inc. and affiliates. Confidential and proprietary.
 
 # pyre-strict
+import random
+from abc import abstractmethod
+
 import torch
 
 from pearl.api.action import Action
@@ -36,9 +39,71 @@ def create_attribute_column_tensor(
     return attr_column_tensor
 
 
+class ReplayBufferWithColumns(TensorBasedReplayBuffer):
+    """
+    A TensorBasedReplayBuffer whose transitions can be complemented by columns, i.e.
+    tensors with one row per transition of `memory` (in the same order), such as the
+    returns or advantages computed by on-policy learners with batched tensor
+    operations. When columns are set, they are gathered by index into sampled batches
+    instead of being read from each transition. Subclasses discard columns when
+    transitions are stored, since rows would no longer be aligned with `memory`.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity)
+        self._columns: dict[str, Tensor] = {}
+
+    def set_columns(self, **columns: Tensor) -> None:
+        """Sets columns, which must have one row per transition of `memory`."""
+        for name, value in columns.items():
+            if len(value) != len(self.memory):
+                raise ValueError(
+                    f"Column {name} has {len(value)} rows, expected {len(self.memory)}"
+                )
+        self._columns = columns
+
+    def column(self, name: str) -> Tensor:
+        return self._columns[name]
+
+    @abstractmethod
+    def _batch_with_columns(
+        self, batch: TransitionBatch, columns: dict[str, Tensor]
+    ) -> TransitionBatch:
+        """Returns `batch` complemented with the rows of columns of its transitions."""
+        pass
+
+    def sample(self, batch_size: int) -> TransitionBatch:
+        if len(self._columns) == 0:
+            return super().sample(batch_size)
+        if batch_size > len(self):
+            raise ValueError(
+                f"Can't get a batch of size {batch_size} from a replay buffer with "
+                f"only {len(self)} elements"
+            )
+        sampling_random = (
+            self._sampling_random if self._sampling_random is not None else random
+        )
+        indices = sampling_random.sample(range(len(self.memory)), batch_size)
+        batch = TensorBasedReplayBuffer._create_transition_batch(
+            self,
+            transitions=[self.memory[i] for i in indices],
+            is_action_continuous=self._is_action_continuous,
+        )
+        index_tensor = torch.tensor(indices)
+        columns = {
+            name: value[index_tensor.to(value.device)].to(batch.device)
+            for name, value in self._columns.items()
+        }
+        return self._batch_with_columns(batch, columns)
+
+    def clear(self) -> None:
+        super().clear()
+        self._columns = {}
+
+
 def make_replay_buffer_class_for_specific_transition_types(
     TransitionType: type[Transition], TransitionBatchType: type[TransitionBatch]
-) -> type[TensorBasedReplayBuffer]:
+) -> type[ReplayBufferWithColumns]:
     """
     Creates a subclass of TensorBasedReplayBuffer with the specified
     TransitionType and TransitionBatchType.
@@ -49,7 +114,7 @@ def make_replay_buffer_class_for_specific_transition_types(
 
     # We define a local class using the given transition types,
     # and that will be returned as the result.
-    class ReplayBufferForGivenTransitionTypes(TensorBasedReplayBuffer):
+    class ReplayBufferForGivenTransitionTypes(ReplayBufferWithColumns):
         # This statement is one reason why making this a generic class does not work;
         # if this is a generic class on TransitionType, then this function call passes
         # the TypeVar, rather than the value of the TypeVar, as an argument,
@@ -78,6 +143,7 @@ def make_replay_buffer_class_for_specific_transition_types(
         ) -> None:
             # Another point that prevents this from being a generic class;
             # in a generic class, TranstionType would be a TypeVar and non-callable.
+            self._columns = {}
             self.memory.append(
                 TransitionType(
                     state=self._process_non_optional_single_state(state),
@@ -93,6 +159,20 @@ def make_replay_buffer_class_for_specific_transition_types(
                 )
             )
 
+        def _store_batch(self, batch: TransitionBatch) -> None:
+            self._columns = {}
+            self.memory.extend(
+                self._split_batch_into_transitions(
+                    batch, transition_type=TransitionType
+                )
+            )
+
+        def _batch_with_columns(
+            self, batch: TransitionBatch, columns: dict[str, Tensor]
+        ) -> TransitionBatchType:
+            # pyre-fixme[16]: `TransitionBatch` has no attribute `from_parent`.
+            return TransitionBatchType.from_parent(batch, **columns)
+
         @staticmethod
         def include_attrs_in_batch(
             attr_names: list[str],
@@ -0,0 +1,142 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+"""
+Micro-benchmark comparing the training throughput of `BootstrappedDQN` when each
+ensemble member is trained on its own filtered sub-batch (as `learn_batch` used to),
+with the bootstrap mask applied as loss weights of all members at once, using either
+the `Ensemble` model or the `StackedEnsemble` model.
+To run it, enter the pearl directory and run
+python -m pearl.utils.scripts.benchmark_bootstrapped_dqn
+"""
+
+import time
+
+import torch
+from pearl.neural_networks.sequential_decision_making.q_value_networks import (
+    EnsembleQValueNetwork,
+)
+from pearl.policy_learners.sequential_decision_making.bootstrapped_dqn import (
+    BootstrappedDQN,
+)
+from pearl.replay_buffers.transition import (
+    filter_batch_by_bootstrap_mask,
+    TransitionWithBootstrapMaskBatch,
+)
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+def learn_batch_per_member(
+    policy_learner: BootstrappedDQN, batch: TransitionWithBootstrapMaskBatch
+) -> float:
+    """The per-member training step which `BootstrappedDQN.learn_batch` replaces."""
+    loss_ensemble = torch.tensor(0.0)
+    mask = batch.bootstrap_mask
+    assert mask is not None
+    for z in range(policy_learner.ensemble_size):
+        index = torch.tensor(z)
+        if mask[:, index].sum() == 0:
+            continue
+        batch_filtered = filter_batch_by_bootstrap_mask(batch=batch, z=index)
+        assert (next_state := batch_filtered.next_state) is not None
+        assert (next_actions := batch_filtered.next_available_actions) is not None
+        unavailable_actions_mask = batch_filtered.next_unavailable_actions_mask
+        assert unavailable_actions_mask is not None
+        state_action_values = policy_learner._Q.get_q_values(
+            batch_filtered.state, batch_filtered.action, z=index
+        )
+        with torch.no_grad():
+            next_state_action_values = policy_learner._Q.get_q_values(
+                next_state, next_actions, z=index
+            )
+            next_state_action_values[unavailable_actions_mask] = -float("inf")
+            next_state_values = policy_learner._Q_target.get_q_values(
+                next_state, next_actions, z=index
+            ).gather(1, next_state_action_values.argmax(dim=1, keepdim=True))
+        expected_state_action_values = (
+            next_state_values.squeeze(1)
+            * policy_learner._discount_factor
+            * (1 - batch_filtered.terminated.float())
+        ) + batch_filtered.reward
+        loss_ensemble += torch.nn.functional.mse_loss(
+            state_action_values, expected_state_action_values
+        )
+    policy_learner._optimizer.zero_grad()
+    loss_ensemble.backward()
+    policy_learner._optimizer.step()
+    return loss_ensemble.item()
+
+
+def benchmark_bootstrapped_dqn(
+    number_of_steps: int = 200,
+    ensemble_size: int = 10,
+    batch_size: int = 128,
+    state_dim: int = 32,
+    number_of_actions: int = 8,
+    hidden_dims: list[int] | None = None,
+) -> dict[str, float]:
+    """
+    Times `number_of_steps` training steps of `BootstrappedDQN` with the per-member
+    loop, and with the vectorized `learn_batch` for both ensemble models.
+
+    Returns:
+        A dictionary with the number of training steps per second of each.
+    """
+    action_space = DiscreteActionSpace(
+        actions=list(torch.arange(number_of_actions).view(-1, 1))
+    )
+    batch = TransitionWithBootstrapMaskBatch(
+        state=torch.randn(batch_size, state_dim),
+        action=torch.randint(number_of_actions, (batch_size, 1)).float(),
+        reward=torch.randn(batch_size),
+        terminated=torch.rand(batch_size) < 0.1,
+        truncated=torch.zeros(batch_size, dtype=torch.bool),
+        next_state=torch.randn(batch_size, state_dim),
+        next_available_actions=torch.arange(number_of_actions)
+        .view(1, -1, 1)
+        .expand(batch_size, -1, -1)
+        .float(),
+        next_unavailable_actions_mask=torch.zeros(
+            batch_size, number_of_actions, dtype=torch.bool
+        ),
+        bootstrap_mask=torch.randint(2, (batch_size, ensemble_size)),
+    )
+    results = {}
+    for name, stacked, learn_batch in (
+        ("per-member loop", False, learn_batch_per_member),
+        ("masked losses, Ensemble", False, BootstrappedDQN.learn_batch),
+        ("masked losses, StackedEnsemble", True, BootstrappedDQN.learn_batch),
+    ):
+        policy_learner = BootstrappedDQN(
+            action_space=action_space,
+            q_ensemble_network=EnsembleQValueNetwork(
+                state_dim=state_dim,
+                action_dim=1,
+                hidden_dims=hidden_dims or [64, 64],
+                output_dim=1,
+                ensemble_size=ensemble_size,
+                stacked=stacked,
+            ),
+        )
+        # warm up
+        learn_batch(policy_learner, batch)
+        start = time.perf_counter()
+        for _ in range(number_of_steps):
+            learn_batch(policy_learner, batch)
+        results[name] = number_of_steps / (time.perf_counter() - start)
+    return results
+
+
+def main() -> None:
+    set_seed(0)
+    for name, steps_per_second in benchmark_bootstrapped_dqn().items():
+        print(f"{name}: {steps_per_second:.1f} training steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+"""
+Micro-benchmark comparing the training throughput (on CPU) of the policy learners of
+the online benchmark methods of `benchmark_config`, when their losses are computed
+eagerly and when they are compiled with `torch.compile` (`compile=True`).
+Policy learners are trained on synthetic transitions, so that no environment is needed.
+To run it, enter the pearl directory and run
+python -m pearl.utils.scripts.benchmark_compiled_training
+"""
+
+import time
+from typing import Any
+
+import torch
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.api.action_space import ActionSpace
+from pearl.pearl_agent import PearlAgent
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from pearl.utils.instantiations.spaces.box_action import BoxActionSpace
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from pearl.utils.scripts.benchmark_config import (
+    all_online_continuous_control_methods,
+    all_online_discrete_control_methods,
+)
+
+
+def create_agent(
+    method: dict[str, Any], state_dim: int, action_space: ActionSpace, compile: bool
+) -> PearlAgent:
+    """
+    Creates an agent with the policy learner, exploration module, replay buffer and
+    safety module of a benchmark method.
+    """
+    policy_learner_args = dict(method["policy_learner_args"])
+    policy_learner_args["state_dim"] = state_dim
+    policy_learner_args["action_space"] = action_space
+    policy_learner_args["compile"] = compile
+    if "exploration_module" in method:
+        policy_learner_args["exploration_module"] = method["exploration_module"](
+            **method["exploration_module_args"]
+        )
+    if method.get("action_representation_module") is (
+        OneHotActionTensorRepresentationModule
+    ):
+        assert isinstance(action_space, DiscreteActionSpace)
+        policy_learner_args["action_representation_module"] = (
+            OneHotActionTensorRepresentationModule(max_number_actions=action_space.n)
+        )
+    return PearlAgent(
+        policy_learner=method["policy_learner"](**policy_learner_args),
+        replay_buffer=method["replay_buffer"](**method["replay_buffer_args"]),
+        safety_module=(
+            method["safety_module"](**method["safety_module_args"])
+            if "safety_module" in method
+            else None
+        ),
+    )
+
+
+def push_transitions(
+    agent: PearlAgent,
+    action_space: ActionSpace,
+    state_dim: int,
+    number_of_transitions: int,
+    episode_length: int = 20,
+) -> None:
+    """Pushes episodes of random transitions to the replay buffer of an agent."""
+    max_number_actions = (
+        action_space.n if isinstance(action_space, DiscreteActionSpace) else None
+    )
+    state = torch.randn(state_dim)
+    for i in range(number_of_transitions):
+        if isinstance(action_space, DiscreteActionSpace):
+            action = torch.randint(action_space.n, (1,))
+        else:
+            assert isinstance(action_space, BoxActionSpace)
+            action = action_space.sample()
+        next_state = torch.randn(state_dim)
+        terminated = (i + 1) % episode_length == 0 or i == number_of_transitions - 1
+        agent.replay_buffer.push(
+            state=state,
+            action=action,
+            reward=float(torch.randn(())),
+            terminated=terminated,
+            truncated=False,
+            curr_available_actions=action_space,
+            next_state=next_state,
+            next_available_actions=action_space,
+            max_number_actions=max_number_actions,
+        )
+        state = torch.randn(state_dim) if terminated else next_state
+
+
+def benchmark_compiled_training(
+    number_of_steps: int = 200,
+    state_dim: int = 8,
+    number_of_actions: int = 4,
+    action_dim: int = 2,
+) -> dict[str, tuple[float, float]]:
+    """
+    Times `number_of_steps` calls of `learn` of the agent of each benchmark method, with
+    eager and compiled losses. Methods whose networks are built from the environment
+    (such as Dueling DQN and Bootstrapped DQN) are skipped.
+
+    Returns:
+        A dictionary with the number of training steps per second of each method, with
+        eager and compiled losses.
+    """
+    discrete_action_space = DiscreteActionSpace(
+        actions=[torch.tensor([i]) for i in range(number_of_actions)]
+    )
+    box_action_space = BoxActionSpace(
+        low=-torch.ones(action_dim), high=torch.ones(action_dim)
+    )
+    results = {}
+    for methods, action_space in (
+        (all_online_discrete_control_methods, discrete_action_space),
+        (all_online_continuous_control_methods, box_action_space),
+    ):
+        for method in methods:
+            if "network_module" in method:
+                continue
+            steps_per_second = []
+            for compile in (False, True):
+                set_seed(0)
+                agent = create_agent(method, state_dim, action_space, compile)
+                batch_size = method["policy_learner_args"]["batch_size"]
+                push_transitions(agent, action_space, state_dim, 4 * batch_size)
+                on_policy = agent.policy_learner.on_policy
+                # warm up, which also compiles the losses of compiled policy learners
+                agent.learn()
+                elapsed_time = 0.0
+                for _ in range(number_of_steps):
+                    if on_policy:
+                        # on-policy agents clear their replay buffer after learning
+                        push_transitions(agent, action_space, state_dim, batch_size)
+                    start = time.perf_counter()
+                    agent.learn()
+                    elapsed_time += time.perf_counter() - start
+                training_rounds = agent.policy_learner._training_rounds
+                steps_per_second.append(
+                    number_of_steps * training_rounds / elapsed_time
+                )
+            results[method["name"]] = (steps_per_second[0], steps_per_second[1])
+    return results
+
+
+def main() -> None:
+    torch.set_num_threads(1)
+    for name, (eager_steps_per_second, compiled_steps_per_second) in (
+        benchmark_compiled_training().items()
+    ):
+        print(
+            f"{name}: eager {eager_steps_per_second:.1f} training steps/s, "
+            f"compiled {compiled_steps_per_second:.1f} training steps/s "
+            f"({compiled_steps_per_second / eager_steps_per_second:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+"""
+Micro-benchmark comparing the latency of `PearlAgent.act(exploit=True)` with the one of
+the inference policy exported with `PolicyLearner.export_inference_policy`.
+To run it, enter the pearl directory and run
+python -m pearl.utils.scripts.benchmark_inference_policy
+"""
+
+import time
+
+import torch
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+def benchmark_inference_policy(
+    number_of_calls: int = 10_000,
+    state_dim: int = 17,
+    number_of_actions: int = 16,
+    hidden_dims: list[int] | None = None,
+) -> dict[str, float]:
+    """
+    Selects greedy actions for `number_of_calls` single states with a DQN agent and with
+    its exported inference policy, and checks that both select the same actions.
+
+    Returns:
+        A dictionary with the mean latency (in microseconds) of both.
+    """
+    action_space = DiscreteActionSpace(
+        actions=[torch.tensor([i]) for i in range(number_of_actions)]
+    )
+    agent = PearlAgent(
+        policy_learner=DeepQLearning(
+            state_dim=state_dim,
+            action_space=action_space,
+            hidden_dims=hidden_dims or [64, 64],
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=number_of_actions
+            ),
+        ),
+    )
+    states = torch.randn(number_of_calls, state_dim)
+    inference_policy = agent.policy_learner.export_inference_policy(states[:1])
+    action_mask = torch.zeros(1, number_of_actions, dtype=torch.bool)
+
+    # each state is set with `reset`, which is not timed
+    agent_time = 0.0
+    agent_actions = []
+    for state in states:
+        agent.reset(state, action_space)
+        start = time.perf_counter()
+        agent_actions.append(agent.act(exploit=True))
+        agent_time += time.perf_counter() - start
+
+    start = time.perf_counter()
+    action_indices = []
+    with torch.no_grad():
+        for state in states:
+            action_indices.append(inference_policy(state.unsqueeze(0), action_mask))
+    inference_policy_time = time.perf_counter() - start
+
+    for agent_action, action_index in zip(agent_actions, action_indices):
+        assert torch.equal(agent_action, action_space.actions[action_index.item()])
+    return {
+        "agent_latency": agent_time / number_of_calls * 1e6,
+        "inference_policy_latency": inference_policy_time / number_of_calls * 1e6,
+    }
+
+
+def main() -> None:
+    set_seed(0)
+    torch.set_num_threads(1)
+    results = benchmark_inference_policy()
+    print(
+        f"PearlAgent.act(exploit=True): {results['agent_latency']:.1f} us/call, "
+        f"exported inference policy: {results['inference_policy_latency']:.1f} us/call"
+    )
+
+
+if __name__ == "__main__":
+    main()
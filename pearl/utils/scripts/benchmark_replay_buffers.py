@@ -0,0 +1,95 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+"""
+Micro-benchmark comparing push and sample throughput of replay buffers.
+To run it, enter the pearl directory and run
+python -m pearl.utils.scripts.benchmark_replay_buffers
+"""
+
+import time
+from collections.abc import Callable
+
+import torch
+from pearl.replay_buffers import (
+    BasicReplayBuffer,
+    ColumnarReplayBuffer,
+    PrioritizedReplayBuffer,
+)
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+def benchmark_replay_buffer(
+    replay_buffer_factory: Callable[[int], TensorBasedReplayBuffer],
+    capacity: int = 1_000_000,
+    number_of_pushes: int = 200_000,
+    number_of_samples: int = 1_000,
+    batch_size: int = 256,
+    state_dim: int = 17,
+    number_of_actions: int = 4,
+) -> dict[str, float]:
+    """
+    Pushes `number_of_pushes` random transitions into a replay buffer and then samples
+    `number_of_samples` batches of size `batch_size` from it.
+
+    Returns:
+        A dictionary with push and sample throughputs (in transitions per second).
+    """
+    replay_buffer = replay_buffer_factory(capacity)
+    action_space = DiscreteActionSpace(
+        actions=[torch.tensor([i]) for i in range(number_of_actions)]
+    )
+    states = torch.randn(number_of_pushes + 1, state_dim)
+    actions = torch.randint(number_of_actions, (number_of_pushes,))
+    rewards = torch.randn(number_of_pushes)
+
+    start = time.perf_counter()
+    for i in range(number_of_pushes):
+        replay_buffer.push(
+            state=states[i],
+            action=actions[i],
+            reward=rewards[i].item(),
+            terminated=False,
+            truncated=False,
+            curr_available_actions=action_space,
+            next_state=states[i + 1],
+            next_available_actions=action_space,
+            max_number_actions=number_of_actions,
+        )
+    push_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(number_of_samples):
+        replay_buffer.sample(batch_size)
+    sample_time = time.perf_counter() - start
+
+    return {
+        "pushes_per_second": number_of_pushes / push_time,
+        "sampled_transitions_per_second": number_of_samples * batch_size / sample_time,
+    }
+
+
+def main() -> None:
+    set_seed(0)
+    replay_buffer_factories: dict[str, Callable[[int], TensorBasedReplayBuffer]] = {
+        "BasicReplayBuffer (deque)": BasicReplayBuffer,
+        "ColumnarReplayBuffer": ColumnarReplayBuffer,
+        "PrioritizedReplayBuffer": PrioritizedReplayBuffer,
+    }
+    for name, replay_buffer_factory in replay_buffer_factories.items():
+        results = benchmark_replay_buffer(replay_buffer_factory)
+        print(
+            f"{name}: "
+            f"{results['pushes_per_second']:.0f} pushes/s, "
+            f"{results['sampled_transitions_per_second']:.0f} sampled transitions/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
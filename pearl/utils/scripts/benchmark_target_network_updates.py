@@ -0,0 +1,149 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+"""
+Micro-benchmark comparing the per-step cost of the soft target network updates of
+policy learners using target networks, when updating parameters one at a time (as
+`update_target_network` used to) and with the fused multi-tensor updates of
+`update_target_network`.
+To run it, enter the pearl directory and run
+python -m pearl.utils.scripts.benchmark_target_network_updates
+"""
+
+import time
+
+import torch
+import torch.nn as nn
+from pearl.neural_networks.common.utils import update_target_network
+from pearl.neural_networks.sequential_decision_making.twin_critic import TwinCritic
+from pearl.policy_learners.policy_learner import PolicyLearner
+from pearl.policy_learners.sequential_decision_making.ddpg import (
+    DeepDeterministicPolicyGradient,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.policy_learners.sequential_decision_making.implicit_q_learning import (
+    ImplicitQLearning,
+)
+from pearl.policy_learners.sequential_decision_making.soft_actor_critic_continuous import (  # noqa E501
+    ContinuousSoftActorCritic,
+)
+from pearl.policy_learners.sequential_decision_making.td3 import TD3
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from pearl.utils.instantiations.spaces.box_action import BoxActionSpace
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+def update_target_network_per_parameter(
+    target_network: nn.Module, source_network: nn.Module, tau: float
+) -> None:
+    """The per-parameter soft update which `update_target_network` replaces."""
+    for target_param, source_param in zip(
+        target_network.parameters(), source_network.parameters()
+    ):
+        if target_param is source_param:
+            continue
+        new_param = tau * source_param.data + (1.0 - tau) * target_param.data
+        target_param.data.copy_(new_param)
+
+
+def target_network_pairs(
+    policy_learner: PolicyLearner,
+) -> list[tuple[nn.Module, nn.Module]]:
+    """
+    Returns the (target network, source network) pairs soft-updated by a policy learner
+    after each gradient step.
+    """
+    if hasattr(policy_learner, "_Q_target"):
+        return [(policy_learner._Q_target, policy_learner._Q)]
+    pairs = []
+    if getattr(policy_learner, "_use_critic_target", False):
+        critic_target = policy_learner._critic_target
+        critic = policy_learner._critic
+        if isinstance(critic_target, TwinCritic):
+            pairs.extend(
+                zip(
+                    critic_target._critic_networks_combined,
+                    critic._critic_networks_combined,
+                )
+            )
+        else:
+            pairs.append((critic_target, critic))
+    if getattr(policy_learner, "_use_actor_target", False):
+        pairs.append((policy_learner._actor_target, policy_learner._actor))
+    return pairs
+
+
+def benchmark_target_network_updates(
+    number_of_steps: int = 1000,
+    state_dim: int = 64,
+    hidden_dims: list[int] | None = None,
+) -> dict[str, tuple[float, float]]:
+    """
+    Times the target network updates of each policy learner using target networks,
+    with the per-parameter and the fused updates.
+
+    Returns:
+        A dictionary with the mean time (in microseconds) of the per-parameter and fused
+        updates of each policy learner.
+    """
+    hidden_dims = hidden_dims or [256, 256, 256]
+    discrete_action_space = DiscreteActionSpace(
+        actions=[torch.tensor([i]) for i in range(8)]
+    )
+    box_action_space = BoxActionSpace(low=-torch.ones(4), high=torch.ones(4))
+    actor_critic_args = {
+        "state_dim": state_dim,
+        "action_space": box_action_space,
+        "actor_hidden_dims": hidden_dims,
+        "critic_hidden_dims": hidden_dims,
+    }
+    policy_learners: dict[str, PolicyLearner] = {
+        "DQN": DeepQLearning(
+            state_dim=state_dim,
+            action_space=discrete_action_space,
+            hidden_dims=hidden_dims,
+        ),
+        "DDPG": DeepDeterministicPolicyGradient(**actor_critic_args),
+        "TD3": TD3(**actor_critic_args),
+        "SAC": ContinuousSoftActorCritic(**actor_critic_args),
+        "IQL": ImplicitQLearning(
+            value_critic_hidden_dims=hidden_dims, **actor_critic_args
+        ),
+    }
+    results = {}
+    for name, policy_learner in policy_learners.items():
+        pairs = target_network_pairs(policy_learner)
+        times = []
+        for update in (update_target_network_per_parameter, update_target_network):
+            for target_network, source_network in pairs:
+                # warm up, which also caches parameter groups of fused updates
+                update(target_network, source_network, 0.005)
+            start = time.perf_counter()
+            for _ in range(number_of_steps):
+                for target_network, source_network in pairs:
+                    update(target_network, source_network, 0.005)
+            times.append((time.perf_counter() - start) / number_of_steps * 1e6)
+        results[name] = (times[0], times[1])
+    return results
+
+
+def main() -> None:
+    set_seed(0)
+    for name, (per_parameter_time, fused_time) in (
+        benchmark_target_network_updates().items()
+    ):
+        print(
+            f"{name}: per-parameter updates {per_parameter_time:.1f} us/step, "
+            f"fused updates {fused_time:.1f} us/step "
+            f"({per_parameter_time / fused_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import copy
+from typing import Sequence
+
+import torch
+from pearl.api.action_space import ActionSpace
+from pearl.history_summarization_modules.history_summarization_module import (
+    HistorySummarizationModule,
+)
+from pearl.history_summarization_modules.identity_history_summarization_module import (
+    IdentityHistorySummarizationModule,
+)
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.policy_learner import PolicyLearner
+from pearl.replay_buffers.prefetching_replay_buffer import PrefetchingReplayBuffer
+from pearl.replay_buffers.replay_buffer import ReplayBuffer
+from pearl.replay_buffers.tensor_based_replay_buffer import TensorBasedReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.safety_modules.safety_module import SafetyModule
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from torch import Tensor
+
+
+class VectorPearlAgent(PearlAgent):
+    """
+    A PearlAgent interacting with `number_of_envs` independent copies of an environment
+    at once (e.g. a gymnasium vector environment). `act_batch` selects the actions of all
+    environments with a single call to `PolicyLearner.act_batch` (a single forward pass
+    for DQN-style and actor-critic learners), and `observe_batch` stores the transitions
+    of all environments with a single `push_batch` for tensor-based replay buffers.
+
+    Each environment has its own history summarization module. For the default
+    `IdentityHistorySummarizationModule`, the batch of observations is used as the batch
+    of subjective states directly. Other modules are copied once per environment; the
+    copies share the parameters of `history_summarization_module` (which are the ones
+    trained by the policy learner) and only keep their own history.
+
+    All environments share the same available action space. Transitions of different
+    environments are interleaved in the replay buffer, so replay buffers and policy
+    learners relying on consecutive transitions forming trajectories (e.g. hindsight
+    experience replay, PPO or REINFORCE) are not supported.
+
+    The single-environment API of `PearlAgent` (`act`, `observe` and `reset`) remains
+    available and is independent of the batched API.
+    """
+
+    def __init__(
+        self,
+        policy_learner: PolicyLearner,
+        number_of_envs: int,
+        safety_module: SafetyModule | None = None,
+        replay_buffer: ReplayBuffer | None = None,
+        history_summarization_module: HistorySummarizationModule | None = None,
+        device_id: int = -1,
+    ) -> None:
+        """
+        Initializes the VectorPearlAgent.
+
+        Args:
+            policy_learner (PolicyLearner): An instance of PolicyLearner.
+            number_of_envs (int): The number of environments the agent interacts with.
+            safety_module, replay_buffer, history_summarization_module and device_id:
+                see `PearlAgent`.
+        """
+        if number_of_envs <= 0:
+            raise ValueError(
+                f"number_of_envs must be positive, got {number_of_envs}"
+            )
+        super().__init__(
+            policy_learner=policy_learner,
+            safety_module=safety_module,
+            replay_buffer=replay_buffer,
+            history_summarization_module=history_summarization_module,
+            device_id=device_id,
+        )
+        self.number_of_envs = number_of_envs
+        module = self.history_summarization_module
+        self._history_summarization_modules: list[HistorySummarizationModule] | None = (
+            None
+            if isinstance(module, IdentityHistorySummarizationModule)
+            else [
+                # the memo makes the copies share the parameters of the original module
+                copy.deepcopy(module, memo={id(p): p for p in module.parameters()})
+                for _ in range(number_of_envs)
+            ]
+        )
+        self._subjective_states: Tensor | None = None
+        self._histories: Tensor | None = None
+        self._latest_actions: Tensor | None = None
+        self._batch_action_space: ActionSpace | None = None
+
+    def reset_batch(
+        self,
+        observations: object,
+        available_action_space: ActionSpace,
+        env_indices: Sequence[int] | Tensor | None = None,
+    ) -> None:
+        """
+        Resets environments to new episodes.
+
+        Args:
+            observations: the initial observations of the environments being reset,
+                with one row per environment.
+            available_action_space: the action space shared by all environments.
+            env_indices: the indices of the environments being reset (e.g. the ones
+                whose episodes ended in the last step). Defaults to all environments.
+        """
+        observations = torch.as_tensor(observations).to(self.device)
+        if env_indices is None:
+            if observations.shape[0] != self.number_of_envs:
+                raise ValueError(
+                    f"Expected observations for {self.number_of_envs} environments, "
+                    f"got {observations.shape[0]}"
+                )
+            env_indices = range(self.number_of_envs)
+            self.policy_learner.reset(available_action_space)
+        elif self._subjective_states is None:
+            raise ValueError("All environments must be reset before resetting a subset")
+        env_indices = torch.as_tensor(env_indices, dtype=torch.long).reshape(-1)
+        self._batch_action_space = available_action_space
+
+        modules = self._history_summarization_modules
+        if modules is None:
+            states, histories = observations, observations
+        else:
+            states_list, histories_list = [], []
+            for i, observation in zip(env_indices.tolist(), observations):
+                modules[i].reset()
+                modules[i].to(self.device)
+                states_list.append(modules[i].summarize_history(observation, None))
+                histories_list.append(modules[i].get_history())
+            states, histories = torch.stack(states_list), torch.stack(histories_list)
+
+        if len(env_indices) == self.number_of_envs:
+            self._subjective_states = states.clone()
+            self._histories = histories.clone()
+        else:
+            assert self._subjective_states is not None and self._histories is not None
+            index = env_indices.to(self.device)
+            self._subjective_states[index] = states
+            self._histories[index] = histories
+
+    def act_batch(self, exploit: bool = False) -> Tensor:
+        """
+        Selects one action per environment.
+
+        Returns:
+            The actions of all environments, with one row per environment.
+        """
+        subjective_states = self._subjective_states
+        action_space = self._batch_action_space
+        if subjective_states is None or action_space is None:
+            raise ValueError("reset_batch must be called before act_batch")
+        # safety modules filter actions independently of the subjective state
+        safe_action_space = self.safety_module.filter_action(
+            subjective_states, action_space
+        )
+        if isinstance(safe_action_space, DiscreteActionSpace):
+            safe_action_space.to(self.device)
+        actions = self.policy_learner.act_batch(
+            subjective_states, safe_action_space, exploit=exploit
+        )
+        self._latest_actions = actions
+        return actions
+
+    def observe_batch(
+        self,
+        observations: object,
+        rewards: object,
+        terminated: object,
+        truncated: object,
+        available_action_space: ActionSpace | None = None,
+    ) -> None:
+        """
+        Observes the result of the last actions of all environments and stores the
+        corresponding transitions in the replay buffer.
+
+        Args:
+            observations: the next observations, with one row per environment.
+            rewards: the rewards, with one entry per environment.
+            terminated: whether each episode terminated.
+            truncated: whether each episode was truncated.
+            available_action_space: the action space available at the next step, if it
+                changed.
+        """
+        latest_actions = self._latest_actions
+        histories = self._histories
+        action_space = self._batch_action_space
+        if latest_actions is None or histories is None or action_space is None:
+            raise ValueError("act_batch must be called before observe_batch")
+        observations = torch.as_tensor(observations).to(self.device)
+
+        modules = self._history_summarization_modules
+        if modules is None:
+            next_states, next_histories = observations, observations
+        else:
+            latest_actions_representation = (
+                self.policy_learner.action_representation_module(latest_actions)
+            )
+            states_list, histories_list = [], []
+            for i in range(self.number_of_envs):
+                states_list.append(
+                    modules[i].summarize_history(
+                        observations[i], latest_actions_representation[i : i + 1]
+                    )
+                )
+                histories_list.append(modules[i].get_history())
+            next_states = torch.stack(states_list)
+            next_histories = torch.stack(histories_list)
+
+        next_action_space = (
+            action_space if available_action_space is None else available_action_space
+        )
+        self._push_transitions(
+            TransitionBatch(
+                state=histories,
+                action=latest_actions,
+                reward=torch.as_tensor(rewards, dtype=torch.float32).reshape(-1),
+                terminated=torch.as_tensor(terminated).bool().reshape(-1),
+                truncated=torch.as_tensor(truncated).bool().reshape(-1),
+                next_state=next_histories,
+            ),
+            action_space,
+            next_action_space,
+        )
+        self._batch_action_space = next_action_space
+        self._subjective_states = next_states.clone()
+        self._histories = next_histories.clone()
+
+    def _push_transitions(
+        self,
+        batch: TransitionBatch,
+        curr_available_actions: ActionSpace,
+        next_available_actions: ActionSpace,
+    ) -> None:
+        max_number_actions = (
+            self.policy_learner.action_representation_module.max_number_actions
+            if not self.policy_learner._is_action_continuous
+            else None
+        )
+        replay_buffer = self.replay_buffer
+        if isinstance(replay_buffer, PrefetchingReplayBuffer):
+            supports_push_batch = isinstance(
+                replay_buffer.replay_buffer, TensorBasedReplayBuffer
+            )
+        else:
+            supports_push_batch = isinstance(replay_buffer, TensorBasedReplayBuffer)
+        if supports_push_batch:
+            assert isinstance(
+                replay_buffer, (TensorBasedReplayBuffer, PrefetchingReplayBuffer)
+            )
+            replay_buffer.push_batch(
+                batch,
+                curr_available_actions=curr_available_actions,
+                next_available_actions=next_available_actions,
+                # pyre-fixme[6]: For 4th argument expected `Optional[int]` but got
+                #  `Union[None, Tensor, Module]`.
+                max_number_actions=max_number_actions,
+            )
+            return
+        next_state = batch.next_state
+        assert next_state is not None
+        for i in range(len(batch)):
+            replay_buffer.push(
+                state=batch.state[i],
+                action=batch.action[i],
+                reward=batch.reward[i].item(),
+                terminated=bool(batch.terminated[i]),
+                truncated=bool(batch.truncated[i]),
+                curr_available_actions=curr_available_actions,
+                next_state=next_state[i],
+                next_available_actions=next_available_actions,
+                # pyre-fixme[6]: For 9th argument expected `Optional[int]` but got
+                #  `Union[None, Tensor, Module]`.
+                max_number_actions=max_number_actions,
+            )
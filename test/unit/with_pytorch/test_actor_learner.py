@@ -0,0 +1,99 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.api.environment import Environment
+from pearl.pearl_agent import PearlAgent
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.policy_learners.sequential_decision_making.ppo import (
+    PPOReplayBuffer,
+    ProximalPolicyOptimization,
+)
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.utils.functional_utils.train_and_eval.actor_learner import (
+    distributed_online_learning,
+)
+from pearl.utils.instantiations.environments.gym_environment import GymEnvironment
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+def _make_env() -> Environment:
+    return GymEnvironment("CartPole-v1")
+
+
+def _make_agent() -> PearlAgent:
+    action_space = _make_env().action_space
+    assert isinstance(action_space, DiscreteActionSpace)
+    return PearlAgent(
+        policy_learner=DeepQLearning(
+            state_dim=4,
+            action_space=action_space,
+            hidden_dims=[16],
+            training_rounds=2,
+            batch_size=16,
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=action_space.n
+            ),
+        ),
+        replay_buffer=BasicReplayBuffer(10000),
+    )
+
+
+def _make_on_policy_agent() -> PearlAgent:
+    action_space = _make_env().action_space
+    assert isinstance(action_space, DiscreteActionSpace)
+    return PearlAgent(
+        policy_learner=ProximalPolicyOptimization(
+            state_dim=4,
+            action_space=action_space,
+            actor_hidden_dims=[16],
+            critic_hidden_dims=[16],
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=action_space.n
+            ),
+        ),
+        replay_buffer=PPOReplayBuffer(100),
+    )
+
+
+class TestActorLearner(unittest.TestCase):
+    def test_distributed_online_learning(self) -> None:
+        info = distributed_online_learning(
+            agent_factory=_make_agent,
+            env_factory=_make_env,
+            number_of_actors=2,
+            number_of_learner_updates=40,
+            weight_broadcast_period=4,
+            learning_start_step=32,
+            transitions_per_message=8,
+            seed=0,
+            start_method="fork",
+        )
+        self.assertGreaterEqual(info["learner_updates"], 40)
+        self.assertGreaterEqual(info["actor_steps"], 32)
+        self.assertGreater(info["actor_steps_per_second"], 0)
+        self.assertGreater(info["learner_updates_per_second"], 0)
+        for episode_return in info["return"]:
+            self.assertGreater(episode_return, 0)
+
+    def test_on_policy_learners_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            distributed_online_learning(
+                agent_factory=_make_on_policy_agent,
+                env_factory=_make_env,
+                number_of_actors=1,
+                number_of_learner_updates=1,
+                start_method="fork",
+            )
@@ -0,0 +1,97 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.neural_networks.contextual_bandit.batched_linear_regression import (
+    BatchedLinearRegression,
+)
+from pearl.neural_networks.contextual_bandit.linear_regression import LinearRegression
+
+
+class TestBatchedLinearRegression(unittest.TestCase):
+    def setUp(self) -> None:
+        self.n_arms = 4
+        self.feature_dim = 3
+        self.batched_model = BatchedLinearRegression(
+            n_arms=self.n_arms, feature_dim=self.feature_dim, l2_reg_lambda=0.5
+        )
+        self.models = [
+            LinearRegression(feature_dim=self.feature_dim, l2_reg_lambda=0.5)
+            for _ in range(self.n_arms)
+        ]
+
+    def _learn(self, batch_size: int) -> None:
+        x = torch.randn(batch_size, self.feature_dim)
+        y = torch.randn(batch_size, 1)
+        weight = torch.rand(batch_size, 1)
+        # arm 3 never gets observations
+        arm = torch.randint(self.n_arms - 1, (batch_size,))
+        self.batched_model.learn_batch(x=x, y=y, arm=arm, weight=weight)
+        for i, model in enumerate(self.models):
+            mask = arm == i
+            if mask.any():
+                model.learn_batch(x=x[mask], y=y[mask], weight=weight[mask])
+
+    def test_matches_per_arm_models(self) -> None:
+        for _ in range(5):
+            self._learn(batch_size=16)
+        x = torch.randn(7, self.n_arms, self.feature_dim)
+        expected_mu = torch.cat(
+            [model(x[:, i, :]) for i, model in enumerate(self.models)], dim=1
+        )
+        expected_sigma = torch.cat(
+            [model.calculate_sigma(x[:, i, :]) for i, model in enumerate(self.models)],
+            dim=1,
+        )
+        tt.assert_close(self.batched_model(x), expected_mu, atol=1e-4, rtol=1e-4)
+        tt.assert_close(
+            self.batched_model.calculate_sigma(x), expected_sigma, atol=1e-4, rtol=1e-4
+        )
+        tt.assert_close(
+            self.batched_model[0].coefs, self.models[0].coefs, atol=1e-4, rtol=1e-4
+        )
+
+    def test_state_dict_has_per_arm_layout(self) -> None:
+        self._learn(batch_size=16)
+        module_list = torch.nn.ModuleList(self.models)
+        state_dict = self.batched_model.state_dict()
+        self.assertEqual(set(state_dict.keys()), set(module_list.state_dict().keys()))
+
+        # per-arm states can be loaded in the batched model and vice versa
+        batched_model = BatchedLinearRegression(
+            n_arms=self.n_arms, feature_dim=self.feature_dim, l2_reg_lambda=0.5
+        )
+        batched_model.load_state_dict(module_list.state_dict())
+        tt.assert_close(batched_model._A, self.batched_model._A)
+        module_list.load_state_dict(state_dict)
+        self.assertEqual(
+            BatchedLinearRegression.from_linear_regressions(self.models).compare(
+                self.batched_model
+            ),
+            "",
+        )
+
+    def test_posterior_samples(self) -> None:
+        self._learn(batch_size=16)
+        scale = self.batched_model.posterior_scale
+        tt.assert_close(
+            scale @ scale.mT, self.batched_model._inv_A, atol=1e-4, rtol=1e-4
+        )
+        samples = self.batched_model.sample_coefs(number_of_samples=5)
+        self.assertEqual(samples.shape, (5, self.n_arms, self.feature_dim + 1))
+
+        # only the factorizations of updated arms are recomputed
+        self._learn(batch_size=1)
+        scale = self.batched_model.posterior_scale
+        tt.assert_close(
+            scale @ scale.mT, self.batched_model._inv_A, atol=1e-4, rtol=1e-4
+        )
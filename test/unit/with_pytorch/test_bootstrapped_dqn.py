@@ -0,0 +1,143 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.neural_networks.common.epistemic_neural_networks import StackedEnsemble
+from pearl.neural_networks.sequential_decision_making.q_value_networks import (
+    EnsembleQValueNetwork,
+)
+from pearl.policy_learners.sequential_decision_making.bootstrapped_dqn import (
+    BootstrappedDQN,
+)
+from pearl.replay_buffers.transition import TransitionWithBootstrapMaskBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestBootstrappedDQN(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state_dim = 5
+        self.number_of_actions = 4
+        self.ensemble_size = 6
+        self.batch_size = 32
+        self.action_space = DiscreteActionSpace(
+            actions=list(torch.arange(self.number_of_actions).view(-1, 1))
+        )
+
+    def _batch(self) -> TransitionWithBootstrapMaskBatch:
+        next_unavailable_actions_mask = torch.zeros(
+            self.batch_size, self.number_of_actions, dtype=torch.bool
+        )
+        next_unavailable_actions_mask[::3, -1] = True
+        bootstrap_mask = torch.randint(2, (self.batch_size, self.ensemble_size))
+        # the first ensemble member has no transitions
+        bootstrap_mask[:, 0] = 0
+        return TransitionWithBootstrapMaskBatch(
+            state=torch.randn(self.batch_size, self.state_dim),
+            action=torch.randint(self.number_of_actions, (self.batch_size, 1)).float(),
+            reward=torch.randn(self.batch_size),
+            terminated=torch.rand(self.batch_size) < 0.2,
+            truncated=torch.zeros(self.batch_size, dtype=torch.bool),
+            next_state=torch.randn(self.batch_size, self.state_dim),
+            next_available_actions=torch.arange(self.number_of_actions)
+            .view(1, -1, 1)
+            .expand(self.batch_size, -1, -1)
+            .float(),
+            next_unavailable_actions_mask=next_unavailable_actions_mask,
+            bootstrap_mask=bootstrap_mask,
+        )
+
+    def _per_member_loss(
+        self, policy_learner: BootstrappedDQN, batch: TransitionWithBootstrapMaskBatch
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Computes the loss and TD errors of a batch by filtering the transitions of each
+        ensemble member and evaluating it separately.
+        """
+        assert (mask := batch.bootstrap_mask) is not None
+        assert (next_state := batch.next_state) is not None
+        assert (next_available_actions := batch.next_available_actions) is not None
+        assert (unavailable_mask := batch.next_unavailable_actions_mask) is not None
+        loss = torch.tensor(0.0)
+        td_error_sum = torch.zeros(len(batch))
+        for z in range(self.ensemble_size):
+            members = mask[:, z] == 1
+            if not members.any():
+                continue
+            index = torch.tensor(z)
+            q_values = policy_learner._Q.get_q_values(
+                batch.state[members], batch.action[members], z=index
+            )
+            with torch.no_grad():
+                next_q_values = policy_learner._Q.get_q_values(
+                    next_state[members], next_available_actions[members], z=index
+                )
+                next_q_values[unavailable_mask[members]] = -float("inf")
+                next_state_values = (
+                    policy_learner._Q_target.get_q_values(
+                        next_state[members], next_available_actions[members], z=index
+                    )
+                    .gather(1, next_q_values.argmax(dim=1, keepdim=True))
+                    .squeeze(1)
+                )
+            expected_q_values = (
+                next_state_values * 0.99 * (1 - batch.terminated[members].float())
+                + batch.reward[members]
+            )
+            loss += (q_values - expected_q_values).pow(2).mean()
+            td_error_sum[members] += (q_values - expected_q_values).detach().abs()
+        return loss, td_error_sum / mask.sum(dim=1)
+
+    def test_stacked_ensemble_members(self) -> None:
+        ensemble = StackedEnsemble(
+            input_dim=3, hidden_dims=[8, 8], output_dim=2, ensemble_size=4
+        )
+        x = torch.randn(7, 5, 3)
+        outputs = ensemble.forward_all(x)
+        self.assertEqual(outputs.shape, (4, 7, 5, 2))
+        for z in range(4):
+            tt.assert_close(ensemble(x, z=torch.tensor(z)), outputs[z])
+        # prior networks are not trained
+        outputs.sum().backward()
+        for prior_weight in ensemble.prior_weights:
+            self.assertIsNone(prior_weight.grad)
+        for weight in ensemble.weights:
+            self.assertIsNotNone(weight.grad)
+
+    def test_learn_batch_matches_per_member_losses(self) -> None:
+        for stacked in (False, True):
+            policy_learner = BootstrappedDQN(
+                action_space=self.action_space,
+                q_ensemble_network=EnsembleQValueNetwork(
+                    state_dim=self.state_dim,
+                    action_dim=1,
+                    hidden_dims=[16, 16],
+                    output_dim=1,
+                    ensemble_size=self.ensemble_size,
+                    stacked=stacked,
+                ),
+                target_update_freq=1000,
+            )
+            # make the target network differ from the online network
+            for param in policy_learner._Q_target.parameters():
+                param.data.add_(0.1)
+            batch = self._batch()
+            expected_loss, expected_td_error = self._per_member_loss(
+                policy_learner, batch
+            )
+            report = policy_learner.learn_batch(batch)
+            self.assertAlmostEqual(
+                float(report["loss"]), expected_loss.item(), places=4
+            )
+            self.assertNotIn("td_error", report)
+            tt.assert_close(
+                policy_learner.td_error, expected_td_error, equal_nan=True
+            )
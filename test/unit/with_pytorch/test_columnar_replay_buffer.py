@@ -0,0 +1,200 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import (
+    ColumnarReplayBuffer,
+    ColumnarStorage,
+    InternedTensorTable,
+)
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestColumnarStorage(unittest.TestCase):
+    def test_wraparound(self) -> None:
+        storage = ColumnarStorage(capacity=4)
+        for i in range(6):
+            storage.append({"x": torch.tensor([[float(i)]])})
+        self.assertEqual(len(storage), 4)
+        self.assertEqual(storage.cursor, 2)
+        # oldest rows (0 and 1) have been overwritten by 4 and 5
+        ordered = storage.gather(storage.ordered_indices())["x"].squeeze(-1)
+        tt.assert_close(ordered, torch.tensor([2.0, 3.0, 4.0, 5.0]))
+
+    def test_extend_matches_append(self) -> None:
+        appended = ColumnarStorage(capacity=5)
+        extended = ColumnarStorage(capacity=5)
+        values = torch.randn(7, 3)
+        for i in range(7):
+            appended.append({"x": values[i : i + 1]})
+        extended.extend({"x": values[:2]})
+        extended.extend({"x": values[2:]})
+        tt.assert_close(appended.column("x"), extended.column("x"))
+        self.assertEqual(appended.cursor, extended.cursor)
+        self.assertEqual(len(appended), len(extended))
+
+    def test_dtype_promotion_and_schema(self) -> None:
+        storage = ColumnarStorage(capacity=3)
+        storage.append({"reward": torch.tensor([1])})
+        storage.append({"reward": torch.tensor([0.5])})
+        self.assertEqual(storage.column("reward").dtype, torch.float32)
+        tt.assert_close(
+            storage.gather(torch.tensor([0, 1]))["reward"], torch.tensor([1.0, 0.5])
+        )
+        with self.assertRaises(ValueError):
+            storage.append({"reward": torch.tensor([1.0]), "cost": torch.tensor([1.0])})
+
+
+class TestInternedTensorTable(unittest.TestCase):
+    def test_intern_deduplicates_by_content(self) -> None:
+        table = InternedTensorTable()
+        a, mask = torch.tensor([[1.0, 2.0]]), torch.tensor([[False, True]])
+        self.assertEqual(table.intern(a, mask), 0)
+        self.assertEqual(table.intern(a.clone(), mask.clone()), 0)
+        self.assertEqual(table.intern(a + 1, mask), 1)
+        self.assertEqual(len(table), 2)
+        with self.assertRaises(ValueError):
+            table.intern(torch.zeros(1, 3), mask)
+        # tensors with the bytes of an interned tuple, but another shape or dtype
+        with self.assertRaises(ValueError):
+            table.intern(a.view(2, 1), mask)
+        with self.assertRaises(ValueError):
+            table.intern(a, mask.to(torch.uint8))
+
+        ids = table.intern_batch(
+            torch.tensor([[2.0, 3.0], [5.0, 5.0], [1.0, 2.0], [5.0, 5.0]]),
+            torch.tensor([[False, True], [True, True], [False, True], [True, True]]),
+        )
+        tt.assert_close(ids, torch.tensor([1, 2, 0, 2]))
+        values, masks = table.gather(ids)
+        tt.assert_close(values[1], torch.tensor([5.0, 5.0]))
+        tt.assert_close(masks[2], torch.tensor([False, True]))
+
+    def test_release_frees_and_reuses_ids(self) -> None:
+        table = InternedTensorTable(initial_capacity=1)
+        ids = table.intern_batch(torch.arange(6.0).view(3, 2))
+        table.acquire(torch.tensor([0, 1, 1, 2]))
+        table.release(torch.tensor([1, 2]))
+        # id 1 is still referenced once, id 2 is freed
+        self.assertEqual(len(table), 2)
+        self.assertIsNone(table.rows[2])
+        self.assertEqual(table.intern(torch.tensor([[9.0, 9.0]])), 2)
+        self.assertEqual(table.intern(torch.tensor([[2.0, 3.0]])), 1)
+        (values,) = table.gather(torch.cat([ids[:2], torch.tensor([2])]))
+        tt.assert_close(values, torch.tensor([[0.0, 1.0], [2.0, 3.0], [9.0, 9.0]]))
+
+        table.release(torch.tensor([0]))
+        loaded = InternedTensorTable.from_rows(table.rows)
+        self.assertEqual(len(loaded), 2)
+        self.assertIsNone(loaded.rows[0])
+        self.assertEqual(loaded.intern(torch.tensor([[9.0, 9.0]])), 2)
+        self.assertEqual(loaded.intern(torch.tensor([[7.0, 7.0]])), 0)
+
+
+class TestColumnarReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(3)]
+        )
+
+    def _push(self, replay_buffer: ColumnarReplayBuffer, i: int) -> None:
+        replay_buffer.push(
+            state=torch.tensor([i, i]),
+            action=torch.tensor(i % 3),
+            reward=float(i),
+            next_state=torch.tensor([i + 1, i + 1]),
+            curr_available_actions=self.action_space,
+            next_available_actions=self.action_space,
+            terminated=i % 2 == 0,
+            truncated=False,
+            max_number_actions=self.action_space.n,
+        )
+
+    def test_sample_is_consistent_across_columns(self) -> None:
+        replay_buffer = ColumnarReplayBuffer(capacity=5)
+        for i in range(8):
+            self._push(replay_buffer, i)
+        self.assertEqual(len(replay_buffer), 5)
+
+        batch = replay_buffer.sample(20)
+        self.assertIsInstance(batch, TransitionBatch)
+        self.assertEqual(batch.state.shape, (20, 2))
+        self.assertEqual(batch.state.dtype, torch.float32)
+        assert (next_state := batch.next_state) is not None
+        assert (curr_available_actions := batch.curr_available_actions) is not None
+        assert (curr_mask := batch.curr_unavailable_actions_mask) is not None
+        self.assertEqual(curr_available_actions.shape, (20, 3, 1))
+        self.assertEqual(curr_mask.shape, (20, 3))
+        step = batch.state[:, 0]
+        # only the 5 most recent transitions are kept
+        self.assertTrue(torch.all(step >= 3))
+        tt.assert_close(batch.reward, step)
+        tt.assert_close(next_state[:, 0], step + 1)
+        tt.assert_close(batch.action, step.long() % 3)
+        tt.assert_close(batch.terminated, step.long() % 2 == 0)
+
+    def test_sample_too_large_and_clear(self) -> None:
+        replay_buffer = ColumnarReplayBuffer(capacity=5)
+        for i in range(3):
+            self._push(replay_buffer, i)
+        with self.assertRaises(ValueError):
+            replay_buffer.sample(4)
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer), 0)
+        self._push(replay_buffer, 7)
+        batch = replay_buffer.sample(1)
+        tt.assert_close(batch.reward, torch.tensor([7.0]))
+
+    def test_available_actions_are_stored_once(self) -> None:
+        replay_buffer = ColumnarReplayBuffer(capacity=10)
+        for i in range(6):
+            self._push(replay_buffer, i)
+        self.assertEqual(len(replay_buffer._available_actions_table), 1)
+        self.assertNotIn("curr_available_actions", replay_buffer.storage.column_names)
+        batch = replay_buffer.sample(4)
+        assert (next_available_actions := batch.next_available_actions) is not None
+        tt.assert_close(
+            next_available_actions,
+            self.action_space.actions_batch.unsqueeze(0).expand(4, -1, -1),
+        )
+
+    def test_overwritten_action_spaces_are_freed(self) -> None:
+        replay_buffer = ColumnarReplayBuffer(capacity=4)
+        action_spaces = [
+            DiscreteActionSpace(actions=[torch.tensor([i]), torch.tensor([i + 1])])
+            for i in range(12)
+        ]
+        for i in range(11):
+            replay_buffer.push(
+                state=torch.tensor([i, i]),
+                action=torch.tensor(0),
+                reward=float(i),
+                next_state=torch.tensor([i + 1, i + 1]),
+                curr_available_actions=action_spaces[i],
+                next_available_actions=action_spaces[i + 1],
+                terminated=False,
+                truncated=False,
+                max_number_actions=2,
+            )
+            # stored rows reference at most capacity + 1 distinct action spaces
+            self.assertLessEqual(len(replay_buffer._available_actions_table), 5)
+        batch = replay_buffer.sample(4)
+        assert (curr_available_actions := batch.curr_available_actions) is not None
+        assert (next_available_actions := batch.next_available_actions) is not None
+        step = batch.reward.to(curr_available_actions.dtype)
+        tt.assert_close(
+            curr_available_actions[:, :, 0], torch.stack([step, step + 1], 1)
+        )
+        tt.assert_close(
+            next_available_actions[:, :, 0], torch.stack([step + 1, step + 2], 1)
+        )
@@ -24,6 +24,9 @@ from pearl.history_summarization_modules.lstm_history_summarization_module impor
 from pearl.history_summarization_modules.stacking_history_summarization_module import (
     StackingHistorySummarizationModule,
 )
+from pearl.neural_networks.contextual_bandit.batched_linear_regression import (
+    BatchedLinearRegression,
+)
 from pearl.neural_networks.contextual_bandit.linear_regression import LinearRegression
 from pearl.neural_networks.contextual_bandit.neural_linear_regression import (
     NeuralLinearRegression,
@@ -687,14 +690,25 @@ class TestCompare(TestCase):
 
         # Now the comparison should show a difference
         self.assertNotEqual(module1.compare(module2), "")
+        module2._state_features_only = module1._state_features_only
+        self.assertEqual(module1.compare(module2), "")
 
-        # Modify a linear regression in module2
-        module2_lr_0 = module2._linear_regressions_list[0]
-        assert isinstance(module2_lr_0, LinearRegression)
-        module2_lr_0.gamma = 0.9
+        # Modify the linear regression of one arm in module2, whose linear regressions
+        # are stacked in a `BatchedLinearRegression`
+        module2_linear_regressions = module2._linear_regressions
+        assert isinstance(module2_linear_regressions, BatchedLinearRegression)
+        module2_linear_regressions._A[0] += torch.eye(11)
 
         # Now the comparison should show a difference
-        self.assertNotEqual(module1.compare(module2), "")
+        self.assertIn("_A is different", module1.compare(module2))
+
+        # Modify gamma, which is shared by the linear regressions of all arms
+        module2_linear_regressions._A[0] -= torch.eye(11)
+        self.assertEqual(module1.compare(module2), "")
+        module2_linear_regressions.gamma = 0.9
+
+        # Now the comparison should show a difference
+        self.assertIn("gamma is different", module1.compare(module2))
 
     def test_compare_neural_bandit(self) -> None:
         # Create exploration modules (e.g., UCBExploration)
@@ -8,6 +8,7 @@
 # pyre-strict
 
 import copy
+import dataclasses
 import unittest
 
 import torch
@@ -104,3 +105,33 @@ class TestDeepTDLearning(unittest.TestCase):
             batch=sarsa.preprocess_batch(self.batch), batch_size=self.batch_size
         )
         self.assertEqual(sa_value.shape, (self.batch_size,))
+
+    def test_compiled_learn_batch(self) -> None:
+        for policy_learner_class in (DeepQLearning, DoubleDQN):
+            policy_learners = [
+                policy_learner_class(
+                    state_dim=self.state_dim,
+                    action_space=self.action_space,
+                    hidden_dims=[3],
+                    training_rounds=1,
+                    action_representation_module=self.action_representation_module,
+                    compile=compile,
+                )
+                for compile in (False, True)
+            ]
+            eager, compiled = policy_learners
+            compiled.load_state_dict(eager.state_dict())
+            # the batch dimension is dynamic, so batch sizes can change
+            for batch_size in (self.batch_size, self.batch_size // 2, 5):
+                batch = copy.deepcopy(self.batch)
+                for field in dataclasses.fields(batch):
+                    value = getattr(batch, field.name)
+                    if isinstance(value, torch.Tensor) and value.ndim > 0:
+                        setattr(batch, field.name, value[:batch_size])
+                eager.learn_batch(eager.preprocess_batch(copy.deepcopy(batch)))
+                compiled.learn_batch(compiled.preprocess_batch(copy.deepcopy(batch)))
+                torch.testing.assert_close(compiled.td_error, eager.td_error)
+            for param, compiled_param in zip(
+                eager.parameters(), compiled.parameters()
+            ):
+                torch.testing.assert_close(compiled_param, param)
@@ -21,3 +21,10 @@ class TestDiscreteActionSpace(unittest.TestCase):
         action_space = DiscreteActionSpace(actions=actions)
         for i, action in enumerate(action_space):
             tt.assert_close(actions[i], action, rtol=0.0, atol=0.0)
+
+    def test_actions_batch_is_reused(self) -> None:
+        actions = [torch.randn(4) for _ in range(5)]
+        action_space = DiscreteActionSpace(actions=actions)
+        actions_batch = action_space.actions_batch
+        tt.assert_close(actions_batch, torch.stack(actions))
+        self.assertIs(action_space.actions_batch, actions_batch)
@@ -79,6 +79,49 @@ class TestEpinet(unittest.TestCase):
             rtol=0.0,
         )
 
+    def test_epinet_values(self) -> None:
+        """
+        check that the epinet output matches the one computed on the cartesian product
+        of inputs and epistemic indices
+        """
+        x = self.train_dataset[0:15][0]
+        z = torch.normal(
+            torch.zeros(self.network.index_dim),
+            torch.ones(self.network.num_indices, self.network.index_dim),
+        )
+        xz = self.network.format_xz(x, z)
+        x_cartesian, z_cartesian = (
+            xz[:, : -self.network.index_dim],
+            xz[:, -self.network.index_dim :],
+        )
+        # pyre-fixme[29]: `Union[Tensor, Module]` is not a function.
+        epinet_out = self.network.epinet(xz).view(
+            len(xz), self.network.output_dim, self.network.index_dim
+        )
+        expected_values = torch.einsum(
+            "ijk,ik->ij", epinet_out, z_cartesian
+        ) + self.network.prior_scale * self.network.priornet(x_cartesian, z_cartesian)
+
+        values = self.network(x, z)
+        self.assertEqual(values.shape, expected_values.shape)
+        tt.assert_close(values, expected_values, atol=1e-5, rtol=1e-5)
+
+    def test_priornet_load_state_dict(self) -> None:
+        """
+        The stacked weights of the priornet follow the weights of its models when a
+        state dict is loaded.
+        """
+        other_network = copy.deepcopy(self.network)
+        with torch.no_grad():
+            for param in other_network.priornet.models.parameters():
+                param.normal_()
+        other_network.priornet.generate_params_buffers()
+        x = self.train_dataset[0:15][0]
+        z = torch.randn(self.network.num_indices, self.network.index_dim)
+        self.assertFalse(torch.allclose(self.network(x, z), other_network(x, z)))
+        self.network.load_state_dict(other_network.state_dict())
+        tt.assert_close(self.network(x, z), other_network(x, z))
+
     def test_epinet_optimization(self) -> None:
         """
         epinet should be able to fit a simple function and the loss value
@@ -15,9 +15,27 @@ import torch.testing as tt
 from pearl.replay_buffers.sequential_decision_making.hindsight_experience_replay_buffer import (
     HindsightExperienceReplayBuffer,
 )
+from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 
 
+def _sample_many(
+    rb: HindsightExperienceReplayBuffer, number_of_batches: int
+) -> TransitionBatch:
+    """
+    Concatenates batches of all stored transitions, each of them relabeled differently.
+    """
+    batches = [rb.sample(len(rb)) for _ in range(number_of_batches)]
+    next_states = [batch.next_state for batch in batches]
+    assert all(next_state is not None for next_state in next_states)
+    return TransitionBatch(
+        state=torch.cat([batch.state for batch in batches]),
+        action=torch.cat([batch.action for batch in batches]),
+        reward=torch.cat([batch.reward for batch in batches]),
+        next_state=torch.cat(next_states),
+    )
+
+
 class TestHindsightExperienceReplayBuffer(unittest.TestCase):
     def test_basic(self) -> None:
         """
@@ -66,30 +84,163 @@ class TestHindsightExperienceReplayBuffer(unittest.TestCase):
                 max_number_actions=action_space.n,
             )
 
-        self.assertEqual(len(rb), 2 * len(states) - 2)
-        batch = rb.sample(2 * len(states) - 2)
+        # transitions are stored once, and relabeled when sampled
+        self.assertEqual(len(rb), len(states) - 1)
+        rb.seed_sampling(0)
+        batch = _sample_many(rb, 50)
+        batch_size = len(batch)
 
         # check if batch has a reward as 0
         self.assertTrue(torch.any(batch.reward == 0))
         # check if batch has append additional goal, which is final state
         additional_goal_count = 0
         original_goal_count = 0
-        for state in batch.state:
+        for state, action, reward in zip(batch.state, batch.action, batch.reward):
             # states[-1] is our additional goal
             if torch.all(torch.eq(state[-2:], states[-1])):
                 additional_goal_count += 1
+                self.assertEqual(reward.item(), reward_fn(state, action))
             if torch.all(torch.eq(state[-2:], goal)):
                 original_goal_count += 1
-        self.assertEqual(3, additional_goal_count)
-        self.assertEqual(3, original_goal_count)
-
-        # check cache is cleared after trajectory is terminated
-        self.assertEqual(0, len(rb._trajectory))
+                self.assertEqual(reward.item(), -1)
+        self.assertEqual(additional_goal_count + original_goal_count, batch_size)
+        self.assertGreater(additional_goal_count, 0)
+        self.assertGreater(original_goal_count, 0)
 
         # check for same transition, goal in state and next state should stay the same
         assert (batch_state := batch.state) is not None
         assert (batch_next_state := batch.next_state) is not None
-        for i in range(2 * len(states) - 2):
+        for i in range(batch_size):
             tt.assert_close(
                 batch_state[i][-2:], batch_next_state[i][-2:], rtol=0.0, atol=0.0
             )
+
+    def test_push_batch(self) -> None:
+        # same failed episode as in test_basic, pushed as a single batch:
+        # (0, 0) -> (0, 1) -> (0, 0) -> (1, 0)
+        states = torch.Tensor([[0, 0], [0, 1], [0, 0], [1, 0]])
+        goal = torch.Tensor([1, 1])
+
+        def reward_fn(state: torch.Tensor, action: torch.Tensor) -> int:
+            next_state = states[int(action.item()) + 1]
+            return 0 if torch.equal(next_state, state[-2:]) else -1
+
+        rb = HindsightExperienceReplayBuffer(
+            capacity=10, goal_dim=2, reward_fn=reward_fn
+        )
+        rb.is_action_continuous = True
+        number_of_steps = len(states) - 1
+        rb.push_batch(
+            TransitionBatch(
+                state=torch.cat([states[:-1], goal.expand(number_of_steps, 2)], dim=1),
+                action=torch.arange(number_of_steps).view(-1, 1),
+                reward=-torch.ones(number_of_steps),
+                next_state=torch.cat(
+                    [states[1:], goal.expand(number_of_steps, 2)], dim=1
+                ),
+                terminated=torch.tensor([False, False, True]),
+                truncated=torch.zeros(number_of_steps, dtype=torch.bool),
+            )
+        )
+        self.assertEqual(len(rb), number_of_steps)
+        rb.seed_sampling(0)
+        batch = _sample_many(rb, 30)
+        relabeled = torch.all(batch.state[:, -2:] == states[-1], dim=1)
+        self.assertTrue(torch.any(relabeled))
+        original = torch.all(batch.state[:, -2:] == goal, dim=1)
+        self.assertTrue(torch.all(relabeled | original))
+        # only the last relabeled transition reaches its goal
+        tt.assert_close(
+            batch.reward[relabeled],
+            torch.where(batch.action[relabeled, 0] == 2, 0.0, -1.0),
+        )
+        tt.assert_close(batch.reward[~relabeled], -torch.ones(int((~relabeled).sum())))
+        assert (batch_next_state := batch.next_state) is not None
+        tt.assert_close(batch.state[:, -2:], batch_next_state[:, -2:])
+
+    def _push_episodes(
+        self, rb: HindsightExperienceReplayBuffer, episode_lengths: list[int]
+    ) -> None:
+        """
+        Pushes episodes along a line, where the state of step t of an episode is
+        (episode, t), and whose original goal (-1, -1) is never reached.
+        """
+        for episode, length in enumerate(episode_lengths):
+            for step in range(length):
+                rb.push(
+                    state=torch.tensor([episode, step, -1.0, -1.0]),
+                    action=torch.tensor([0.0]),
+                    reward=-1.0,
+                    next_state=torch.tensor([episode, step + 1, -1.0, -1.0]),
+                    terminated=step == length - 1,
+                    truncated=False,
+                )
+
+    def test_strategies(self) -> None:
+        def batch_reward_fn(
+            states: torch.Tensor, actions: torch.Tensor
+        ) -> torch.Tensor:
+            # reward 0 if the transition reaches its goal
+            next_positions = states[:, :2] + states.new_tensor([0, 1])
+            return torch.all(next_positions == states[:, 2:], dim=1).float() - 1
+
+        for strategy in ("final", "future", "episode"):
+            rb = HindsightExperienceReplayBuffer(
+                capacity=12,
+                goal_dim=2,
+                batch_reward_fn=batch_reward_fn,
+                strategy=strategy,
+                relabels_per_transition=3,
+            )
+            rb.is_action_continuous = True
+            # the oldest 2 transitions are overwritten, and the last episode is not
+            # finished
+            self._push_episodes(rb, [4, 6, 3])
+            rb.push(
+                state=torch.tensor([3, 0, -1.0, -1.0]),
+                action=torch.tensor([0.0]),
+                reward=-1.0,
+                next_state=torch.tensor([3, 1, -1.0, -1.0]),
+                terminated=False,
+                truncated=False,
+            )
+            self.assertEqual(len(rb), 12)
+            rb.seed_sampling(0)
+            batch = _sample_many(rb, 200)
+            batch_size = len(batch)
+            assert (batch_next_state := batch.next_state) is not None
+            tt.assert_close(batch.state[:, 2:], batch_next_state[:, 2:])
+            relabeled = batch.state[:, 2] >= 0
+            # about 3 relabeled transitions for each original one
+            self.assertGreater(int(relabeled.sum()), 0.6 * batch_size)
+            # goals are reached in the same episode, never before the first stored
+            # transition of the episode
+            tt.assert_close(batch.state[relabeled, 2], batch.state[relabeled, 0])
+            goal_steps = batch.state[relabeled, 3]
+            self.assertTrue(torch.all(goal_steps >= 1))
+            self.assertTrue(torch.all(batch.state[relabeled, 0] < 3))
+            self.assertTrue(torch.all(batch.state[batch.state[:, 0] == 0, 1] >= 2))
+            episode_lengths = torch.tensor([4.0, 6.0, 3.0])[
+                batch.state[relabeled, 0].long()
+            ]
+            if strategy == "final":
+                tt.assert_close(goal_steps, episode_lengths)
+            elif strategy == "future":
+                self.assertTrue(torch.all(goal_steps > batch.state[relabeled, 1]))
+                self.assertTrue(torch.all(goal_steps <= episode_lengths))
+            # all steps of episodes are relabeled goals with the "episode" strategy
+            goals = set(map(tuple, batch.state[relabeled].tolist()))
+            if strategy == "episode":
+                self.assertIn((1.0, 4.0, 1.0, 1.0), goals)
+            else:
+                self.assertNotIn((1.0, 4.0, 1.0, 1.0), goals)
+            tt.assert_close(
+                batch.reward,
+                (batch.state[:, 1] + 1 == batch.state[:, 3]).float() - 1,
+            )
+
+        rb.clear()
+        self.assertEqual(len(rb), 0)
+        self._push_episodes(rb, [2])
+        batch = rb.sample(2)
+        self.assertTrue(torch.all(batch.state[:, 0] == 0))
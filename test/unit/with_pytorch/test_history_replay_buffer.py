@@ -0,0 +1,210 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.history_summarization_modules.lstm_history_summarization_module import (
+    LSTMHistorySummarizationModule,
+)
+from pearl.history_summarization_modules.stacking_history_summarization_module import (
+    StackingHistorySummarizationModule,
+)
+from pearl.replay_buffers import HistoryReplayBuffer
+from pearl.replay_buffers.transition import TransitionBatch
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestHistoryReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.observation_dim = 3
+        self.action_dim = 2
+        self.history_length = 4
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(self.action_dim)]
+        )
+
+    def _module(
+        self, stacking: bool = False
+    ) -> LSTMHistorySummarizationModule | StackingHistorySummarizationModule:
+        if stacking:
+            return StackingHistorySummarizationModule(
+                self.observation_dim, self.action_dim, self.history_length
+            )
+        return LSTMHistorySummarizationModule(
+            observation_dim=self.observation_dim,
+            action_dim=self.action_dim,
+            history_length=self.history_length,
+            hidden_dim=8,
+            incremental=True,
+        )
+
+    def _push_episodes(
+        self,
+        replay_buffer: HistoryReplayBuffer,
+        number_of_steps: int,
+        stacking: bool = False,
+    ) -> tuple[list[torch.Tensor], list[torch.Tensor]]:
+        """
+        Pushes the interleaved transitions of two episodes (the first of which is
+        terminated after 5 steps and restarted), and returns the pushed windows.
+        """
+        modules = [self._module(stacking), self._module(stacking)]
+        for module in modules:
+            module.summarize_history(torch.rand(self.observation_dim), None)
+        states, next_states = [], []
+        for step in range(number_of_steps):
+            module = modules[step % 2]
+            terminated = step == 8
+            state = module.get_history()
+            action = torch.randint(self.action_dim, (1,))
+            module.summarize_history(
+                torch.rand(self.observation_dim),
+                torch.nn.functional.one_hot(action, self.action_dim),
+            )
+            next_state = module.get_history()
+            replay_buffer.push(
+                state=state,
+                action=action,
+                reward=float(step),
+                terminated=terminated,
+                truncated=False,
+                curr_available_actions=self.action_space,
+                next_state=next_state,
+                next_available_actions=self.action_space,
+                max_number_actions=self.action_dim,
+            )
+            states.append(state)
+            next_states.append(next_state)
+            if terminated:
+                module.reset()
+                module.summarize_history(torch.rand(self.observation_dim), None)
+        return states, next_states
+
+    def test_windows_are_rebuilt(self) -> None:
+        replay_buffer = HistoryReplayBuffer(
+            capacity=100, history_length=self.history_length
+        )
+        states, next_states = self._push_episodes(replay_buffer, 20)
+        # one step per transition, and one more per episode
+        self.assertEqual(len(replay_buffer.steps), 23)
+        batch = replay_buffer.sample(64)
+        for i in range(64):
+            index = int(batch.buffer_index[i])
+            tt.assert_close(batch.state[i], states[index])
+            tt.assert_close(batch.next_state[i], next_states[index])
+            self.assertEqual(batch.reward[i].item(), float(index))
+
+    def test_stacked_windows(self) -> None:
+        replay_buffer = HistoryReplayBuffer(
+            capacity=100, history_length=self.history_length
+        )
+        states, next_states = self._push_episodes(replay_buffer, 20, stacking=True)
+        self.assertEqual(len(replay_buffer.steps), 23)
+        batch = replay_buffer.sample(64)
+        self.assertEqual(
+            batch.state.shape,
+            (64, self.history_length * (self.observation_dim + self.action_dim)),
+        )
+        tt.assert_close(batch.state, torch.stack(states)[batch.buffer_index])
+        tt.assert_close(batch.next_state, torch.stack(next_states)[batch.buffer_index])
+
+    def test_overwritten_steps(self) -> None:
+        replay_buffer = HistoryReplayBuffer(
+            capacity=10, history_length=self.history_length, steps_capacity=12
+        )
+        # transitions whose windows use overwritten steps are evicted
+        states, next_states = self._push_episodes(replay_buffer, 20)
+        self.assertEqual(len(replay_buffer.storage), 10)
+        self.assertLess(len(replay_buffer), 10)
+        self.assertGreater(len(replay_buffer), 0)
+        batch = replay_buffer.sample(64)
+        # the transition pushed at step i is stored at index i - 10
+        indices = batch.buffer_index + 10
+        tt.assert_close(batch.state, torch.stack(states)[indices])
+        tt.assert_close(batch.next_state, torch.stack(next_states)[indices])
+        with self.assertRaises(ValueError):
+            HistoryReplayBuffer(
+                capacity=10, history_length=self.history_length, steps_capacity=4
+            )
+
+    def test_steps_capacity(self) -> None:
+        # the steps of the windows of the transitions of a single episode take
+        # `capacity + history_length` rows, the default steps_capacity
+        capacity = 10
+        for steps_capacity, number_of_transitions in (
+            (None, capacity),
+            (capacity + self.history_length - 1, capacity - 1),
+        ):
+            replay_buffer = HistoryReplayBuffer(
+                capacity=capacity,
+                history_length=self.history_length,
+                steps_capacity=steps_capacity,
+            )
+            self.assertEqual(
+                replay_buffer.steps.capacity,
+                steps_capacity or capacity + self.history_length,
+            )
+            module = self._module()
+            module.summarize_history(torch.rand(self.observation_dim), None)
+            states, next_states = [], []
+            for _ in range(30):
+                states.append(module.get_history())
+                module.summarize_history(
+                    torch.rand(self.observation_dim), torch.zeros(self.action_dim)
+                )
+                next_states.append(module.get_history())
+                replay_buffer.push(
+                    state=states[-1],
+                    action=torch.tensor([0]),
+                    reward=0.0,
+                    terminated=False,
+                    truncated=False,
+                    curr_available_actions=self.action_space,
+                    next_state=next_states[-1],
+                    next_available_actions=self.action_space,
+                    max_number_actions=self.action_dim,
+                )
+            # the oldest transition is evicted when a step of its window is overwritten
+            self.assertEqual(len(replay_buffer), number_of_transitions)
+            batch = replay_buffer.sample(32)
+            # the transitions pushed at steps 20 to 29
+            indices = batch.buffer_index + 20
+            self.assertTrue(bool((indices >= 30 - number_of_transitions).all()))
+            tt.assert_close(batch.state, torch.stack(states)[indices])
+            tt.assert_close(batch.next_state, torch.stack(next_states)[indices])
+
+    def test_push_batch(self) -> None:
+        pushed = HistoryReplayBuffer(capacity=100, history_length=self.history_length)
+        states, next_states = self._push_episodes(pushed, 20)
+        replay_buffer = HistoryReplayBuffer(
+            capacity=100, history_length=self.history_length
+        )
+        replay_buffer.push_batch(
+            TransitionBatch(
+                state=torch.stack(states),
+                action=torch.zeros(20, 1, dtype=torch.long),
+                reward=torch.zeros(20),
+                next_state=torch.stack(next_states),
+                terminated=torch.arange(20) == 8,
+                truncated=torch.zeros(20, dtype=torch.bool),
+            ),
+            curr_available_actions=self.action_space,
+            next_available_actions=self.action_space,
+            max_number_actions=self.action_dim,
+        )
+        self.assertEqual(len(replay_buffer.steps), len(pushed.steps))
+        batch = replay_buffer.sample(32)
+        tt.assert_close(batch.state, torch.stack(states)[batch.buffer_index])
+        tt.assert_close(batch.next_state, torch.stack(next_states)[batch.buffer_index])
+
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer), 0)
+        self.assertEqual(len(replay_buffer.steps), 0)
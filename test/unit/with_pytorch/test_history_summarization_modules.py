@@ -42,6 +42,89 @@ class TestHistorySummarizationModules(unittest.TestCase):
                 self.history_length * (self.action_dim + self.observation_dim),
             )
 
+    def test_stacking_history_summarizer_order(self) -> None:
+        """
+        Stacked histories hold the last pairs from the oldest to the most recent, and
+        are not modified by the next `history_length` steps.
+        """
+        summarization_module = StackingHistorySummarizationModule(
+            self.observation_dim, self.action_dim, self.history_length
+        )
+        for _ in range(2):
+            summarization_module.reset()
+            # enough steps to move the pairs to the front of the buffer several times
+            pairs = torch.rand(
+                (7 * self.history_length, self.action_dim + self.observation_dim)
+            )
+            expected_histories = [
+                torch.cat(
+                    [
+                        torch.zeros(
+                            (
+                                max(self.history_length - step - 1, 0),
+                                self.action_dim + self.observation_dim,
+                            )
+                        ),
+                        pairs[max(step + 1 - self.history_length, 0) : step + 1],
+                    ]
+                ).view(-1)
+                for step in range(len(pairs))
+            ]
+            histories = []
+            for step, pair in enumerate(pairs):
+                histories.append(
+                    summarization_module.summarize_history(
+                        pair[self.action_dim :], pair[: self.action_dim]
+                    )
+                )
+                for previous_step in range(
+                    max(step - self.history_length, 0), step + 1
+                ):
+                    torch.testing.assert_close(
+                        histories[previous_step], expected_histories[previous_step]
+                    )
+            # get_history returns a copy of the last history
+            history = summarization_module.get_history()
+            torch.testing.assert_close(history, histories[-1])
+            self.assertNotEqual(history.data_ptr(), histories[-1].data_ptr())
+
+    def test_stacking_history_summarizer_state_dict(self) -> None:
+        """
+        Histories are preserved by saving and loading the state dict, including into a
+        module whose circular buffer is at another position.
+        """
+        # a partial window, and a window which wrapped around the circular buffer
+        for number_of_steps in (self.history_length - 2, self.history_length + 2):
+            summarization_module = StackingHistorySummarizationModule(
+                self.observation_dim, self.action_dim, self.history_length
+            )
+            for _ in range(number_of_steps):
+                summarization_module.summarize_history(
+                    torch.rand((1, self.observation_dim)),
+                    torch.rand((1, self.action_dim)),
+                )
+            history = summarization_module.get_history()
+            state_dict = summarization_module.state_dict()
+            torch.testing.assert_close(state_dict["history"].view(-1), history)
+
+            loaded_module = StackingHistorySummarizationModule(
+                self.observation_dim, self.action_dim, self.history_length
+            )
+            loaded_module.summarize_history(
+                torch.rand((1, self.observation_dim)), torch.rand((1, self.action_dim))
+            )
+            loaded_module.load_state_dict(state_dict)
+            torch.testing.assert_close(loaded_module.get_history(), history)
+            self.assertEqual(loaded_module.compare(summarization_module), "")
+
+            # later steps continue from the loaded history
+            observation = torch.rand((1, self.observation_dim))
+            action = torch.rand((1, self.action_dim))
+            torch.testing.assert_close(
+                loaded_module.summarize_history(observation, action),
+                summarization_module.summarize_history(observation, action),
+            )
+
     def test_lstm_history_summarizer(self) -> None:
         """
         Easy test for LSTM history summarization module.
@@ -61,3 +144,41 @@ class TestHistorySummarizationModules(unittest.TestCase):
             self.assertEqual(
                 subjective_state.shape[0], self.observation_dim + self.action_dim
             )
+
+    def test_incremental_lstm_history_summarizer(self) -> None:
+        """
+        The incremental LSTM history summarization module performs one LSTM step per
+        call, which summarizes the whole episode.
+        """
+        summarization_module = LSTMHistorySummarizationModule(
+            observation_dim=self.observation_dim,
+            action_dim=self.action_dim,
+            history_length=self.history_length,
+            hidden_dim=8,
+            incremental=True,
+        )
+        for _ in range(2):
+            summarization_module.reset()
+            episode = torch.rand(
+                (2 * self.history_length, self.action_dim + self.observation_dim)
+            )
+            for step in episode:
+                subjective_state = summarization_module.summarize_history(
+                    step[self.action_dim :], step[: self.action_dim]
+                )
+            expected_subjective_state, _ = summarization_module.lstm(episode)
+            torch.testing.assert_close(subjective_state, expected_subjective_state[-1])
+            # the window of the last steps is still kept for replay buffers
+            torch.testing.assert_close(
+                summarization_module.get_history(), episode[-self.history_length :]
+            )
+            # learning runs the LSTM from zero states over the window, which gives
+            # another subjective state once the episode is longer than the window
+            self.assertFalse(
+                torch.allclose(
+                    subjective_state,
+                    summarization_module(
+                        summarization_module.get_history().unsqueeze(0)
+                    )[0],
+                )
+            )
@@ -0,0 +1,150 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import io
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.policy_learners.contextual_bandits.linear_bandit import LinearBandit
+from pearl.policy_learners.exploration_modules.contextual_bandits.ucb_exploration import (
+    UCBExploration,
+)
+from pearl.policy_learners.sequential_decision_making.ddpg import (
+    DeepDeterministicPolicyGradient,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.policy_learners.sequential_decision_making.ppo import (
+    ProximalPolicyOptimization,
+)
+from pearl.utils.functional_utils.learning.action_utils import (
+    concatenate_actions_to_state,
+)
+from pearl.utils.instantiations.spaces.box_action import BoxActionSpace
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestInferencePolicy(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state_dim = 5
+        self.number_of_actions = 4
+        self.action_space = DiscreteActionSpace(
+            actions=list(torch.arange(self.number_of_actions).view(-1, 1))
+        )
+        self.states = torch.randn(32, self.state_dim)
+        self.no_mask = torch.zeros(32, self.number_of_actions, dtype=torch.bool)
+
+    def _one_hot(self) -> OneHotActionTensorRepresentationModule:
+        return OneHotActionTensorRepresentationModule(
+            max_number_actions=self.number_of_actions
+        )
+
+    def test_dqn(self) -> None:
+        dqn = DeepQLearning(
+            state_dim=self.state_dim,
+            action_space=self.action_space,
+            hidden_dims=[16, 16],
+            action_representation_module=self._one_hot(),
+        )
+        policy = dqn.export_inference_policy(self.states[:2], return_scores=True)
+        action_indices, scores = policy(self.states, self.no_mask)
+        self.assertEqual(action_indices.shape, (32,))
+        self.assertEqual(scores.shape, (32, self.number_of_actions))
+        for state, action_index in zip(self.states, action_indices):
+            self.assertTrue(
+                torch.equal(
+                    self.action_space.actions[action_index],
+                    dqn.act(state, self.action_space, exploit=True),
+                )
+            )
+
+        # masked actions are never selected
+        mask = torch.nn.functional.one_hot(action_indices, self.number_of_actions)
+        masked_action_indices, _ = policy(self.states, mask.bool())
+        self.assertFalse(torch.any(masked_action_indices == action_indices))
+
+        # the exported policy is not affected by later changes of the policy learner
+        # and can be serialized
+        for parameter in dqn._Q.parameters():
+            parameter.data.zero_()
+        buffer = io.BytesIO()
+        torch.jit.save(policy, buffer)
+        buffer.seek(0)
+        loaded_policy = torch.jit.load(buffer)
+        loaded_action_indices, loaded_scores = loaded_policy(self.states, self.no_mask)
+        self.assertTrue(torch.equal(loaded_action_indices, action_indices))
+        tt.assert_close(loaded_scores, scores, atol=0.0, rtol=0.0)
+
+    def test_discrete_actor_critic(self) -> None:
+        ppo = ProximalPolicyOptimization(
+            state_dim=self.state_dim,
+            action_space=self.action_space,
+            actor_hidden_dims=[16],
+            critic_hidden_dims=[16],
+            action_representation_module=self._one_hot(),
+        )
+        policy = ppo.export_inference_policy(self.states[:2], self.action_space)
+        action_indices = policy(self.states, self.no_mask)
+        for state, action_index in zip(self.states, action_indices):
+            self.assertTrue(
+                torch.equal(
+                    self.action_space.actions[action_index],
+                    ppo.act(state, self.action_space, exploit=True),
+                )
+            )
+
+    def test_continuous_actor_critic(self) -> None:
+        action_space = BoxActionSpace(
+            low=torch.tensor([-1.0, -2.0]), high=torch.tensor([1.0, 2.0])
+        )
+        ddpg = DeepDeterministicPolicyGradient(
+            state_dim=self.state_dim,
+            action_space=action_space,
+            actor_hidden_dims=[16],
+            critic_hidden_dims=[16],
+        )
+        policy = ddpg.export_inference_policy(self.states[:2])
+        actions = policy(self.states)
+        self.assertEqual(actions.shape, (32, 2))
+        for state, action in zip(self.states, actions):
+            tt.assert_close(action, ddpg.act(state, action_space, exploit=True))
+
+    def test_linear_bandit(self) -> None:
+        action_dim = 2
+        action_space = DiscreteActionSpace(
+            actions=list(torch.randn(self.number_of_actions, action_dim))
+        )
+        bandit = LinearBandit(
+            feature_dim=self.state_dim + action_dim,
+            exploration_module=UCBExploration(alpha=1.0),
+        )
+        bandit.model.learn_batch(
+            x=torch.randn(100, self.state_dim + action_dim), y=torch.randn(100)
+        )
+        policy = bandit.export_inference_policy(
+            self.states[:2], action_space, return_scores=True
+        )
+        action_indices, scores = policy(self.states, self.no_mask)
+        expected_scores = bandit.model(
+            concatenate_actions_to_state(
+                subjective_state=self.states,
+                action_space=action_space,
+                action_representation_module=bandit.action_representation_module,
+            )
+        )
+        tt.assert_close(scores, expected_scores)
+        self.assertTrue(torch.equal(action_indices, expected_scores.argmax(dim=1)))
+
+        with self.assertRaises(ValueError):
+            bandit.export_inference_policy(self.states[:2])
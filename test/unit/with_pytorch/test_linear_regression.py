@@ -70,3 +70,47 @@ class TestLinearRegression(unittest.TestCase):
         states["_b"] = torch.ones((feature_dim + 1,))
         model.load_state_dict(states)
         self.assertEqual(model._b[3], 1)
+
+    def test_incremental_updates(self) -> None:
+        feature_dim = 8
+        model = LinearRegression(feature_dim=feature_dim, gamma=0.9)
+        incremental_model = LinearRegression(
+            feature_dim=feature_dim,
+            gamma=0.9,
+            incremental_updates=True,
+            refactorization_interval=10,
+        )
+        for i in range(25):
+            # single rows and small batches are applied incrementally
+            batch_size = 1 + i % 3
+            x = torch.randn(batch_size, feature_dim)
+            y = torch.randn(batch_size)
+            weight = torch.rand(batch_size)
+            model.learn_batch(x, y, weight)
+            incremental_model.learn_batch(x, y, weight)
+            if i % 7 == 6:
+                model.apply_discounting()
+                incremental_model.apply_discounting()
+            tt.assert_close(
+                incremental_model._inv_A, model._inv_A, atol=1e-4, rtol=1e-4
+            )
+            tt.assert_close(
+                incremental_model.coefs, model.coefs, atol=1e-4, rtol=1e-4
+            )
+        self.assertLess(incremental_model._number_of_incremental_updates, 10)
+
+    def test_posterior_samples(self) -> None:
+        feature_dim = 4
+        model = LinearRegression(feature_dim=feature_dim, l2_reg_lambda=0.1)
+        model.learn_batch(torch.randn(20, feature_dim), torch.randn(20))
+        scale = model.posterior_scale
+        tt.assert_close(scale @ scale.t(), model._inv_A, atol=1e-4, rtol=1e-4)
+        # the factorization is cached until A changes
+        self.assertIs(model.posterior_scale, scale)
+        model.learn_batch(torch.randn(1, feature_dim), torch.randn(1))
+        self.assertIsNot(model.posterior_scale, scale)
+
+        samples = model.sample_coefs(number_of_samples=20000)
+        self.assertEqual(samples.shape, (20000, feature_dim + 1))
+        tt.assert_close(samples.mean(dim=0), model.coefs, atol=0.05, rtol=0.0)
+        tt.assert_close(torch.cov(samples.t()), model._inv_A, atol=0.05, rtol=0.0)
@@ -0,0 +1,102 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import os
+import tempfile
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import MemmapColumnarStorage, MemmapReplayBuffer
+from pearl.utils.functional_utils.train_and_eval.offline_learning_and_evaluation import (
+    convert_offline_data_to_memmap_buffer,
+)
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestMemmapReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(3)]
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_storage_is_written_to_disk(self) -> None:
+        storage = MemmapColumnarStorage(capacity=4, directory=self.directory.name)
+        storage.extend({"x": torch.arange(6.0).view(3, 2)})
+        storage.flush()
+        self.assertTrue(os.path.isfile(os.path.join(self.directory.name, "x.bin")))
+
+        reopened = MemmapColumnarStorage.load(self.directory.name)
+        self.assertEqual(len(reopened), 3)
+        self.assertEqual(reopened.cursor, 3)
+        tt.assert_close(
+            reopened.gather(torch.tensor([2, 0]))["x"],
+            torch.tensor([[4.0, 5.0], [0.0, 1.0]]),
+        )
+        with self.assertRaises(ValueError):
+            reopened.append({"x": torch.zeros(1, 2, dtype=torch.float64)})
+
+    def test_flush_and_load(self) -> None:
+        replay_buffer = MemmapReplayBuffer(capacity=5, directory=self.directory.name)
+        for i in range(5):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([i % 3]),
+                reward=float(i),
+                terminated=False,
+                truncated=False,
+                curr_available_actions=self.action_space,
+                next_state=torch.tensor([i + 1.0]),
+                next_available_actions=self.action_space,
+            )
+        replay_buffer.flush()
+
+        reopened = MemmapReplayBuffer.load(self.directory.name)
+        self.assertEqual(len(reopened), 5)
+        batch = reopened.sample(5)
+        assert (buffer_index := batch.buffer_index) is not None
+        # indices are sorted to read the files sequentially
+        tt.assert_close(buffer_index, buffer_index.sort().values)
+        tt.assert_close(batch.reward, batch.state[:, 0])
+        assert (next_available_actions := batch.next_available_actions) is not None
+        self.assertEqual(next_available_actions.shape, (5, 3, 1))
+
+    def test_convert_offline_data(self) -> None:
+        raw_transitions = [
+            {
+                "observation": torch.tensor([float(i), 0.0]),
+                "action": torch.tensor([i % 3]),
+                "reward": float(i),
+                "next_observation": torch.tensor([i + 1.0, 0.0]),
+                "curr_available_actions": self.action_space,
+                "next_available_actions": self.action_space,
+                "done": i == 6,
+            }
+            for i in range(7)
+        ]
+        data_path = os.path.join(self.directory.name, "data.pt")
+        torch.save(raw_transitions, data_path)
+        buffer_directory = os.path.join(self.directory.name, "buffer")
+
+        replay_buffer = convert_offline_data_to_memmap_buffer(
+            buffer_directory,
+            is_action_continuous=False,
+            data_path=data_path,
+            max_number_actions_if_discrete=3,
+            chunk_size=3,
+        )
+        self.assertEqual(len(replay_buffer), 7)
+
+        batch = MemmapReplayBuffer.load(buffer_directory).sample(7)
+        tt.assert_close(batch.reward, batch.state[:, 0])
+        tt.assert_close(batch.terminated, batch.reward == 6.0)
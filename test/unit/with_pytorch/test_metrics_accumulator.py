@@ -0,0 +1,109 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.policy_learners.contextual_bandits.linear_bandit import LinearBandit
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.utils.functional_utils.learning.metrics_accumulator import (
+    MetricsAccumulator,
+)
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestMetricsAccumulator(unittest.TestCase):
+    def test_means(self) -> None:
+        metrics = MetricsAccumulator(initial_capacity=1)
+        losses = torch.randn(5, requires_grad=True)
+        for i, loss in enumerate(losses):
+            report = {"loss": loss, "td_error": torch.randn(3), "step": i}
+            if i % 2 == 0:
+                report["actor_loss"] = 2 * loss
+            metrics.record(report)
+        # non-scalar values are not recorded
+        self.assertEqual(metrics.names, ["loss", "step", "actor_loss"])
+        means = metrics.means()
+        self.assertFalse(means["loss"].requires_grad)
+        self.assertAlmostEqual(float(means["loss"]), losses.mean().item(), places=5)
+        self.assertAlmostEqual(
+            float(means["actor_loss"]), 2 * losses[::2].mean().item(), places=5
+        )
+
+        reduced = metrics.reduce()
+        self.assertEqual(set(reduced), {"loss", "step", "actor_loss"})
+        self.assertAlmostEqual(reduced["loss"], losses.mean().item(), places=5)
+        self.assertAlmostEqual(reduced["step"], 2.0)
+        # reducing resets the accumulator
+        self.assertEqual(len(metrics), 0)
+        self.assertEqual(metrics.reduce(), {})
+        metrics.record({"step": 3})
+        self.assertEqual(metrics.reduce(), {"step": 3.0})
+
+    def test_policy_learner_report(self) -> None:
+        action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(2)]
+        )
+        replay_buffer = BasicReplayBuffer(capacity=8)
+        for i in range(8):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([i % 2]),
+                reward=float(i),
+                terminated=False,
+                truncated=False,
+                curr_available_actions=action_space,
+                next_state=torch.tensor([i + 1.0]),
+                next_available_actions=action_space,
+            )
+        policy_learner = DeepQLearning(
+            state_dim=1,
+            action_space=action_space,
+            hidden_dims=[4],
+            training_rounds=3,
+            batch_size=4,
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=2
+            ),
+        )
+        report = policy_learner.learn(replay_buffer)
+        # the mean loss of the training rounds, which is not transferred to the host
+        self.assertIsInstance(report["loss"], torch.Tensor)
+        self.assertEqual(report["loss"].shape, ())
+        self.assertNotIn("td_error", report)
+
+    def test_bandit_report(self) -> None:
+        action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(2)]
+        )
+        replay_buffer = BasicReplayBuffer(capacity=8)
+        for i in range(8):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([float(i % 2)]),
+                reward=float(i),
+                terminated=True,
+                truncated=False,
+                curr_available_actions=action_space,
+                next_state=torch.tensor([float(i)]),
+                next_available_actions=action_space,
+                max_number_actions=2,
+            )
+        policy_learner = LinearBandit(feature_dim=2, training_rounds=3, batch_size=4)
+        report = policy_learner.learn(replay_buffer)
+        # per-transition values are those of the last training round
+        self.assertEqual(set(report), {"label", "prediction", "weight"})
+        self.assertEqual(report["label"].shape, (4,))
+        torch.testing.assert_close(report["weight"], torch.ones(4))
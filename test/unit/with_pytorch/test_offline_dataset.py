@@ -0,0 +1,121 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import tempfile
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from pearl.utils.offline_dataset import (
+    OfflineDataset,
+    OfflineDatasetReplayBuffer,
+    OfflineDatasetWriter,
+)
+
+
+class TestOfflineDataset(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(3)]
+        )
+        self.small_action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(2)]
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _write(self, start: int, end: int) -> None:
+        with OfflineDatasetWriter(
+            self.directory.name, max_number_actions=3, shard_size=4
+        ) as writer:
+            for i in range(start, end):
+                writer.append(
+                    observation=torch.tensor([float(i), 0.0]),
+                    action=torch.tensor([i % 2]),
+                    reward=float(i),
+                    next_observation=torch.tensor([i + 1.0, 0.0]),
+                    terminated=i % 5 == 4,
+                    truncated=False,
+                    curr_available_actions=self.action_space,
+                    next_available_actions=(
+                        self.small_action_space if i % 5 == 4 else self.action_space
+                    ),
+                )
+
+    def test_write_append_and_stream(self) -> None:
+        self._write(0, 6)
+        self._write(6, 10)
+        dataset = OfflineDataset(self.directory.name)
+        self.assertEqual(len(dataset), 10)
+        # 4 + 2 rows from the first writer, then 4 rows from the second
+        self.assertEqual(dataset.number_of_shards, 3)
+
+        batches = list(dataset.iter_batches())
+        self.assertEqual([len(batch) for batch in batches], [4, 2, 4])
+        rewards = torch.cat([batch.reward for batch in batches])
+        tt.assert_close(rewards, torch.arange(10.0))
+
+        batch = batches[1]
+        tt.assert_close(batch.terminated, torch.tensor([True, False]))
+        assert (next_mask := batch.next_unavailable_actions_mask) is not None
+        tt.assert_close(next_mask, torch.tensor([[False, False, True], [False] * 3]))
+        assert (curr_available_actions := batch.curr_available_actions) is not None
+        self.assertEqual(curr_available_actions.shape, (2, 3, 1))
+
+    def test_random_access(self) -> None:
+        self._write(0, 10)
+        dataset = OfflineDataset(self.directory.name, max_cached_shards=1)
+        indices = torch.tensor([9, 0, 5, 5, 3])
+        batch = dataset.get_batch(indices)
+        tt.assert_close(batch.reward, indices.float())
+        tt.assert_close(batch.state[:, 0], indices.float())
+        with self.assertRaises(IndexError):
+            dataset.get_batch(torch.tensor([10]))
+
+        replay_buffer = OfflineDatasetReplayBuffer(dataset)
+        self.assertEqual(len(replay_buffer), 10)
+        batch = replay_buffer.sample(6)
+        tt.assert_close(batch.reward, batch.state[:, 0])
+        with self.assertRaises(NotImplementedError):
+            replay_buffer.clear()
+
+    def test_shard_cache_and_shard_local_sampling(self) -> None:
+        self._write(0, 10)
+        dataset = OfflineDataset(self.directory.name, max_cached_shards=2)
+        for shard_id in (0, 1, 0, 2):
+            dataset._load_shard(shard_id)
+        # the least recently read shard is evicted
+        self.assertEqual(list(dataset._shards), [0, 2])
+        tt.assert_close(dataset.shard_sizes, torch.tensor([4, 4, 2]))
+
+        replay_buffer = OfflineDatasetReplayBuffer(dataset, shard_local=True)
+        replay_buffer.seed_sampling(0)
+        for _ in range(10):
+            batch = replay_buffer.sample(8)
+            assert (buffer_index := batch.buffer_index) is not None
+            shard_id = int(buffer_index[0]) // 4
+            start, end = dataset.shard_range(shard_id)
+            self.assertTrue(bool((buffer_index >= start).all()))
+            self.assertTrue(bool((buffer_index < end).all()))
+            tt.assert_close(batch.reward, buffer_index.float())
+
+    def test_action_space_key_includes_dtype(self) -> None:
+        with OfflineDatasetWriter(
+            self.directory.name, max_number_actions=1, shard_size=4
+        ) as writer:
+            # action spaces with the same bytes, but different dtypes
+            integer_action_space = DiscreteActionSpace(actions=[torch.tensor([0])])
+            float_action_space = DiscreteActionSpace(
+                actions=[torch.tensor([0.0], dtype=torch.float64)]
+            )
+            self.assertEqual(writer._action_space_id(integer_action_space), 0)
+            self.assertEqual(writer._action_space_id(float_action_space), 1)
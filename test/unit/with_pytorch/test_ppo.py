@@ -10,10 +10,12 @@
 import unittest
 
 import torch
-
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
 from pearl.policy_learners.sequential_decision_making.ppo import (
     PPOReplayBuffer,
-    PPOTransition,
+    PPOTransitionBatch,
     ProximalPolicyOptimization,
 )
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
@@ -103,14 +105,84 @@ class TestPPO(unittest.TestCase):
         true_lambda_returns = [lam_return0, lam_return1, lam_return2]  # list of returns
 
         policy_learner.preprocess_replay_buffer(replay_buffer)
+        assert isinstance(replay_buffer, PPOReplayBuffer)
         for i in range(trajectory_len):
-            transition = replay_buffer.memory[i]
+            torch.testing.assert_close(
+                replay_buffer.column("gae")[i : i + 1], true_gaes[i]
+            )
+            torch.testing.assert_close(
+                replay_buffer.column("lam_return")[i : i + 1], true_lambda_returns[i]
+            )
+        batch = replay_buffer.sample(trajectory_len)
+        assert isinstance(batch, PPOTransitionBatch)
+        assert batch.gae is not None
+        self.assertEqual(batch.gae.shape, (trajectory_len,))
 
-            assert isinstance(transition, PPOTransition)
-            gae = transition.gae
-            assert gae is not None
-            self.assertEqual(true_gaes[i], gae.detach())
+        # pushing transitions discards the columns computed for previous transitions
+        replay_buffer.push(
+            state=torch.tensor([3.0]),
+            action=torch.tensor(0.0),
+            reward=1.0,
+            next_state=torch.tensor([4.0]),
+            curr_available_actions=action_space,
+            next_available_actions=action_space,
+            terminated=False,
+            truncated=False,
+            max_number_actions=action_space.n,
+        )
+        with self.assertRaises(KeyError):
+            replay_buffer.column("gae")
 
-            lam_return = transition.lam_return
-            assert lam_return is not None
-            self.assertEqual(true_lambda_returns[i], lam_return.detach())
+    def test_preprocess_replay_buffer_with_several_episodes(self) -> None:
+        """
+        Advantages restart after terminated and truncated transitions, and the values of
+        the next states of truncated transitions are bootstrapped.
+        """
+        action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(3)]
+        )
+        policy_learner = ProximalPolicyOptimization(
+            state_dim=1,
+            action_space=action_space,
+            actor_hidden_dims=[16],
+            critic_hidden_dims=[16],
+            discount_factor=0.9,
+            trace_decay_param=0.8,
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=3
+            ),
+        )
+        replay_buffer = PPOReplayBuffer(20)
+        rewards = torch.randn(10)
+        terminated = [i == 3 for i in range(10)]
+        truncated = [i == 6 for i in range(10)]
+        for i in range(10):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([i % 3]),
+                reward=rewards[i].item(),
+                # the next state of the truncated transition is not the following state
+                next_state=torch.tensor([float(i + 1) if i != 6 else -1.0]),
+                curr_available_actions=action_space,
+                next_available_actions=action_space,
+                terminated=terminated[i],
+                truncated=truncated[i],
+                max_number_actions=action_space.n,
+            )
+        policy_learner.preprocess_replay_buffer(replay_buffer)
+
+        def value(state: float) -> torch.Tensor:
+            return policy_learner._critic(torch.tensor([[state]])).detach()[0]
+
+        # advantages computed backwards with a loop
+        gae = torch.zeros(1)
+        expected_gaes = []
+        for i in reversed(range(10)):
+            next_value = value(float(i + 1) if i != 6 else -1.0)
+            td_error = rewards[i] - value(float(i))
+            td_error += 0.9 * next_value * (not terminated[i])
+            gae = td_error + 0.9 * 0.8 * (not (terminated[i] or truncated[i])) * gae
+            expected_gaes.append(gae)
+        torch.testing.assert_close(
+            replay_buffer.column("gae"), torch.cat(expected_gaes[::-1])
+        )
@@ -0,0 +1,89 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.replay_buffers import (
+    BasicReplayBuffer,
+    PrefetchingReplayBuffer,
+    PrioritizedReplayBuffer,
+)
+from pearl.replay_buffers.replay_buffer import ReplayBuffer
+
+
+class TestPrefetchingReplayBuffer(unittest.TestCase):
+    def _push(self, replay_buffer: ReplayBuffer, start: int, end: int) -> None:
+        for i in range(start, end):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([0.0]),
+                reward=float(i),
+                terminated=False,
+                truncated=False,
+                next_state=torch.tensor([i + 1.0]),
+            )
+
+    def test_sampling_is_reproducible(self) -> None:
+        replay_buffer = BasicReplayBuffer(capacity=100)
+        self._push(replay_buffer, 0, 50)
+        replay_buffer.seed_sampling(7)
+        expected = [replay_buffer.sample(8).reward for _ in range(5)]
+
+        replay_buffer = BasicReplayBuffer(capacity=100)
+        self._push(replay_buffer, 0, 50)
+        prefetching_buffer = PrefetchingReplayBuffer(
+            replay_buffer, number_of_prefetched_batches=3, seed=7
+        )
+        for rewards in expected:
+            tt.assert_close(prefetching_buffer.sample(8).reward, rewards)
+        prefetching_buffer.close()
+
+    def test_deterministic_push(self) -> None:
+        # the batches prefetched when pushing are sampled before the push
+        replay_buffer = BasicReplayBuffer(capacity=100)
+        self._push(replay_buffer, 0, 50)
+        replay_buffer.seed_sampling(7)
+        expected = [replay_buffer.sample(8).reward for _ in range(4)]
+        self._push(replay_buffer, 50, 60)
+        expected += [replay_buffer.sample(8).reward for _ in range(3)]
+
+        replay_buffer = BasicReplayBuffer(capacity=100)
+        self._push(replay_buffer, 0, 50)
+        prefetching_buffer = PrefetchingReplayBuffer(
+            replay_buffer, number_of_prefetched_batches=3, seed=7, deterministic=True
+        )
+        tt.assert_close(prefetching_buffer.sample(8).reward, expected[0])
+        self._push(prefetching_buffer, 50, 60)
+        for rewards in expected[1:]:
+            tt.assert_close(prefetching_buffer.sample(8).reward, rewards)
+        prefetching_buffer.close()
+
+    def test_push_and_clear(self) -> None:
+        prefetching_buffer = PrefetchingReplayBuffer(
+            PrioritizedReplayBuffer(capacity=100), seed=0
+        )
+        self._push(prefetching_buffer, 0, 10)
+        self.assertEqual(len(prefetching_buffer), 10)
+        batch = prefetching_buffer.sample(4)
+        assert (buffer_index := batch.buffer_index) is not None
+        prefetching_buffer.update_priorities(buffer_index, torch.zeros(4))
+
+        self._push(prefetching_buffer, 10, 20)
+        self.assertEqual(len(prefetching_buffer), 20)
+        # changing the batch size restarts prefetching
+        self.assertEqual(len(prefetching_buffer.sample(20)), 20)
+
+        prefetching_buffer.clear()
+        self.assertEqual(len(prefetching_buffer), 0)
+        # errors raised in the background thread are raised by `sample`
+        with self.assertRaises(ValueError):
+            prefetching_buffer.sample(4)
+        prefetching_buffer.close()
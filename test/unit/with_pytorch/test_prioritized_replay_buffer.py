@@ -0,0 +1,121 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers import PrioritizedReplayBuffer, SumTree
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestSumTree(unittest.TestCase):
+    def test_update_and_find(self) -> None:
+        tree = SumTree(capacity=5)
+        tree.update(torch.tensor([0, 1, 2, 3]), torch.tensor([1.0, 2.0, 3.0, 4.0]))
+        self.assertAlmostEqual(tree.total, 10.0)
+        self.assertAlmostEqual(tree.min, 1.0)
+        tt.assert_close(
+            tree.find_prefix_sum_indices(torch.tensor([0.0, 0.99, 1.0, 2.5, 5.9, 9.9])),
+            torch.tensor([0, 0, 1, 1, 2, 3]),
+        )
+        tree.update(torch.tensor([1]), torch.tensor([0.5]))
+        self.assertAlmostEqual(tree.total, 8.5)
+        self.assertAlmostEqual(tree.min, 0.5)
+        tt.assert_close(tree[torch.tensor([1, 3])], torch.tensor([0.5, 4.0]).double())
+
+    def test_sampling_is_proportional(self) -> None:
+        set_seed(0)
+        tree = SumTree(capacity=3)
+        tree.update(torch.arange(3), torch.tensor([1.0, 0.0, 3.0]))
+        indices = tree.find_prefix_sum_indices(torch.rand(20000) * tree.total)
+        counts = torch.bincount(indices, minlength=3).double() / 20000
+        tt.assert_close(
+            counts, torch.tensor([0.25, 0.0, 0.75]).double(), atol=0.02, rtol=0
+        )
+
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+    def setUp(self) -> None:
+        set_seed(0)
+        self.action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(2)]
+        )
+
+    def _fill(self, replay_buffer: PrioritizedReplayBuffer, n: int) -> None:
+        for i in range(n):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor([i % 2]),
+                reward=float(i),
+                terminated=False,
+                truncated=False,
+                curr_available_actions=self.action_space,
+                next_state=torch.tensor([i + 1.0]),
+                next_available_actions=self.action_space,
+            )
+
+    def test_sample_follows_priorities(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=4, alpha=1.0, beta=1.0)
+        self._fill(replay_buffer, 4)
+        # new transitions have the same (maximum) priority
+        batch = replay_buffer.sample(4)
+        assert (weight := batch.weight) is not None
+        tt.assert_close(weight, torch.ones(4))
+
+        replay_buffer.update_priorities(
+            torch.tensor([0, 1, 2, 3]), torch.tensor([0.0, 0.0, 0.0, -3.0])
+        )
+        batch = replay_buffer.sample(4)
+        tt.assert_close(batch.reward, torch.full((4,), 3.0))
+        assert (buffer_index := batch.buffer_index) is not None
+        tt.assert_close(buffer_index, torch.full((4,), 3))
+        assert (weight := batch.weight) is not None
+        self.assertTrue(torch.all(weight < 1e-3))
+
+        # NaN TD errors leave priorities unchanged
+        replay_buffer.update_priorities(torch.tensor([3]), torch.tensor([float("nan")]))
+        tt.assert_close(replay_buffer.sample(2).reward, torch.full((2,), 3.0))
+
+    def test_new_transitions_get_max_priority(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=3, alpha=1.0)
+        self._fill(replay_buffer, 3)
+        replay_buffer.update_priorities(torch.arange(3), torch.tensor([5.0, 0.0, 0.0]))
+        # overwrites the transition at index 0
+        self._fill(replay_buffer, 1)
+        self.assertAlmostEqual(replay_buffer._sum_tree.total, 5.0 + 3e-6, places=5)
+        replay_buffer.clear()
+        self.assertEqual(len(replay_buffer), 0)
+        self.assertEqual(replay_buffer._sum_tree.total, 0.0)
+
+    def test_learn_updates_priorities(self) -> None:
+        replay_buffer = PrioritizedReplayBuffer(capacity=8)
+        self._fill(replay_buffer, 8)
+        policy_learner = DeepQLearning(
+            state_dim=1,
+            action_space=self.action_space,
+            hidden_dims=[4],
+            training_rounds=1,
+            batch_size=8,
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=2
+            ),
+        )
+        report = policy_learner.learn(replay_buffer)
+        self.assertIn("loss", report)
+        self.assertNotIn("td_error", report)
+        # priorities now come from TD errors rather than the initial maximum priority
+        self.assertNotAlmostEqual(replay_buffer._sum_tree.total, 8.0)
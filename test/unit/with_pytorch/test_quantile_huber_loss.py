@@ -0,0 +1,69 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+from pearl.utils.functional_utils.learning.loss_fn_utils import (
+    compute_elementwise_huber_loss,
+    compute_quantile_huber_loss,
+)
+
+
+class TestQuantileHuberLoss(unittest.TestCase):
+    def test_matches_elementwise_loss(self) -> None:
+        batch_size, number_of_quantiles = 7, 5
+        quantile_midpoints = (torch.arange(number_of_quantiles) + 0.5) / (
+            number_of_quantiles
+        )
+        # scaled so that errors fall on both sides of the huber loss threshold
+        quantiles = (3 * torch.randn(batch_size, number_of_quantiles)).requires_grad_()
+        target_quantiles = (
+            3 * torch.randn(batch_size, number_of_quantiles)
+        ).requires_grad_()
+
+        # the (batch_size, N, N) computation replaced by `compute_quantile_huber_loss`
+        pairwise_errors = target_quantiles.unsqueeze(2) - quantiles.unsqueeze(1)
+        asymmetric_weight = torch.abs(
+            quantile_midpoints - (pairwise_errors < 0).float()
+        ).detach()
+        expected_loss = (
+            (asymmetric_weight * compute_elementwise_huber_loss(pairwise_errors, 2.0))
+            .sum(dim=1)
+            .mean()
+        )
+        expected_grads = torch.autograd.grad(
+            expected_loss, (quantiles, target_quantiles)
+        )
+
+        for chunk_size in (None, 1, 3, batch_size):
+            loss = compute_quantile_huber_loss(
+                quantiles,
+                target_quantiles,
+                quantile_midpoints,
+                kappa=2.0,
+                chunk_size=chunk_size,
+            )
+            self.assertTrue(torch.allclose(loss, expected_loss, atol=1e-6))
+            grads = torch.autograd.grad(loss, (quantiles, target_quantiles))
+            for grad, expected_grad in zip(grads, expected_grads):
+                self.assertTrue(torch.allclose(grad, expected_grad, atol=1e-6))
+
+    def test_gradcheck(self) -> None:
+        quantile_midpoints = torch.tensor([0.125, 0.375, 0.625, 0.875]).double()
+        quantiles = torch.randn(3, 4, dtype=torch.double, requires_grad=True)
+        target_quantiles = torch.randn(3, 4, dtype=torch.double, requires_grad=True)
+        self.assertTrue(
+            torch.autograd.gradcheck(
+                lambda quantiles, target_quantiles: compute_quantile_huber_loss(
+                    quantiles, target_quantiles, quantile_midpoints, chunk_size=2
+                ),
+                (quantiles, target_quantiles),
+            )
+        )
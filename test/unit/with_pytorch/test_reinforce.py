@@ -0,0 +1,91 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.policy_learners.sequential_decision_making.reinforce import (
+    REINFORCE,
+    REINFORCEReplayBuffer,
+)
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+
+
+class TestREINFORCE(unittest.TestCase):
+    def test_returns(self) -> None:
+        """
+        Returns restart after terminated and truncated transitions. With a critic, they
+        are bootstrapped with the values of the next states of truncated transitions
+        and of the last transition, unless it is terminated.
+        """
+        action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(3)]
+        )
+        rewards = torch.randn(8)
+        terminated = [i == 2 for i in range(8)]
+        truncated = [i == 5 for i in range(8)]
+        # the next state of the truncated transition is not the following state
+        next_states = [float(i + 1) if i != 5 else -1.0 for i in range(8)]
+        for use_critic in (False, True):
+            # the last transition is terminated, or its episode is unfinished
+            for number_of_transitions in (3, 8):
+                policy_learner = REINFORCE(
+                    state_dim=1,
+                    action_space=action_space,
+                    actor_hidden_dims=[16],
+                    use_critic=use_critic,
+                    critic_hidden_dims=[16],
+                    discount_factor=0.9,
+                    training_rounds=1,
+                    batch_size=number_of_transitions,
+                    action_representation_module=OneHotActionTensorRepresentationModule(
+                        max_number_actions=3
+                    ),
+                )
+                replay_buffer = REINFORCEReplayBuffer(20)
+                for i in range(number_of_transitions):
+                    replay_buffer.push(
+                        state=torch.tensor([float(i)]),
+                        action=torch.tensor([i % 3]),
+                        reward=rewards[i].item(),
+                        next_state=torch.tensor([next_states[i]]),
+                        curr_available_actions=action_space,
+                        next_available_actions=action_space,
+                        terminated=terminated[i],
+                        truncated=truncated[i],
+                        max_number_actions=action_space.n,
+                    )
+
+                # returns computed backwards with a loop, before the critic is trained
+                expected_returns = []
+                discounted_return = torch.zeros(())
+                for i in reversed(range(number_of_transitions)):
+                    if terminated[i]:
+                        next_return = torch.zeros(())
+                    elif truncated[i] or i == number_of_transitions - 1:
+                        next_return = (
+                            policy_learner._critic(torch.tensor([[next_states[i]]]))
+                            .detach()
+                            .reshape(())
+                            if use_critic
+                            else torch.zeros(())
+                        )
+                    else:
+                        next_return = discounted_return
+                    discounted_return = rewards[i] + 0.9 * next_return
+                    expected_returns.append(discounted_return)
+
+                policy_learner.learn(replay_buffer)
+                torch.testing.assert_close(
+                    replay_buffer.column("cum_reward"),
+                    torch.stack(expected_returns[::-1]),
+                )
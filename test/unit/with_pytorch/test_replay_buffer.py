@@ -9,6 +9,7 @@
 import unittest
 
 import torch
+import torch.testing as tt
 
 from pearl.policy_learners.sequential_decision_making.ppo import PPOReplayBuffer
 
@@ -16,10 +17,16 @@ from pearl.policy_learners.sequential_decision_making.reinforce import (
     REINFORCEReplayBuffer,
 )
 
-from pearl.replay_buffers import BasicReplayBuffer
+from pearl.replay_buffers import (
+    BasicReplayBuffer,
+    ColumnarReplayBuffer,
+    TensorBasedReplayBuffer,
+    TransitionBatch,
+)
 from pearl.replay_buffers.sequential_decision_making.bootstrap_replay_buffer import (
     BootstrapReplayBuffer,
 )
+from pearl.utils.functional_utils.experimentation.set_seed import set_seed
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 
 
@@ -84,3 +91,105 @@ class TestReplayBuffer(unittest.TestCase):
                 gpu_usage_after_batch = torch.cuda.memory_allocated(device)
                 print(f"GPU usage after sampling batch: {gpu_usage_after_batch}")
                 self.assertTrue(gpu_usage_after_batch > gpu_usage_after_replay_buffer)
+
+    def test_push_batch_matches_push(self) -> None:
+        number_of_transitions = 6
+        action_space = DiscreteActionSpace([torch.tensor([i]) for i in range(3)])
+        states = torch.randn(number_of_transitions + 1, 4)
+        actions = torch.randint(3, (number_of_transitions, 1))
+        rewards = torch.randn(number_of_transitions)
+        terminated = torch.tensor([False, False, True, False, False, True])
+
+        replay_buffer_types: list[type[TensorBasedReplayBuffer]] = [
+            BasicReplayBuffer,
+            ColumnarReplayBuffer,
+        ]
+        for replay_buffer_type in replay_buffer_types:
+            pushed = replay_buffer_type(10)
+            batch_pushed = replay_buffer_type(10)
+            for i in range(number_of_transitions):
+                pushed.push(
+                    state=states[i],
+                    action=actions[i],
+                    reward=rewards[i].item(),
+                    next_state=states[i + 1],
+                    curr_available_actions=action_space,
+                    next_available_actions=action_space,
+                    terminated=bool(terminated[i]),
+                    truncated=False,
+                    max_number_actions=action_space.n,
+                )
+            batch_pushed.push_batch(
+                TransitionBatch(
+                    state=states[:-1],
+                    action=actions,
+                    reward=rewards,
+                    next_state=states[1:],
+                    terminated=terminated,
+                    truncated=torch.zeros(number_of_transitions, dtype=torch.bool),
+                ),
+                curr_available_actions=action_space,
+                next_available_actions=action_space,
+            )
+            self.assertEqual(len(pushed), len(batch_pushed))
+
+            # sampling the same indices from both buffers yields the same batch
+            set_seed(0)
+            expected = pushed.sample(number_of_transitions)
+            set_seed(0)
+            actual = batch_pushed.sample(number_of_transitions)
+            for field in (
+                "state",
+                "action",
+                "reward",
+                "next_state",
+                "terminated",
+                "truncated",
+                "curr_available_actions",
+                "curr_unavailable_actions_mask",
+                "next_available_actions",
+                "next_unavailable_actions_mask",
+            ):
+                tt.assert_close(getattr(actual, field), getattr(expected, field))
+
+    def test_bootstrap_push_batch(self) -> None:
+        replay_buffer = BootstrapReplayBuffer(10, p=0.5, ensemble_size=3)
+        replay_buffer.is_action_continuous = True
+        replay_buffer.push_batch(
+            TransitionBatch(
+                state=torch.randn(4, 2),
+                action=torch.randn(4, 1),
+                reward=torch.randn(4),
+                next_state=torch.randn(4, 2),
+                terminated=torch.zeros(4, dtype=torch.bool),
+                truncated=torch.zeros(4, dtype=torch.bool),
+            )
+        )
+        batch = replay_buffer.sample(4)
+        assert (bootstrap_mask := batch.bootstrap_mask) is not None
+        self.assertEqual(bootstrap_mask.shape, (4, 3))
+
+    def test_padded_available_actions_are_shared(self) -> None:
+        replay_buffer = BasicReplayBuffer(10)
+        action_space = DiscreteActionSpace(
+            actions=[torch.tensor([i]) for i in range(3)]
+        )
+        other_action_space = DiscreteActionSpace(actions=[torch.tensor([0])])
+        for i in range(3):
+            replay_buffer.push(
+                state=torch.tensor([float(i)]),
+                action=torch.tensor(0),
+                reward=0.0,
+                terminated=False,
+                truncated=False,
+                curr_available_actions=action_space,
+                next_state=torch.tensor([i + 1.0]),
+                next_available_actions=action_space if i < 2 else other_action_space,
+                max_number_actions=3,
+            )
+        first, second, third = replay_buffer.memory
+        self.assertIs(first.curr_available_actions, second.curr_available_actions)
+        self.assertIs(first.next_available_actions, third.curr_available_actions)
+        self.assertIsNot(first.next_available_actions, third.next_available_actions)
+        assert (mask := third.next_unavailable_actions_mask) is not None
+        tt.assert_close(mask, torch.tensor([[False, True, True]]))
@@ -0,0 +1,91 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.utils.functional_utils.learning.return_utils import (
+    discounted_returns,
+    generalized_advantage_estimates,
+    reverse_discounted_cumsum,
+)
+
+
+class TestReturnUtils(unittest.TestCase):
+    def test_reverse_discounted_cumsum(self) -> None:
+        for length in [1, 2, 7, 64, 1000]:
+            values = torch.randn(length, 3)
+            discounts = torch.rand(length, 1) * (torch.rand(length, 1) > 0.1)
+            last_value = torch.randn(3)
+            expected = torch.zeros(length, 3)
+            next_value = last_value
+            for t in reversed(range(length)):
+                next_value = values[t] + discounts[t] * next_value
+                expected[t] = next_value
+            tt.assert_close(
+                reverse_discounted_cumsum(values, discounts, last_value), expected
+            )
+
+    def test_generalized_advantage_estimates(self) -> None:
+        length = 100
+        rewards = torch.randn(length)
+        state_values = torch.randn(length)
+        next_state_values = torch.randn(length)
+        terminated = torch.rand(length) < 0.05
+        truncated = torch.rand(length) < 0.05
+        gamma, trace_decay_param = 0.99, 0.95
+        expected = torch.zeros(length)
+        gae = 0.0
+        for t in reversed(range(length)):
+            td_error = (
+                rewards[t]
+                + gamma * next_state_values[t] * (not terminated[t])
+                - state_values[t]
+            )
+            done = terminated[t] or truncated[t]
+            gae = td_error + gamma * trace_decay_param * (not done) * gae
+            expected[t] = gae
+        tt.assert_close(
+            generalized_advantage_estimates(
+                rewards=rewards,
+                state_values=state_values,
+                next_state_values=next_state_values,
+                terminated=terminated,
+                truncated=truncated,
+                discount_factor=gamma,
+                trace_decay_param=trace_decay_param,
+            ),
+            expected,
+        )
+
+    def test_discounted_returns(self) -> None:
+        rewards = torch.tensor([1.0, 2.0, 3.0, 4.0, 5.0])
+        dones = torch.tensor([False, True, False, False, False])
+        gamma = 0.5
+        # two episodes, the second of which is unfinished and bootstrapped with 8
+        tt.assert_close(
+            discounted_returns(rewards, dones, gamma, bootstrap_value=8.0),
+            torch.tensor([2.0, 2.0, 7.25, 8.5, 9.0]),
+        )
+        # values following done steps are bootstrapped too (e.g. at truncations)
+        tt.assert_close(
+            discounted_returns(
+                rewards,
+                dones,
+                gamma,
+                bootstrap_value=torch.tensor([0.0, 4.0, 0.0, 0.0, 8.0]),
+            ),
+            torch.tensor([3.0, 4.0, 7.25, 8.5, 9.0]),
+        )
+        # the bootstrap value is ignored when the last step is done
+        tt.assert_close(
+            discounted_returns(rewards[:2], dones[:2], gamma, bootstrap_value=8.0),
+            torch.tensor([2.0, 2.0]),
+        )
@@ -15,6 +15,7 @@ import torch.testing as tt
 from pearl.replay_buffers.sequential_decision_making.sarsa_replay_buffer import (
     SARSAReplayBuffer,
 )
+from pearl.replay_buffers.transition import TransitionBatch
 from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
 
 
@@ -117,3 +118,46 @@ class TestSARSABuffer(unittest.TestCase):
         # expect one sample returned
         batch = replay_buffer.sample(1)
         self.assertTrue(batch.terminated[0])
+
+    def test_sarsa_push_batch(self) -> None:
+        """
+        This test is to ensure push_batch matches SARSA pairs within a batch
+        and with the transition cached by a previous push
+        """
+        replay_buffer = SARSAReplayBuffer(self.batch_size * 4)
+        # push S0 A0 R0 S1 one at a time, then S1 A1 R1 S2 and S2 A2 R2 S3 as a batch
+        replay_buffer.push(
+            state=self.states[0],
+            action=self.actions[0],
+            reward=self.rewards[0],
+            terminated=False,
+            truncated=False,
+            curr_available_actions=self.curr_available_actions,
+            next_state=self.next_states[0],
+            next_available_actions=self.next_available_actions,
+            max_number_actions=self.action_space.n,
+        )
+        replay_buffer.push_batch(
+            TransitionBatch(
+                state=torch.stack([self.next_states[0], self.next_states[1]]),
+                action=self.actions[1:],
+                reward=self.rewards[1:],
+                next_state=torch.stack([self.next_states[1], self.next_states[2]]),
+                terminated=torch.tensor([False, True]),
+                truncated=torch.tensor([False, False]),
+            ),
+            curr_available_actions=self.curr_available_actions,
+            next_available_actions=self.next_available_actions,
+        )
+        # S0 A0 R0 S1 A1, S1 A1 R1 S2 A2 and the terminal S2 A2 R2 S3
+        self.assertEqual(len(replay_buffer), 3)
+        batch = replay_buffer.sample(3)
+        assert (batch_next_action := batch.next_action) is not None
+        expected_states = [self.states[0], self.next_states[0], self.next_states[1]]
+        # the terminal transition uses its own action as next action
+        expected_next_actions = [self.actions[1], self.actions[2], self.actions[2]]
+        for state, next_action in zip(batch.state, batch_next_action):
+            k = next(
+                k for k, s in enumerate(expected_states) if torch.equal(s, state)
+            )
+            self.assertEqual(next_action, expected_next_actions[k])
@@ -0,0 +1,79 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import copy
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.neural_networks.common.utils import mlp_block, update_target_network
+from pearl.neural_networks.sequential_decision_making.twin_critic import TwinCritic
+from pearl.utils.functional_utils.learning.critic_utils import (
+    update_critic_target_network,
+)
+
+
+class TestTargetNetworkUpdates(unittest.TestCase):
+    def test_soft_update(self) -> None:
+        network = mlp_block(input_dim=5, hidden_dims=[8, 8], output_dim=2)
+        target_network = copy.deepcopy(network)
+        for param in target_network.parameters():
+            param.data.normal_()
+        tau = 0.1
+        for _ in range(3):
+            expected_params = [
+                tau * param.detach() + (1 - tau) * target_param.detach()
+                for param, target_param in zip(
+                    network.parameters(), target_network.parameters()
+                )
+            ]
+            update_target_network(target_network, network, tau)
+            for target_param, expected_param in zip(
+                target_network.parameters(), expected_params
+            ):
+                tt.assert_close(target_param.detach(), expected_param)
+            # later changes of the network are tracked by the cached parameter groups
+            for param in network.parameters():
+                param.data.add_(1.0)
+
+        # hard updates copy the network
+        update_target_network(target_network, network, 1.0)
+        for param, target_param in zip(
+            network.parameters(), target_network.parameters()
+        ):
+            tt.assert_close(target_param, param, rtol=0.0, atol=0.0)
+
+    def test_shared_parameters(self) -> None:
+        shared_layer = torch.nn.Linear(3, 3)
+        network = torch.nn.Sequential(shared_layer, torch.nn.Linear(3, 1))
+        target_network = torch.nn.Sequential(shared_layer, torch.nn.Linear(3, 1))
+        shared_weight = shared_layer.weight.detach().clone()
+        expected_weight = (network[1].weight + target_network[1].weight).detach() / 2
+        update_target_network(target_network, network, 0.5)
+        # shared parameters are not soft-updated
+        tt.assert_close(shared_layer.weight.detach(), shared_weight)
+        tt.assert_close(target_network[1].weight.detach(), expected_weight)
+        # parameters are updated in place, and are still trainable
+        self.assertTrue(target_network[1].weight.requires_grad)
+
+    def test_twin_critic_update(self) -> None:
+        critic = TwinCritic(state_dim=4, action_dim=2, hidden_dims=[8, 8])
+        target_critic = TwinCritic(state_dim=4, action_dim=2, hidden_dims=[8, 8])
+        tau = 0.3
+        expected_params = [
+            tau * param.detach() + (1 - tau) * target_param.detach()
+            for param, target_param in zip(
+                critic.parameters(), target_critic.parameters()
+            )
+        ]
+        update_critic_target_network(target_critic, critic, tau)
+        for target_param, expected_param in zip(
+            target_critic.parameters(), expected_params
+        ):
+            tt.assert_close(target_param.detach(), expected_param)
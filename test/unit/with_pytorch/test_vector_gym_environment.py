@@ -0,0 +1,89 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.utils.functional_utils.train_and_eval.online_learning import (
+    online_learning_vectorized,
+)
+from pearl.utils.instantiations.environments.vector_gym_environment import (
+    VectorGymEnvironment,
+)
+from pearl.vector_pearl_agent import VectorPearlAgent
+
+
+class TestVectorGymEnvironment(unittest.TestCase):
+    def test_step(self) -> None:
+        number_of_envs = 4
+        env = VectorGymEnvironment("CartPole-v1", number_of_envs=number_of_envs)
+        observations, action_space = env.reset(seed=0)
+        self.assertEqual(observations.shape, (number_of_envs, 4))
+        self.assertEqual(observations.dtype, torch.float32)
+        self.assertEqual(action_space.n, 2)
+
+        episode_ended = False
+        for _ in range(200):
+            actions = torch.zeros(number_of_envs, 1, dtype=torch.long)
+            result = env.step(actions)
+            self.assertEqual(result.observation.shape, (number_of_envs, 4))
+            self.assertEqual(result.reward.shape, (number_of_envs,))
+            self.assertEqual(result.done.dtype, torch.bool)
+            not_done = ~result.done
+            self.assertTrue(
+                torch.equal(
+                    result.observation[not_done], result.reset_observation[not_done]
+                )
+            )
+            if result.done.any():
+                # always pushing left makes the pole fall, far from its initial position
+                episode_ended = True
+                done = result.done
+                self.assertFalse(
+                    torch.equal(
+                        result.observation[done], result.reset_observation[done]
+                    )
+                )
+        self.assertTrue(episode_ended)
+        env.close()
+
+    def test_online_learning_vectorized(self) -> None:
+        number_of_envs = 3
+        env = VectorGymEnvironment("CartPole-v1", number_of_envs=number_of_envs)
+        agent = VectorPearlAgent(
+            policy_learner=DeepQLearning(
+                state_dim=4,
+                action_space=env.action_space,
+                hidden_dims=[16],
+                training_rounds=1,
+                batch_size=8,
+                action_representation_module=OneHotActionTensorRepresentationModule(
+                    max_number_actions=2
+                ),
+            ),
+            number_of_envs=number_of_envs,
+            replay_buffer=BasicReplayBuffer(1000),
+        )
+        info = online_learning_vectorized(
+            agent=agent, env=env, number_of_episodes=5, seed=0
+        )
+        self.assertGreaterEqual(len(info["return"]), 5)
+        self.assertEqual(len(info["env_index"]), len(info["return"]))
+        for env_index in info["env_index"]:
+            self.assertIn(env_index, range(number_of_envs))
+        for episode_return in info["return"]:
+            self.assertGreater(episode_return, 0)
+        env.close()
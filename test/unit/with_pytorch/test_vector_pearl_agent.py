@@ -0,0 +1,141 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+# pyre-strict
+
+import unittest
+
+import torch
+import torch.testing as tt
+from pearl.action_representation_modules.one_hot_action_representation_module import (
+    OneHotActionTensorRepresentationModule,
+)
+from pearl.history_summarization_modules.lstm_history_summarization_module import (
+    LSTMHistorySummarizationModule,
+)
+from pearl.policy_learners.exploration_modules.common.epsilon_greedy_exploration import (
+    EGreedyExploration,
+)
+from pearl.policy_learners.sequential_decision_making.deep_q_learning import (
+    DeepQLearning,
+)
+from pearl.replay_buffers import BasicReplayBuffer
+from pearl.utils.instantiations.spaces.discrete_action import DiscreteActionSpace
+from pearl.vector_pearl_agent import VectorPearlAgent
+
+
+class TestVectorPearlAgent(unittest.TestCase):
+    def setUp(self) -> None:
+        self.number_of_envs = 6
+        self.state_dim = 4
+        self.action_space = DiscreteActionSpace(
+            actions=list(torch.arange(3).view(-1, 1))
+        )
+
+    def _dqn(self, state_dim: int, epsilon: float = 0.1) -> DeepQLearning:
+        return DeepQLearning(
+            state_dim=state_dim,
+            action_space=self.action_space,
+            hidden_dims=[8],
+            training_rounds=1,
+            batch_size=4,
+            exploration_module=EGreedyExploration(epsilon),
+            action_representation_module=OneHotActionTensorRepresentationModule(
+                max_number_actions=self.action_space.n
+            ),
+        )
+
+    def test_act_and_observe_batch(self) -> None:
+        agent = VectorPearlAgent(
+            policy_learner=self._dqn(self.state_dim),
+            number_of_envs=self.number_of_envs,
+            replay_buffer=BasicReplayBuffer(100),
+        )
+        observations = torch.randn(self.number_of_envs, self.state_dim)
+        agent.reset_batch(observations, self.action_space)
+
+        # exploit actions match the ones selected for each environment separately
+        actions = agent.act_batch(exploit=True)
+        self.assertEqual(actions.shape, (self.number_of_envs, 1))
+        self.assertEqual(actions.dtype, self.action_space.actions_batch.dtype)
+        for i in range(self.number_of_envs):
+            tt.assert_close(
+                actions[i],
+                agent.policy_learner.act(
+                    observations[i], self.action_space, exploit=True
+                ).to(actions),
+            )
+
+        for step in range(3):
+            actions = agent.act_batch()
+            self.assertEqual(actions.shape, (self.number_of_envs, 1))
+            agent.observe_batch(
+                observations=torch.randn(self.number_of_envs, self.state_dim),
+                rewards=torch.ones(self.number_of_envs),
+                terminated=torch.zeros(self.number_of_envs, dtype=torch.bool),
+                truncated=torch.zeros(self.number_of_envs, dtype=torch.bool),
+            )
+            self.assertEqual(len(agent.replay_buffer), (step + 1) * self.number_of_envs)
+            agent.learn()
+
+        batch = agent.replay_buffer.sample(2 * self.number_of_envs)
+        self.assertEqual(batch.state.shape, (2 * self.number_of_envs, self.state_dim))
+        self.assertEqual(batch.action.shape, (2 * self.number_of_envs, 1))
+
+    def test_reset_subset_of_envs(self) -> None:
+        agent = VectorPearlAgent(
+            policy_learner=self._dqn(self.state_dim),
+            number_of_envs=self.number_of_envs,
+            replay_buffer=BasicReplayBuffer(100),
+        )
+        with self.assertRaises(ValueError):
+            agent.reset_batch(torch.randn(2, self.state_dim), self.action_space, [0, 1])
+        observations = torch.randn(self.number_of_envs, self.state_dim)
+        agent.reset_batch(observations, self.action_space)
+        new_observations = torch.randn(2, self.state_dim)
+        agent.reset_batch(new_observations, self.action_space, env_indices=[1, 4])
+        assert agent._subjective_states is not None
+        tt.assert_close(agent._subjective_states[[1, 4]], new_observations)
+        unchanged = [0, 2, 3, 5]
+        tt.assert_close(agent._subjective_states[unchanged], observations[unchanged])
+
+    def test_history_summarization_modules_share_parameters(self) -> None:
+        hidden_dim = 5
+        history_summarization_module = LSTMHistorySummarizationModule(
+            observation_dim=self.state_dim,
+            action_dim=self.action_space.n,
+            history_length=3,
+            hidden_dim=hidden_dim,
+        )
+        agent = VectorPearlAgent(
+            policy_learner=self._dqn(hidden_dim),
+            number_of_envs=self.number_of_envs,
+            replay_buffer=BasicReplayBuffer(100),
+            history_summarization_module=history_summarization_module,
+        )
+        modules = agent._history_summarization_modules
+        assert modules is not None
+        self.assertEqual(len(modules), self.number_of_envs)
+        for module in modules:
+            self.assertIs(
+                module.lstm.weight_ih_l0,
+                history_summarization_module.lstm.weight_ih_l0,
+            )
+
+        agent.reset_batch(
+            torch.randn(self.number_of_envs, self.state_dim), self.action_space
+        )
+        agent.act_batch()
+        agent.observe_batch(
+            observations=torch.randn(self.number_of_envs, self.state_dim),
+            rewards=torch.zeros(self.number_of_envs),
+            terminated=torch.zeros(self.number_of_envs, dtype=torch.bool),
+            truncated=torch.zeros(self.number_of_envs, dtype=torch.bool),
+        )
+        self.assertEqual(len(agent.replay_buffer), self.number_of_envs)
+        # each environment keeps its own history
+        self.assertFalse(torch.equal(modules[0].history, modules[1].history))